@@ -0,0 +1,312 @@
+"""
+Apify actor runs shared by every Instagram caller in the repo.
+
+enrich (IG profiles / reels / posts), scripts/apify_all_instagram_counts,
+scripts/augment_butcher_instagram and social_graph/fetch_seed_posts each
+used to build an ApifyClient, block a thread on `.call()` for the whole
+run, then list the dataset in one shot. `scrape_usernames` replaces that:
+
+  - Per-username cache: items are stored in SQLite (APIFY_CACHE_PATH) per
+    (actor, run options, username) with a TTL (APIFY_CACHE_TTL_DAYS), and
+    usernames a successful run returned nothing for are cached as empty, so
+    the same 30-username batch is never scraped twice in a week.
+  - Runs are started with `.start()` and polled from one loop in the
+    calling thread. New dataset pages are read as the actor writes them, and
+    each batch is handed to `on_batch` as soon as its run finishes.
+  - At most APIFY_MAX_CONCURRENT_RUNS runs are in flight per process
+    (shared by all callers), and usernames another thread is already
+    scraping with the same actor/options are waited on rather than re-run.
+
+Failed runs are not cached; their usernames are simply missing from the
+result (and from `on_batch`), so callers can tell "failed" from "empty".
+`print_apify_summary()` prints hits / runs / failures at the end of a run.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable
+
+import telemetry
+from config import (
+    APIFY_API_TOKEN, APIFY_CACHE_ENABLED, APIFY_CACHE_PATH, APIFY_CACHE_TTL_DAYS,
+    APIFY_MAX_CONCURRENT_RUNS, APIFY_POLL_SECONDS,
+)
+
+_DAY = 86_400
+_PAGE = 1_000
+_TERMINAL = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    actor       TEXT NOT NULL,
+    options     TEXT NOT NULL,
+    username    TEXT NOT NULL,
+    body        TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    PRIMARY KEY (actor, options, username)
+);
+"""
+
+
+def _options_key(options: dict | None) -> str:
+    raw = json.dumps(options or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class ApifyCache:
+    def __init__(self, path: str = APIFY_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def lookup(self, actor: str, options: str, usernames: list[str], ttl_days: float) -> dict[str, list]:
+        cutoff = time.time() - ttl_days * _DAY
+        out = {}
+        with self._lock:
+            for i in range(0, len(usernames), 500):
+                chunk = usernames[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT username, body FROM items WHERE actor = ? AND options = ? AND fetched_at >= ?"
+                    f" AND username IN ({','.join('?' * len(chunk))})",
+                    (actor, options, cutoff, *chunk),
+                )
+                out.update((u, json.loads(body)) for u, body in rows)
+        return out
+
+    def fetched_at(self, actor: str, options: str, usernames: list[str]) -> dict[str, float]:
+        """{username: when its cached items were scraped} for the cached ones."""
+        out = {}
+        with self._lock:
+            for i in range(0, len(usernames), 500):
+                chunk = usernames[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT username, fetched_at FROM items WHERE actor = ? AND options = ?"
+                    f" AND username IN ({','.join('?' * len(chunk))})",
+                    (actor, options, *chunk),
+                )
+                out.update(rows)
+        return out
+
+    def store(self, actor: str, options: str, results: dict[str, list]) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO items (actor, options, username, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                [(actor, options, u, json.dumps(items, default=str), now) for u, items in results.items()],
+            )
+
+
+class ApifyStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"hits": 0, "scraped": 0, "runs": 0, "failed_runs": 0}
+
+    def add(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[field] += n
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"Apify: {c['hits']:,} usernames from cache, {c['scraped']:,} scraped "
+                f"in {c['runs']:,} runs ({c['failed_runs']} failed)")
+
+
+STATS = ApifyStats()
+_cache: ApifyCache | None = None
+_cache_lock = threading.Lock()
+_run_slots = threading.BoundedSemaphore(max(1, APIFY_MAX_CONCURRENT_RUNS))
+_inflight: dict[tuple, threading.Event] = {}
+_inflight_lock = threading.Lock()
+_client = None
+
+
+def get_apify_cache() -> ApifyCache | None:
+    global _cache
+    if not APIFY_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ApifyCache()
+        return _cache
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        from apify_client import ApifyClient
+        _client = ApifyClient(APIFY_API_TOKEN)
+    return _client
+
+
+def print_apify_summary() -> None:
+    if STATS.counts["hits"] or STATS.counts["runs"]:
+        print(STATS.summary())
+
+
+class _Run:
+    """One started actor run whose dataset is read incrementally."""
+
+    def __init__(self, client, actor: str, run_input: dict, usernames: list[str]):
+        self.usernames = usernames
+        run = client.actor(actor).start(run_input=run_input)
+        self.run_id = run["id"]
+        self.started = time.perf_counter()
+        self.cost = 0.0
+        self.dataset = client.dataset(run["defaultDatasetId"])
+        self.client = client
+        self.items: list[dict] = []
+        self.status = run.get("status", "READY")
+
+    def poll(self) -> bool:
+        """Read newly written items; True once the run is finished and drained."""
+        info = self.client.run(self.run_id).get() or {}
+        self.status = info.get("status", self.status)
+        self.cost = info.get("usageTotalUsd") or self.cost
+        while True:
+            page = self.dataset.list_items(offset=len(self.items), limit=_PAGE)
+            self.items.extend(page.items)
+            if len(page.items) < _PAGE:
+                break
+        return self.status in _TERMINAL
+
+
+def scrape_usernames(
+    actor: str,
+    usernames: Iterable[str],
+    run_input: Callable[[list[str]], dict],
+    owner: Callable[[dict], str],
+    *,
+    options: dict | None = None,
+    batch_size: int = 30,
+    ttl_days: float = APIFY_CACHE_TTL_DAYS,
+    refresh: bool = False,
+    on_batch: Callable[[dict[str, list]], None] | None = None,
+    label: str = "",
+) -> dict[str, list]:
+    """{username: [items]} for every username whose scrape succeeded.
+
+    `run_input(batch)` builds the actor input for a list of usernames;
+    `owner(item)` says which username an item belongs to. `options` are the
+    non-username inputs that change the output (e.g. resultsLimit) and are
+    part of the cache key. Cached / just-finished usernames are passed to
+    `on_batch` as they become available. refresh=True skips the cache
+    lookup and scrapes every username (results are still cached).
+    """
+    usernames = list(dict.fromkeys(u.strip().lstrip("@").lower() for u in usernames if u and u.strip()))
+    opt = _options_key(options)
+    cache = get_apify_cache()
+    results: dict[str, list] = {}
+
+    def deliver(found: dict[str, list]) -> None:
+        results.update(found)
+        if on_batch and found:
+            on_batch(found)
+
+    if cache is not None and usernames and not refresh:
+        hits = cache.lookup(actor, opt, usernames, ttl_days)
+        STATS.add("hits", len(hits))
+        deliver(hits)
+
+    # Claim usernames nobody else is scraping; wait for the rest afterwards
+    # (their results arrive through the cache, so without one we scrape all).
+    mine, theirs = [], []
+    with _inflight_lock:
+        for u in usernames:
+            if u in results:
+                continue
+            key = (actor, opt, u)
+            if key in _inflight and cache is not None:
+                theirs.append(u)
+            else:
+                _inflight.setdefault(key, threading.Event())
+                mine.append(u)
+
+    try:
+        if mine:
+            _run_batches(actor, opt, mine, run_input, owner, batch_size, cache, deliver, label)
+    finally:
+        with _inflight_lock:
+            for u in mine:
+                event = _inflight.pop((actor, opt, u), None)
+                if event is not None:
+                    event.set()
+
+    if theirs:
+        for u in theirs:
+            event = _inflight.get((actor, opt, u))
+            if event is not None:
+                event.wait()
+        if cache is not None:
+            deliver(cache.lookup(actor, opt, theirs, ttl_days))
+    return results
+
+
+def _run_batches(actor, opt, usernames, run_input, owner, batch_size, cache, deliver, label) -> None:
+    client = _get_client()
+    batches = [usernames[i:i + batch_size] for i in range(0, len(usernames), batch_size)]
+    pending = iter(batches)
+    running: list[_Run] = []
+    started = finished = 0
+    tag = f"[apify{' ' + label if label else ''}]"
+
+    def start_more():
+        nonlocal started
+        while True:
+            if running and not _run_slots.acquire(blocking=False):
+                return  # keep polling what we have; retry for a slot next tick
+            if not running:
+                _run_slots.acquire()
+            batch = next(pending, None)
+            if batch is None:
+                _run_slots.release()
+                return
+            started += 1
+            try:
+                running.append(_Run(client, actor, run_input(batch), batch))
+                STATS.add("runs")
+            except Exception as e:
+                _run_slots.release()
+                STATS.add("failed_runs")
+                telemetry.record("apify", status=type(e).__name__)
+                print(f"  {tag} could not start batch {started}/{len(batches)}: {e}", flush=True)
+
+    start_more()
+    while running:
+        time.sleep(APIFY_POLL_SECONDS)
+        for run in list(running):
+            try:
+                done = run.poll()
+            except Exception as e:
+                print(f"  {tag} poll failed for run {run.run_id}: {e}", flush=True)
+                continue
+            if not done:
+                continue
+            running.remove(run)
+            _run_slots.release()
+            finished += 1
+            telemetry.record("apify", latency=time.perf_counter() - run.started, status=run.status,
+                             cost=run.cost, error=run.status != "SUCCEEDED")
+            if run.status != "SUCCEEDED":
+                STATS.add("failed_runs")
+                print(f"  {tag} run {run.run_id} ended {run.status}; {len(run.usernames)} usernames left pending",
+                      flush=True)
+                continue
+            found = {u: [] for u in run.usernames}
+            for item in run.items:
+                u = (owner(item) or "").lower()
+                if u in found:
+                    found[u].append(item)
+            STATS.add("scraped", len(found))
+            if cache is not None:
+                cache.store(actor, opt, found)
+            deliver(found)
+            if finished % 10 == 0 or finished == len(batches):
+                print(f"  {tag} {finished}/{len(batches)} runs finished", flush=True)
+        start_more()
@@ -76,6 +76,14 @@ ALL_SOURCES: list[tuple[str, str, int, str, str, bool]] = [
 ]
 
 
+# Sources that drive Playwright from the start (not just as a fallback).
+# discover_awards.py runs them in source_runner's smaller browser pool.
+BROWSER_SOURCES: frozenset[str] = frozenset({
+    "james_beard",
+    "nyt",
+})
+
+
 def by_slug(slug: str):
     for row in ALL_SOURCES:
         if row[0] == slug:
@@ -15,11 +15,11 @@ import os
 import time
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
 from awards._lib import to_dataframe, normalize_state
 from awards.llm_extract import extract_businesses_from_url, extract_businesses_from_text
+from serper import serper_post
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
 
@@ -31,7 +31,7 @@ def _serper_search(query: str, *, num: int = 10) -> list[dict]:
         print("  [editorial] SERPER_API_KEY missing; skipping search", flush=True)
         return []
     try:
-        r = requests.post(
+        r = serper_post(
             "https://google.serper.dev/search",
             headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
             json={"q": query, "num": num, "gl": "us", "hl": "en"},
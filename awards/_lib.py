@@ -4,7 +4,9 @@ Shared infrastructure for award scrapers.
 Every per-source module in `awards.<category>.<source>` should:
   - import `SCHEMA`, `normalize_state`, `is_us_country`, `make_row`, `save_source`
   - return a `pandas.DataFrame` from `scrape()` matching SCHEMA
-  - use `playwright_session()` for any Playwright work (handles WAF, UA, retries)
+  - use `browser_pool.fetch_rendered()` when all you need is a page's rendered
+    HTML, and `playwright_session()` only when the scraper drives the page
+    (clicks, selectors, scrolling)
   - use `fetch_html()` for plain HTTP
 
 Idempotency: every per-source CSV is rewritten on each run (date-stamped path).
@@ -25,6 +27,9 @@ from typing import Any, Iterable
 import pandas as pd
 import requests
 
+from lead_io import AWARD_SCHEMA, read_table, with_suffix, write_table
+from source_runner import browser_slot, host_slot
+
 # Canonical schema. Order matters — used when writing CSVs.
 SCHEMA: list[str] = [
     "source",
@@ -148,18 +153,14 @@ def filter_us(df: pd.DataFrame) -> pd.DataFrame:
 
 def dedupe(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Within a single source's output: keep the first occurrence per (name, city)
-    case-insensitive. Across sources we keep duplicates intentionally — multiple
+    Within a single source's output: keep the first occurrence per business
+    (entity_resolution: same name and city, allowing small spelling variants). Across sources we keep duplicates intentionally — multiple
     awards reinforce the lead score.
     """
     if df.empty:
         return df
-    key = (df["name"].fillna("").str.lower().str.strip()
-           + "||"
-           + df["city"].fillna("").str.lower().str.strip())
-    df = df.assign(_dedupe_key=key)
-    df = df.drop_duplicates("_dedupe_key", keep="first")
-    return df.drop(columns="_dedupe_key").reset_index(drop=True)
+    from entity_resolution import dedupe as dedupe_entities
+    return dedupe_entities(df).reset_index(drop=True)
 
 
 def to_dataframe(rows: Iterable[dict]) -> pd.DataFrame:
@@ -173,13 +174,14 @@ def to_dataframe(rows: Iterable[dict]) -> pd.DataFrame:
 
 
 def save_source(df: pd.DataFrame, slug: str, *, stamp: str | None = None) -> Path:
-    """Write per-source CSV with date stamp. Always overwrites today's file."""
+    """Write per-source CSV (or Parquet, see lead_io) with date stamp.
+    Always overwrites today's file."""
     stamp = stamp or datetime.now().strftime("%Y%m%d")
-    path = OUTPUT_DIR / f"{slug}_{stamp}.csv"
+    path = with_suffix(OUTPUT_DIR / f"{slug}_{stamp}.csv")
     df = to_dataframe(df.to_dict("records") if not df.empty else [])
     df = filter_us(df)
     df = dedupe(df)
-    df.to_csv(path, index=False)
+    write_table(df, path, AWARD_SCHEMA)
     print(f"  Saved {len(df):>5} rows -> {path.relative_to(ROOT)}", flush=True)
     return path
 
@@ -187,16 +189,26 @@ def save_source(df: pd.DataFrame, slug: str, *, stamp: str | None = None) -> Pat
 def latest_for_slug(slug: str) -> Path | None:
     # Use regex match on the date suffix so e.g. slug="michelin" doesn't
     # accidentally pick up `michelin_grape_*.csv` (sibling slug).
-    pat = re.compile(rf"^{re.escape(slug)}_\d{{8}}\.csv$")
-    files = sorted(p for p in OUTPUT_DIR.glob(f"{slug}_*.csv") if pat.match(p.name))
+    # Same-day .parquet sorts after .csv, so it wins when both exist.
+    pat = re.compile(rf"^{re.escape(slug)}_\d{{8}}\.(csv|parquet)$")
+    files = sorted(p for p in OUTPUT_DIR.glob(f"{slug}_*") if pat.match(p.name))
     return files[-1] if files else None
 
 
-def load_latest(slug: str) -> pd.DataFrame:
+def stamped_path(directory: Path, slug: str, stamp: str) -> Path | None:
+    """The per-source file for one date stamp, Parquet preferred."""
+    for ext in (".parquet", ".csv"):
+        path = directory / f"{slug}_{stamp}{ext}"
+        if path.exists():
+            return path
+    return None
+
+
+def load_latest(slug: str, columns: list[str] | None = None) -> pd.DataFrame:
     p = latest_for_slug(slug)
     if not p:
-        return pd.DataFrame(columns=SCHEMA)
-    return pd.read_csv(p, dtype=str).fillna("")
+        return pd.DataFrame(columns=columns or SCHEMA)
+    return read_table(p, columns=columns)
 
 
 # -- Playwright session ------------------------------------------------------
@@ -205,24 +217,26 @@ def load_latest(slug: str) -> pd.DataFrame:
 def playwright_session(*, headed: bool = False, cookies: list[dict] | None = None):
     """
     Yields (page, context, browser). Handles WAF JS challenges (Michelin pattern).
-    Cookies (Playwright format) optional for paywalled sources.
+    Cookies (Playwright format) optional for paywalled sources. Waits for a
+    source_runner.browser_slot() so concurrent sources share a capped set.
     """
     from playwright.sync_api import sync_playwright
-    pw = sync_playwright().start()
-    browser = pw.chromium.launch(headless=not headed)
-    context = browser.new_context(
-        user_agent=UA, locale="en-US", viewport={"width": 1280, "height": 900}
-    )
-    if cookies:
-        context.add_cookies(cookies)
-    page = context.new_page()
-    try:
-        yield page, context, browser
-    finally:
+    with browser_slot():
+        pw = sync_playwright().start()
+        browser = pw.chromium.launch(headless=not headed)
+        context = browser.new_context(
+            user_agent=UA, locale="en-US", viewport={"width": 1280, "height": 900}
+        )
+        if cookies:
+            context.add_cookies(cookies)
+        page = context.new_page()
         try:
-            browser.close()
+            yield page, context, browser
         finally:
-            pw.stop()
+            try:
+                browser.close()
+            finally:
+                pw.stop()
 
 
 def load_cookies_from_file(path: str) -> list[dict]:
@@ -254,12 +268,13 @@ def fetch_html(url: str, *, timeout: int = 30, retries: int = 3, sleep: float =
         # Path 1: curl_cffi with chrome120 impersonation
         if _cffi is not None:
             try:
-                r = _cffi.get(
-                    url,
-                    impersonate="chrome120",
-                    timeout=timeout,
-                    allow_redirects=True,
-                )
+                with host_slot(url):
+                    r = _cffi.get(
+                        url,
+                        impersonate="chrome120",
+                        timeout=timeout,
+                        allow_redirects=True,
+                    )
                 if r.status_code == 200:
                     return r.text
                 if r.status_code in (403, 429, 503):
@@ -274,12 +289,13 @@ def fetch_html(url: str, *, timeout: int = 30, retries: int = 3, sleep: float =
                 last_exc = e
         # Path 2: plain requests fallback
         try:
-            r = requests.get(
-                url,
-                headers={"User-Agent": UA, "Accept-Language": "en-US,en"},
-                timeout=timeout,
-                allow_redirects=True,
-            )
+            with host_slot(url):
+                r = requests.get(
+                    url,
+                    headers={"User-Agent": UA, "Accept-Language": "en-US,en"},
+                    timeout=timeout,
+                    allow_redirects=True,
+                )
             if r.status_code == 200:
                 return r.text
             if r.status_code in (403, 429, 503):
@@ -298,34 +314,31 @@ def fetch_html(url: str, *, timeout: int = 30, retries: int = 3, sleep: float =
 # -- Master union ------------------------------------------------------------
 
 def build_master(*, stamp: str | None = None) -> Path:
-    """Union every per-source CSV from today (or latest if today missing) into a
-    single master file at output/awards_all_<YYYYMMDD>.csv."""
+    """Union every per-source file from today (or latest if today missing) into a
+    single master file at output/awards_all_<YYYYMMDD>.csv (.parquet with
+    OUTPUT_FORMAT=parquet)."""
     stamp = stamp or datetime.now().strftime("%Y%m%d")
     from awards import ALL_SOURCES
     frames: list[pd.DataFrame] = []
     for slug, *_ in ALL_SOURCES:
-        path = OUTPUT_DIR / f"{slug}_{stamp}.csv"
-        if not path.exists():
-            path = latest_for_slug(slug)
-        if not path or not path.exists():
+        path = stamped_path(OUTPUT_DIR, slug, stamp) or latest_for_slug(slug)
+        if not path:
             continue
-        df = pd.read_csv(path, dtype=str).fillna("")
+        df = read_table(path, schema=AWARD_SCHEMA)
         if df.empty:
             continue
         frames.append(df)
-    master_path = ROOT / "output" / f"awards_all_{stamp}.csv"
+    master_path = with_suffix(ROOT / "output" / f"awards_all_{stamp}.csv")
     if not frames:
-        pd.DataFrame(columns=SCHEMA).to_csv(master_path, index=False)
+        write_table(pd.DataFrame(columns=SCHEMA), master_path, AWARD_SCHEMA)
         print(f"\n  No source CSVs found — wrote empty master at {master_path.relative_to(ROOT)}")
         return master_path
     master = pd.concat(frames, ignore_index=True)
-    # Cross-source dedupe: keep one row per (name, city, source) so multiple awards
+    # Cross-source dedupe: keep one row per (business, source) so multiple awards
     # from different sources are preserved as distinct rows.
-    master["name_n"] = master["name"].str.lower().str.strip()
-    master["city_n"] = master["city"].str.lower().str.strip()
-    master = master.drop_duplicates(["source", "name_n", "city_n"], keep="first")
-    master = master.drop(columns=["name_n", "city_n"]).reset_index(drop=True)
-    master.to_csv(master_path, index=False)
+    from entity_resolution import dedupe as dedupe_entities
+    master = dedupe_entities(master, within="source").reset_index(drop=True)
+    write_table(master, master_path, AWARD_SCHEMA)
     print(f"\n  Master: {len(master)} rows across {master['source'].nunique()} sources -> {master_path.relative_to(ROOT)}")
     print("\n  Rows per source:")
     for src, n in master["source"].value_counts().items():
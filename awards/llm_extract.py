@@ -25,9 +25,12 @@ import re
 import textwrap
 from typing import Any
 
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+import llm_cache
+import telemetry
+from browser_pool import fetch_rendered
+from readable import map_chunks, readable_text
 from awards._lib import fetch_html, normalize_state
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
@@ -62,44 +65,31 @@ Rules:
 - If you cannot find any qualifying businesses, return [].
 """).strip()
 
-_FALLBACK_TEXT_LIMIT = 60_000  # chars sent to Claude
 
-
-def _readable_text(html: str) -> str:
-    """Reduce HTML to article-relevant text. Best-effort, not perfect."""
-    soup = BeautifulSoup(html, "html.parser")
-    for tag in soup(["script", "style", "nav", "footer", "aside", "form", "noscript", "header"]):
-        tag.decompose()
-    main = soup.find("article") or soup.find("main") or soup.body or soup
-    text = main.get_text(separator="\n", strip=True)
-    text = re.sub(r"\n{2,}", "\n\n", text)
-    return text[:_FALLBACK_TEXT_LIMIT]
-
-
-def _call_claude(article_text: str, model: str, hint: str = "") -> list[dict]:
+def _ask_claude(user_block: str, model: str) -> list | None:
+    """One Messages call -> parsed JSON array (cached), or None on any failure."""
     try:
-        from anthropic import Anthropic
+        from anthropic import Anthropic  # noqa: F401
     except ImportError:
         print("  [llm] anthropic SDK not installed; skipping", flush=True)
-        return []
+        return None
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("  [llm] ANTHROPIC_API_KEY not set; skipping", flush=True)
-        return []
-
-    client = Anthropic(api_key=api_key)
-    user_block = (f"Hint: {hint}\n\n" if hint else "") + "Article text:\n\n" + article_text
+        return None
 
     try:
-        msg = client.messages.create(
-            model=model,
-            max_tokens=4096,
-            system=_SYSTEM,
-            messages=[{"role": "user", "content": user_block}],
-        )
+        with telemetry.timed("anthropic") as call:
+            msg = llm_cache.get_anthropic_client(api_key).messages.create(
+                model=model,
+                max_tokens=4096,
+                system=_SYSTEM,
+                messages=[{"role": "user", "content": user_block}],
+            )
+            call["cost"] = telemetry.anthropic_cost(model, msg.usage)
     except Exception as e:
         print(f"  [llm] api error: {e}", flush=True)
-        return []
+        return None
 
     raw = "".join(block.text for block in msg.content if getattr(block, "type", "") == "text").strip()
     raw = re.sub(r"^```(?:json)?\s*", "", raw)
@@ -108,13 +98,33 @@ def _call_claude(article_text: str, model: str, hint: str = "") -> list[dict]:
     start, end = raw.find("["), raw.rfind("]")
     if start == -1 or end == -1 or end < start:
         print(f"  [llm] could not find JSON array in response (len={len(raw)})", flush=True)
-        return []
+        return None
     try:
         data = json.loads(raw[start : end + 1])
     except json.JSONDecodeError as e:
         print(f"  [llm] json decode error: {e}", flush=True)
-        return []
+        return None
     if not isinstance(data, list):
+        return None
+    llm_cache.store(model, _SYSTEM, user_block, data, msg.usage)
+    return data
+
+
+def _call_claude(article_text: str, model: str, hint: str = "") -> list[dict]:
+    """Extract from each heading-aligned chunk of the article in parallel."""
+    return map_chunks(
+        article_text,
+        lambda chunk: _call_claude_chunk(chunk, model, hint),
+        key=lambda r: (r["name"].lower(), r["city"].lower()),
+    )
+
+
+def _call_claude_chunk(article_text: str, model: str, hint: str) -> list[dict]:
+    user_block = (f"Hint: {hint}\n\n" if hint else "") + "Article text:\n\n" + article_text
+    data = llm_cache.lookup(model, _SYSTEM, user_block)
+    if data is None:
+        data = _ask_claude(user_block, model)
+    if data is None:
         return []
     out: list[dict] = []
     for d in data:
@@ -151,18 +161,10 @@ def extract_businesses_from_text(
 
 def _fetch_via_playwright(url: str, *, cookies: list[dict] | None = None) -> str:
     """Used for sites that block plain HTTP (Vox Media / NYT / Wine Spectator)."""
-    from awards._lib import playwright_session
-    try:
-        with playwright_session(cookies=cookies) as (page, _ctx, _br):
-            page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-            try:
-                page.wait_for_load_state("networkidle", timeout=12_000)
-            except Exception:
-                pass
-            return page.evaluate("() => document.body.innerText") or ""
-    except Exception as e:
-        print(f"  [llm] playwright fetch error for {url}: {e}", flush=True)
-        return ""
+    page = fetch_rendered(url, text=True, cookies=cookies)
+    if page.error:
+        print(f"  [llm] playwright fetch error for {url}: {page.error}", flush=True)
+    return page.text
 
 
 def extract_businesses_from_url(
@@ -174,7 +176,7 @@ def extract_businesses_from_url(
     cookies: list[dict] | None = None,
 ) -> list[dict]:
     html = fetch_html(url)
-    text = _readable_text(html) if html else ""
+    text = readable_text(html)
     if len(text) < 400:
         # Plain HTTP blocked or article is JS-rendered. Fall back to Playwright.
         text = _fetch_via_playwright(url, cookies=cookies)
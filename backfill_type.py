@@ -22,6 +22,7 @@ import requests
 import pandas as pd
 
 from config import SERPER_API_KEY
+from serper import serper_post
 
 
 TOP_FILES = [
@@ -35,21 +36,6 @@ ALL_FILES = [
 DEFAULT_OUT = "output/type_lookup.csv"
 
 MAX_WORKERS = 80
-RATE_LIMIT_RPS = 45
-_rate_lock = threading.Lock()
-_last_times: list[float] = []
-
-
-def _rate_limit():
-    with _rate_lock:
-        now = time.monotonic()
-        while _last_times and _last_times[0] < now - 1.0:
-            _last_times.pop(0)
-        if len(_last_times) >= RATE_LIMIT_RPS:
-            wait = _last_times[0] + 1.0 - now
-            if wait > 0:
-                time.sleep(wait)
-        _last_times.append(time.monotonic())
 
 
 def _clean_phone(s: pd.Series) -> pd.Series:
@@ -78,7 +64,6 @@ def build_input() -> pd.DataFrame:
 
 def fetch_type(cid: str, name: str, city: str, state: str, max_retries: int = 3) -> dict | None:
     """Query Serper Maps and return the place whose cid matches."""
-    _rate_limit()
     url = "https://google.serper.dev/maps"
     headers = {"X-API-KEY": SERPER_API_KEY, "Content-Type": "application/json"}
     loc = f"{city}, {state}, United States" if city and state else "United States"
@@ -86,7 +71,7 @@ def fetch_type(cid: str, name: str, city: str, state: str, max_retries: int = 3)
 
     for attempt in range(max_retries):
         try:
-            r = requests.post(url, json=payload, headers=headers, timeout=20)
+            r = serper_post(url, json=payload, headers=headers, timeout=20)
             r.raise_for_status()
             places = r.json().get("places", [])
 
@@ -9,6 +9,7 @@ Usage:
     python -m best_wine_shops.discover --no-seeds       # serper only
     python -m best_wine_shops.discover --max-per-query 3
     python -m best_wine_shops.discover --dry-run
+    python -m best_wine_shops.discover --llm-batch      # one Message Batch, half price
 
 Output:
     output/best_wine_shops/best_wine_shops_<YYYYMMDD>.csv
@@ -20,7 +21,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+import llm_batch
 from awards._lib import ROOT
+from llm_cache import print_llm_cache_summary
 from .scraper import SOURCE_SLUG, scrape
 
 
@@ -32,7 +35,11 @@ def main() -> int:
                     help="cap candidate articles per Serper query (default 5)")
     ap.add_argument("--dry-run", action="store_true",
                     help="print plan only; no fetches, no LLM calls")
+    ap.add_argument("--llm-batch", action="store_true",
+                    help="extract via the Message Batches API (slower turnaround, half price)")
     args = ap.parse_args()
+    if args.llm_batch:
+        llm_batch.set_enabled()
 
     out_dir = ROOT / "output" / "best_wine_shops"
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -58,6 +65,7 @@ def main() -> int:
         print(f"  large indies tagged: {n_large}")
         print(f"  online-only tagged:  {n_online}")
         print(f"  unique source URLs:  {df['source_url'].nunique()}")
+    print_llm_cache_summary()
     return 0
 
 
@@ -17,7 +17,11 @@ import textwrap
 
 from dotenv import load_dotenv
 
+import llm_batch
+import llm_cache
+import telemetry
 from awards._lib import normalize_state
+from readable import chunk_text, map_chunks
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
 
@@ -63,29 +67,31 @@ Rules:
 """).strip()
 
 
-def _call_claude(text: str, hint: str) -> list[dict]:
+def _ask_claude(user: str) -> list | None:
+    """One Messages call -> parsed JSON array (cached), or None on any failure."""
     try:
-        from anthropic import Anthropic
+        from anthropic import Anthropic  # noqa: F401
     except ImportError:
         print("  [llm] anthropic SDK not installed", flush=True)
-        return []
+        return None
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("  [llm] ANTHROPIC_API_KEY not set (shell may have empty override; "
               "run with `unset ANTHROPIC_API_KEY && ...`)", flush=True)
-        return []
+        return None
 
-    user = (f"Hint: {hint}\n\n" if hint else "") + "Article text:\n\n" + text
     try:
-        msg = Anthropic(api_key=api_key).messages.create(
-            model=MODEL,
-            max_tokens=4096,
-            system=_SYSTEM,
-            messages=[{"role": "user", "content": user}],
-        )
+        with telemetry.timed("anthropic") as call:
+            msg = llm_cache.get_anthropic_client(api_key).messages.create(
+                model=MODEL,
+                max_tokens=4096,
+                system=_SYSTEM,
+                messages=[{"role": "user", "content": user}],
+            )
+            call["cost"] = telemetry.anthropic_cost(MODEL, msg.usage)
     except Exception as e:
         print(f"  [llm] api error: {e}", flush=True)
-        return []
+        return None
 
     raw = "".join(b.text for b in msg.content if getattr(b, "type", "") == "text").strip()
     raw = re.sub(r"^```(?:json)?\s*", "", raw)
@@ -93,13 +99,36 @@ def _call_claude(text: str, hint: str) -> list[dict]:
     s, e = raw.find("["), raw.rfind("]")
     if s == -1 or e == -1 or e < s:
         print(f"  [llm] no JSON array in response (len={len(raw)})", flush=True)
-        return []
+        return None
     try:
         data = json.loads(raw[s : e + 1])
     except json.JSONDecodeError as err:
         print(f"  [llm] json decode error: {err}", flush=True)
-        return []
+        return None
     if not isinstance(data, list):
+        return None
+    llm_cache.store(MODEL, _SYSTEM, user, data, msg.usage)
+    return data
+
+
+def _user_block(text: str, hint: str) -> str:
+    return (f"Hint: {hint}\n\n" if hint else "") + "Article text:\n\n" + text
+
+
+def _call_claude(text: str, hint: str) -> list[dict]:
+    return map_chunks(
+        text,
+        lambda chunk: _call_claude_chunk(chunk, hint),
+        key=lambda r: (r["name"].lower(), r["city"].lower()),
+    )
+
+
+def _call_claude_chunk(text: str, hint: str) -> list[dict]:
+    user = _user_block(text, hint)
+    data = llm_cache.lookup(MODEL, _SYSTEM, user)
+    if data is None:
+        data = _ask_claude(user)
+    if data is None:
         return []
 
     out: list[dict] = []
@@ -124,3 +153,8 @@ def extract_from_text(text: str, *, source_url: str, hint: str = "") -> list[dic
     for r in rows:
         r["source_url"] = source_url
     return [r for r in rows if r.get("country", "us") == "us"]
+
+
+def prefill(docs: list[tuple[str, str]]) -> None:
+    """Batch-extract (text, hint) pairs into the LLM cache ahead of extract_from_text."""
+    llm_batch.prefill(MODEL, _SYSTEM, [_user_block(c, hint) for text, hint in docs for c in chunk_text(text)], label="best_wine_shops")
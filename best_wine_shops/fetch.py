@@ -1,8 +1,8 @@
 """
 Fetch + readable-text extraction.
 
-Primary path: httpx (sync) + selectolax HTML parsing.
-Fallback path: Playwright (reused from awards._lib.playwright_session) — used
+Primary path: httpx (sync) + readable.readable_text (selectolax).
+Fallback path: Playwright (a warm page from browser_pool) — used
 when httpx is blocked (403/429/503) or returns too-thin text.
 """
 from __future__ import annotations
@@ -11,9 +11,11 @@ import os
 import time
 
 import httpx
-from selectolax.parser import HTMLParser
 
-from awards._lib import playwright_session
+from browser_pool import fetch_rendered
+from readable import readable_text
+from serper import serper_post
+from source_runner import host_slot
 
 UA = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
@@ -25,7 +27,6 @@ HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 MIN_TEXT = 400         # below this we assume the fetch is junk/blocked
-MAX_TEXT = 60_000      # cap passed to LLM
 RETRYABLE = {403, 429, 503, 502, 520, 522}
 
 
@@ -34,7 +35,7 @@ def _httpx_get(url: str, *, timeout: int = 25, retries: int = 3) -> tuple[int, s
     backoff = 1.5
     for attempt in range(retries):
         try:
-            with httpx.Client(headers=HEADERS, follow_redirects=True) as client:
+            with host_slot(url), httpx.Client(headers=HEADERS, follow_redirects=True) as client:
                 r = client.get(url, timeout=timeout)
             if r.status_code == 200:
                 return 200, r.text
@@ -48,57 +49,17 @@ def _httpx_get(url: str, *, timeout: int = 25, retries: int = 3) -> tuple[int, s
     return 0, ""
 
 
-def _readable(html: str) -> str:
-    """selectolax-based readable-text extraction. Picks the richest container."""
-    if not html:
-        return ""
-    tree = HTMLParser(html)
-    for sel in ("script", "style", "noscript", "nav", "footer", "aside", "form", "header"):
-        for node in tree.css(sel):
-            node.decompose()
-    candidates: list[str] = []
-    for sel in ("article", "main", '[role="main"]', ".entry-content",
-                ".post-content", ".article-body", ".content", "body"):
-        node = tree.css_first(sel)
-        if node is None:
-            continue
-        t = node.text(separator="\n", strip=True)
-        if t:
-            candidates.append(t)
-    text = max(candidates, key=len) if candidates else ""
-    # Collapse runs of blank lines
-    out_lines: list[str] = []
-    blank = 0
-    for line in text.splitlines():
-        if line.strip():
-            out_lines.append(line)
-            blank = 0
-        else:
-            blank += 1
-            if blank <= 1:
-                out_lines.append("")
-    return "\n".join(out_lines)[:MAX_TEXT]
-
-
 def _playwright_text(url: str) -> str:
-    try:
-        with playwright_session() as (page, _ctx, _br):
-            page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-            try:
-                page.wait_for_load_state("networkidle", timeout=12_000)
-            except Exception:
-                pass
-            html = page.content()
-        return _readable(html)
-    except Exception as e:
-        print(f"  [playwright] {url}: {e}", flush=True)
-        return ""
+    page = fetch_rendered(url)
+    if page.error:
+        print(f"  [playwright] {url}: {page.error}", flush=True)
+    return readable_text(page.html)
 
 
 def fetch_readable(url: str) -> str:
     """Get readable article text. httpx → Playwright fallback if blocked/thin."""
     status, html = _httpx_get(url)
-    text = _readable(html) if html else ""
+    text = readable_text(html)
     if status in RETRYABLE or len(text) < MIN_TEXT:
         print(f"  [fetch] httpx={status} text={len(text)}; trying playwright {url}", flush=True)
         text = _playwright_text(url)
@@ -115,10 +76,11 @@ def serper_search(query: str, *, num: int = 10) -> list[dict]:
         return []
     try:
         with httpx.Client(timeout=20) as client:
-            r = client.post(
+            r = serper_post(
                 "https://google.serper.dev/search",
                 headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
                 json={"q": query, "num": num, "gl": "us", "hl": "en"},
+                post=client.post,
             )
         if r.status_code != 200:
             print(f"  [serper] {r.status_code} for '{query}'", flush=True)
@@ -1,6 +1,7 @@
 """
 Orchestration: seed URLs + Serper queries -> readable text -> LLM extract ->
-filter & tag -> DataFrame.
+filter & tag -> DataFrame. With --llm-batch every article is fetched first and
+extracted in one Message Batch (llm_batch.py).
 """
 from __future__ import annotations
 
@@ -8,10 +9,11 @@ import time
 
 import pandas as pd
 
+import llm_batch
 from awards._lib import SCHEMA, dedupe, filter_us, to_dataframe
 
 from . import filters
-from .extractor import extract_from_text
+from .extractor import extract_from_text, prefill
 from .fetch import fetch_readable, serper_search
 from .sources import SEED_URLS, SEARCH_QUERIES
 
@@ -54,11 +56,11 @@ def _row_from(item: dict, *, src_url: str) -> dict:
     }
 
 
-def _extract_url(url: str, hint: str, *, seen: set[str]) -> list[dict]:
+def _extract_url(url: str, hint: str, *, seen: set[str], texts: dict[str, str]) -> list[dict]:
     if not url or url in seen:
         return []
     seen.add(url)
-    text = fetch_readable(url)
+    text = texts[url] if url in texts else fetch_readable(url)
     if len(text) < 400:
         print(f"  [skip] readable text too thin ({len(text)} chars) for {url}", flush=True)
         return []
@@ -66,6 +68,27 @@ def _extract_url(url: str, hint: str, *, seen: set[str]) -> list[dict]:
     return extract_from_text(text, source_url=url, hint=hint)
 
 
+def _prefetch(*, use_seeds: bool, use_search: bool, max_per_query: int) -> dict[str, str]:
+    """Batch mode: fetch every article up front and batch-extract them all,
+    so the loops in scrape() are answered from the LLM cache. Snippet
+    fallbacks depend on those results and still go one call at a time."""
+    plan: list[tuple[str, str]] = list(SEED_URLS) if use_seeds else []
+    if use_search:
+        for q, hint in SEARCH_QUERIES:
+            plan += [(r.get("link") or "", hint) for r in serper_search(q, num=max_per_query)[:max_per_query]]
+    texts: dict[str, str] = {}
+    docs: list[tuple[str, str]] = []
+    for url, hint in plan:
+        if not url or url in texts:
+            continue
+        texts[url] = fetch_readable(url)
+        if len(texts[url]) >= 400:
+            docs.append((texts[url], hint))
+        time.sleep(0.3)
+    prefill(docs)
+    return texts
+
+
 def scrape(
     *,
     use_seeds: bool = True,
@@ -75,6 +98,7 @@ def scrape(
 ) -> pd.DataFrame:
     rows: list[dict] = []
     seen: set[str] = set()
+    texts: dict[str, str] = {}
 
     if dry_run:
         print(f"[dry-run] would fetch {len(SEED_URLS)} seed URLs and run "
@@ -82,11 +106,14 @@ def scrape(
               flush=True)
         return _to_df([])
 
+    if llm_batch.enabled():
+        texts = _prefetch(use_seeds=use_seeds, use_search=use_search, max_per_query=max_per_query)
+
     # 1) Seed URLs
     if use_seeds:
         print(f"\n=== Seeds ({len(SEED_URLS)}) ===", flush=True)
         for url, hint in SEED_URLS:
-            items = _extract_url(url, hint, seen=seen)
+            items = _extract_url(url, hint, seen=seen, texts=texts)
             print(f"    +{len(items)} from {url}", flush=True)
             for it in items:
                 rows.append(_row_from(it, src_url=url))
@@ -104,7 +131,7 @@ def scrape(
             before = len(rows)
             for r in results:
                 url = r.get("link") or ""
-                items = _extract_url(url, hint, seen=seen)
+                items = _extract_url(url, hint, seen=seen, texts=texts)
                 if items:
                     print(f"      +{len(items)} from {url}", flush=True)
                 for it in items:
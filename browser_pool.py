@@ -0,0 +1,292 @@
+"""
+Warm Playwright browser pool for render-only page fetches.
+
+awards._lib.playwright_session starts Playwright and launches a fresh
+Chromium on every call, which costs 1-2 s and ~50 MB before the page even
+loads. The JS-rendering fallbacks (directories/_browser_fetch,
+awards/llm_extract, the Substack and stockist helpers, best_wine_shops/fetch,
+jobs/_lib) and crawl_engine's Playwright tier only need "the rendered
+HTML of this URL", so they now share a pool:
+
+  - BROWSER_POOL_BROWSERS Chromiums, each launched on first use and kept
+    warm (relaunched if one crashes). Each browser serves up to
+    BROWSER_POOL_PAGES pages at once, and that is the pool's concurrency.
+  - Each page slot owns a context and page that are reused for the next
+    URL. The context is replaced after BROWSER_POOL_RECYCLE navigations,
+    or straight away after an error, so cookies and memory don't pile up.
+  - Every context aborts requests for BROWSER_POOL_BLOCK resource types
+    (images, fonts, media by default). Stylesheets and scripts still load,
+    so layout-driven JS renders the same.
+  - Requests carrying cookies get a one-off context on a pooled browser.
+    Their cookies never leak into a reused context.
+
+Async callers (crawl_engine) own a `BrowserPool` on their event loop.
+Threaded callers use `fetch_rendered(url)`. It queues the fetch on one
+process-wide pool that runs on a background event loop thread, so dozens of
+scraper threads share the same warm browsers. Scrapers that click and wait
+on selectors (James Beard, NYT, the somm directories) still use
+playwright_session.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import math
+import threading
+from dataclasses import dataclass
+
+import telemetry
+from config import (
+    BROWSER_POOL_BLOCK,
+    BROWSER_POOL_BROWSERS,
+    BROWSER_POOL_PAGES,
+    BROWSER_POOL_RECYCLE,
+)
+
+UA = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+
+@dataclass
+class RenderedPage:
+    url: str
+    final_url: str
+    status: int        # 0 when the navigation produced no response
+    html: str          # rendered DOM ("" on error)
+    text: str = ""     # document.body.innerText, when asked for
+    error: str = ""    # exception type name on failure
+
+
+@dataclass
+class _Slot:
+    browser: int
+    owner: object = None    # the browser `context` was opened on
+    context: object = None
+    page: object = None
+    uses: int = 0
+
+
+class BrowserPool:
+    """N warm browsers × M reusable page slots, for one asyncio loop."""
+
+    def __init__(
+        self,
+        *,
+        browsers: int = BROWSER_POOL_BROWSERS,
+        pages_per_browser: int = BROWSER_POOL_PAGES,
+        recycle_after: int = BROWSER_POOL_RECYCLE,
+        block: tuple[str, ...] = BROWSER_POOL_BLOCK,
+        user_agent: str = UA,
+        headless: bool = True,
+    ):
+        self.n_browsers = max(1, browsers)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self.block = frozenset(block)
+        self.user_agent = user_agent
+        self.headless = headless
+        self._pw = None
+        self._browsers: list = [None] * self.n_browsers
+        self._launch_locks: list[asyncio.Lock] = []
+        self._free: asyncio.LifoQueue | None = None
+
+    @property
+    def size(self) -> int:
+        return self.n_browsers * self.pages_per_browser
+
+    async def start(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self._pw = await async_playwright().start()
+        self._launch_locks = [asyncio.Lock() for _ in range(self.n_browsers)]
+        # LIFO, browser 0's slots on top: light load keeps reusing the same
+        # warm page, and later browsers only launch once the earlier ones
+        # have all their pages busy.
+        self._free = asyncio.LifoQueue()
+        for b in reversed(range(self.n_browsers)):
+            for _ in range(self.pages_per_browser):
+                self._free.put_nowait(_Slot(b))
+
+    async def close(self) -> None:
+        for b in self._browsers:
+            if b is not None:
+                try:
+                    await b.close()
+                except Exception:
+                    pass
+        self._browsers = [None] * self.n_browsers
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _browser(self, i: int):
+        async with self._launch_locks[i]:
+            b = self._browsers[i]
+            if b is None or not b.is_connected():
+                b = self._browsers[i] = await self._pw.chromium.launch(headless=self.headless)
+            return b
+
+    async def _route(self, route) -> None:
+        if route.request.resource_type in self.block:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _new_context(self, browser, cookies: list[dict] | None = None):
+        ctx = await browser.new_context(
+            user_agent=self.user_agent, locale="en-US", viewport={"width": 1280, "height": 900}
+        )
+        if self.block:
+            await ctx.route("**/*", self._route)
+        if cookies:
+            await ctx.add_cookies(cookies)
+        return ctx
+
+    @staticmethod
+    async def _drop(slot: _Slot) -> None:
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.owner = slot.context = slot.page = None
+        slot.uses = 0
+
+    async def _navigate(self, page, url: str, *, timeout_ms: int, idle_ms: int, text: bool) -> RenderedPage:
+        with telemetry.timed("playwright") as call:
+            try:
+                resp = await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                if idle_ms:
+                    try:
+                        await page.wait_for_load_state("networkidle", timeout=idle_ms)
+                    except Exception:
+                        pass
+                html = await page.content() or ""
+                body_text = (await page.evaluate("() => document.body ? document.body.innerText : ''") or "") if text else ""
+            except Exception as e:
+                call.update(status=type(e).__name__, error=True)
+                return RenderedPage(url, url, 0, "", error=type(e).__name__)
+            status = resp.status if resp else 0
+            call.update(status=status or "no_resp", error=not status or status >= 400, nbytes=len(html))
+        return RenderedPage(url, page.url, status, html, body_text)
+
+    async def fetch(
+        self,
+        url: str,
+        *,
+        timeout_ms: int = 45_000,
+        idle_ms: int = 12_000,
+        text: bool = False,
+        cookies: list[dict] | None = None,
+    ) -> RenderedPage:
+        """Render `url` on a pooled page; never raises (errors come back in `.error`)."""
+        slot: _Slot = await self._free.get()
+        try:
+            try:
+                browser = await self._browser(slot.browser)
+            except Exception as e:
+                print(f"  [browser_pool] launch failed: {e}", flush=True)
+                return RenderedPage(url, url, 0, "", error=type(e).__name__)
+            if cookies:
+                ctx = await self._new_context(browser, cookies)
+                try:
+                    return await self._navigate(await ctx.new_page(), url,
+                                                timeout_ms=timeout_ms, idle_ms=idle_ms, text=text)
+                finally:
+                    try:
+                        await ctx.close()
+                    except Exception:
+                        pass
+            if slot.context is not None and (slot.uses >= self.recycle_after or slot.owner is not browser):
+                await self._drop(slot)
+            if slot.context is None:
+                slot.owner = browser
+                slot.context = await self._new_context(browser)
+                slot.page = await slot.context.new_page()
+            slot.uses += 1
+            result = await self._navigate(slot.page, url, timeout_ms=timeout_ms, idle_ms=idle_ms, text=text)
+            if result.error:
+                await self._drop(slot)
+            return result
+        except Exception as e:
+            await self._drop(slot)
+            return RenderedPage(url, url, 0, "", error=type(e).__name__)
+        finally:
+            self._free.put_nowait(slot)
+
+    async def fetch_many(self, urls: list[str], **kwargs) -> list[RenderedPage]:
+        """Render every URL, `size` at a time, results in input order."""
+        return list(await asyncio.gather(*(self.fetch(u, **kwargs) for u in urls)))
+
+
+# ─── Process-wide pool for threaded callers ─────────────────────────
+
+_pool: BrowserPool | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_failed: Exception | None = None  # start-up error, so later calls fail fast
+_lock = threading.Lock()
+
+
+def _shutdown() -> None:
+    if _pool is not None and _loop is not None and _loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(_pool.close(), _loop).result(timeout=15)
+        except Exception:
+            pass
+        _loop.call_soon_threadsafe(_loop.stop)
+
+
+def _shared() -> tuple[BrowserPool, asyncio.AbstractEventLoop]:
+    global _pool, _loop, _failed
+    with _lock:
+        if _failed is not None:
+            raise _failed
+        if _pool is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True)
+            thread.start()
+            pool = BrowserPool()
+            try:
+                asyncio.run_coroutine_threadsafe(pool.start(), loop).result()
+            except Exception as e:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join(timeout=5)
+                loop.close()
+                _failed = e
+                raise
+            _pool, _loop = pool, loop
+            atexit.register(_shutdown)
+        return _pool, _loop
+
+
+async def _in_stage(stage: str, coro):
+    with telemetry.stage(stage):
+        return await coro
+
+
+def fetch_rendered(url: str, **kwargs) -> RenderedPage:
+    """Blocking render of `url` on the shared pool (safe from any thread).
+    Keyword arguments are those of BrowserPool.fetch."""
+    first_failure = _failed is None
+    try:
+        pool, loop = _shared()
+    except Exception as e:
+        if first_failure:
+            print(f"  [browser_pool] unavailable: {e}", flush=True)
+        return RenderedPage(url, url, 0, "", error=type(e).__name__)
+    coro = _in_stage(telemetry.current_stage(), pool.fetch(url, **kwargs))
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def pages_for(concurrency: int, browsers: int = BROWSER_POOL_BROWSERS) -> int:
+    """Pages per browser so that `browsers` browsers give `concurrency` slots."""
+    return max(1, math.ceil(concurrency / max(1, browsers)))
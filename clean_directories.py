@@ -45,6 +45,8 @@ import requests
 
 from config import CHAIN_KEYWORDS, LIQUOR_KEYWORDS
 from discover import search_serper_maps, parse_town_state
+from entity_resolution import resolve as resolve_entities
+from page_cache import cached_get, cached_head
 
 
 # Word-boundary chain match. Avoids false positives like "Geraldine's" matching
@@ -223,14 +225,13 @@ def verify_website(url: str, timeout: int = 8) -> bool:
         url = "https://" + url
     try:
         # HEAD often gets blocked or returns 405; fall back to GET.
-        r = requests.head(url, timeout=timeout, allow_redirects=True,
-                          headers={"User-Agent": "Mozilla/5.0"})
-        if 200 <= r.status_code < 400:
+        # Any fresh cached crawl of the site (enrich, detect_clubs, ...) answers HEAD.
+        r = cached_head(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        if r.ok:
             return True
-        if r.status_code in (403, 405, 501):
-            r = requests.get(url, timeout=timeout, allow_redirects=True,
-                             headers={"User-Agent": "Mozilla/5.0"}, stream=True)
-            return 200 <= r.status_code < 400
+        if r.status in (403, 405, 501):
+            page = cached_get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+            return page.ok
         return False
     except requests.RequestException:
         return False
@@ -241,84 +242,42 @@ def verify_website(url: str, timeout: int = 8) -> bool:
 # ---------------------------------------------------------------------------
 
 def dedupe_cross_source(df: pd.DataFrame) -> pd.DataFrame:
-    """Collapse rows with the same (name, city). Aggregates source list/count.
+    """Collapse rows for the same business. Aggregates source list/count.
 
-    For Raisin rows (empty city), we also try to match against stockist rows
-    by name only — but only when the name is unambiguous (1 stockist row).
+    Rows are clustered with entity_resolution (name within city, tolerant of
+    small spelling differences). Raisin rows (empty city) join a stockist row
+    when the names match closely and the states don't conflict.
     """
     df = df.copy()
-    df["_name_n"] = df["name"].fillna("").str.lower().str.strip()
-    df["_city_n"] = df["city"].fillna("").str.lower().str.strip()
+    df["_cluster"] = resolve_entities(df)
 
-    # First pass: group by (name, city) for rows that have a city.
-    has_city = df[df["_city_n"] != ""]
-    no_city = df[df["_city_n"] == ""]
+    def _blurb(s: pd.Series) -> str:
+        # Prefer the blurb that has lat/lng (Raisin)
+        with_latlng = [b for b in s if "lat=" in (b or "")]
+        return with_latlng[0] if with_latlng else s.iloc[0]
 
-    grouped_with_city = (
-        has_city.groupby(["_name_n", "_city_n"])
+    def _first_nonempty(s: pd.Series) -> str:
+        filled = [v for v in s if v]
+        return filled[0] if filled else s.iloc[0]
+
+    return (
+        df.groupby("_cluster", sort=False)
         .agg(
             name=("name", "first"),
-            city=("city", "first"),
-            state=("state", "first"),
+            city=("city", _first_nonempty),
+            state=("state", _first_nonempty),
             country=("country", "first"),
             business_type=("business_type", "first"),
             source_count=("source", "nunique"),
             all_sources=("source", lambda s: "|".join(sorted(set(s)))),
             all_distinctions=("distinction", lambda s: "|".join(sorted(set(d for d in s if d)))),
             source_url=("source_url", "first"),
-            blurb=("blurb", "first"),
+            blurb=("blurb", _blurb),
             tier=("tier", "min"),
         )
         .reset_index(drop=True)
     )
 
-    # Second pass: for no-city rows (Raisin), check whether the name already
-    # exists in grouped_with_city. If yes, merge into that row's source list.
-    name_index = {r["name"].lower().strip(): i for i, r in grouped_with_city.iterrows()}
-    leftover_no_city = []
-    for _, r in no_city.iterrows():
-        key = r["_name_n"]
-        if key in name_index:
-            i = name_index[key]
-            existing_sources = set(grouped_with_city.at[i, "all_sources"].split("|"))
-            existing_sources.add(r["source"])
-            grouped_with_city.at[i, "all_sources"] = "|".join(sorted(existing_sources))
-            grouped_with_city.at[i, "source_count"] = len(existing_sources)
-            existing_distinctions = set(filter(None, grouped_with_city.at[i, "all_distinctions"].split("|")))
-            if r["distinction"]:
-                existing_distinctions.add(r["distinction"])
-            grouped_with_city.at[i, "all_distinctions"] = "|".join(sorted(existing_distinctions))
-            # Prefer the blurb that has lat/lng (Raisin)
-            if "lat=" in (r.get("blurb") or "") and "lat=" not in (grouped_with_city.at[i, "blurb"] or ""):
-                grouped_with_city.at[i, "blurb"] = r["blurb"]
-        else:
-            leftover_no_city.append(r)
-
-    if leftover_no_city:
-        no_city_df = pd.DataFrame(leftover_no_city)
-        no_city_grouped = (
-            no_city_df.groupby("_name_n")
-            .agg(
-                name=("name", "first"),
-                city=("city", "first"),
-                state=("state", "first"),
-                country=("country", "first"),
-                business_type=("business_type", "first"),
-                source_count=("source", "nunique"),
-                all_sources=("source", lambda s: "|".join(sorted(set(s)))),
-                all_distinctions=("distinction", lambda s: "|".join(sorted(set(d for d in s if d)))),
-                source_url=("source_url", "first"),
-                blurb=("blurb", "first"),
-                tier=("tier", "min"),
-            )
-            .reset_index(drop=True)
-        )
-        result = pd.concat([grouped_with_city, no_city_grouped], ignore_index=True)
-    else:
-        result = grouped_with_city
-
-    return result
-
 
 # ---------------------------------------------------------------------------
 # Serper Maps verification
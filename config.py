@@ -12,6 +12,161 @@ APIFY_ACTOR_IG_REELS = "apify/instagram-reel-scraper"
 APIFY_ACTOR_IG_POSTS = "apify/instagram-post-scraper"
 APIFY_ACTOR_OPENTABLE = "shahidirfan/opentable-scraper"
 
+# Serper rate limit shared by every process on this machine (serper.py).
+# Plan limit is 50 req/s; the limiter halves its rate on 429 and creeps back up.
+SERPER_RPS = float(os.getenv("SERPER_RPS", "45"))
+SERPER_MIN_RPS = 2.0
+SERPER_BURST = 4  # max back-to-back calls; keeps any 1s window under RPS + BURST
+SERPER_LIMITER_PATH = os.getenv(
+    "SERPER_LIMITER_PATH", os.path.join(os.path.dirname(__file__), "output", "cache", "serper_bucket")
+)
+
+# Serper response cache (serper.py). SERPER_CACHE=0 disables it; SERPER_OFFLINE=1
+# (or --offline on the entry points) serves only cached responses, never bills.
+SERPER_CACHE_ENABLED = os.getenv("SERPER_CACHE", "1") != "0"
+SERPER_CACHE_PATH = os.getenv(
+    "SERPER_CACHE_PATH", os.path.join(os.path.dirname(__file__), "output", "cache", "serper.sqlite")
+)
+SERPER_OFFLINE = os.getenv("SERPER_OFFLINE", "0") == "1"
+SERPER_CACHE_TTL_DAYS = {  # by endpoint; Maps listings move slowly, news quickly
+    "maps": 30,
+    "places": 30,
+    "reviews": 14,
+    "search": 7,
+    "news": 1,
+}
+SERPER_CACHE_DEFAULT_TTL_DAYS = 7
+SERPER_USD_PER_1K = float(os.getenv("SERPER_USD_PER_1K", "1.0"))  # plan price, for the cost line
+
+# External-call telemetry (telemetry.py): live summary line every
+# TELEMETRY_LIVE_SECONDS (0 = off) and a JSON + CSV run report in TELEMETRY_DIR.
+TELEMETRY_LIVE_SECONDS = float(os.getenv("TELEMETRY_LIVE_SECONDS", "60"))
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", os.path.join(os.path.dirname(__file__), "output", "telemetry"))
+ANTHROPIC_USD_PER_MTOK = {  # (input, output) list price by model family, for cost estimates
+    "haiku": (1.0, 5.0),
+    "sonnet": (3.0, 15.0),
+    "opus": (15.0, 75.0),
+}
+
+# Claude extraction cache (llm_cache.py): parsed rows keyed by model + system
+# prompt + normalized input text. LLM_CACHE=0 bypasses it; LLM_CACHE_REFRESH=1
+# re-asks the model but still writes back.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_REFRESH = os.getenv("LLM_CACHE_REFRESH", "0") == "1"
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), "output", "cache", "llm.sqlite")
+)
+
+# Message Batches mode (llm_batch.py, --llm-batch on the runners): bulk sweeps
+# submit one batch job instead of one Messages call per document. Half price,
+# results within 24h (usually minutes). Batch ids are kept in LLM_CACHE_PATH.
+LLM_BATCH_ENABLED = os.getenv("LLM_BATCH", "0") == "1"
+LLM_BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+LLM_BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", "10000"))  # API limit 100k
+LLM_BATCH_MAX_MB = 200  # API limit 256MB per batch
+LLM_BATCH_DISCOUNT = 0.5
+
+# Readable-text extraction (readable.py): article text sent to Claude is split
+# at headings into chunks of about this many tokens, extracted in parallel.
+READABLE_CHUNK_TOKENS = int(os.getenv("READABLE_CHUNK_TOKENS", "12000"))
+READABLE_MAX_CHUNKS = int(os.getenv("READABLE_MAX_CHUNKS", "8"))  # beyond this the tail is dropped
+READABLE_CHUNK_WORKERS = int(os.getenv("READABLE_CHUNK_WORKERS", "4"))
+
+# Incremental discovery (discovery_ledger.py): cells queried more recently than
+# this are skipped when discover runs with --incremental / --budget.
+DISCOVERY_LEDGER_PATH = os.getenv(
+    "DISCOVERY_LEDGER_PATH", os.path.join(os.path.dirname(__file__), "output", "discovery_ledger.sqlite")
+)
+DISCOVERY_CELL_STALE_DAYS = float(os.getenv("DISCOVERY_CELL_STALE_DAYS", "30"))
+
+# Lead master table (lead_store.py): enrichment steps upsert only changed cells.
+LEAD_STORE_PATH = os.getenv(
+    "LEAD_STORE_PATH", os.path.join(os.path.dirname(__file__), "output", "leads.sqlite")
+)
+
+# Enrichment completion journal (step_journal.py). ENRICH_JOURNAL=0 ignores and
+# clears it, so every step starts from scratch.
+JOURNAL_ENABLED = os.getenv("ENRICH_JOURNAL", "1") != "0"
+JOURNAL_FLUSH_EVERY = int(os.getenv("ENRICH_JOURNAL_FLUSH_EVERY", "200"))  # records per fsync
+
+# Enrichment step scheduler (pipeline_dag.py): how many steps may run at once,
+# and the concurrent units each shared resource can take across running steps.
+PIPELINE_MAX_PARALLEL = int(os.getenv("PIPELINE_MAX_PARALLEL", "4"))
+PIPELINE_BUDGETS = {
+    "serper": int(os.getenv("PIPELINE_SERPER_THREADS", "80")),   # request rate is capped by SERPER_RPS
+    "apify": int(os.getenv("PIPELINE_APIFY_RUNS", "16")),        # concurrent actor runs
+    "http": int(os.getenv("PIPELINE_HTTP_SOCKETS", "330")),      # website + Facebook + Resy sockets
+}
+
+# main.py --stream: leads per enrichment batch, and batches buffered between
+# discovery and enrichment before discovery pauses.
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "250"))
+STREAM_QUEUE_BATCHES = int(os.getenv("STREAM_QUEUE_BATCHES", "4"))
+
+# Intermediate file format (lead_io.py): "csv" (default) or "parquet" (needs pyarrow).
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "csv").strip().lower()
+
+# Apify actor runs (apify_runs.py): per-username result cache + run concurrency.
+APIFY_CACHE_ENABLED = os.getenv("APIFY_CACHE", "1") != "0"
+APIFY_CACHE_PATH = os.getenv(
+    "APIFY_CACHE_PATH", os.path.join(os.path.dirname(__file__), "output", "cache", "apify.sqlite")
+)
+APIFY_CACHE_TTL_DAYS = float(os.getenv("APIFY_CACHE_TTL_DAYS", "7"))
+APIFY_MAX_CONCURRENT_RUNS = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", "16"))
+APIFY_POLL_SECONDS = float(os.getenv("APIFY_POLL_SECONDS", "5"))
+
+# Cross-run Instagram handle -> profile store (ig_profiles.py). IG_PROFILE_STORE=0
+# disables it; IG_PROFILE_REFRESH=1 re-scrapes everything but still backfills.
+IG_PROFILE_STORE_ENABLED = os.getenv("IG_PROFILE_STORE", "1") != "0"
+IG_PROFILE_REFRESH = os.getenv("IG_PROFILE_REFRESH", "0") == "1"
+IG_PROFILE_STORE_PATH = os.getenv(
+    "IG_PROFILE_STORE_PATH", os.path.join(os.path.dirname(__file__), "output", "cache", "ig_profiles.sqlite")
+)
+IG_PROFILE_MAX_AGE_DAYS = {  # by field; counts drift quickly, bios and flags rarely
+    "ig_followers": 14,
+    "ig_posts": 14,
+    "avg_video_views": 30,
+    "avg_likes": 30,
+    "ig_avg_video_views": 30,
+    "ig_avg_likes": 30,
+}
+IG_PROFILE_DEFAULT_MAX_AGE_DAYS = 90
+
+# Adaptive Serper Maps paging/tiling (maps_planner.py, discover --adaptive).
+MAPS_PAGE_SIZE = 20          # a page shorter than this is the last one
+MAPS_MAX_PAGES = 3           # per area (city or tile)
+MAPS_OVERLAP_STOP = 0.8      # stop paging once this share of a page's cids were already seen
+MAPS_TILE_DEPTH = 1          # 2x2 splits below the city; 0 disables tiling
+MAPS_TILE_ZOOM = 13          # viewport zoom for first-level tiles (+1 per level)
+MAPS_TILE_SPAN_DEG = 0.2     # width of the area split into first-level tiles
+
+# Disk cache for website crawls (page_cache.py). PAGE_CACHE=0 disables it.
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE", "1") != "0"
+PAGE_CACHE_DIR = os.getenv(
+    "PAGE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "output", "cache", "pages")
+)
+PAGE_CACHE_TTL_DAYS = float(os.getenv("PAGE_CACHE_TTL_DAYS", "14"))
+PAGE_CACHE_ERROR_TTL_DAYS = 1.0  # 4xx/5xx responses are re-checked sooner
+PAGE_CACHE_MAX_MB = int(os.getenv("PAGE_CACHE_MAX_MB", "4096"))
+
+# Award/directory source runner (source_runner.py). SOURCE_WORKERS=1 runs the
+# sources one after another, as before; SOURCE_TIMEOUT=0 waits forever.
+SOURCE_WORKERS = int(os.getenv("SOURCE_WORKERS", "8"))
+SOURCE_BROWSER_WORKERS = int(os.getenv("SOURCE_BROWSER_WORKERS", "2"))  # Playwright-first sources
+SOURCE_MAX_BROWSERS = int(os.getenv("SOURCE_MAX_BROWSERS", "3"))        # open Chromiums, any source
+SOURCE_PER_HOST = int(os.getenv("SOURCE_PER_HOST", "2"))                # concurrent requests per site
+SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", "1800"))             # seconds per source
+
+# Warm Playwright pool for render-only fetches (browser_pool.py). Contexts are
+# replaced after BROWSER_POOL_RECYCLE navigations; blocked resource types
+# are never downloaded.
+BROWSER_POOL_BROWSERS = int(os.getenv("BROWSER_POOL_BROWSERS", "3"))
+BROWSER_POOL_PAGES = int(os.getenv("BROWSER_POOL_PAGES", "8"))  # concurrent pages per browser
+BROWSER_POOL_RECYCLE = int(os.getenv("BROWSER_POOL_RECYCLE", "50"))
+BROWSER_POOL_BLOCK = tuple(
+    t for t in os.getenv("BROWSER_POOL_BLOCK", "image,font,media").split(",") if t.strip()
+)
+
 # Resy API config (reverse-engineered, may be fragile)
 RESY_API_BASE = "https://api.resy.com/4"
 RESY_API_KEY = os.getenv("RESY_API_KEY", "")
@@ -0,0 +1,451 @@
+"""
+Resumable async crawl engine for seed-CSV website signal hunts.
+
+scripts/scrape_newsletter.py, scripts/scrape_resy_tock.py and their
+recover_* waterfalls each carried the same few hundred lines of plumbing
+around a small amount of detection code. The plumbing lives here, so a hunt
+is a site_signals `Detector` plus a `CrawlSpec`:
+
+  - Seed + resume: the seed CSV is read as strings and rows whose key (cid)
+    is already in the progress CSV are skipped, so a killed run picks up
+    where it stopped.
+  - Tiered fetch: every row is crawled with the first tier and escalates to
+    the next only while `spec.escalate(out)` says so (default: the homepage
+    returned no HTML). Tiers are "httpx" (page_cache, http2), "curl_cffi"
+    (Chrome TLS impersonation, gets past Cloudflare JA3 blocks) and
+    "playwright" (warm browser_pool pages, render JS-injected content); each has
+    its own concurrency cap (TIER_CONCURRENCY) and subpage budget.
+  - Politeness: at most PER_HOST in-flight requests per host, across tiers.
+  - Analysis: site_signals.analyze_site runs the detectors over whatever
+    the tier fetched (homepage + pooled subpages). `site_tier` and
+    `site_tier_attempts` record which tiers ran.
+  - Output: rows are appended to the progress CSV as they finish, flushed
+    every `flush_every`; `spec.finish(seed_row, out)` can rename columns or
+    add post-crawl lookups (sync or async) before the row is written.
+
+A new hunt:
+
+    SPEC = CrawlSpec(
+        seed_path=SEED_PATH,
+        progress_path=PROGRESS_PATH,
+        detectors=[POS_DETECTOR],
+        counters={"toast": "pos_toast_url"},
+    )
+
+    if __name__ == "__main__":
+        crawl_engine.main(SPEC)
+
+or, for detectors already registered with site_signals:
+
+    python crawl_engine.py seed.csv progress.csv --detectors newsletter,reservations
+    python crawl_engine.py seed.csv progress.csv --detectors reservations --tiers httpx,curl_cffi,playwright
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import inspect
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+import pandas as pd
+
+import telemetry
+from browser_pool import BrowserPool, pages_for
+from config import BROWSER_POOL_BROWSERS, BROWSER_POOL_PAGES
+from page_cache import print_cache_summary
+from site_signals import (
+    FETCH_TIMEOUT, MAX_SUBPAGES, Detector, HostLimiter, SitePage,
+    analyze_site, fetch_page, normalize_url, output_columns, resolve_detectors,
+)
+
+SEED_COLS = ("cid", "name", "website", "business_type", "city", "state")
+TIER_COLS = ["site_tier", "site_tier_attempts"]
+PER_HOST = 2
+TIER_CONCURRENCY = {"curl_cffi": 20, "playwright": BROWSER_POOL_BROWSERS * BROWSER_POOL_PAGES}  # httpx: the row concurrency
+FLUSH_EVERY = 500
+
+CHROME_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Sec-Ch-Ua": '"Chromium";v="123", "Not?A_Brand";v="24"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"macOS"',
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+def _is_html(content_type: str) -> bool:
+    ct = (content_type or "").lower()
+    return "text/html" in ct or "application/xhtml" in ct
+
+
+# ─── Fetch tiers ─────────────────────────────────────────────────────
+
+class FetchTier:
+    """One way of getting a page. `get` never raises; failures come back with html=""."""
+    name: str = ""
+    max_subpages: int | None = None  # None → the spec's budget
+
+    def __init__(self, *, concurrency: int, timeout: float = FETCH_TIMEOUT, headers: dict | None = None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = headers
+        self.sem: asyncio.Semaphore | None = None
+
+    async def open(self) -> None:
+        self.sem = asyncio.Semaphore(self.concurrency)
+
+    async def recycle(self) -> None:
+        """Called between chunks of rows."""
+
+    async def close(self) -> None:
+        pass
+
+    async def get(self, url: str, is_home: bool) -> SitePage:
+        raise NotImplementedError
+
+
+class HttpxTier(FetchTier):
+    name = "httpx"
+
+    async def open(self) -> None:
+        await super().open()
+        self._client = self._new_client()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency),
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 6.0)),
+            verify=False,
+        )
+
+    async def recycle(self) -> None:
+        # Fresh pool per chunk — httpx pools degrade across ~10K distinct hosts.
+        await self._client.aclose()
+        self._client = self._new_client()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def get(self, url: str, is_home: bool) -> SitePage:
+        return await fetch_page(self._client, url, is_home=is_home, headers=self.headers, timeout=self.timeout)
+
+
+class CurlCffiTier(FetchTier):
+    name = "curl_cffi"
+
+    def _get(self, url: str, is_home: bool) -> SitePage:
+        from curl_cffi import requests as crq
+        with telemetry.timed("curl_cffi") as call:
+            try:
+                r = crq.get(
+                    url,
+                    impersonate="chrome",
+                    timeout=self.timeout,
+                    allow_redirects=True,
+                    headers={"Accept-Language": "en-US,en;q=0.9"},
+                )
+            except Exception as e:
+                call.update(status=type(e).__name__, error=True)
+                return SitePage(url, url, f"err:{type(e).__name__}", "", is_home)
+            call.update(status=r.status_code, nbytes=len(r.content or b""))
+        if not _is_html(r.headers.get("content-type", "")):
+            return SitePage(url, str(r.url), f"non_html_{r.status_code}", "", is_home)
+        html = r.text if r.status_code < 400 else ""
+        return SitePage(url, str(r.url), str(r.status_code), html, is_home)
+
+    async def get(self, url: str, is_home: bool) -> SitePage:
+        return await asyncio.to_thread(self._get, url, is_home)
+
+
+class PlaywrightTier(FetchTier):
+    name = "playwright"
+    max_subpages = 1  # a rendered page costs seconds
+
+    async def open(self) -> None:
+        await super().open()
+        ua = (self.headers or {}).get("User-Agent", CHROME_HEADERS["User-Agent"])
+        # Warm browsers with reused pages: `concurrency` pages spread over
+        # BROWSER_POOL_BROWSERS Chromiums instead of a context per fetch.
+        self._pool = BrowserPool(pages_per_browser=pages_for(self.concurrency), user_agent=ua)
+        await self._pool.start()
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    async def get(self, url: str, is_home: bool) -> SitePage:
+        page = await self._pool.fetch(url, timeout_ms=25_000, idle_ms=8_000)
+        if page.error:
+            return SitePage(url, url, f"err:{page.error}", "", is_home)
+        # The rendered DOM is kept whatever the first response said: a
+        # 403 challenge page often resolves into the real site in-browser.
+        return SitePage(url, page.final_url, str(page.status) if page.status else "no_resp", page.html, is_home)
+
+
+TIERS: dict[str, type[FetchTier]] = {t.name: t for t in (HttpxTier, CurlCffiTier, PlaywrightTier)}
+
+
+# ─── Spec ────────────────────────────────────────────────────────────
+
+@dataclass
+class CrawlSpec:
+    """What to crawl, with which detectors, and where the progress CSV goes."""
+    seed_path: str
+    progress_path: str
+    detectors: list[Detector]
+    key: str = "cid"
+    url_col: str = "website"
+    passthrough: tuple[str, ...] = SEED_COLS
+    columns: list[str] | None = None  # progress CSV header; None → passthrough + detector + tier columns
+    tiers: tuple[str, ...] = ("httpx",)
+    headers: dict | None = None       # request headers for the httpx tier (default site_signals.HEADERS)
+    escalate: Callable[[dict], bool] | None = None  # None → escalate when the homepage had no HTML
+    finish: Callable[[dict, dict], dict | Awaitable[dict]] | None = None
+    counters: dict[str, str | Callable[[dict], bool]] = field(default_factory=dict)
+    concurrency: int = 50
+    timeout: float = FETCH_TIMEOUT
+    max_subpages: int = MAX_SUBPAGES
+    flush_every: int = FLUSH_EVERY
+
+    def header(self) -> list[str]:
+        if self.columns is not None:
+            return self.columns
+        return list(self.passthrough) + output_columns(self.detectors) + TIER_COLS
+
+
+# ─── Seed / progress ─────────────────────────────────────────────────
+
+def load_done_keys(progress_path: str, key: str = "cid") -> set[str]:
+    if not os.path.exists(progress_path):
+        return set()
+    try:
+        df = pd.read_csv(progress_path, usecols=[key], dtype=str)
+        return set(df[key].dropna().astype(str).tolist())
+    except Exception:
+        return set()
+
+
+def read_seed(spec: CrawlSpec, limit: int | None = None) -> list[dict]:
+    """Seed rows not yet in the progress CSV (first `limit` of them)."""
+    seed = pd.read_csv(spec.seed_path, dtype=str).fillna("")
+    print(f"Loaded seed: {len(seed):,} rows")
+    done = load_done_keys(spec.progress_path, spec.key)
+    if done:
+        print(f"Resuming — {len(done):,} {spec.key}s already processed, skipping.")
+        seed = seed[~seed[spec.key].astype(str).isin(done)]
+    if limit:
+        seed = seed.head(limit)
+    return seed.to_dict("records")
+
+
+class ProgressWriter:
+    """Append-only CSV writer; the header is written once per file."""
+
+    def __init__(self, path: str, columns: list[str], flush_every: int = FLUSH_EVERY):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._f = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._f, fieldnames=columns, extrasaction="ignore")
+        self.flush_every = flush_every
+        self.written = 0
+        if write_header:
+            self._writer.writeheader()
+            self._f.flush()
+
+    def write(self, row: dict) -> None:
+        self._writer.writerow(row)
+        self.written += 1
+        if self.written % self.flush_every == 0:
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.flush()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── Engine ──────────────────────────────────────────────────────────
+
+class CrawlEngine:
+    def __init__(self, spec: CrawlSpec, tiers: list[FetchTier], per_host: int = PER_HOST):
+        self.spec = spec
+        self.tiers = tiers
+        self.limiter = HostLimiter(per_host)
+
+    async def crawl_row(self, row: dict) -> dict:
+        """Run the tier waterfall for one seed row; returns analyze_site's columns + tier columns."""
+        spec = self.spec
+        if not normalize_url(row.get(spec.url_col, "")):
+            out = await analyze_site(None, "", spec.detectors, row=row)
+            return {**out, "site_tier": "", "site_tier_attempts": ""}
+        attempts: list[str] = []
+        for tier in self.tiers:
+            attempts.append(tier.name)
+            home_html = False
+
+            async def fetch(url: str, is_home: bool, tier: FetchTier = tier) -> SitePage:
+                nonlocal home_html
+                async with tier.sem, self.limiter(url):
+                    page = await tier.get(url, is_home)
+                if is_home:
+                    home_html = bool(page.html)
+                return page
+
+            out = await analyze_site(
+                None, row.get(spec.url_col, ""), spec.detectors, row=row,
+                max_subpages=tier.max_subpages or spec.max_subpages, fetch=fetch,
+            )
+            escalate = spec.escalate(out) if spec.escalate else not home_html
+            if not escalate:
+                break
+        out["site_tier"] = attempts[-1]
+        out["site_tier_attempts"] = ",".join(attempts)
+        return out
+
+    async def process(self, row: dict) -> tuple[dict, dict]:
+        try:
+            out = await self.crawl_row(row)
+        except Exception as e:
+            out = {"site_status": f"err:{type(e).__name__}"}
+        res = {**{c: row.get(c, "") for c in self.spec.passthrough}, **out}
+        if self.spec.finish is not None:
+            res = self.spec.finish(row, res)
+            if inspect.isawaitable(res):
+                res = await res
+        return out, res
+
+
+def _counted(res: dict, test) -> bool:
+    return bool(test(res)) if callable(test) else bool(res.get(test))
+
+
+async def crawl(spec: CrawlSpec, *, limit: int | None = None, concurrency: int | None = None,
+                timeout: float | None = None, tiers: tuple[str, ...] | None = None,
+                tier_concurrency: dict[str, int] | None = None) -> None:
+    """Crawl every unprocessed seed row and append the results to the progress CSV."""
+    concurrency = concurrency or spec.concurrency
+    timeout = timeout or spec.timeout
+    tier_concurrency = {**TIER_CONCURRENCY, **(tier_concurrency or {})}
+    rows = read_seed(spec, limit)
+    total = len(rows)
+    print(f"To crawl this run: {total:,}")
+    if not rows:
+        print("Nothing to do.")
+        return
+
+    fetchers = []
+    for name in tiers or spec.tiers:
+        if name not in TIERS:
+            raise ValueError(f"unknown tier {name!r} (known: {', '.join(TIERS)})")
+        fetchers.append(TIERS[name](concurrency=tier_concurrency.get(name, concurrency), timeout=timeout,
+                                    headers=spec.headers))
+    engine = CrawlEngine(spec, fetchers)
+    sem = asyncio.Semaphore(concurrency)
+    counts = dict.fromkeys(spec.counters, 0)
+    errors = 0
+    completed = 0
+    t0 = time.time()
+
+    async def one(row: dict) -> tuple[dict, dict]:
+        async with sem:
+            return await engine.process(row)
+
+    for f in fetchers:
+        await f.open()
+    try:
+        with ProgressWriter(spec.progress_path, spec.header(), spec.flush_every) as writer:
+            # Chunk to keep memory bounded — pre-allocating 60K+ tasks at once OOMs.
+            chunk_size = max(concurrency * 20, 1000)
+            for start in range(0, total, chunk_size):
+                tasks = [asyncio.create_task(one(r)) for r in rows[start:start + chunk_size]]
+                for fut in asyncio.as_completed(tasks):
+                    out, res = await fut
+                    writer.write(res)
+                    completed += 1
+                    for label, test in spec.counters.items():
+                        counts[label] += _counted(res, test)
+                    status = str(out.get("site_status") or "")
+                    if status and not status.startswith(("200", "non_html", "no_url")):
+                        errors += 1
+                    if completed % spec.flush_every == 0:
+                        elapsed = time.time() - t0
+                        rate = completed / elapsed if elapsed > 0 else 0
+                        eta = (total - completed) / rate if rate > 0 else 0
+                        hits = " ".join(f"{k}={v}" for k, v in counts.items())
+                        print(f"  [{completed:,}/{total:,}] {hits} err={errors} "
+                              f"| {rate:.1f}/s | ETA {eta / 60:.1f}min", flush=True)
+                tasks.clear()
+                for f in fetchers:
+                    await f.recycle()
+    finally:
+        for f in fetchers:
+            await f.close()
+
+    hits = " ".join(f"{k}={v}" for k, v in counts.items())
+    print(f"\nDone in {(time.time() - t0) / 60:.1f}min. {hits} errors={errors}")
+    print(f"Progress: {spec.progress_path}")
+    print_cache_summary()
+    telemetry.print_telemetry_report()
+
+
+def _tier_concurrency(value: str) -> dict[str, int]:
+    out = {}
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        name, _, n = part.partition("=")
+        out[name.strip()] = int(n)
+    return out
+
+
+def main(spec: CrawlSpec | None = None) -> None:
+    """CLI for a hunt module (`spec` given) or for registered detectors by name."""
+    ap = argparse.ArgumentParser(description="Resumable tiered crawl over a seed CSV")
+    if spec is None:
+        ap.add_argument("seed_csv", help="CSV with cid + website columns")
+        ap.add_argument("progress_csv", help="Append-only output; rows already in it are skipped")
+        ap.add_argument("--detectors", required=True, help="Comma-separated site_signals detector names")
+        ap.add_argument("--key", default="cid", help="Resume key column (default: cid)")
+    else:
+        ap.add_argument("--seed", "--input", dest="seed_csv", default=spec.seed_path)
+        ap.add_argument("--progress", dest="progress_csv", default=spec.progress_path)
+    ap.add_argument("--limit", type=int, default=None, help="Cap rows processed this run")
+    ap.add_argument("--concurrency", type=int, default=spec.concurrency if spec else 50, help="Max sites in flight")
+    ap.add_argument("--timeout", type=float, default=spec.timeout if spec else FETCH_TIMEOUT)
+    ap.add_argument("--tiers", default=",".join(spec.tiers) if spec else "httpx",
+                    help=f"Comma-separated fetch waterfall (of {','.join(TIERS)})")
+    ap.add_argument("--tier-concurrency", type=_tier_concurrency, default=None,
+                    help="e.g. curl_cffi=20,playwright=24")
+    args = ap.parse_args()
+
+    if spec is None:
+        names = [n.strip() for n in args.detectors.split(",") if n.strip()]
+        spec = CrawlSpec(seed_path=args.seed_csv, progress_path=args.progress_csv,
+                         detectors=resolve_detectors(names), key=args.key)
+    else:
+        spec.seed_path, spec.progress_path = args.seed_csv, args.progress_csv
+    tiers = tuple(t.strip() for t in args.tiers.split(",") if t.strip())
+    asyncio.run(crawl(spec, limit=args.limit, concurrency=args.concurrency, timeout=args.timeout,
+                      tiers=tiers, tier_concurrency=args.tier_concurrency))
+
+
+if __name__ == "__main__":
+    main()
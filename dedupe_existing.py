@@ -6,6 +6,8 @@ import os
 import sys
 import pandas as pd
 
+from entity_resolution import dedupe as dedupe_entities, match_existing
+
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 
 
@@ -28,12 +30,7 @@ def load_existing_leads() -> pd.DataFrame:
 
     combined = pd.concat(frames, ignore_index=True)
     # Dedup the existing set itself
-    combined["phone_clean"] = combined["phone"].astype(str).str.replace(r"[^\d]", "", regex=True)
-    combined = combined.drop_duplicates(subset=["phone_clean"], keep="first")
-    mask_no_phone = combined["phone_clean"] == ""
-    with_phone = combined[~mask_no_phone]
-    no_phone = combined[mask_no_phone].drop_duplicates(subset=["name", "address"], keep="first")
-    combined = pd.concat([with_phone, no_phone], ignore_index=True)
+    combined = dedupe_entities(combined).reset_index(drop=True)
     print(f"  Total unique existing leads: {len(combined)}")
     return combined
 
@@ -53,31 +50,11 @@ def dedupe_against_existing(new_path: str) -> None:
         print("No existing leads to dedupe against. Skipping.")
         return
 
-    # Build lookup sets from existing leads
-    existing["phone_clean"] = existing["phone"].astype(str).str.replace(r"[^\d]", "", regex=True)
-    existing_phones = set(existing["phone_clean"][existing["phone_clean"] != ""])
-    existing_name_addr = set(
-        zip(
-            existing["name"].str.lower().str.strip(),
-            existing["address"].str.lower().str.strip(),
-        )
-    )
-
-    # Mark duplicates in new data
-    new_df["phone_clean"] = new_df["phone"].astype(str).str.replace(r"[^\d]", "", regex=True)
-    is_phone_dupe = new_df["phone_clean"].isin(existing_phones) & (new_df["phone_clean"] != "")
-    is_name_addr_dupe = pd.Series(
-        [
-            (str(n).lower().strip(), str(a).lower().strip()) in existing_name_addr
-            for n, a in zip(new_df["name"], new_df["address"])
-        ],
-        index=new_df.index,
-    )
-
-    is_dupe = is_phone_dupe | is_name_addr_dupe
+    # Mark new rows that resolve to an existing lead
+    is_dupe = match_existing(new_df, existing)
     n_dupes = is_dupe.sum()
 
-    deduped = new_df[~is_dupe].drop(columns=["phone_clean"]).reset_index(drop=True)
+    deduped = new_df[~is_dupe].reset_index(drop=True)
 
     print(f"\nDuplicates found: {n_dupes}")
     print(f"Leads after dedup: {len(deduped)}")
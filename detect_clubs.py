@@ -18,9 +18,12 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
 
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
+from keyword_match import KeywordMatcher
+from page_cache import cached_get, print_cache_summary
+from site_signals import Detector
+
 # ─── Club/Subscription Signals ──────────────────────────────────────
 
 # Keywords found in page text or HTML that indicate a club program
@@ -134,6 +137,9 @@ PLATFORM_SIGNALS = [
     "patreon.com", "memberful", "memberspace",
 ]
 
+CLUB_MATCHER = KeywordMatcher(CLUB_KEYWORDS)
+PLATFORM_MATCHER = KeywordMatcher(PLATFORM_SIGNALS)
+
 # URL path segments that suggest a club/subscription page
 CLUB_URL_PATHS = [
     "/club", "/clubs",
@@ -186,19 +192,11 @@ MAX_BODY = 500_000  # 500KB cap — skip huge pages
 def _fetch_page(url: str) -> tuple[str, str, BeautifulSoup] | None:
     """Fetch a URL and return (raw_html_lower, visible_text_lower, soup) or None."""
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=TIMEOUT,
-                            allow_redirects=True, stream=True)
-        resp.raise_for_status()
-        # Read up to MAX_BODY bytes then stop — prevents slow-drip hangs
-        chunks = []
-        total = 0
-        for chunk in resp.iter_content(chunk_size=65536, decode_unicode=True):
-            chunks.append(chunk)
-            total += len(chunk)
-            if total >= MAX_BODY:
-                break
-        resp.close()
-        raw_text = "".join(chunks)
+        # Reads up to MAX_BODY bytes then stops — prevents slow-drip hangs
+        page = cached_get(url, headers=HEADERS, timeout=TIMEOUT, max_body=MAX_BODY)
+        if not page.ok:
+            return None
+        raw_text = page.text
         raw_html = raw_text.lower()
         soup = BeautifulSoup(raw_text, "html.parser")
         for tag in soup(["script", "style", "noscript"]):
@@ -234,6 +232,13 @@ def _classify_club_type(signals: list[str]) -> str:
     return "unknown"
 
 
+def match_club_signals(raw_html: str, text: str) -> list[str]:
+    """Club keywords found in lowercased visible text + platform tokens in raw HTML."""
+    # Content keywords — match against visible text only (no HTML noise);
+    # platform signals — match against raw HTML (script tags, class names, etc.)
+    return CLUB_MATCHER.matches(text) + PLATFORM_MATCHER.matches(raw_html)
+
+
 def detect_club(url: str) -> dict:
     """Scrape a website homepage for club/subscription/membership signals."""
     result = {
@@ -254,17 +259,7 @@ def detect_club(url: str) -> dict:
         return result
 
     raw_html, text, soup = page
-    signals = []
-
-    # Content keywords — match against visible text only (no HTML noise)
-    for kw in CLUB_KEYWORDS:
-        if kw in text:
-            signals.append(kw)
-
-    # Platform signals — match against raw HTML (script tags, class names, etc.)
-    for kw in PLATFORM_SIGNALS:
-        if kw in raw_html:
-            signals.append(kw)
+    signals = match_club_signals(raw_html, text)
 
     if signals:
         result["has_club"] = True
@@ -275,6 +270,44 @@ def detect_club(url: str) -> dict:
     return result
 
 
+class ClubDetector(Detector):
+    """detect_club for the single-fetch pass in site_signals.py.
+
+    Unlike detect_club it also follows up to two club-pathed subpages.
+    """
+    name = "clubs"
+    columns = {"has_club": False, "club_type": "", "club_url": "", "club_signals": ""}
+    subpage_hints = tuple(CLUB_URL_PATHS)
+    match_anchor_text = False
+
+    def start(self):
+        return {**self.columns, "signals": []}
+
+    def analyze(self, page, acc):
+        for sig in match_club_signals(page.html_lower, page.text):
+            if sig not in acc["signals"]:
+                acc["signals"].append(sig)
+        if acc["signals"] and not acc["club_url"]:
+            acc["club_url"] = page.final_url
+
+    def satisfied(self, acc):
+        return bool(acc["signals"])
+
+    def finalize(self, acc):
+        signals = acc["signals"]
+        if not signals:
+            return dict(self.columns)
+        return {
+            "has_club": True,
+            "club_type": _classify_club_type(signals),
+            "club_url": acc["club_url"],
+            "club_signals": "; ".join(signals[:10]),
+        }
+
+
+CLUB_DETECTOR = ClubDetector()
+
+
 # ─── Batch Processing ────────────────────────────────────────────────
 
 def _atomic_csv_write(df: pd.DataFrame, path: str):
@@ -372,6 +405,7 @@ def run(input_path: str, output_path: str | None, threads: int, resume: bool):
     print(f"\n{'='*60}")
     print(f"DONE: {clubs_found}/{total} businesses have a club/subscription ({clubs_found/total*100:.1f}%)")
     print(f"Output: {output_path}")
+    print_cache_summary()
     print(f"{'='*60}")
 
     if clubs_found > 0:
@@ -27,11 +27,11 @@ import pandas as pd
 from selectolax.parser import HTMLParser
 
 from detect_clubs import (
-    CLUB_KEYWORDS,
-    PLATFORM_SIGNALS,
     _classify_club_type,
     _atomic_csv_write,
+    match_club_signals,
 )
+from page_cache import async_cached_get, print_cache_summary
 
 
 # ─── Fetcher ───────────────────────────────────────────────────────────────
@@ -53,25 +53,15 @@ MAX_BODY = 500_000  # 500KB cap
 async def _fetch(url: str, client: httpx.AsyncClient) -> str | None:
     """GET a URL via httpx, returning raw HTML (or None on failure). Size-capped."""
     try:
-        async with client.stream("GET", url, headers=HEADERS) as resp:
-            if resp.status_code != 200:
-                return None
-            ctype = resp.headers.get("content-type", "").lower()
-            if "html" not in ctype and "text" not in ctype:
-                return None
-            chunks = []
-            total = 0
-            async for chunk in resp.aiter_bytes(chunk_size=65536):
-                chunks.append(chunk)
-                total += len(chunk)
-                if total >= MAX_BODY:
-                    break
-            try:
-                return b"".join(chunks).decode(resp.encoding or "utf-8", errors="replace")
-            except (LookupError, UnicodeDecodeError):
-                return b"".join(chunks).decode("utf-8", errors="replace")
+        page = await async_cached_get(client, url, headers=HEADERS, max_body=MAX_BODY)
     except (httpx.HTTPError, httpx.InvalidURL, ValueError, RuntimeError):
         return None
+    if page.status != 200:
+        return None
+    ctype = page.content_type.lower()
+    if "html" not in ctype and "text" not in ctype:
+        return None
+    return page.text
 
 
 # ─── Detection ─────────────────────────────────────────────────────────────
@@ -85,14 +75,7 @@ def _scan(raw_text: str) -> list[str]:
         tag.decompose()
     text = tree.text(separator=" ", strip=True).lower() if tree.body else raw_html
 
-    signals = []
-    for kw in CLUB_KEYWORDS:
-        if kw in text:
-            signals.append(kw)
-    for kw in PLATFORM_SIGNALS:
-        if kw in raw_html:
-            signals.append(kw)
-    return signals
+    return match_club_signals(raw_html, text)
 
 
 async def detect_club_v2(url: str, client: httpx.AsyncClient, sem: asyncio.Semaphore) -> dict:
@@ -224,6 +207,7 @@ async def _run_async(input_path: str, output_path: str, concurrency: int, resume
         print(f"  Newly found by v2: {newly_found}")
         print(f"  v1-True but v2-False: {lost}")
     print(f"Output: {output_path}")
+    print_cache_summary()
     print("=" * 60)
 
     if clubs_found > 0:
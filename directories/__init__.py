@@ -88,6 +88,15 @@ ALL_SOURCES: list[tuple[str, str, int, str, str, bool]] = [
 ]
 
 
+# Sources that drive Playwright from the start (not just as a fallback).
+# discover_directories.py runs them in source_runner's smaller browser pool.
+BROWSER_SOURCES: frozenset[str] = frozenset({
+    "somm_cms_master",
+    "somm_guildsomm",
+    "stockist_zev_rovine",
+})
+
+
 def by_slug(slug: str):
     for row in ALL_SOURCES:
         if row[0] == slug:
@@ -18,6 +18,9 @@ from __future__ import annotations
 
 from curl_cffi import requests as _cffi_requests
 
+from browser_pool import fetch_rendered
+from source_runner import host_slot
+
 
 _DEFAULT_IMPERSONATE = "chrome120"
 
@@ -40,12 +43,13 @@ def fetch_html_cffi(
     Returns empty string on hard failure.
     """
     try:
-        r = _cffi_requests.get(
-            url,
-            impersonate=impersonate,
-            timeout=timeout,
-            allow_redirects=allow_redirects,
-        )
+        with host_slot(url):
+            r = _cffi_requests.get(
+                url,
+                impersonate=impersonate,
+                timeout=timeout,
+                allow_redirects=allow_redirects,
+            )
     except Exception as e:
         print(f"  [browser_fetch] error fetching {url}: {e}", flush=True)
         return ""
@@ -64,7 +68,7 @@ def fetch_html_with_fallback(url: str) -> str:
     behind a WAF. The cost ladder is:
       curl_cffi  ~0.5s, free
       requests   ~0.5s, free (probably already failed if we're here)
-      playwright ~5s, ~50MB memory
+      playwright ~3s on a warm pooled page (browser_pool.py)
     """
     html = fetch_html_cffi(url)
     if html:
@@ -74,16 +78,8 @@ def fetch_html_with_fallback(url: str) -> str:
     html = fetch_html(url)
     if html and "<body" in html.lower():
         return html
-    # Last resort: Playwright (defer import to avoid loading at module import)
-    from awards._lib import playwright_session
-    try:
-        with playwright_session() as (page, _ctx, _br):
-            page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-            try:
-                page.wait_for_load_state("networkidle", timeout=12_000)
-            except Exception:
-                pass
-            return page.content() or ""
-    except Exception as e:
-        print(f"  [browser_fetch] playwright fallback failed for {url}: {e}", flush=True)
-        return ""
+    # Last resort: a page from the shared warm browser pool
+    page = fetch_rendered(url)
+    if page.error:
+        print(f"  [browser_fetch] playwright fallback failed for {url}: {page.error}", flush=True)
+    return page.html
@@ -26,15 +26,17 @@ import textwrap
 import time
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
+import llm_cache
+import telemetry
 from awards._lib import (
     SCHEMA,
     make_row,
     normalize_state,
     to_dataframe,
 )
+from serper import serper_post
 
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
@@ -77,7 +79,7 @@ def _serper_web(query: str, *, num: int = 8) -> list[dict]:
         print("  [editorial] SERPER_API_KEY missing", flush=True)
         return []
     try:
-        r = requests.post(
+        r = serper_post(
             "https://google.serper.dev/search",
             headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
             json={"q": query, "num": num, "gl": "us", "hl": "en"},
@@ -104,40 +106,52 @@ def _build_snippet(distributor_name: str, results: list[dict]) -> str:
     return "\n\n".join(chunks)
 
 
-def _call_claude(snippet: str, model: str = "claude-sonnet-4-5-20250929") -> list[dict]:
+def _ask_claude(snippet: str, model: str) -> list | None:
+    """One Messages call -> parsed JSON array (cached), or None on any failure."""
     try:
-        from anthropic import Anthropic
+        from anthropic import Anthropic  # noqa: F401
     except ImportError:
         print("  [editorial] anthropic SDK not installed", flush=True)
-        return []
+        return None
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("  [editorial] ANTHROPIC_API_KEY not set", flush=True)
-        return []
-    client = Anthropic(api_key=api_key)
+        return None
     try:
-        msg = client.messages.create(
-            model=model,
-            max_tokens=4096,
-            system=_EDITORIAL_SYSTEM,
-            messages=[{"role": "user", "content": snippet}],
-        )
+        with telemetry.timed("anthropic") as call:
+            msg = llm_cache.get_anthropic_client(api_key).messages.create(
+                model=model,
+                max_tokens=4096,
+                system=_EDITORIAL_SYSTEM,
+                messages=[{"role": "user", "content": snippet}],
+            )
+            call["cost"] = telemetry.anthropic_cost(model, msg.usage)
     except Exception as e:
         print(f"  [editorial] api error: {e}", flush=True)
-        return []
+        return None
     raw = "".join(b.text for b in msg.content if getattr(b, "type", "") == "text").strip()
     raw = re.sub(r"^```(?:json)?\s*", "", raw)
     raw = re.sub(r"\s*```$", "", raw)
     start, end = raw.find("["), raw.rfind("]")
     if start == -1 or end == -1 or end < start:
-        return []
+        return None
     try:
         data = json.loads(raw[start : end + 1])
     except json.JSONDecodeError:
-        return []
-    out: list[dict] = []
+        return None
     if not isinstance(data, list):
+        return None
+    llm_cache.store(model, _EDITORIAL_SYSTEM, snippet, data, msg.usage)
+    return data
+
+
+def _call_claude(snippet: str, model: str = "claude-sonnet-4-5-20250929") -> list[dict]:
+    data = llm_cache.lookup(model, _EDITORIAL_SYSTEM, snippet)
+    if data is None:
+        data = _ask_claude(snippet, model)
+    if data is None:
         return []
+    out: list[dict] = []
     for d in data:
         if not isinstance(d, dict) or not d.get("restaurant_name"):
             continue
@@ -42,13 +42,16 @@ import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+import llm_cache
+import telemetry
+from browser_pool import fetch_rendered
+from readable import map_chunks, readable_text
 from awards._lib import (
     SCHEMA,
     fetch_html,
     make_row,
     normalize_state,
     parse_city_state,
-    playwright_session,
     to_dataframe,
     UA,
 )
@@ -91,21 +94,6 @@ Rules:
 """).strip()
 
 
-def _readable_text(html: str) -> str:
-    """Strip HTML to retailer-list-relevant text."""
-    soup = BeautifulSoup(html, "html.parser")
-    for tag in soup(["script", "style", "noscript", "form"]):
-        tag.decompose()
-    # Most stockist pages have everything in <main> or <body>; keep nav stripped
-    # because some importers shove a giant nav above the retailer list.
-    for tag in soup(["nav", "header", "footer", "aside"]):
-        tag.decompose()
-    main = soup.find("main") or soup.find("article") or soup.body or soup
-    text = main.get_text(separator="\n", strip=True)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text[:80_000]
-
-
 def _parse_json_array(raw: str) -> list[dict] | None:
     """Parse a JSON array; salvage partials when the LLM response was truncated.
 
@@ -156,21 +144,21 @@ def _parse_json_array(raw: str) -> list[dict] | None:
     return salvaged
 
 
-def _call_claude(text: str, *, hint: str, model: str) -> list[dict]:
+def _ask_claude(user_block: str, model: str) -> list | None:
+    """One streamed Messages call -> parsed JSON array (cached), or None on any failure."""
     try:
-        from anthropic import Anthropic
+        from anthropic import Anthropic  # noqa: F401
     except ImportError:
         print("  [stockist-llm] anthropic SDK not installed; skipping", flush=True)
-        return []
+        return None
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("  [stockist-llm] ANTHROPIC_API_KEY not set; skipping", flush=True)
-        return []
-    client = Anthropic(api_key=api_key)
-    user_block = (f"Hint: {hint}\n\n" if hint else "") + "Page text:\n\n" + text
+        return None
+    client = llm_cache.get_anthropic_client(api_key)
     raw_parts: list[str] = []
     try:
-        with client.messages.stream(
+        with telemetry.timed("anthropic") as call, client.messages.stream(
             model=model,
             max_tokens=32_000,
             system=_STOCKIST_SYSTEM,
@@ -178,9 +166,11 @@ def _call_claude(text: str, *, hint: str, model: str) -> list[dict]:
         ) as stream:
             for chunk in stream.text_stream:
                 raw_parts.append(chunk)
+            usage = stream.get_final_message().usage
+            call["cost"] = telemetry.anthropic_cost(model, usage)
     except Exception as e:
         print(f"  [stockist-llm] api error: {e}", flush=True)
-        return []
+        return None
     raw = "".join(raw_parts).strip()
     raw = re.sub(r"^```(?:json)?\s*", "", raw)
     raw = re.sub(r"\s*```$", "", raw)
@@ -189,8 +179,28 @@ def _call_claude(text: str, *, hint: str, model: str) -> list[dict]:
         print(f"  [stockist-llm] could not parse JSON (len={len(raw)})", flush=True)
         print(f"  [stockist-llm] raw head: {raw[:200]!r}", flush=True)
         print(f"  [stockist-llm] raw tail: {raw[-200:]!r}", flush=True)
-        return []
+        return None
     if not isinstance(data, list):
+        return None
+    llm_cache.store(model, _STOCKIST_SYSTEM, user_block, data, usage)
+    return data
+
+
+def _call_claude(text: str, *, hint: str, model: str) -> list[dict]:
+    """Extract from each chunk of the page in parallel (long retailer lists span several)."""
+    return map_chunks(
+        text,
+        lambda chunk: _call_claude_chunk(chunk, hint=hint, model=model),
+        key=lambda r: (r["name"].lower(), r["city"].lower(), r["state"]),
+    )
+
+
+def _call_claude_chunk(text: str, *, hint: str, model: str) -> list[dict]:
+    user_block = (f"Hint: {hint}\n\n" if hint else "") + "Page text:\n\n" + text
+    data = llm_cache.lookup(model, _STOCKIST_SYSTEM, user_block)
+    if data is None:
+        data = _ask_claude(user_block, model)
+    if data is None:
         return []
     out: list[dict] = []
     for d in data:
@@ -209,17 +219,10 @@ def _call_claude(text: str, *, hint: str, model: str) -> list[dict]:
 
 def _fetch_html_or_playwright(url: str, *, strategy: str) -> str:
     if strategy == "playwright":
-        try:
-            with playwright_session() as (page, _ctx, _br):
-                page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-                try:
-                    page.wait_for_load_state("networkidle", timeout=12_000)
-                except Exception:
-                    pass
-                return page.content() or ""
-        except Exception as e:
-            print(f"  [stockist] playwright error for {url}: {e}", flush=True)
-            return ""
+        page = fetch_rendered(url)
+        if page.error:
+            print(f"  [stockist] playwright error for {url}: {page.error}", flush=True)
+        return page.html
     # WAF-aware fetch: curl_cffi (TLS impersonation) -> plain requests -> Playwright
     from directories._browser_fetch import fetch_html_with_fallback
     return fetch_html_with_fallback(url)
@@ -306,7 +309,7 @@ def scrape_stockist_page(
         if strategy == "html":
             parsed = _parse_html_list(html, css_selector)  # type: ignore[arg-type]
         else:
-            text = _readable_text(html)
+            text = readable_text(html)
             if len(text) < 200:
                 print(f"  [{source}] readable text too short ({len(text)})", flush=True)
                 time.sleep(sleep_between)
@@ -11,9 +11,11 @@ Per source module supplies:
 The helper:
   1. Fetches archive page(s) (httpx -> Playwright fallback)
   2. Pulls last N post URLs
-  3. For each post: fetches body text, runs Claude (Haiku 4.5) extraction
-     for venue mentions with sentiment + context
-  4. Returns canonical SCHEMA rows
+  3. For each post: fetches body text
+  4. Runs Claude (Haiku 4.5) extraction for venue mentions with sentiment +
+     context, one call per post or one Message Batch for the whole archive
+     (`--llm-batch`, see llm_batch.py)
+  5. Returns canonical SCHEMA rows
 """
 from __future__ import annotations
 
@@ -29,12 +31,16 @@ import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+import llm_batch
+import llm_cache
+import telemetry
+from browser_pool import fetch_rendered
+from readable import chunk_text, map_chunks, readable_text
 from awards._lib import (
     SCHEMA,
     fetch_html,
     make_row,
     normalize_state,
-    playwright_session,
     to_dataframe,
 )
 
@@ -42,6 +48,8 @@ from awards._lib import (
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env"))
 
 
+_DEFAULT_MODEL = "claude-haiku-4-5-20251001"
+
 _EXTRACT_SYSTEM = textwrap.dedent("""
 You read a food / restaurant newsletter post. Extract every US-based
 restaurant, wine bar, wine shop, bakery, butcher, cheesemonger, or
@@ -68,17 +76,10 @@ Rules:
 
 def _fetch(url: str, *, prefer_playwright: bool = False) -> str:
     if prefer_playwright:
-        try:
-            with playwright_session() as (page, _ctx, _br):
-                page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-                try:
-                    page.wait_for_load_state("networkidle", timeout=10_000)
-                except Exception:
-                    pass
-                return page.content() or ""
-        except Exception as e:
-            print(f"  [substack] playwright failed: {e}", flush=True)
-            return ""
+        page = fetch_rendered(url, idle_ms=10_000)
+        if page.error:
+            print(f"  [substack] playwright failed: {page.error}", flush=True)
+        return page.html
     # WAF-aware: curl_cffi -> requests -> Playwright
     from directories._browser_fetch import fetch_html_with_fallback
     return fetch_html_with_fallback(url)
@@ -101,45 +102,57 @@ def _extract_post_links(archive_html: str, base: str) -> list[tuple[str, str]]:
     return out
 
 
-def _readable_text(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"]):
-        tag.decompose()
-    main = soup.find("article") or soup.find("main") or soup.body or soup
-    text = main.get_text(separator="\n", strip=True)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text[:60_000]
-
-
-def _call_claude(post_text: str, *, model: str = "claude-haiku-4-5-20251001") -> list[dict]:
+def _ask_claude(post_text: str, model: str) -> list | None:
+    """One Messages call -> parsed JSON array (cached), or None on any failure."""
     try:
-        from anthropic import Anthropic
+        from anthropic import Anthropic  # noqa: F401
     except ImportError:
-        return []
+        return None
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
-        return []
-    client = Anthropic(api_key=api_key)
+        return None
     try:
-        msg = client.messages.create(
-            model=model, max_tokens=4096, system=_EXTRACT_SYSTEM,
-            messages=[{"role": "user", "content": post_text}],
-        )
+        with telemetry.timed("anthropic") as call:
+            msg = llm_cache.get_anthropic_client(api_key).messages.create(
+                model=model, max_tokens=4096, system=_EXTRACT_SYSTEM,
+                messages=[{"role": "user", "content": post_text}],
+            )
+            call["cost"] = telemetry.anthropic_cost(model, msg.usage)
     except Exception as e:
         print(f"  [substack] api error: {e}", flush=True)
-        return []
+        return None
     raw = "".join(b.text for b in msg.content if getattr(b, "type", "") == "text").strip()
     raw = re.sub(r"^```(?:json)?\s*", "", raw)
     raw = re.sub(r"\s*```$", "", raw)
     start, end = raw.find("["), raw.rfind("]")
     if start == -1 or end == -1 or end < start:
-        return []
+        return None
     try:
         data = json.loads(raw[start : end + 1])
     except json.JSONDecodeError:
+        return None
+    if not isinstance(data, list):
+        return None
+    llm_cache.store(model, _EXTRACT_SYSTEM, post_text, data, msg.usage)
+    return data
+
+
+def _call_claude(post_text: str, *, model: str = _DEFAULT_MODEL) -> list[dict]:
+    return map_chunks(
+        post_text,
+        lambda chunk: _call_claude_chunk(chunk, model=model),
+        key=lambda v: (v["venue_name"].lower(), v["city"].lower()),
+    )
+
+
+def _call_claude_chunk(post_text: str, *, model: str) -> list[dict]:
+    data = llm_cache.lookup(model, _EXTRACT_SYSTEM, post_text)
+    if data is None:
+        data = _ask_claude(post_text, model)
+    if data is None:
         return []
     out: list[dict] = []
-    for d in data if isinstance(data, list) else []:
+    for d in data:
         if not isinstance(d, dict) or not d.get("venue_name"):
             continue
         out.append({
@@ -170,15 +183,23 @@ def scrape_publication(
     posts = _extract_post_links(html, archive_url)[:max_posts]
     print(f"  [substack:{publication_slug}] {len(posts)} posts", flush=True)
     distinction_label = distinction_label or f"Mentioned by {publication_name}"
-    rows: list[dict] = []
+    docs: list[tuple[str, str, str]] = []
     for i, (url, title) in enumerate(posts):
         print(f"  [substack:{publication_slug}] ({i + 1}/{len(posts)}) {title[:60]}", flush=True)
         post_html = _fetch(url)
         if not post_html:
             continue
-        text = _readable_text(post_html)
+        text = readable_text(post_html)
         if len(text) < 400:
             continue
+        docs.append((url, title, text))
+        time.sleep(sleep_between)
+    if llm_batch.enabled():
+        llm_batch.prefill(_DEFAULT_MODEL, _EXTRACT_SYSTEM, [c for _, _, text in docs for c in chunk_text(text)],
+                          label=f"substack:{publication_slug}")
+
+    rows: list[dict] = []
+    for url, title, text in docs:
         venues = _call_claude(text)
         for v in venues:
             if drop_negative and v["sentiment"] == "negative":
@@ -195,5 +216,4 @@ def scrape_publication(
                 source_url=url,
                 blurb=f"sentiment={v['sentiment']}; post_title={title[:80]}",
             ))
-        time.sleep(sleep_between)
     return to_dataframe(rows)
@@ -43,7 +43,6 @@ import time
 from pathlib import Path
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
 from awards._lib import (
@@ -53,6 +52,7 @@ from awards._lib import (
     normalize_state,
     to_dataframe,
 )
+from serper import serper_post
 
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env"))
@@ -152,7 +152,7 @@ def _serper_web(query: str, *, num: int = 6) -> list[dict]:
         print("  [cookbook_authors] SERPER_API_KEY missing; skipping search", flush=True)
         return []
     try:
-        r = requests.post(
+        r = serper_post(
             "https://google.serper.dev/search",
             headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
             json={"q": query, "num": num, "gl": "us", "hl": "en"},
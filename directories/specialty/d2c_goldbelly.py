@@ -16,7 +16,6 @@ import re
 import time
 
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 
 from awards._lib import (
@@ -25,6 +24,7 @@ from awards._lib import (
     normalize_state,
     to_dataframe,
 )
+from serper import serper_post
 
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env"))
@@ -58,7 +58,7 @@ def _serper(query: str, num: int = 30) -> list[dict]:
     if not api_key:
         return []
     try:
-        r = requests.post(
+        r = serper_post(
             "https://google.serper.dev/search",
             headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
             json={"q": query, "num": num, "gl": "us", "hl": "en"},
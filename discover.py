@@ -3,43 +3,39 @@ Phase 1: Discover leads via Serper Maps API across multiple business types.
 Uses concurrent requests to stay within Serper's 50 req/s rate limit.
 """
 import re
+import sys
 import time
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures import as_completed
 
 import requests
 import pandas as pd
 from config import (
-    SERPER_API_KEY, SEARCH_QUERIES, CITIES,
+    SERPER_API_KEY, SERPER_RPS, SEARCH_QUERIES, CITIES,
     BUSINESS_TYPE_MAP, CHAIN_KEYWORDS, LIQUOR_KEYWORDS,
 )
+from discovery_ledger import DiscoveryLedger
+from entity_resolution import dedupe as dedupe_entities, normalize_cid, normalize_phone
+from maps_planner import AdaptiveMapsPlanner
+import telemetry
+from telemetry import ThreadPoolExecutor  # propagates the pipeline stage to workers
+from serper import is_offline, print_serper_summary, serper_post, set_offline
 
 # --- Concurrency settings ---
 MAX_WORKERS = 80       # 80 parallel HTTP requests; each blocks ~4s avg = ~20 req/s
-RATE_LIMIT_RPS = 45    # Stay under 50 req/s Serper Start plan limit
-_rate_lock = threading.Lock()
-_last_times: list[float] = []
-
-
-def _rate_limit():
-    """Token-bucket style rate limiter — blocks if we'd exceed RATE_LIMIT_RPS."""
-    with _rate_lock:
-        now = time.monotonic()
-        # Prune timestamps older than 1 second
-        while _last_times and _last_times[0] < now - 1.0:
-            _last_times.pop(0)
-        if len(_last_times) >= RATE_LIMIT_RPS:
-            sleep_until = _last_times[0] + 1.0
-            wait = sleep_until - now
-            if wait > 0:
-                time.sleep(wait)
-        _last_times.append(time.monotonic())
+# Rate limit: serper.py's machine-wide bucket (SERPER_RPS, under the 50 req/s plan)
 
 
-def search_serper_maps(query: str, location: str, max_retries: int = 3) -> list[dict]:
-    """Search Serper Maps API for a query + location combo with retry on rate limits."""
-    _rate_limit()
+def search_serper_maps(
+    query: str, location: str, max_retries: int = 3, raise_errors: bool = False,
+    page: int = 1, ll: str | None = None,
+) -> list[dict]:
+    """Search Serper Maps API for a query + location combo with retry on rate limits.
 
+    Failures return [] unless `raise_errors`, which lets callers tell an
+    empty cell from a failed one. `page` > 1 fetches deeper result pages;
+    `ll` ("@lat,lng,zoomz") searches a map viewport instead of the city name.
+    """
     url = "https://google.serper.dev/maps"
     headers = {
         "X-API-KEY": SERPER_API_KEY,
@@ -52,10 +48,15 @@ def search_serper_maps(query: str, location: str, max_retries: int = 3) -> list[
         "hl": "en",
         "num": 20,
     }
+    if ll:
+        del payload["location"]
+        payload["ll"] = ll
+    if page > 1:
+        payload["page"] = page
 
     for attempt in range(max_retries):
         try:
-            resp = requests.post(url, json=payload, headers=headers, timeout=15)
+            resp = serper_post(url, json=payload, headers=headers, timeout=15)
             resp.raise_for_status()
             data = resp.json()
             places = data.get("places", [])
@@ -90,14 +91,19 @@ def search_serper_maps(query: str, location: str, max_retries: int = 3) -> list[
                 wait = 2 ** (attempt + 1)  # 2s, 4s, 8s
                 time.sleep(wait)
                 continue
+            if raise_errors:
+                raise
             return []
     return []
 
 
-def _search_task(category: str, query: str, city: str) -> list[dict]:
+def _search_task(category: str, query: str, city: str, planner: AdaptiveMapsPlanner | None = None) -> list[dict]:
     """Single search task for the thread pool. Returns tagged results."""
     business_type = BUSINESS_TYPE_MAP[category]
-    results = search_serper_maps(query, city)
+    if planner is not None:
+        results = planner.search_cell(query, city)
+    else:
+        results = search_serper_maps(query, city, raise_errors=True)
     for r in results:
         r["business_type"] = business_type
         r["search_category"] = category
@@ -139,26 +145,50 @@ def is_liquor_store(name: str, category: str) -> bool:
     return any(kw in combined for kw in LIQUOR_KEYWORDS)
 
 
-def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_cities: int = 0) -> pd.DataFrame:
-    """Run all search queries across all cities using concurrent requests.
+# Quality floor: (min reviews, min rating) for restaurants vs. niche shops.
+RESTAURANT_FLOOR = (50, 4.2)
+NICHE_FLOOR = (20, 4.0)
 
-    Args:
-        types: Optional list of business types to discover.
-        max_searches: Stop after this many API calls (0 = unlimited).
-        max_cities: Limit to the first N cities (0 = all).
+
+def parse_price(p) -> int:
+    """Serper price_level ("$$") -> numeric tier."""
+    if isinstance(p, str):
+        return p.count("$")
+    return 0
+
+
+def drop_reason(place: dict) -> str:
+    """Why discover_leads' filters would drop this place ("" = keep).
+
+    Row-level mirror of the vectorized filters below, for stream_leads.
     """
-    # Filter search queries by requested types
+    name = place.get("name") or ""
+    if is_chain(name):
+        return "chain"
+    if place.get("business_type") == "wine_store" and is_liquor_store(name, place.get("category") or ""):
+        return "liquor"
+    if not place.get("website"):
+        return "no_website"
+    min_reviews, min_rating = RESTAURANT_FLOOR if place.get("business_type") == "restaurant" else NICHE_FLOOR
+    if (place.get("review_count") or 0) < min_reviews or (place.get("rating") or 0) < min_rating:
+        return "quality"
+    return ""
+
+
+def _plan_tasks(
+    types: list[str] | None, max_searches: int, max_cities: int, incremental: bool, budget: int,
+):
+    """(category, query, city) tasks to run, plus the ledger and planning stats."""
     active_queries = SEARCH_QUERIES
     if types:
         active_queries = {
             cat: queries for cat, queries in SEARCH_QUERIES.items()
             if BUSINESS_TYPE_MAP[cat] in types
         }
-        if not active_queries:
-            print(f"No search categories match types: {types}")
-            return pd.DataFrame()
 
     cities = CITIES[:max_cities] if max_cities > 0 else CITIES
+    if not active_queries:
+        return [], None, 0, active_queries, cities
 
     # Build full task list: (category, query, city)
     tasks = []
@@ -167,8 +197,118 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
             for city in cities:
                 tasks.append((category, query, city))
 
+    ledger = DiscoveryLedger() if incremental or budget > 0 else None
+    n_fresh = 0
+    if ledger is not None:
+        tasks, n_fresh = ledger.plan(tasks, budget)
+
     if max_searches > 0:
         tasks = tasks[:max_searches]
+    return tasks, ledger, n_fresh, active_queries, cities
+
+
+def stream_leads(
+    types: list[str] | None = None, max_searches: int = 0, max_cities: int = 0,
+    incremental: bool = False, budget: int = 0, adaptive: bool = False,
+    max_in_flight: int = MAX_WORKERS * 2, stats: dict | None = None,
+):
+    """Yield filtered, deduplicated leads as the Serper searches come back.
+
+    Streaming counterpart of discover_leads: at most `max_in_flight`
+    searches are queued at once and new ones are only submitted as the
+    consumer pulls, so a slow consumer throttles discovery. Dedupe is
+    online by Google cid and phone (discover_leads additionally merges
+    fuzzy name matches across the whole batch). `stats`, if given, is
+    filled with searches / raw / kept / dropped-by-reason counts.
+    """
+    tasks, ledger, _, _, _ = _plan_tasks(types, max_searches, max_cities, incremental, budget)
+    planner = None
+    if adaptive:
+        planner = AdaptiveMapsPlanner(search_serper_maps, seen=ledger.seen_cids() if ledger is not None else ())
+    record = ledger is not None and not is_offline()
+    stats = stats if stats is not None else {}
+    stats.update(searches=len(tasks), done=0, raw=0, kept=0, errors=0, dropped=Counter())
+    seen: set[str] = set()
+    pending_tasks = iter(tasks)
+
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            running = {}
+
+            def top_up():
+                while len(running) < max_in_flight:
+                    task = next(pending_tasks, None)
+                    if task is None:
+                        return
+                    running[pool.submit(_search_task, *task, planner)] = task
+
+            top_up()
+            while running:
+                future = next(as_completed(running))
+                task = running.pop(future)
+                stats["done"] += 1
+                try:
+                    results = future.result()
+                except Exception:
+                    stats["errors"] += 1
+                    results = None
+                if record and results is not None:
+                    ledger.record(task, results)
+                for place in results or []:
+                    stats["raw"] += 1
+                    keys = [k for k in ("cid:" + normalize_cid(str(place.get("cid") or "")),
+                                        "tel:" + normalize_phone(str(place.get("phone") or "")))
+                            if not k.endswith(":")]
+                    if any(k in seen for k in keys):
+                        stats["dropped"]["duplicate"] += 1
+                        continue
+                    seen.update(keys)
+                    reason = drop_reason(place)
+                    if reason:
+                        stats["dropped"][reason] += 1
+                        continue
+                    place["city"], place["state"] = parse_town_state(place.get("address", ""))
+                    place["price_tier"] = parse_price(place.get("price_level"))
+                    stats["kept"] += 1
+                    yield place
+                top_up()
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+
+def discover_leads(
+    types: list[str] | None = None, max_searches: int = 0, max_cities: int = 0,
+    incremental: bool = False, budget: int = 0, adaptive: bool = False,
+    stats: dict | None = None,
+) -> pd.DataFrame:
+    """Run all search queries across all cities using concurrent requests.
+
+    Args:
+        types: Optional list of business types to discover.
+        max_searches: Stop after this many API calls (0 = unlimited).
+        max_cities: Limit to the first N cities (0 = all).
+        incremental: Skip (query, city) cells the discovery ledger saw recently
+            and run the rest in order of historical new-lead yield.
+        budget: Query at most this many of the most valuable stale cells
+            (implies incremental; 0 = no cap).
+        adaptive: Page deeper and tile dense cities while results still
+            bring unseen cids (maps_planner.py); reports cost per new lead.
+        stats: If given, filled with searches (planned), fresh (cells the
+            ledger skipped) and errors.
+    """
+    tasks, ledger, n_fresh, active_queries, cities = _plan_tasks(
+        types, max_searches, max_cities, incremental, budget,
+    )
+    stats = stats if stats is not None else {}
+    stats.update(searches=len(tasks), fresh=n_fresh, errors=0)
+    if not active_queries:
+        print(f"No search categories match types: {types}")
+        return pd.DataFrame()
+
+    planner = None
+    if adaptive:
+        planner = AdaptiveMapsPlanner(search_serper_maps, seen=ledger.seen_cids() if ledger is not None else ())
 
     total = len(tasks)
     type_label = ", ".join(types) if types else "all"
@@ -177,18 +317,24 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
     print(f"{'='*60}")
     print(f"Search categories: {', '.join(active_queries.keys())}")
     print(f"Total searches: {total:,} across {len(cities)} cities")
-    print(f"Concurrency: {MAX_WORKERS} workers, rate limit {RATE_LIMIT_RPS} req/s")
+    if ledger is not None:
+        print(f"Incremental: skipped {n_fresh:,} fresh cells, querying the {total:,} most valuable stale ones")
+    if planner is not None:
+        print(f"Adaptive: up to {planner.max_pages} pages per area, tiling depth {planner.tile_depth}")
+    print(f"Concurrency: {MAX_WORKERS} workers, rate limit {SERPER_RPS} req/s (shared)")
     print()
 
     all_results = []
     completed = 0
     errors = 0
+    new_leads = 0
+    record = ledger is not None and not is_offline()  # replayed responses don't refresh a cell
     start_time = time.monotonic()
     last_print = start_time
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
         futures = {
-            pool.submit(_search_task, cat, query, city): (cat, query, city)
+            pool.submit(_search_task, cat, query, city, planner): (cat, query, city)
             for cat, query, city in tasks
         }
 
@@ -197,6 +343,8 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
             try:
                 results = future.result()
                 all_results.extend(results)
+                if record:
+                    new_leads += ledger.record(futures[future], results)
             except Exception:
                 errors += 1
 
@@ -217,9 +365,17 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
                 )
                 last_print = now
 
+    stats["errors"] = errors
     elapsed_total = time.monotonic() - start_time
     print(f"\nDiscovery complete in {elapsed_total/60:.1f} minutes")
     print(f"Total raw results: {len(all_results):,}")
+    if planner is not None:
+        print(planner.report())
+    if ledger is not None:
+        if record:
+            print(f"New to the ledger: {new_leads:,} leads")
+        print(ledger.summary())
+        ledger.close()
 
     if not all_results:
         print("No results found!")
@@ -232,20 +388,9 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
     df["city"] = parsed.apply(lambda x: x[0])
     df["state"] = parsed.apply(lambda x: x[1])
 
-    # --- Dedup ---
+    # --- Dedup (cid / phone / website / fuzzy name within city) ---
     before = len(df)
-
-    df["phone_clean"] = df["phone"].str.replace(r"[^\d]", "", regex=True)
-    df_deduped = df.drop_duplicates(subset=["phone_clean"], keep="first")
-
-    mask_no_phone = df_deduped["phone_clean"] == ""
-    df_with_phone = df_deduped[~mask_no_phone]
-    df_no_phone = df_deduped[mask_no_phone].drop_duplicates(
-        subset=["name", "address"], keep="first"
-    )
-
-    df_final = pd.concat([df_with_phone, df_no_phone], ignore_index=True)
-    df_final = df_final.drop(columns=["phone_clean"])
+    df_final = dedupe_entities(df).reset_index(drop=True)
 
     # --- Filter chains ---
     chain_mask = df_final["name"].apply(is_chain)
@@ -264,15 +409,12 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
 
     # --- Quality floor: reviews and rating thresholds ---
     is_restaurant = df_final["business_type"] == "restaurant"
-    restaurant_mask = is_restaurant & (df_final["review_count"] >= 50) & (df_final["rating"] >= 4.2)
-    niche_mask = ~is_restaurant & (df_final["review_count"] >= 20) & (df_final["rating"] >= 4.0)
+    restaurant_mask = (is_restaurant & (df_final["review_count"] >= RESTAURANT_FLOOR[0])
+                       & (df_final["rating"] >= RESTAURANT_FLOOR[1]))
+    niche_mask = ~is_restaurant & (df_final["review_count"] >= NICHE_FLOOR[0]) & (df_final["rating"] >= NICHE_FLOOR[1])
     df_final = df_final[restaurant_mask | niche_mask]
 
     # --- Convert price_level to numeric tier ---
-    def parse_price(p):
-        if isinstance(p, str):
-            return p.count("$")
-        return 0
     df_final["price_tier"] = df_final["price_level"].apply(parse_price)
 
     # Sort by review count descending
@@ -291,7 +433,11 @@ def discover_leads(types: list[str] | None = None, max_searches: int = 0, max_ci
 
 
 if __name__ == "__main__":
+    if "--offline" in sys.argv:
+        set_offline()
     df = discover_leads()
+    print_serper_summary()
+    telemetry.print_telemetry_report()
     if not df.empty:
         print(f"\nTop 20 by review count:")
         print(df[["name", "city", "state", "business_type", "rating", "review_count", "website"]].head(20).to_string())
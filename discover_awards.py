@@ -20,6 +20,9 @@ Usage:
     # auth-walled source
     python discover_awards.py --source nyt --cookies-from cookies/nyt.json
 
+    # run everything with up to 12 sources at once (1 = serial)
+    python discover_awards.py --all --workers 12
+
     # rebuild master from existing per-source CSVs only (no scraping)
     python discover_awards.py --master-only
 
@@ -34,16 +37,22 @@ import importlib
 import sys
 import traceback
 from datetime import datetime
+from functools import partial
 
 import pandas as pd
 
-from awards import ALL_SOURCES, by_slug
+from awards import ALL_SOURCES, BROWSER_SOURCES, by_slug
 from awards._lib import (
     build_master,
     load_cookies_from_file,
     save_source,
     to_dataframe,
 )
+import telemetry
+from llm_cache import print_llm_cache_summary
+from serper import print_serper_summary, set_offline
+from config import SOURCE_BROWSER_WORKERS, SOURCE_TIMEOUT, SOURCE_WORKERS
+from source_runner import SourceJob, run_sources
 
 
 def _select_sources(args) -> list[tuple]:
@@ -112,7 +121,15 @@ def main() -> None:
     p.add_argument("--cookies-from", type=str, default="", help="Path to JSON cookie file for auth sources")
     p.add_argument("--headed", action="store_true", help="Run Playwright in headed mode (debug)")
     p.add_argument("--skip-master", action="store_true", help="Don't rebuild the master file at the end")
+    p.add_argument("--offline", action="store_true", help="Serve Serper only from the response cache (no API calls)")
+    p.add_argument("--workers", type=int, default=SOURCE_WORKERS, help="Sources run at once (1 = one after another)")
+    p.add_argument("--browser-workers", type=int, default=SOURCE_BROWSER_WORKERS,
+                   help="Playwright-first sources run at once, on top of --workers")
+    p.add_argument("--source-timeout", type=float, default=SOURCE_TIMEOUT,
+                   help="Seconds before a source is given up on (0 = no limit; ignored with --workers 1)")
     args = p.parse_args()
+    if args.offline:
+        set_offline()
 
     if args.master_only:
         build_master()
@@ -125,11 +142,17 @@ def main() -> None:
     print(f"AWARDS DISCOVERY  ({len(sources)} sources)  {datetime.now():%Y-%m-%d %H:%M}")
     print(f"{'='*60}")
 
-    total = 0
-    for row in sources:
-        total += _run_one(*row, cookies=cookies, headed=args.headed)
+    jobs = [
+        SourceJob(row[0], partial(_run_one, *row, cookies=cookies, headed=args.headed),
+                  browser=row[0] in BROWSER_SOURCES, timeout=args.source_timeout)
+        for row in sources
+    ]
+    total = run_sources(jobs, workers=args.workers, browser_workers=args.browser_workers)
 
     print(f"\n  TOTAL ROWS WRITTEN: {total}")
+    print_serper_summary()
+    print_llm_cache_summary()
+    telemetry.print_telemetry_report()
 
     if not args.skip_master:
         build_master()
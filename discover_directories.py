@@ -18,6 +18,9 @@ Usage:
     # everything
     python discover_directories.py --all
 
+    # everything, serially (default runs SOURCE_WORKERS sources at once)
+    python discover_directories.py --all --workers 1
+
     # rebuild master only
     python discover_directories.py --master-only
 
@@ -32,6 +35,7 @@ import importlib
 import sys
 import traceback
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
 import pandas as pd
@@ -41,9 +45,17 @@ from awards._lib import (
     ROOT,
     dedupe,
     filter_us,
+    stamped_path,
     to_dataframe,
 )
-from directories import ALL_SOURCES, by_slug
+from directories import ALL_SOURCES, BROWSER_SOURCES, by_slug
+from lead_io import AWARD_SCHEMA, read_table, with_suffix, write_table
+import llm_batch
+import telemetry
+from llm_cache import print_llm_cache_summary
+from serper import print_serper_summary, set_offline
+from config import SOURCE_BROWSER_WORKERS, SOURCE_TIMEOUT, SOURCE_WORKERS
+from source_runner import SourceJob, run_sources
 
 OUTPUT_DIR = ROOT / "output" / "directories"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -57,11 +69,11 @@ def save_source(df: pd.DataFrame, slug: str, *, stamp: str | None = None) -> Pat
     modifying anything in awards/.
     """
     stamp = stamp or datetime.now().strftime("%Y%m%d")
-    path = OUTPUT_DIR / f"{slug}_{stamp}.csv"
+    path = with_suffix(OUTPUT_DIR / f"{slug}_{stamp}.csv")
     df = to_dataframe(df.to_dict("records") if not df.empty else [])
     df = filter_us(df)
     df = dedupe(df)
-    df.to_csv(path, index=False)
+    write_table(df, path, AWARD_SCHEMA)
     print(f"  Saved {len(df):>5} rows -> {path.relative_to(ROOT)}", flush=True)
     return path
 
@@ -123,7 +135,7 @@ def _run_one(slug: str, category: str, tier: int, module_path: str, business_typ
 
 
 def _latest_for_slug(slug: str) -> Path | None:
-    files = sorted(OUTPUT_DIR.glob(f"{slug}_*.csv"))
+    files = sorted(p for p in OUTPUT_DIR.glob(f"{slug}_*") if p.suffix in (".csv", ".parquet"))
     return files[-1] if files else None
 
 
@@ -131,18 +143,16 @@ def build_master(*, stamp: str | None = None) -> Path:
     stamp = stamp or datetime.now().strftime("%Y%m%d")
     frames: list[pd.DataFrame] = []
     for slug, *_ in ALL_SOURCES:
-        path = OUTPUT_DIR / f"{slug}_{stamp}.csv"
-        if not path.exists():
-            path = _latest_for_slug(slug)
-        if not path or not path.exists():
+        path = stamped_path(OUTPUT_DIR, slug, stamp) or _latest_for_slug(slug)
+        if not path:
             continue
-        df = pd.read_csv(path, dtype=str).fillna("")
+        df = read_table(path, schema=AWARD_SCHEMA)
         if df.empty:
             continue
         frames.append(df)
-    master_path = ROOT / "output" / f"directories_all_{stamp}.csv"
+    master_path = with_suffix(ROOT / "output" / f"directories_all_{stamp}.csv")
     if not frames:
-        pd.DataFrame(columns=SCHEMA).to_csv(master_path, index=False)
+        write_table(pd.DataFrame(columns=SCHEMA), master_path, AWARD_SCHEMA)
         print(f"\n  No source CSVs found — wrote empty master at {master_path.relative_to(ROOT)}")
         return master_path
     master = pd.concat(frames, ignore_index=True)
@@ -150,7 +160,7 @@ def build_master(*, stamp: str | None = None) -> Path:
     master["city_n"] = master["city"].str.lower().str.strip()
     master = master.drop_duplicates(["source", "name_n", "city_n"], keep="first")
     master = master.drop(columns=["name_n", "city_n"]).reset_index(drop=True)
-    master.to_csv(master_path, index=False)
+    write_table(master, master_path, AWARD_SCHEMA)
     print(f"\n  Master: {len(master)} rows across {master['source'].nunique()} sources -> {master_path.relative_to(ROOT)}")
     print("\n  Rows per source:")
     for src, n in master["source"].value_counts().items():
@@ -180,7 +190,19 @@ def main() -> None:
     p.add_argument("--master-only", action="store_true", help="Skip scraping; rebuild master from existing CSVs")
     p.add_argument("--headed", action="store_true", help="Run Playwright in headed mode (debug)")
     p.add_argument("--skip-master", action="store_true", help="Don't rebuild the master file at the end")
+    p.add_argument("--offline", action="store_true", help="Serve Serper only from the response cache (no API calls)")
+    p.add_argument("--llm-batch", action="store_true",
+                   help="Extract Substack archives via the Message Batches API (half price, slower)")
+    p.add_argument("--workers", type=int, default=SOURCE_WORKERS, help="Sources run at once (1 = one after another)")
+    p.add_argument("--browser-workers", type=int, default=SOURCE_BROWSER_WORKERS,
+                   help="Playwright-first sources run at once, on top of --workers")
+    p.add_argument("--source-timeout", type=float, default=SOURCE_TIMEOUT,
+                   help="Seconds before a source is given up on (0 = no limit; ignored with --workers 1)")
     args = p.parse_args()
+    if args.offline:
+        set_offline()
+    if args.llm_batch:
+        llm_batch.set_enabled()
 
     if args.list:
         _list_sources()
@@ -194,11 +216,17 @@ def main() -> None:
     print(f"DIRECTORIES DISCOVERY  ({len(sources)} sources)  {datetime.now():%Y-%m-%d %H:%M}")
     print(f"{'='*60}")
 
-    total = 0
-    for row in sources:
-        total += _run_one(*row, headed=args.headed)
+    jobs = [
+        SourceJob(row[0], partial(_run_one, *row, headed=args.headed),
+                  browser=row[0] in BROWSER_SOURCES, timeout=args.source_timeout)
+        for row in sources
+    ]
+    total = run_sources(jobs, workers=args.workers, browser_workers=args.browser_workers)
 
     print(f"\n  TOTAL ROWS WRITTEN: {total}")
+    print_serper_summary()
+    print_llm_cache_summary()
+    telemetry.print_telemetry_report()
 
     if not args.skip_master:
         build_master()
@@ -30,9 +30,13 @@ from awards._lib import (
     ROOT,
     dedupe,
     filter_us,
+    stamped_path,
     to_dataframe,
 )
 from jobs import ALL_SOURCES, by_slug
+from lead_io import AWARD_SCHEMA, read_table, with_suffix, write_table
+import telemetry
+from serper import print_serper_summary, set_offline
 
 OUTPUT_DIR = ROOT / "output" / "jobs"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -40,11 +44,11 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 def save_source(df: pd.DataFrame, slug: str, *, stamp: str | None = None) -> Path:
     stamp = stamp or datetime.now().strftime("%Y%m%d")
-    path = OUTPUT_DIR / f"{slug}_{stamp}.csv"
+    path = with_suffix(OUTPUT_DIR / f"{slug}_{stamp}.csv")
     df = to_dataframe(df.to_dict("records") if not df.empty else [])
     df = filter_us(df)
     df = dedupe(df)
-    df.to_csv(path, index=False)
+    write_table(df, path, AWARD_SCHEMA)
     print(f"  Saved {len(df):>5} rows -> {path.relative_to(ROOT)}", flush=True)
     return path
 
@@ -83,7 +87,7 @@ def _run_one(slug: str, tier: int, module_path: str, business_type: str) -> int:
 
 
 def _latest_for_slug(slug: str) -> Path | None:
-    files = sorted(OUTPUT_DIR.glob(f"{slug}_*.csv"))
+    files = sorted(p for p in OUTPUT_DIR.glob(f"{slug}_*") if p.suffix in (".csv", ".parquet"))
     return files[-1] if files else None
 
 
@@ -91,18 +95,16 @@ def build_master(*, stamp: str | None = None) -> Path:
     stamp = stamp or datetime.now().strftime("%Y%m%d")
     frames: list[pd.DataFrame] = []
     for slug, *_ in ALL_SOURCES:
-        path = OUTPUT_DIR / f"{slug}_{stamp}.csv"
-        if not path.exists():
-            path = _latest_for_slug(slug)
-        if not path or not path.exists():
+        path = stamped_path(OUTPUT_DIR, slug, stamp) or _latest_for_slug(slug)
+        if not path:
             continue
-        df = pd.read_csv(path, dtype=str).fillna("")
+        df = read_table(path, schema=AWARD_SCHEMA)
         if df.empty:
             continue
         frames.append(df)
-    master_path = ROOT / "output" / f"jobs_all_{stamp}.csv"
+    master_path = with_suffix(ROOT / "output" / f"jobs_all_{stamp}.csv")
     if not frames:
-        pd.DataFrame(columns=SCHEMA).to_csv(master_path, index=False)
+        write_table(pd.DataFrame(columns=SCHEMA), master_path, AWARD_SCHEMA)
         print(f"\n  No source CSVs — wrote empty master at {master_path.relative_to(ROOT)}")
         return master_path
     master = pd.concat(frames, ignore_index=True)
@@ -110,7 +112,7 @@ def build_master(*, stamp: str | None = None) -> Path:
     master["city_n"] = master["city"].str.lower().str.strip()
     master = master.drop_duplicates(["source", "name_n", "city_n"], keep="first")
     master = master.drop(columns=["name_n", "city_n"]).reset_index(drop=True)
-    master.to_csv(master_path, index=False)
+    write_table(master, master_path, AWARD_SCHEMA)
     print(f"\n  Master: {len(master)} rows across {master['source'].nunique()} sources -> {master_path.relative_to(ROOT)}")
     return master_path
 
@@ -127,7 +129,10 @@ def main():
     p.add_argument("--all", action="store_true")
     p.add_argument("--list", action="store_true")
     p.add_argument("--master-only", action="store_true")
+    p.add_argument("--offline", action="store_true", help="Serve Serper only from the response cache")
     args = p.parse_args()
+    if args.offline:
+        set_offline()
 
     if args.list:
         _list_sources()
@@ -149,8 +154,11 @@ def main():
     print(f"\n{'='*60}\nJOBS DISCOVERY ({len(sources)} sources)  {datetime.now():%Y-%m-%d %H:%M}\n{'='*60}")
     total = 0
     for row in sources:
-        total += _run_one(*row)
+        with telemetry.stage(row[0]):
+            total += _run_one(*row)
     print(f"\n  TOTAL ROWS WRITTEN: {total}")
+    print_serper_summary()
+    telemetry.print_telemetry_report()
     build_master()
 
 
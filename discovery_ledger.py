@@ -0,0 +1,156 @@
+"""
+Per-cell ledger for incremental Serper Maps discovery.
+
+discover.discover_leads searches every (category, query, city) cell. Most
+cells return the same places run after run, so the ledger remembers, for each
+cell, when it was last queried, how many places it returned and how many of
+those were leads no earlier cell had produced. With it the planner can:
+
+  - skip cells queried within DISCOVERY_CELL_STALE_DAYS,
+  - rank the rest by expected new-lead yield (an EWMA of the cell's past
+    yield; never-queried cells borrow the average of the same query in other
+    cities, or go first when nothing is known), and
+  - stop at a fixed budget: `python main.py --discover --budget 2000`
+    refreshes the 2,000 most valuable stale cells.
+
+Leads are identified by Google cid, else phone digits, else name + address.
+The ledger is SQLite (output/discovery_ledger.sqlite) and is only written from
+the thread that collects results.
+"""
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import time
+
+from config import DISCOVERY_CELL_STALE_DAYS, DISCOVERY_LEDGER_PATH
+
+_DAY = 86_400
+_YIELD_ALPHA = 0.5  # weight of the latest run in the yield EWMA
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    category       TEXT NOT NULL,
+    query          TEXT NOT NULL,
+    city           TEXT NOT NULL,
+    last_queried   REAL NOT NULL,
+    runs           INTEGER NOT NULL DEFAULT 0,
+    last_results   INTEGER NOT NULL DEFAULT 0,
+    last_new       INTEGER NOT NULL DEFAULT 0,
+    total_new      INTEGER NOT NULL DEFAULT 0,
+    yield_ewma     REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, query, city)
+);
+CREATE TABLE IF NOT EXISTS leads (
+    lead_key    TEXT PRIMARY KEY,
+    first_seen  REAL NOT NULL,
+    category    TEXT NOT NULL,
+    query       TEXT NOT NULL,
+    city        TEXT NOT NULL
+);
+"""
+
+Cell = tuple[str, str, str]  # (category, query, city)
+
+
+def lead_key(place: dict) -> str:
+    """Stable identity for a Serper Maps place."""
+    cid = str(place.get("cid") or "").strip()
+    if cid:
+        return f"cid:{cid}"
+    phone = re.sub(r"[^\d]", "", str(place.get("phone") or ""))
+    if len(phone) >= 10:
+        return f"tel:{phone[-10:]}"
+    name = " ".join(str(place.get("name") or "").lower().split())
+    address = " ".join(str(place.get("address") or "").lower().split())
+    return f"na:{name}|{address}"
+
+
+class DiscoveryLedger:
+    def __init__(self, path: str = DISCOVERY_LEDGER_PATH, stale_days: float = DISCOVERY_CELL_STALE_DAYS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.stale = stale_days * _DAY
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    # ─── Planning ─────────────────────────────────────────────────────
+
+    def seen_cids(self) -> set[str]:
+        """Google cids of every lead the ledger has recorded."""
+        return {key[4:] for (key,) in self._db.execute("SELECT lead_key FROM leads WHERE lead_key LIKE 'cid:%'")}
+
+    def plan(self, cells: list[Cell], budget: int = 0) -> tuple[list[Cell], int]:
+        """Stale cells ordered by expected new-lead yield, capped at `budget`.
+
+        Returns (cells_to_query, n_fresh_skipped). Ties keep the input order.
+        """
+        history = {
+            (cat, q, city): (last, runs, ewma)
+            for cat, q, city, last, runs, ewma in self._db.execute(
+                "SELECT category, query, city, last_queried, runs, yield_ewma FROM cells"
+            )
+        }
+        query_prior: dict[tuple[str, str], list[float]] = {}
+        for (cat, q, _), (_, runs, ewma) in history.items():
+            if runs:
+                query_prior.setdefault((cat, q), []).append(ewma)
+
+        now = time.time()
+        ranked, fresh = [], 0
+        for i, cell in enumerate(cells):
+            seen = history.get(cell)
+            if seen is not None and now - seen[0] < self.stale:
+                fresh += 1
+                continue
+            if seen is not None and seen[1]:
+                expected = seen[2]
+            else:
+                prior = query_prior.get(cell[:2])
+                expected = sum(prior) / len(prior) if prior else float("inf")
+            ranked.append((-expected, i, cell))
+        ranked.sort()
+        picked = [cell for _, _, cell in ranked]
+        if budget > 0:
+            picked = picked[:budget]
+        return picked, fresh
+
+    # ─── Recording ────────────────────────────────────────────────────
+
+    def record(self, cell: Cell, places: list[dict]) -> int:
+        """Log one completed search; returns how many places were new leads."""
+        category, query, city = cell
+        now = time.time()
+        new = 0
+        for key in dict.fromkeys(lead_key(p) for p in places):
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO leads (lead_key, first_seen, category, query, city)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, now, category, query, city),
+            )
+            new += cur.rowcount
+        row = self._db.execute(
+            "SELECT runs, yield_ewma FROM cells WHERE category = ? AND query = ? AND city = ?", cell,
+        ).fetchone()
+        ewma = new if row is None or not row[0] else _YIELD_ALPHA * new + (1 - _YIELD_ALPHA) * row[1]
+        self._db.execute(
+            "INSERT INTO cells (category, query, city, last_queried, runs, last_results, last_new,"
+            " total_new, yield_ewma) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)"
+            " ON CONFLICT (category, query, city) DO UPDATE SET"
+            " last_queried = excluded.last_queried, runs = runs + 1,"
+            " last_results = excluded.last_results, last_new = excluded.last_new,"
+            " total_new = total_new + excluded.last_new, yield_ewma = excluded.yield_ewma",
+            (category, query, city, now, len(places), new, new, ewma),
+        )
+        self._db.commit()
+        return new
+
+    def summary(self) -> str:
+        cells, leads = self._db.execute(
+            "SELECT (SELECT COUNT(*) FROM cells), (SELECT COUNT(*) FROM leads)"
+        ).fetchone()
+        return f"discovery ledger: {cells:,} cells tracked, {leads:,} unique leads seen"
@@ -0,0 +1,496 @@
+"""
+Entity resolution shared by every dedupe pass in the repo.
+
+discover, main.merge_discovery, dedupe_existing, awards._lib,
+clean_directories, scripts/build_wave2_master.py,
+scripts/dedupe_restaurants_by_cid.py and scrape_beli/dedupe_final.py used to
+each drop duplicates on their own exact key (phone, then name+address; or
+name+city; or cid). `resolve(df)` replaces them with one pass:
+
+  1. Normalize once into compact keys: name (ASCII-folded, "&" -> "and",
+     apostrophes and legal suffixes dropped), city, 2-letter state, last 10
+     phone digits, website domain (social/booking hosts ignored), street
+     number and Google cid.
+  2. Strong keys link rows outright: same cid, same phone, or same domain in
+     the same city.
+  3. Blocking finds fuzzy candidates: rows sharing (state, phonetic code of
+     the first name token) or (state, phonetic code of the longest token).
+     Oversized blocks are narrowed by city.
+  4. Candidate pairs are scored in bulk with numpy: MinHash estimates of the
+     name-trigram Jaccard, plus city / street-number / phone agreement.
+  5. Connected components become clusters, built strongest link first. A
+     cluster id is a hash of the smallest member identity (cid, else phone,
+     else name|city|state), so it stays the same across runs as long as that
+     member is present. Separate clusters that share that identity (two
+     locations with no cid or phone) also hash their smallest street
+     number / domain / `distinct` value, so each keeps its own id.
+
+Rows whose cid (or any `distinct` column) differs never end up in one
+cluster, not even through a chain of rows without one: a link that would
+join two different cids is refused. Rows with different street numbers or
+phone numbers never match fuzzily, since those are usually separate
+locations of one business.
+
+    python entity_resolution.py in.csv -o out.csv   # adds cluster_id
+    python entity_resolution.py --bench 500000       # synthetic timing
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import re
+import time
+import unicodedata
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from awards._lib import STATE_NAME_TO_CODE, US_STATES
+
+# Fuzzy match thresholds on the estimated name-trigram Jaccard.
+NAME_SIM_SAME_CITY = 0.75     # same city (or same street number)
+NAME_SIM_SAME_STREET = 0.6    # same city and same street number
+NAME_SIM_CITY_UNKNOWN = 0.9   # one side has no city; states must not conflict
+MAX_BLOCK = 400               # blocks larger than this are split by city, then skipped
+MINHASH_PERMUTATIONS = 32
+
+_STOP_TOKENS = r"\b(?:the|a|an|and|of|llc|inc|co|corp|company|ltd)\b"
+_GENERIC_HOSTS = (
+    "instagram.com", "facebook.com", "fb.com", "linktr.ee", "yelp.com", "google.com",
+    "goo.gl", "business.site", "square.site", "squareup.com", "toasttab.com",
+    "order.online", "resy.com", "exploretock.com", "opentable.com", "sevenrooms.com",
+    "wixsite.com", "squarespace.com", "godaddysites.com", "myshopify.com", "tiktok.com",
+    "twitter.com", "x.com", "doordash.com", "ubereats.com", "grubhub.com", "chownow.com",
+)
+_GENERIC_HOST_RE = "|".join(re.escape(h) for h in _GENERIC_HOSTS)
+_PAIR_CHUNK = 250_000
+_NAME_WIDTH = 48  # names are compared on their first 46 characters
+
+
+# ─── Normalization ───────────────────────────────────────────────────
+
+def _text(df: pd.DataFrame, col: str | None) -> pd.Series:
+    if not col or col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str).astype(object)
+
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_STOP_RE = re.compile(_STOP_TOKENS)
+_SCHEME = re.compile(r"^[a-z]+://")
+_WWW = re.compile(r"^www\d?\.")
+_GENERIC_HOST = re.compile(rf"(?:^|\.)(?:{_GENERIC_HOST_RE})$")
+_STREET_NO = re.compile(r"^\s*(\d+[a-zA-Z]?)\b")
+_ADDRESS_STATE = re.compile(r",\s*([A-Z]{2})\s+\d{5}")
+_PHONETIC_CLASSES = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556", "aeiouyhw0123456789")
+
+
+def fold(value: str) -> str:
+    """Lowercase ASCII with punctuation removed and whitespace collapsed."""
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii").lower()
+    value = _APOSTROPHES.sub("", value.replace("&", " and "))
+    return " ".join(_NON_ALNUM.sub(" ", value).split())
+
+
+def normalize_name(value: str) -> str:
+    return " ".join(_STOP_RE.sub(" ", fold(value)).split())
+
+
+def normalize_state(value: str) -> str:
+    v = value.strip()
+    if v.upper() in US_STATES:
+        return v.upper()
+    return STATE_NAME_TO_CODE.get(v.lower(), "")
+
+
+def normalize_phone(value: str) -> str:
+    digits = re.sub(r"\D", "", value[:-2] if value.endswith(".0") else value)
+    return digits[-10:] if len(digits) >= 10 else ""
+
+
+def normalize_domain(value: str) -> str:
+    host = _SCHEME.sub("", value.strip().lower())
+    host = _WWW.sub("", re.split(r"[/?#:]", host, maxsplit=1)[0])
+    return host if "." in host and not _GENERIC_HOST.search(host) else ""
+
+
+def normalize_cid(value: str) -> str:
+    v = value.strip()
+    v = v[:-2] if v.endswith(".0") else v
+    return "" if v in ("nan", "None") else v
+
+
+def street_number(address: str) -> str:
+    m = _STREET_NO.match(address)
+    return m.group(1).lower() if m else ""
+
+
+def address_state(address: str) -> str:
+    m = _ADDRESS_STATE.search(address)
+    return m.group(1) if m and m.group(1) in US_STATES else ""
+
+
+def phonetic(token: str) -> str:
+    """Crude phonetic code: first letter + 3 consonant classes (Soundex-like)."""
+    rest = re.sub(r"(\d)\1+", r"\1", token[1:].translate(_PHONETIC_CLASSES))
+    return token[:1] + rest[:3]
+
+
+def _on_uniques(s: pd.Series, fn) -> pd.Series:
+    """Apply a scalar normalizer once per distinct value."""
+    codes, uniques = pd.factorize(s)
+    out = np.array([fn(u) for u in np.asarray(uniques, dtype=object)] + [""], dtype=object)
+    return pd.Series(out[codes], index=s.index, dtype=object)
+
+
+def normalize(
+    df: pd.DataFrame, *, name: str = "name", city: str = "city", state: str = "state",
+    phone: str = "phone", website: str = "website", address: str = "address",
+    cid: str | None = "cid",
+) -> pd.DataFrame:
+    """Compact per-row keys used for matching. Missing columns become ''."""
+    raw_address = _text(df, address)
+    keys = pd.DataFrame({
+        "name_key": _on_uniques(_text(df, name), normalize_name),
+        "city_key": _on_uniques(_text(df, city), fold),
+        "state_key": _on_uniques(_text(df, state), normalize_state),
+        "phone_key": _on_uniques(_text(df, phone), normalize_phone),
+        "domain_key": _on_uniques(_text(df, website), normalize_domain),
+        "cid_key": _on_uniques(_text(df, cid), normalize_cid),
+        "street_no": _on_uniques(raw_address, street_number),
+    }, index=df.index)
+    # Fill missing state from "..., TX 78701" style addresses.
+    addr_state = _on_uniques(raw_address, address_state)
+    keys["state_key"] = keys["state_key"].where(keys["state_key"] != "", addr_state)
+    return keys
+
+
+# ─── Similarity ──────────────────────────────────────────────────────
+
+def _minhash(names: np.ndarray, k: int = MINHASH_PERMUTATIONS) -> np.ndarray:
+    """(len(names), k) MinHash signatures of each name's character trigrams.
+
+    Names are packed into a fixed-width byte matrix so trigram codes and all
+    k multiply-shift hash functions run as whole-array numpy operations.
+    """
+    padded = np.array([(" " + s + " ")[:_NAME_WIDTH] for s in names], dtype="S")
+    width = max(3, padded.dtype.itemsize)
+    chars = padded.view(np.uint8).reshape(len(padded), padded.dtype.itemsize)[:, :width].astype(np.uint64)
+    grams = (chars[:, :-2] << np.uint64(16)) | (chars[:, 1:-1] << np.uint64(8)) | chars[:, 2:]
+    # Positions past the end repeat the row's first trigram, which leaves every minimum unchanged.
+    valid = np.arange(width - 2) < (np.char.str_len(padded) - 2)[:, None]
+    grams = np.where(valid, grams, grams[:, :1])
+    rng = np.random.default_rng(20240601)
+    a = rng.integers(1, 2**63, size=k, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=k, dtype=np.uint64)
+    sig = np.empty((len(padded), k), dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for p in range(k):
+            sig[:, p] = ((grams * a[p] + b[p]) >> np.uint64(32)).min(axis=1)
+    return sig
+
+
+def _block_pairs(block: pd.Series, city: pd.Series) -> np.ndarray:
+    """Candidate (i, j) pairs, i < j, for rows sharing a blocking key."""
+    frame = pd.DataFrame({"b": block.to_numpy(), "i": np.arange(len(block))})
+    frame = frame[frame["b"] != ""]
+    sizes = frame.groupby("b")["i"].transform("size")
+    big = sizes > MAX_BLOCK
+    if big.any():  # narrow oversized blocks by city; drop what is still too big
+        frame.loc[big, "b"] = frame.loc[big, "b"] + "|" + city.to_numpy()[frame.loc[big, "i"]]
+        sizes = frame.groupby("b")["i"].transform("size")
+        frame = frame[(sizes > 1) & (sizes <= MAX_BLOCK)]
+    else:
+        frame = frame[sizes > 1]
+    pairs = frame.merge(frame, on="b")
+    pairs = pairs[pairs["i_x"] < pairs["i_y"]]
+    return pairs[["i_x", "i_y"]].to_numpy()
+
+
+def _key_edges(key: pd.Series) -> np.ndarray:
+    """Star edges linking every row to the first row with the same non-empty key."""
+    idx = pd.Series(np.arange(len(key)))
+    mask = (key != "").to_numpy()
+    first = idx[mask].groupby(key.to_numpy()[mask]).transform("min")
+    edges = np.column_stack([first.to_numpy(), idx[mask].to_numpy()])
+    return edges[edges[:, 0] != edges[:, 1]]
+
+
+def _codes(s: pd.Series) -> np.ndarray:
+    """Integer code per value; -1 for ''."""
+    codes, _ = pd.factorize(s.where(s != "", None))
+    return codes
+
+
+def _conflict(codes: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Both sides have a value and the values differ."""
+    a, b = codes[i], codes[j]
+    return (a >= 0) & (b >= 0) & (a != b)
+
+
+def _block_tokens(names: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """First token and rarest token (lowest frequency in this frame) of each name."""
+    token_lists = [n.split() for n in names]
+    freq = Counter(t for tokens in token_lists for t in set(tokens))
+    first = [tokens[0] if tokens else "" for tokens in token_lists]
+    rare = [min(tokens, key=freq.__getitem__) if tokens else "" for tokens in token_lists]
+    return pd.Series(first, index=names.index, dtype=object), pd.Series(rare, index=names.index, dtype=object)
+
+
+def _components(n: int, edges: np.ndarray, guards: list[np.ndarray] = ()) -> np.ndarray:
+    """Connected-component label (smallest member index) for each row.
+
+    Edges are applied in order. An edge is refused when it would put two
+    different values of a guard (codes >= 0) in one component, so the cid
+    rule also holds across chains of cid-less rows.
+    """
+    if len(edges) == 0:
+        return np.arange(n)
+    parent = list(range(n))
+    held = [g.tolist() for g in guards]  # guard value per component root
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in edges.tolist():
+        ra, rb = find(a), find(b)
+        if ra == rb:
+            continue
+        if any(h[ra] >= 0 and h[rb] >= 0 and h[ra] != h[rb] for h in held):
+            continue
+        if rb < ra:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        for h in held:
+            if h[ra] < 0:
+                h[ra] = h[rb]
+    return np.array([find(x) for x in range(n)], dtype=np.int64)
+
+
+def _identity(keys: pd.DataFrame) -> np.ndarray:
+    """Row's own identity: cid, else phone, else name|city|state."""
+    return np.where(
+        keys["cid_key"] != "", "cid:" + keys["cid_key"],
+        np.where(keys["phone_key"] != "", "tel:" + keys["phone_key"],
+                 "n:" + keys["name_key"] + "|" + keys["city_key"] + "|" + keys["state_key"]),
+    )
+
+
+# ─── Public API ──────────────────────────────────────────────────────
+
+def identity_ids(df: pd.DataFrame, *, prefix: str = "er_", **columns) -> pd.Series:
+    """Per-row id hashed from the row's own identity, independent of the other rows.
+
+    A singleton cluster's resolve() id is the same hash under "er_".
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+    identity = pd.Series(_identity(normalize(df, **columns)), index=df.index)
+    return _on_uniques(identity, lambda u: prefix + hashlib.sha1(u.encode()).hexdigest()[:12])
+
+
+def resolve(
+    df: pd.DataFrame, *, within: str | None = None, distinct: tuple[str, ...] = (), **columns,
+) -> pd.Series:
+    """Stable cluster id per row (index-aligned with df).
+
+    `columns` maps roles to column names (name=, city=, state=, phone=,
+    website=, address=, cid=); absent columns are ignored. `within` keeps
+    clusters inside one value of that column (e.g. per source). Rows that
+    disagree on a `distinct` column (e.g. ig_handle) never match.
+    """
+    n = len(df)
+    if n == 0:
+        return pd.Series([], index=df.index, dtype=object)
+    keys = normalize(df, **columns)
+    scope = _text(df, within).str.strip().str.lower() if within else pd.Series("", index=df.index)
+    scope_pre = (scope + "\x1f").where(scope != "", "") if within else scope
+
+    code = {col: _codes(keys[col]) for col in keys.columns}
+    scope_code = _codes(scope)
+    guards = [code["cid_key"]] + [_codes(_text(df, c).str.strip().str.lower()) for c in distinct]
+
+    # Strong keys.
+    strong = np.concatenate([
+        _key_edges((scope_pre + keys["cid_key"]).where(keys["cid_key"] != "", "")),
+        _key_edges((scope_pre + keys["phone_key"]).where(keys["phone_key"] != "", "")),
+        _key_edges((scope_pre + keys["domain_key"] + "|" + keys["city_key"]).where(keys["domain_key"] != "", "")),
+    ])
+    ok = np.ones(len(strong), dtype=bool)
+    for guard in guards:
+        ok &= ~_conflict(guard, strong[:, 0], strong[:, 1])
+    strong = strong[ok]
+
+    # Blocking + fuzzy scoring.
+    has_name = keys["name_key"] != ""
+    first_tok, rare_tok = _block_tokens(keys["name_key"])
+    block_base = scope_pre + keys["state_key"] + "|"
+    candidates = np.concatenate([
+        _block_pairs((block_base + _on_uniques(first_tok, phonetic)).where(has_name, ""), keys["city_key"]),
+        _block_pairs((block_base + _on_uniques(rare_tok, phonetic)).where(has_name, ""), keys["city_key"]),
+    ])
+    fuzzy = np.empty((0, 2), dtype=np.int64)
+    if len(candidates):
+        flat = pd.unique(candidates[:, 0].astype(np.int64) * n + candidates[:, 1])
+        i, j = flat // n, flat % n
+        blocked = (scope_code[i] != scope_code[j]) | _conflict(code["state_key"], i, j)
+        for col in ("street_no", "phone_key"):
+            blocked |= _conflict(code[col], i, j)
+        for guard in guards:
+            blocked |= _conflict(guard, i, j)
+        i, j = i[~blocked], j[~blocked]
+
+        if len(i):  # the guards may have blocked every candidate
+            # Signatures only for the distinct names that appear in a candidate pair.
+            name, city, street = code["name_key"], code["city_key"], code["street_no"]
+            used, slot = np.unique(np.concatenate([name[i], name[j]]), return_inverse=True)
+            name_values = keys["name_key"].to_numpy()
+            first_row = pd.Series(np.arange(n)).groupby(name).first()
+            sig = _minhash(name_values[first_row.loc[used].to_numpy()].astype(str))
+            si, sj = slot[:len(i)], slot[len(i):]
+            sim = np.empty(len(i))
+            for lo in range(0, len(i), _PAIR_CHUNK):  # bounded memory on huge candidate sets
+                hi = lo + _PAIR_CHUNK
+                sim[lo:hi] = (sig[si[lo:hi]] == sig[sj[lo:hi]]).mean(axis=1)
+            sim[name[i] == name[j]] = 1.0
+            same_city = (city[i] >= 0) & (city[i] == city[j])
+            city_unknown = (city[i] < 0) | (city[j] < 0)
+            same_street = (street[i] >= 0) & (street[i] == street[j])
+            match = (
+                (same_city & (sim >= NAME_SIM_SAME_CITY))
+                | (same_city & same_street & (sim >= NAME_SIM_SAME_STREET))
+                | (city_unknown & (sim >= NAME_SIM_CITY_UNKNOWN))
+            )
+            best_first = np.argsort(-sim[match], kind="stable")
+            fuzzy = np.column_stack([i[match], j[match]])[best_first]
+
+    # Strong links first, then fuzzy ones from most to least similar.
+    labels = _components(n, np.concatenate([strong, fuzzy]).astype(np.int64), guards)
+
+    identity = _identity(keys)
+    # Smallest identity per cluster, via lexicographically ordered codes.
+    codes, uniques = pd.factorize(scope_pre.to_numpy() + identity, sort=True)
+    best = np.full(n, len(uniques), dtype=np.int64)
+    np.minimum.at(best, labels, codes)
+    rep_codes = best[labels]
+    ids = np.array(["er_" + hashlib.sha1(u.encode()).hexdigest()[:12] for u in uniques], dtype=object)
+    cluster_ids = pd.Series(ids[rep_codes], index=df.index, name="cluster_id")
+
+    # Components the matcher kept apart (two street numbers, two `distinct`
+    # values) can share their smallest identity when neither has a cid or
+    # phone. Those get the component's smallest other member key mixed in.
+    roots = pd.Series(labels)
+    shared = roots.groupby(rep_codes).transform("nunique").to_numpy() > 1
+    if shared.any():
+        extra = keys["street_no"] + "|" + keys["domain_key"] + "|" + keys["phone_key"]
+        for c in distinct:
+            extra = extra + "|" + _text(df, c).str.strip().str.lower()
+        extra = pd.Series(extra.to_numpy()[shared]).groupby(labels[shared]).transform("min").to_numpy()
+        key = scope_pre.to_numpy()[shared] + identity[shared] + "#" + extra
+        # Still tied (e.g. oversized blocks left unscored): number them in row order.
+        sub = pd.DataFrame({"key": key, "root": labels[shared]})
+        rank = sub.groupby("key")["root"].rank(method="dense").astype(int) - 1
+        key = np.where(rank > 0, key + "#" + rank.astype(str), key)
+        cluster_ids[shared] = _on_uniques(
+            pd.Series(key), lambda u: "er_" + hashlib.sha1(u.encode()).hexdigest()[:12]
+        ).to_numpy()
+    return cluster_ids
+
+
+def dedupe(df: pd.DataFrame, *, keep: str = "first", **kwargs) -> pd.DataFrame:
+    """Drop rows resolved to an earlier row's entity (keeps df order)."""
+    if df.empty:
+        return df
+    clusters = resolve(df, **kwargs)
+    return df[~clusters.duplicated(keep=keep)]
+
+
+def match_existing(new: pd.DataFrame, existing: pd.DataFrame, **kwargs) -> pd.Series:
+    """Boolean mask over `new`: rows that resolve to an entity in `existing`."""
+    if new.empty or existing.empty:
+        return pd.Series(False, index=new.index)
+    both = pd.concat([existing, new], ignore_index=True)
+    clusters = resolve(both, **kwargs).to_numpy()
+    seen = set(clusters[:len(existing)])
+    return pd.Series([c in seen for c in clusters[len(existing):]], index=new.index)
+
+
+# ─── CLI / benchmark ─────────────────────────────────────────────────
+
+_SYLLABLES = ("ba", "cor", "del", "fen", "gar", "hol", "ka", "lin", "mar", "nor", "os", "pel",
+              "quin", "ros", "sal", "tor", "ul", "ver", "wil", "zan", "bri", "cha", "dun", "el")
+_KINDS = ("Butcher", "Wine Shop", "Bakery", "Cheese", "Kitchen", "Cellars", "Provisions", "Deli")
+
+
+def _synthetic(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    states = sorted(US_STATES)
+    base = []
+    for k in range(int(n * 0.8)):
+        words = ["".join(rng.choices(_SYLLABLES, k=rng.randint(2, 3))).title() for _ in range(rng.randint(1, 2))]
+        name = " ".join(words + [rng.choice(_KINDS)])
+        st = rng.choice(states)
+        base.append({
+            "name": name, "city": f"City{rng.randrange(40)}", "state": st,
+            "address": f"{rng.randrange(1, 9999)} Main St, City, {st} 00000",
+            "phone": f"({rng.randrange(200, 999)}) 555-{k % 10000:04d}" if rng.random() < 0.7 else "",
+            "website": f"https://www.{name.replace(' ', '').lower()}{k}.com" if rng.random() < 0.6 else "",
+            "cid": str(10**15 + k) if rng.random() < 0.5 else "",
+        })
+    rows = list(base)
+    while len(rows) < n:  # near-duplicates: typos, "The", "&", missing ids
+        r = dict(rng.choice(base))
+        name = r["name"]
+        roll = rng.random()
+        if roll < 0.3:
+            pos = rng.randrange(len(name))
+            name = name[:pos] + name[pos + 1:]
+        elif roll < 0.6:
+            name = "The " + name.replace(" And ", " & ")
+        else:
+            name = name.upper() + " LLC"
+        r.update(name=name, cid="", phone="" if rng.random() < 0.5 else r["phone"])
+        rows.append(r)
+    rng.shuffle(rows)
+    return pd.DataFrame(rows)
+
+
+def bench(n: int) -> None:
+    df = _synthetic(n)
+    t0 = time.perf_counter()
+    clusters = resolve(df)
+    elapsed = time.perf_counter() - t0
+    exact = len(df.drop_duplicates(["name", "city"]))
+    print(f"{n:,} rows resolved in {elapsed:.1f}s -> {clusters.nunique():,} entities "
+          f"(exact name+city dedupe leaves {exact:,})")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Add a stable cluster_id column to a lead CSV")
+    p.add_argument("input", nargs="?", help="CSV to resolve")
+    p.add_argument("-o", "--output", help="Output CSV (default: <input>_resolved.csv)")
+    p.add_argument("--within", help="Only cluster rows sharing this column's value (e.g. source)")
+    p.add_argument("--dedupe", action="store_true", help="Keep one row per cluster instead of tagging")
+    p.add_argument("--bench", type=int, metavar="N", help="Time resolve() on N synthetic rows")
+    args = p.parse_args()
+    if args.bench:
+        bench(args.bench)
+        return
+    if not args.input:
+        p.error("input CSV required (or --bench N)")
+    df = pd.read_csv(args.input, dtype=str, low_memory=False).fillna("")
+    df["cluster_id"] = resolve(df, within=args.within)
+    out = dedupe(df, within=args.within) if args.dedupe else df
+    path = args.output or re.sub(r"\.csv$", "", args.input) + "_resolved.csv"
+    out.to_csv(path, index=False)
+    print(f"{len(df):,} rows -> {df['cluster_id'].nunique():,} entities; saved {len(out):,} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
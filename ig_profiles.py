@@ -0,0 +1,291 @@
+"""
+Cross-run Instagram handle -> profile store.
+
+enrich.enrich_instagram (+ its Reels / Posts steps),
+scripts/apify_all_instagram_counts.py, scripts/apify_missing_instagram_counts.py,
+scripts/augment_butcher_instagram.py and
+scripts/enrich_instagram_public_counts.py all look up the same handles, and
+each kept its own CSV checkpoint, so a full-universe refresh paid again for
+every handle. They now share one SQLite store (IG_PROFILE_STORE_PATH):
+
+  - One row per (username, field, source) with the value and fetched_at.
+    Sources are "apify_profile", "apify_reels", "apify_posts" and
+    "web_profile_info" / "page_meta" (the public-counts script).
+  - Staleness is per field (IG_PROFILE_MAX_AGE_DAYS): follower and post
+    counts go stale after two weeks, bios and flags after three months.
+    `fresh(usernames, fields)` takes the newest in-date value of each field
+    from any source and only returns handles that have all of them.
+  - Handles a successful scrape found nothing for are stored with null
+    values, so they are not re-scraped until they go stale either.
+
+`fetch(kind, usernames)` is the consult-first / backfill-after wrapper
+around apify_runs for the three Apify actors; callers that fetch some other
+way use `fresh()` + `put()` directly. IG_PROFILE_REFRESH=1 skips both this
+store and apify_runs' cache and re-scrapes (results are still written back).
+Values replayed from the Apify cache are stored with the time they were
+scraped, not the time they were copied.
+
+    python ig_profiles.py info
+    python ig_profiles.py show <username>
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable
+
+from config import (
+    APIFY_ACTOR_IG_POSTS, APIFY_ACTOR_IG_REELS, IG_PROFILE_DEFAULT_MAX_AGE_DAYS,
+    IG_PROFILE_MAX_AGE_DAYS, IG_PROFILE_REFRESH, IG_PROFILE_STORE_ENABLED, IG_PROFILE_STORE_PATH,
+)
+
+PROFILE_ACTOR = "apify/instagram-profile-scraper"
+_DAY = 86_400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    username    TEXT NOT NULL,
+    field       TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    value       TEXT,
+    fetched_at  REAL NOT NULL,
+    PRIMARY KEY (username, field, source)
+);
+"""
+
+
+def max_age_days(field: str) -> float:
+    return IG_PROFILE_MAX_AGE_DAYS.get(field, IG_PROFILE_DEFAULT_MAX_AGE_DAYS)
+
+
+class IGProfileStore:
+    def __init__(self, path: str = IG_PROFILE_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _rows(self, usernames: list[str], fields: Iterable[str] | None = None):
+        fields = list(fields) if fields is not None else None
+        with self._lock:
+            for i in range(0, len(usernames), 500):
+                chunk = usernames[i:i + 500]
+                sql = (f"SELECT username, field, source, value, fetched_at FROM fields"
+                       f" WHERE username IN ({','.join('?' * len(chunk))})")
+                args = list(chunk)
+                if fields is not None:
+                    sql += f" AND field IN ({','.join('?' * len(fields))})"
+                    args += fields
+                yield from self._db.execute(sql, args).fetchall()
+
+    def fresh(self, usernames: Iterable[str], fields: Iterable[str]) -> dict[str, dict]:
+        """{username: {field: value}} for handles with every field in date."""
+        fields = list(fields)
+        usernames = list(dict.fromkeys(usernames))
+        now = time.time()
+        newest: dict[tuple[str, str], tuple[float, object]] = {}
+        for username, field, _source, value, fetched_at in self._rows(usernames, fields):
+            if now - fetched_at > max_age_days(field) * _DAY:
+                continue
+            key = (username, field)
+            if key not in newest or fetched_at > newest[key][0]:
+                newest[key] = (fetched_at, json.loads(value) if value is not None else None)
+        out = {}
+        for u in usernames:
+            if all((u, f) in newest for f in fields):
+                out[u] = {f: newest[(u, f)][1] for f in fields}
+        return out
+
+    def put(self, records: dict[str, dict], source: str, fetched_at: dict[str, float] | None = None) -> None:
+        """Store {username: {field: value}} from `source` (None = looked, not found).
+
+        `fetched_at` gives when each handle was actually scraped (default: now),
+        so values replayed from an upstream cache keep their real age.
+        """
+        now = time.time()
+        fetched_at = fetched_at or {}
+        rows = [
+            (u.lower(), field, source, None if value is None else json.dumps(value, default=str),
+             fetched_at.get(u, now))
+            for u, values in records.items() for field, value in values.items()
+        ]
+        if not rows:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO fields (username, field, source, value, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def profile(self, username: str) -> dict[str, dict]:
+        """Every stored field for one handle: {field: {value, source, fetched_at}} (newest wins)."""
+        out: dict[str, dict] = {}
+        for _u, field, source, value, fetched_at in self._rows([username.lower()]):
+            if field not in out or fetched_at > out[field]["fetched_at"]:
+                out[field] = {
+                    "value": json.loads(value) if value is not None else None,
+                    "source": source,
+                    "fetched_at": fetched_at,
+                }
+        return out
+
+    def summary(self) -> str:
+        with self._lock:
+            handles = self._db.execute("SELECT COUNT(DISTINCT username) FROM fields").fetchone()[0]
+            by_source = self._db.execute(
+                "SELECT source, COUNT(DISTINCT username) FROM fields GROUP BY source ORDER BY source"
+            ).fetchall()
+        parts = ", ".join(f"{s} {n:,}" for s, n in by_source)
+        return f"IG profile store: {handles:,} handles ({parts})" if by_source else "IG profile store: empty"
+
+
+_store: IGProfileStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_ig_profile_store() -> IGProfileStore | None:
+    global _store
+    if not IG_PROFILE_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = IGProfileStore()
+        return _store
+
+
+# ─── Apify actors ────────────────────────────────────────────────────
+
+def _mean(values: list) -> float:
+    return sum(values) / len(values) if values else 0
+
+
+def profile_values(items: list[dict]) -> dict:
+    """Profile-scraper item -> store fields (all None when the handle wasn't found)."""
+    item = items[0] if items else None
+    if item is None:
+        return dict.fromkeys(KIND_FIELDS["profile"])
+    return {
+        "ig_followers": item.get("followersCount", 0) or 0,
+        "ig_following": item.get("followsCount", 0) or 0,
+        "ig_posts": item.get("postsCount", 0) or 0,
+        "ig_full_name": item.get("fullName") or item.get("full_name") or "",
+        "ig_bio": item.get("biography", "") or "",
+        "ig_is_private": item.get("private") if "private" in item else item.get("isPrivate"),
+        "ig_is_verified": item.get("verified") if "verified" in item else item.get("isVerified"),
+        "ig_is_business": item.get("isBusinessAccount", False),
+        # the profile actor's own averages; kept apart from the Reels / Posts actors'
+        "ig_avg_video_views": item.get("avgVideoViews", 0) or 0,
+        "ig_avg_likes": item.get("avgLikes", 0) or 0,
+    }
+
+
+def reels_values(items: list[dict]) -> dict:
+    """Average views over a handle's scraped Reels."""
+    views = [item.get("videoViewCount") or item.get("playCount") or 0 for item in items]
+    return {"avg_video_views": _mean([v for v in views if v > 0])}
+
+
+def posts_values(items: list[dict]) -> dict:
+    """Average likes over a handle's scraped posts."""
+    likes = [item.get("likesCount", -1) for item in items]
+    return {"avg_likes": _mean([v for v in likes if v is not None and v >= 0])}
+
+
+def _owner(item: dict) -> str:
+    return item.get("ownerUsername") or ""
+
+
+# kind -> (actor, run_input(batch), owner(item), reduce(items), options)
+KINDS: dict[str, tuple] = {
+    "profile": (PROFILE_ACTOR, lambda batch: {"usernames": batch},
+                lambda item: item.get("username") or "", profile_values, None),
+    "reels": (APIFY_ACTOR_IG_REELS, lambda batch: {"username": batch, "resultsLimit": 12},
+              _owner, reels_values, {"resultsLimit": 12}),
+    "posts": (APIFY_ACTOR_IG_POSTS, lambda batch: {"username": batch, "resultsLimit": 12},
+              _owner, posts_values, {"resultsLimit": 12}),
+}
+KIND_FIELDS = {
+    "profile": ("ig_followers", "ig_following", "ig_posts", "ig_full_name", "ig_bio", "ig_is_private",
+                "ig_is_verified", "ig_is_business", "ig_avg_video_views", "ig_avg_likes"),
+    "reels": ("avg_video_views",),
+    "posts": ("avg_likes",),
+}
+# What the count scripts need; the public-counts script can satisfy these too.
+COUNT_FIELDS = ("ig_followers", "ig_posts", "ig_full_name", "ig_is_private")
+
+
+def fetch(
+    kind: str,
+    usernames: Iterable[str],
+    fields: Iterable[str] | None = None,
+    *,
+    on_batch: Callable[[dict[str, dict]], None] | None = None,
+    batch_size: int = 30,
+) -> dict[str, dict]:
+    """{username: values} for `kind`, from the store where `fields` are fresh
+    (default: all of the kind's fields), else scraped and written back.
+
+    Handles whose scrape failed are absent from the result. `on_batch` gets
+    store hits first, then each finished Apify batch.
+    """
+    from apify_runs import _options_key, get_apify_cache, scrape_usernames
+
+    actor, run_input, owner, reduce, options = KINDS[kind]
+    fields = tuple(fields or KIND_FIELDS[kind])
+    usernames = list(dict.fromkeys(u.strip().lstrip("@").lower() for u in usernames if u and u.strip()))
+    store = get_ig_profile_store()
+    source = f"apify_{kind}"
+    results: dict[str, dict] = {}
+
+    if store is not None and not IG_PROFILE_REFRESH:
+        hits = store.fresh(usernames, fields)
+        if hits:
+            print(f"  [ig_profiles] {len(hits):,}/{len(usernames):,} {kind} handles fresh in store", flush=True)
+            results.update(hits)
+            if on_batch:
+                on_batch(hits)
+
+    apify_cache = get_apify_cache()
+
+    def deliver(found: dict[str, list]) -> None:
+        values = {u: reduce(items) for u, items in found.items()}
+        if store is not None:
+            stamps = apify_cache.fetched_at(actor, _options_key(options), list(values)) if apify_cache else None
+            store.put(values, source, fetched_at=stamps)
+        results.update(values)
+        if on_batch:
+            on_batch(values)
+
+    todo = [u for u in usernames if u not in results]
+    if todo:
+        scrape_usernames(actor, todo, run_input, owner, options=options,
+                         batch_size=batch_size, refresh=IG_PROFILE_REFRESH, on_batch=deliver, label=kind)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the cross-run Instagram profile store.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("info", help="handle counts per source")
+    show = sub.add_parser("show", help="every stored field for one handle")
+    show.add_argument("username")
+    args = parser.parse_args()
+
+    store = IGProfileStore()
+    if args.cmd == "info":
+        print(store.summary())
+    else:
+        now = time.time()
+        for field, row in sorted(store.profile(args.username).items()):
+            age = (now - row["fetched_at"]) / _DAY
+            stale = " (stale)" if age > max_age_days(field) else ""
+            print(f"{field:22} {row['value']!r:30} {row['source']:18} {age:5.1f}d{stale}")
+
+
+if __name__ == "__main__":
+    main()
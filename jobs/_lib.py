@@ -6,7 +6,6 @@ import re
 import time
 
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
@@ -15,9 +14,10 @@ from awards._lib import (
     fetch_html,
     make_row,
     normalize_state,
-    playwright_session,
     to_dataframe,
 )
+from browser_pool import fetch_rendered
+from serper import serper_post
 
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
@@ -46,7 +46,7 @@ def serper_web(query: str, *, num: int = 20) -> list[dict]:
     if not api_key:
         return []
     try:
-        r = requests.post(
+        r = serper_post(
             "https://google.serper.dev/search",
             headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
             json={"q": query, "num": num, "gl": "us", "hl": "en"},
@@ -64,17 +64,10 @@ def fetch_listing_html(url: str, *, prefer_playwright: bool = False) -> str:
         html = fetch_html(url)
         if html and "<body" in html.lower():
             return html
-    try:
-        with playwright_session() as (page, _ctx, _br):
-            page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-            try:
-                page.wait_for_load_state("networkidle", timeout=10_000)
-            except Exception:
-                pass
-            return page.content() or ""
-    except Exception as e:
-        print(f"  [jobs] playwright failed for {url}: {e}", flush=True)
-        return ""
+    page = fetch_rendered(url, idle_ms=10_000)
+    if page.error:
+        print(f"  [jobs] playwright failed for {url}: {page.error}", flush=True)
+    return page.html
 
 
 _CITY_STATE_RE = re.compile(r"([A-Z][a-zA-Z\s.'\-]+?),\s*([A-Z]{2})\b")
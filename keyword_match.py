@@ -0,0 +1,206 @@
+"""
+Multi-keyword substring matching for the website signal lists.
+
+detect_clubs (CLUB_KEYWORDS / PLATFORM_SIGNALS), enrich (ECOMMERCE / EMAIL /
+ONLINE_ORDER signals, RESERVATION_DIFFICULTY_KEYWORDS) and
+scripts/scrape_newsletter.py (ESP_SIGNALS / POPUP_TOKENS) used to run
+`for kw in LIST: if kw in text`, i.e. one pass over the page per keyword.
+A `KeywordMatcher` is built once at import and finds every keyword in a
+single scan with an Aho–Corasick automaton (pyahocorasick).
+
+pyahocorasick is optional: without it the matcher falls back to the
+per-keyword `in` loop. That loop is still faster than a pure-Python automaton
+or a big regex alternation. Lists shorter than MIN_AUTOMATON_KEYWORDS also use
+the loop, because for a dozen keywords CPython's substring search beats one
+automaton pass. Results are identical either way; only the speed differs.
+
+Benchmark (hit lists are checked against the plain loop on every page):
+    python keyword_match.py --bench                  # page-cache bodies, else synthetic
+    python keyword_match.py --bench path/to/pages/   # *.html files
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import random
+import time
+import zlib
+from typing import Iterable, Iterator
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover
+    ahocorasick = None
+
+
+MIN_AUTOMATON_KEYWORDS = 32
+
+
+class KeywordMatcher:
+    """Case-sensitive multi-substring matcher over a fixed keyword list.
+
+    Callers lowercase the text (as the old loops did). Hits are reported in
+    keyword-list order, so `first()` reproduces
+    `for kw in LIST: if kw in text: return kw`.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(kw for kw in keywords if kw))
+        self._rank = {kw: i for i, kw in enumerate(self.keywords)}
+        self._automaton = None
+        if ahocorasick is not None and len(self.keywords) >= MIN_AUTOMATON_KEYWORDS:
+            automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                automaton.add_word(kw, kw)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def finditer(self, text: str) -> Iterator[tuple[int, str]]:
+        """Every (start, keyword) occurrence, overlapping ones included, by end offset."""
+        if not text:
+            return
+        if self._automaton is not None:
+            for end, kw in self._automaton.iter(text):
+                yield end - len(kw) + 1, kw
+            return
+        hits = []
+        for kw in self.keywords:
+            pos = text.find(kw)
+            while pos != -1:
+                hits.append((pos, kw))
+                pos = text.find(kw, pos + 1)
+        yield from sorted(hits, key=lambda hit: (hit[0] + len(hit[1]), -len(hit[1])))
+
+    def positions(self, text: str) -> dict[str, list[int]]:
+        """keyword -> start offsets, in keyword-list order."""
+        found: dict[str, list[int]] = {}
+        for start, kw in self.finditer(text):
+            found.setdefault(kw, []).append(start)
+        return {kw: found[kw] for kw in sorted(found, key=self._rank.__getitem__)}
+
+    def matches(self, text: str) -> list[str]:
+        """Distinct keywords present in `text`, in keyword-list order."""
+        if not text:
+            return []
+        if self._automaton is None:
+            return [kw for kw in self.keywords if kw in text]
+        found = {kw for _, kw in self._automaton.iter(text)}
+        return sorted(found, key=self._rank.__getitem__)
+
+    def first(self, text: str) -> str | None:
+        """Earliest-listed keyword present in `text`, or None."""
+        hits = self.matches(text)
+        return hits[0] if hits else None
+
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in `text` (stops at the first hit)."""
+        if not text:
+            return False
+        if self._automaton is None:
+            return any(kw in text for kw in self.keywords)
+        for _ in self._automaton.iter(text):
+            return True
+        return False
+
+
+# ─── Benchmark ───────────────────────────────────────────────────────
+
+PAGE_SIZE = 500_000
+
+
+def _load_pages(source: str | None, limit: int) -> list[str]:
+    """Saved pages from a directory of *.html, else page-cache blobs, else synthetic."""
+    bodies: list[str] = []
+    if source:
+        for path in sorted(glob.glob(os.path.join(source, "**", "*.htm*"), recursive=True))[:limit]:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                bodies.append(f.read())
+    else:
+        from config import PAGE_CACHE_DIR
+        for path in sorted(glob.glob(os.path.join(PAGE_CACHE_DIR, "blobs", "*", "*.z")))[:limit]:
+            with open(path, "rb") as f:
+                bodies.append(zlib.decompress(f.read()).decode("utf-8", errors="replace"))
+    bodies = [b for b in bodies if b.strip()]
+    if not bodies:
+        return []
+    # Pad/trim every body to PAGE_SIZE so timings are per 500KB page.
+    return [((b + " ") * (PAGE_SIZE // len(b) + 1))[:PAGE_SIZE].lower() for b in bodies]
+
+
+def _synthetic_pages(keywords: list[str], n: int) -> list[str]:
+    rng = random.Random(7)
+    filler = "lorem ipsum dolor sit amet shop wine cheese menu about contact the our and".split()
+    pages = []
+    for _ in range(n):
+        words = [rng.choice(filler) for _ in range(PAGE_SIZE // 5)]
+        for _ in range(20):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        pages.append(" ".join(words)[:PAGE_SIZE])
+    return pages
+
+
+def _signal_lists() -> dict[str, list[str]]:
+    from detect_clubs import CLUB_KEYWORDS, PLATFORM_SIGNALS
+    from enrich import ECOMMERCE_SIGNALS, EMAIL_SIGNALS, ONLINE_ORDER_SIGNALS
+    from config import RESERVATION_DIFFICULTY_KEYWORDS
+    from scripts.scrape_newsletter import ESP_TOKENS, POPUP_TOKENS
+    return {
+        "CLUB_KEYWORDS": CLUB_KEYWORDS,
+        "PLATFORM_SIGNALS": PLATFORM_SIGNALS,
+        "ECOMMERCE_SIGNALS": ECOMMERCE_SIGNALS,
+        "EMAIL_SIGNALS": EMAIL_SIGNALS,
+        "ONLINE_ORDER_SIGNALS": ONLINE_ORDER_SIGNALS,
+        "RESERVATION_DIFFICULTY_KEYWORDS": RESERVATION_DIFFICULTY_KEYWORDS,
+        "ESP_TOKENS": ESP_TOKENS,
+        "POPUP_TOKENS": list(POPUP_TOKENS),
+    }
+
+
+def bench(source: str | None, limit: int) -> bool:
+    lists = _signal_lists()
+    pages = _load_pages(source, limit)
+    origin = source or "page cache"
+    if not pages:
+        pages = _synthetic_pages([kw for kws in lists.values() for kw in kws], limit)
+        origin = "synthetic"
+    print(f"{len(pages)} pages x {PAGE_SIZE // 1000}KB ({origin}); "
+          f"backend={'pyahocorasick' if ahocorasick else 'substring loop'}")
+    print(f"{'list':<34}{'kws':>5}{'loop ms/page':>14}{'matcher ms/page':>17}{'speedup':>9}")
+
+    ok = True
+    total_loop = total_matcher = 0.0
+    for name, keywords in lists.items():
+        matcher = KeywordMatcher(keywords)
+        t0 = time.perf_counter()
+        expected = [[kw for kw in matcher.keywords if kw in page] for page in pages]
+        t_loop = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = [matcher.matches(page) for page in pages]
+        t_matcher = time.perf_counter() - t0
+        if got != expected:
+            ok = False
+            print(f"  MISMATCH in {name}")
+        total_loop += t_loop
+        total_matcher += t_matcher
+        print(f"{name:<34}{len(matcher):>5}{t_loop / len(pages) * 1000:>14.2f}"
+              f"{t_matcher / len(pages) * 1000:>17.2f}{t_loop / max(t_matcher, 1e-9):>8.1f}x")
+    print(f"{'TOTAL':<39}{total_loop / len(pages) * 1000:>14.2f}"
+          f"{total_matcher / len(pages) * 1000:>17.2f}{total_loop / max(total_matcher, 1e-9):>8.1f}x")
+    print("hit lists identical to the substring loop" if ok else "HIT LISTS DIFFER")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark KeywordMatcher against the substring loop")
+    parser.add_argument("--bench", nargs="?", const="", metavar="DIR",
+                        help="Directory of saved *.html pages (default: page-cache bodies)")
+    parser.add_argument("--limit", type=int, default=50, help="Max pages to load (default: 50)")
+    args = parser.parse_args()
+    if args.bench is None:
+        parser.print_help()
+    else:
+        raise SystemExit(0 if bench(args.bench or None, args.limit) else 1)
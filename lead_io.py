@@ -0,0 +1,186 @@
+"""
+Typed CSV / Parquet I/O for pipeline outputs.
+
+Everything under output/ used to be CSV read back with `dtype=str` and then
+re-coerced by hand (`numeric()`, `truthy()` in the scripts). This module
+declares the column types once and applies them on both paths:
+
+  - `LEAD_SCHEMA` is the canonical lead row (discover -> enrich -> score),
+    `AWARD_SCHEMA` types `awards._lib.SCHEMA` (also used by directories/).
+  - `write_table(df, path, schema)` writes Parquet when the path ends in
+    .parquet and pyarrow is installed (dictionary-encoded categoricals for
+    business_type / state / source / ...), else CSV.
+  - `read_table(path, columns=, schema=)` reads either format, projecting
+    to `columns` before parsing and returning typed columns.
+  - `with_suffix(path)` maps a .csv output path to OUTPUT_FORMAT, so writers
+    flip to Parquet with `OUTPUT_FORMAT=parquet` and readers keep working.
+
+Column kinds: "str" (missing -> ""), "category", "int" / "float" (nullable,
+unparseable -> NA), "bool" (true/1/yes/y). Columns not in the schema pass
+through untouched.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from config import OUTPUT_FORMAT
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PARQUET = True
+except ImportError:  # pragma: no cover
+    HAVE_PARQUET = False
+
+
+AWARD_SCHEMA: dict[str, str] = {
+    "source": "category",
+    "tier": "int",
+    "business_type": "category",
+    "name": "str",
+    "city": "str",
+    "state": "category",
+    "country": "category",
+    "distinction": "str",
+    "year": "str",
+    "source_url": "str",
+    "blurb": "str",
+}
+
+LEAD_SCHEMA: dict[str, str] = {
+    "lead_id": "str",
+    # discover.search_serper_maps
+    "name": "str",
+    "address": "str",
+    "city": "str",
+    "state": "category",
+    "rating": "float",
+    "review_count": "float",
+    "type": "category",
+    "types": "str",
+    "category": "category",
+    "phone": "str",
+    "website": "str",
+    "price_level": "category",
+    "latitude": "float",
+    "longitude": "float",
+    "cid": "str",
+    "search_query": "category",
+    "search_city": "category",
+    "business_type": "category",
+    "search_category": "category",
+    # enrich.enrich_websites
+    "website_reachable": "bool",
+    "has_ecommerce": "bool",
+    "has_email_signup": "bool",
+    "has_online_ordering": "bool",
+    "instagram_url": "str",
+    "facebook_url": "str",
+    "ecommerce_platform": "category",
+    "email_platform": "category",
+    "page_title": "str",
+    "reservation_difficulty": "category",
+    "reservation_url": "str",
+    "domain_age": "float",
+    # social / press / reviews / availability
+    "ig_username": "str",
+    "ig_followers": "float",
+    "follower_count": "float",
+    "fb_likes": "float",
+    "press_mentions": "float",
+    "press_sources": "str",
+    "awards_count": "float",
+    "awards_list": "str",
+    "review_difficulty_sentiment": "float",
+    "review_texts_sample": "str",
+    "avg_video_views": "float",
+    "avg_likes": "float",
+    "booking_availability_score": "float",
+    "price_tier": "category",
+    # score.py
+    "lead_score": "float",
+    "tier": "category",
+}
+
+_TRUE = {"true", "1", "1.0", "yes", "y"}
+
+
+def truthy(series: pd.Series) -> pd.Series:
+    """"True" / 1 / yes -> True, everything else (incl. missing) -> False."""
+    if series.dtype == bool:
+        return series
+    return series.fillna(False).astype(str).str.strip().str.lower().isin(_TRUE)
+
+
+def numeric(series: pd.Series, fill: float | None = 0) -> pd.Series:
+    """Parse to float; unparseable cells become `fill` (NaN when None)."""
+    out = pd.to_numeric(series, errors="coerce")
+    return out if fill is None else out.fillna(fill)
+
+
+def coerce(df: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    """Cast the schema's columns that are present in df to their kinds."""
+    df = df.copy()
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if kind == "str":
+            df[col] = s.fillna("").astype(str)
+        elif kind == "category":
+            df[col] = s.fillna("").astype(str).astype("category")
+        elif kind == "int":
+            df[col] = numeric(s, fill=None).round().astype("Int64")
+        elif kind == "float":
+            df[col] = numeric(s, fill=None)
+        elif kind == "bool":
+            df[col] = truthy(s)
+    return df
+
+
+def with_suffix(path: str | Path) -> Path:
+    """Swap a .csv output path to .parquet when OUTPUT_FORMAT=parquet."""
+    path = Path(path)
+    if OUTPUT_FORMAT == "parquet" and HAVE_PARQUET:
+        return path.with_suffix(".parquet")
+    return path
+
+
+def write_table(df: pd.DataFrame, path: str | Path, schema: dict[str, str] | None = None) -> Path:
+    """Write df to .parquet (typed, dictionary-encoded) or .csv, atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        if not HAVE_PARQUET:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        out = coerce(df, schema) if schema else df
+        out.to_parquet(tmp, index=False, engine="pyarrow")
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def read_table(
+    path: str | Path, columns: list[str] | None = None, schema: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    """Read .parquet or .csv, projected to `columns` and typed by `schema`.
+
+    Without a schema, CSVs come back as in the old `dtype=str` + fillna("")
+    readers, so existing string-based callers keep working.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=columns)
+        if columns is not None:
+            df = df.reindex(columns=columns)
+    else:
+        usecols = (lambda c: c in set(columns)) if columns is not None else None
+        df = pd.read_csv(path, dtype=str, usecols=usecols, keep_default_na=False)
+        if columns is not None:
+            df = df.reindex(columns=columns, fill_value="")
+    if schema:
+        return coerce(df, schema)
+    return df
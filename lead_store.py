@@ -0,0 +1,303 @@
+"""
+Persistent lead master table for the main pipeline.
+
+main.run_enrichment used to rewrite the whole DataFrame to a new CSV after
+every step (2_enriched_websites.csv, 2_enriched_instagram.csv, ...) and each
+resume re-read one of those files in full. The lead store replaces that with
+one SQLite table keyed by a canonical `lead_id`:
+
+  - `assign_lead_ids(df)` adds lead_id hashed from each row's own identity
+    (Google cid, else phone, else name|city|state), so re-discovering a
+    lead maps it back onto the same row whatever else is in the frame.
+    Duplicates are dropped upstream (entity_resolution.resolve); rows that
+    still share an identity are told apart by address / website, never by
+    their order in the frame.
+  - `snapshot(df)` fingerprints every column (one uint64 per cell) before a
+    step; `upsert_changes(snap, df, step)` then writes only the rows and
+    columns the step actually changed. A checkpoint costs O(changed cells).
+  - Columns are added on first write, so new enrichment fields need no
+    migration.
+  - `load(columns=, where=)` reads a subset with plain SQL, and
+    `export(path)` writes CSV (or Parquet when pyarrow is installed) on
+    demand: `python lead_store.py export output/leads.csv`.
+
+The file is output/leads.sqlite (LEAD_STORE_PATH) in WAL mode, so scripts
+can read it while a run is writing.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import LEAD_STORE_PATH
+
+ID_COL = "lead_id"
+_BATCH = 5_000  # rows per executemany
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS leads (
+    {ID_COL}    TEXT PRIMARY KEY,
+    _updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    step          TEXT PRIMARY KEY,
+    finished_at   REAL NOT NULL,
+    rows_changed  INTEGER NOT NULL,
+    cells_changed INTEGER NOT NULL
+);
+"""
+
+
+def _quote(col: str) -> str:
+    return '"' + str(col).replace('"', '""') + '"'
+
+
+def _sql_value(v):
+    """Python/numpy value -> something sqlite3 can bind."""
+    if v is None or v is pd.NA or v is pd.NaT:
+        return None
+    if isinstance(v, (bool, np.bool_)):
+        return int(v)
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, (str, int, float, bytes)):
+        return v
+    if isinstance(v, (pd.Timestamp, datetime)):
+        return v.isoformat()
+    if isinstance(v, (list, tuple, dict, set)):
+        return json.dumps(list(v) if isinstance(v, set) else v, default=str)
+    return str(v)
+
+
+def assign_lead_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with a lead_id column (existing ids are kept).
+
+    Every id comes from the row itself, never from its position or the other
+    rows. Rows sharing an identity (e.g. two locations with no cid or phone
+    in a CSV that was never deduped) are told apart by address and website:
+    the smallest of those keeps the bare id, the others get "~" plus a hash
+    of theirs. Rows that agree on all of it are one lead and share an id.
+    """
+    from entity_resolution import fold, identity_ids, normalize
+
+    df = df.copy()
+    ids = identity_ids(df, prefix="ld_")
+    shared = ids.duplicated(keep=False).to_numpy()
+    if shared.any():
+        sub = df[shared]
+        keys = normalize(sub)
+        address = sub["address"].fillna("").astype(str).map(fold) if "address" in sub.columns else ""
+        content = keys["street_no"] + "|" + keys["domain_key"] + "|" + address
+        first = content.groupby(ids[shared]).transform("min")
+        tagged = ids[shared] + "~" + content.map(lambda c: hashlib.sha1(c.encode()).hexdigest()[:8])
+        ids[shared] = ids[shared].where(content == first, tagged)
+    if ID_COL in df.columns:
+        have = df[ID_COL].fillna("").astype(str).str.strip()
+        ids = have.where(have != "", ids)
+    df[ID_COL] = ids
+    return df
+
+
+def snapshot(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Per-column cell fingerprints, for diffing after a step mutates df."""
+    snap = {}
+    for col in df.columns:
+        s = df[col]
+        try:
+            snap[col] = pd.util.hash_pandas_object(s, index=False).to_numpy()
+        except TypeError:  # unhashable cells (lists, dicts)
+            snap[col] = pd.util.hash_pandas_object(s.astype(str), index=False).to_numpy()
+    return snap
+
+
+class LeadStore:
+    def __init__(self, path: str = LEAD_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._columns = self._table_columns()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _table_columns(self) -> set[str]:
+        return {row[1] for row in self._db.execute("PRAGMA table_info(leads)")}
+
+    def _ensure_columns(self, cols) -> None:
+        for col in cols:
+            if col not in self._columns:
+                self._db.execute(f"ALTER TABLE leads ADD COLUMN {_quote(col)}")
+                self._columns.add(col)
+
+    # ─── Writing ──────────────────────────────────────────────────────
+
+    def upsert(self, df: pd.DataFrame, columns: list[str] | None = None) -> int:
+        """Insert or update rows of df (by lead_id), writing only `columns`."""
+        if ID_COL not in df.columns:
+            raise ValueError(f"upsert needs a {ID_COL} column (see assign_lead_ids)")
+        cols = [c for c in (columns if columns is not None else df.columns) if c != ID_COL]
+        if df.empty:
+            return 0
+        self._ensure_columns(cols)
+        names = [ID_COL, *cols, "_updated_at"]
+        sets = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in [*cols, "_updated_at"])
+        sql = (
+            f"INSERT INTO leads ({', '.join(map(_quote, names))}) VALUES ({', '.join('?' * len(names))})"
+            f" ON CONFLICT ({ID_COL}) DO UPDATE SET {sets}"
+        )
+        now = time.time()
+        frame = df[[ID_COL, *cols]].astype(object)
+        rows = frame.itertuples(index=False, name=None)
+        with self._db:
+            batch = []
+            for row in rows:
+                batch.append([_sql_value(v) for v in row] + [now])
+                if len(batch) >= _BATCH:
+                    self._db.executemany(sql, batch)
+                    batch = []
+            if batch:
+                self._db.executemany(sql, batch)
+        return len(frame)
+
+    def upsert_changes(self, before: dict[str, np.ndarray], df: pd.DataFrame, step: str | None = None) -> tuple[int, int]:
+        """Write the cells of df that differ from a `snapshot` taken earlier.
+
+        Returns (rows_changed, cells_changed) and, with `step`, records the
+        step as finished.
+        """
+        after = snapshot(df)
+        n = len(df)
+        changed_cols, row_mask, cells = [], np.zeros(n, dtype=bool), 0
+        for col, h in after.items():
+            if col == ID_COL:
+                continue
+            old = before.get(col)
+            diff = np.ones(n, dtype=bool) if old is None or len(old) != n else old != h
+            if diff.any():
+                changed_cols.append(col)
+                row_mask |= diff
+                cells += int(diff.sum())
+        if ID_COL not in before or len(before[ID_COL]) != n or (before[ID_COL] != after[ID_COL]).any():
+            row_mask[:] = True  # rows were added/reordered: rewrite everything the step touched
+        rows = int(row_mask.sum()) if changed_cols else 0
+        if rows:
+            self.upsert(df.loc[row_mask], changed_cols)
+        if step:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO steps (step, finished_at, rows_changed, cells_changed)"
+                    " VALUES (?, ?, ?, ?)",
+                    (step, time.time(), rows, cells),
+                )
+        return rows, cells
+
+    def reset_steps(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM steps")
+
+    # ─── Reading ──────────────────────────────────────────────────────
+
+    def finished_steps(self) -> dict[str, float]:
+        return dict(self._db.execute("SELECT step, finished_at FROM steps"))
+
+    def count(self, where: str | None = None, params: tuple = ()) -> int:
+        sql = "SELECT COUNT(*) FROM leads" + (f" WHERE {where}" if where else "")
+        return self._db.execute(sql, params).fetchone()[0]
+
+    def _select(self, columns: list[str] | None, where: str | None) -> str:
+        if columns:
+            cols = [ID_COL] + [c for c in columns if c != ID_COL and c in self._columns]
+        else:
+            cols = [c for c in self._table_column_order() if c != "_updated_at"]
+        sql = f"SELECT {', '.join(map(_quote, cols))} FROM leads"
+        if where:
+            sql += f" WHERE {where}"
+        return sql + " ORDER BY rowid"
+
+    def _table_column_order(self) -> list[str]:
+        return [row[1] for row in self._db.execute("PRAGMA table_info(leads)")]
+
+    def load(self, columns: list[str] | None = None, where: str | None = None, params: tuple = ()) -> pd.DataFrame:
+        """Leads as a DataFrame, optionally only some columns / a SQL filter."""
+        return pd.read_sql_query(self._select(columns, where), self._db, params=params)
+
+    def export(
+        self, path: str, columns: list[str] | None = None, where: str | None = None, params: tuple = (),
+    ) -> int:
+        """Write leads to .csv or .parquet; CSV is streamed in chunks."""
+        sql = self._select(columns, where)
+        tmp = path + ".tmp"
+        n = 0
+        if path.endswith(".parquet"):
+            df = pd.read_sql_query(sql, self._db, params=params)
+            df.to_parquet(tmp, index=False)
+            n = len(df)
+        else:
+            first = True
+            for chunk in pd.read_sql_query(sql, self._db, params=params, chunksize=50_000):
+                chunk.to_csv(tmp, index=False, mode="w" if first else "a", header=first)
+                first = False
+                n += len(chunk)
+            if first:  # no rows: still write the header
+                pd.read_sql_query(sql + " LIMIT 0", self._db, params=params).to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        return n
+
+    def summary(self) -> str:
+        steps = self.finished_steps()
+        last = max(steps, key=steps.get) if steps else "none"
+        return (
+            f"lead store: {self.count():,} leads x {len(self._columns) - 2} columns "
+            f"in {self.path} (last step: {last})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export the lead store")
+    parser.add_argument("--path", default=LEAD_STORE_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    exp = sub.add_parser("export", help="Write leads to CSV or Parquet")
+    exp.add_argument("output", help="*.csv or *.parquet")
+    exp.add_argument("--columns", help="Comma-separated columns (default: all)")
+    exp.add_argument("--where", help="SQL filter, e.g. \"business_type = 'butcher'\"")
+    imp = sub.add_parser("import", help="Upsert a CSV into the store")
+    imp.add_argument("input")
+    sub.add_parser("info", help="Row/column counts and finished steps")
+    args = parser.parse_args()
+
+    with LeadStore(args.path) as store:
+        if args.cmd == "export":
+            cols = [c.strip() for c in args.columns.split(",")] if args.columns else None
+            n = store.export(args.output, columns=cols, where=args.where)
+            print(f"Exported {n:,} leads to {args.output}")
+        elif args.cmd == "import":
+            df = assign_lead_ids(pd.read_csv(args.input))
+            print(f"Upserted {store.upsert(df):,} leads from {args.input}")
+        else:
+            print(store.summary())
+            for step, ts in sorted(store.finished_steps().items(), key=lambda kv: kv[1]):
+                print(f"  {step:<14} finished {datetime.fromtimestamp(ts):%Y-%m-%d %H:%M}")
+
+
+if __name__ == "__main__":
+    main()
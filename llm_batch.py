@@ -0,0 +1,412 @@
+"""
+Message Batches mode for the bulk Claude extraction sweeps.
+
+The Substack archive sweeps, best_wine_shops seed + search URLs and the
+Beli slide OCR send one synchronous `messages.create` per document. With
+`--llm-batch` (or LLM_BATCH=1) they instead collect every document first
+and submit them as one Message Batch: half the price, no per-call retry
+loops or rate-limit sleeps, at the cost of waiting for the whole batch
+(minutes usually, 24h at worst). Good for overnight runs.
+
+  - `run_batch(model, system, items)` takes {item id: user content},
+    submits whatever the LLM cache can't answer (split at
+    LLM_BATCH_MAX_REQUESTS / LLM_BATCH_MAX_MB), polls every
+    LLM_BATCH_POLL_SECONDS and returns {item id: parsed reply or None}.
+    Identical requests are sent once and fanned back out to every id.
+  - `prefill(model, system, users)` is the usual entry point: it runs the
+    batch and only writes the parsed replies into llm_cache, so each
+    caller's existing `_call_claude` then finds every document cached and
+    maps results back to its rows exactly as in a synchronous run.
+  - Submitted batch ids are recorded in the LLM cache DB. If a run is
+    interrupted while polling, the rerun re-attaches to the open batch
+    for any request it already submitted instead of paying for it again.
+  - Results are recorded in telemetry as provider "anthropic_batch" at the
+    discounted cost; cached entries keep that cost for "saved" totals.
+
+For offline runs there is a fake batch endpoint that replies with a fixed
+text to every request (the SDK reads ANTHROPIC_BASE_URL):
+
+    python llm_batch.py fake-server --port 8765 --reply '[]'
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=fake \\
+        python discover_directories.py --source substack_vittles --llm-batch
+
+    python llm_batch.py list        # recorded batches and their state
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+import llm_cache
+import telemetry
+from config import (
+    LLM_BATCH_DISCOUNT,
+    LLM_BATCH_ENABLED,
+    LLM_BATCH_MAX_MB,
+    LLM_BATCH_MAX_REQUESTS,
+    LLM_BATCH_POLL_SECONDS,
+    LLM_CACHE_PATH,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id      TEXT PRIMARY KEY,
+    label         TEXT NOT NULL,
+    model         TEXT NOT NULL,
+    custom_ids    TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    collected_at  REAL
+);
+"""
+
+_enabled = LLM_BATCH_ENABLED
+
+
+def set_enabled(enabled: bool = True) -> None:
+    """Switch the bulk sweeps to Message Batches for this process."""
+    global _enabled
+    _enabled = enabled
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def parse_json_array(raw: str) -> list | None:
+    """Fence-stripped first '[' .. last ']' of a reply, or None."""
+    raw = re.sub(r"^```(?:json)?\s*", "", raw.strip())
+    raw = re.sub(r"\s*```$", "", raw)
+    start, end = raw.find("["), raw.rfind("]")
+    if start == -1 or end < start:
+        return None
+    try:
+        data = json.loads(raw[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, list) else None
+
+
+class BatchLog:
+    """Which batch each submitted request went to, so reruns can re-attach."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def add(self, batch_id: str, label: str, model: str, custom_ids: list[str]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO batches (batch_id, label, model, custom_ids, created_at) VALUES (?, ?, ?, ?, ?)",
+                (batch_id, label, model, json.dumps(custom_ids), time.time()),
+            )
+            self._db.commit()
+
+    def open_for(self, custom_ids) -> dict[str, str]:
+        """{custom_id: batch_id} for requests sitting in batches not yet collected."""
+        wanted = set(custom_ids)
+        with self._lock:
+            rows = self._db.execute("SELECT batch_id, custom_ids FROM batches WHERE collected_at IS NULL").fetchall()
+        return {cid: batch_id for batch_id, ids in rows for cid in json.loads(ids) if cid in wanted}
+
+    def collected(self, batch_id: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE batches SET collected_at = ? WHERE batch_id = ?", (time.time(), batch_id))
+            self._db.commit()
+
+    def report(self) -> list[tuple]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT batch_id, label, model, custom_ids, created_at, collected_at FROM batches ORDER BY created_at"
+            ).fetchall()
+
+
+_log: BatchLog | None = None
+_log_lock = threading.Lock()
+
+
+def get_batch_log() -> BatchLog:
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = BatchLog()
+        return _log
+
+
+def _custom_id(params: dict) -> str:
+    blob = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return "req_" + hashlib.sha256(blob.encode("utf-8")).hexdigest()[:40]
+
+
+def _chunks(custom_ids: list[str], params: dict[str, dict]) -> list[list[str]]:
+    limit = LLM_BATCH_MAX_MB * 1024 * 1024
+    out, cur, size = [], [], 0
+    for cid in custom_ids:
+        n = len(json.dumps(params[cid], ensure_ascii=False).encode("utf-8"))
+        if cur and (len(cur) >= LLM_BATCH_MAX_REQUESTS or size + n > limit):
+            out.append(cur)
+            cur, size = [], 0
+        cur.append(cid)
+        size += n
+    if cur:
+        out.append(cur)
+    return out
+
+
+def _wait(client, batch_id: str, label: str):
+    while True:
+        try:
+            batch = client.messages.batches.retrieve(batch_id)
+        except Exception as e:
+            print(f"  [{label}] poll error for {batch_id}: {e}", flush=True)
+            time.sleep(LLM_BATCH_POLL_SECONDS)
+            continue
+        if batch.processing_status == "ended":
+            return batch
+        c = batch.request_counts
+        print(f"  [{label}] {batch_id}: {c.processing} processing, {c.succeeded} done, "
+              f"{c.errored} errored", flush=True)
+        time.sleep(LLM_BATCH_POLL_SECONDS)
+
+
+def run_batch(
+    model: str,
+    system: str | list,
+    items: dict[str, str | list],
+    *,
+    max_tokens: int = 4096,
+    parse: Callable[[str], object] = parse_json_array,
+    label: str = "llm-batch",
+    check_cache: bool = True,
+) -> dict[str, object]:
+    """{item id: parsed reply, or None on error / unparseable / no API key}.
+
+    Text-only requests (str system and content) go through llm_cache both
+    ways; anything else (images, cache_control blocks) is always sent.
+    """
+    out: dict[str, object] = {}
+    ids_for: dict[str, list[str]] = {}   # custom_id -> item ids
+    params: dict[str, dict] = {}
+    cacheable: dict[str, str] = {}       # custom_id -> user text, when cacheable
+    cache = llm_cache.get_llm_cache()
+    for item_id, content in items.items():
+        text_only = isinstance(system, str) and isinstance(content, str)
+        if text_only and check_cache:
+            hit = llm_cache.lookup(model, system, content)
+            if hit is not None:
+                out[item_id] = hit
+                continue
+        p = {"model": model, "max_tokens": max_tokens, "system": system,
+             "messages": [{"role": "user", "content": content}]}
+        cid = _custom_id(p)
+        ids_for.setdefault(cid, []).append(item_id)
+        params[cid] = p
+        if text_only and cache is not None:
+            cacheable[cid] = content
+    if not ids_for:
+        return out
+
+    try:
+        from anthropic import Anthropic  # noqa: F401
+    except ImportError:
+        print(f"  [{label}] anthropic SDK not installed; skipping", flush=True)
+        return {**out, **{i: None for ids in ids_for.values() for i in ids}}
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        print(f"  [{label}] ANTHROPIC_API_KEY not set; skipping", flush=True)
+        return {**out, **{i: None for ids in ids_for.values() for i in ids}}
+    client = llm_cache.get_anthropic_client(api_key)
+    log = get_batch_log()
+
+    in_flight = log.open_for(ids_for)
+    batch_ids = list(dict.fromkeys(in_flight.values()))
+    if in_flight:
+        print(f"  [{label}] re-attaching to {len(batch_ids)} open batch(es) for {len(in_flight)} requests", flush=True)
+    new = [cid for cid in ids_for if cid not in in_flight]
+    for chunk in _chunks(new, params):
+        try:
+            batch = client.messages.batches.create(
+                requests=[{"custom_id": cid, "params": params[cid]} for cid in chunk]
+            )
+        except Exception as e:
+            print(f"  [{label}] batch submit error: {e}", flush=True)
+            continue
+        log.add(batch.id, label, model, chunk)
+        batch_ids.append(batch.id)
+        print(f"  [{label}] submitted {batch.id} ({len(chunk)} requests)", flush=True)
+
+    started = time.monotonic()
+    for batch_id in batch_ids:
+        _wait(client, batch_id, label)
+        elapsed = time.monotonic() - started
+        for entry in client.messages.batches.results(batch_id):
+            item_ids = ids_for.get(entry.custom_id)
+            if not item_ids:
+                continue
+            value = None
+            result = entry.result
+            if result.type == "succeeded":
+                msg = result.message
+                cost = telemetry.anthropic_cost(model, msg.usage) * LLM_BATCH_DISCOUNT
+                telemetry.record("anthropic_batch", latency=elapsed, cost=cost)
+                raw = "".join(b.text for b in msg.content if getattr(b, "type", "") == "text")
+                value = parse(raw)
+                if value is None:
+                    print(f"  [{label}] unparseable reply for {item_ids[0]} (len={len(raw)})", flush=True)
+                elif entry.custom_id in cacheable:
+                    llm_cache.store(model, system, cacheable[entry.custom_id], value, msg.usage, cost=cost)
+            else:
+                telemetry.record("anthropic_batch", latency=elapsed, status=result.type)
+            for item_id in item_ids:
+                out[item_id] = value
+        log.collected(batch_id)
+
+    for ids in ids_for.values():
+        for item_id in ids:
+            out.setdefault(item_id, None)
+    return out
+
+
+def prefill(model: str, system: str, users, *, max_tokens: int = 4096,
+            parse: Callable[[str], object] = parse_json_array, label: str = "llm-batch") -> None:
+    """Batch every user text the cache doesn't have yet and store the replies,
+    so the caller's normal per-document path is answered from llm_cache."""
+    cache = llm_cache.get_llm_cache()
+    if cache is None:
+        print(f"  [{label}] LLM_CACHE=0: batch mode needs the cache; using one call per document", flush=True)
+        return
+    todo = {}
+    for user in users:
+        if user and not cache.contains(model, system, user):
+            todo.setdefault(llm_cache.cache_key(model, system, user)[0], user)
+    if not todo:
+        return
+    print(f"  [{label}] batching {len(todo)} documents ({model})", flush=True)
+    replies = run_batch(model, system, todo, max_tokens=max_tokens, parse=parse, label=label, check_cache=False)
+    got = sum(v is not None for v in replies.values())
+    print(f"  [{label}] {got}/{len(todo)} extracted", flush=True)
+
+
+# ─── Fake batch endpoint ─────────────────────────────────────────────
+
+def _fake_handler(reply: str, delay: float):
+    batches: dict[str, dict] = {}
+    lock = threading.Lock()
+
+    def iso(ts: float) -> str:
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _json(self, body: dict, status: int = 200) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _batch(self, batch_id: str) -> dict:
+            b = batches[batch_id]
+            done = time.time() >= b["created"] + delay
+            n = len(b["requests"])
+            host = self.headers.get("Host", "127.0.0.1")
+            return {
+                "id": batch_id, "type": "message_batch",
+                "processing_status": "ended" if done else "in_progress",
+                "request_counts": {"processing": 0 if done else n, "succeeded": n if done else 0,
+                                   "errored": 0, "canceled": 0, "expired": 0},
+                "created_at": iso(b["created"]), "expires_at": iso(b["created"] + 86400),
+                "ended_at": iso(b["created"] + delay) if done else None,
+                "archived_at": None, "cancel_initiated_at": None,
+                "results_url": f"http://{host}/v1/messages/batches/{batch_id}/results" if done else None,
+            }
+
+        def do_POST(self):
+            if self.path.split("?")[0].rstrip("/") != "/v1/messages/batches":
+                return self._json({"type": "error", "error": {"type": "not_found_error", "message": self.path}}, 404)
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            batch_id = "msgbatch_fake_" + uuid.uuid4().hex[:16]
+            with lock:
+                batches[batch_id] = {"created": time.time(), "requests": body.get("requests", [])}
+                self._json(self._batch(batch_id))
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if len(parts) < 4 or parts[:3] != ["v1", "messages", "batches"] or parts[3] not in batches:
+                return self._json({"type": "error", "error": {"type": "not_found_error", "message": self.path}}, 404)
+            batch_id = parts[3]
+            with lock:
+                if len(parts) == 4:
+                    return self._json(self._batch(batch_id))
+                lines = []
+                for req in batches[batch_id]["requests"]:
+                    p = req["params"]
+                    lines.append(json.dumps({"custom_id": req["custom_id"], "result": {"type": "succeeded", "message": {
+                        "id": "msg_fake_" + uuid.uuid4().hex[:16], "type": "message", "role": "assistant",
+                        "model": p.get("model", ""), "content": [{"type": "text", "text": reply}],
+                        "stop_reason": "end_turn", "stop_sequence": None,
+                        "usage": {"input_tokens": len(json.dumps(p)) // 4, "output_tokens": max(1, len(reply) // 4)},
+                    }}}))
+            data = ("\n".join(lines) + "\n").encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def serve_fake(port: int = 8765, reply: str = "[]", delay: float = 2.0) -> ThreadingHTTPServer:
+    """Start the fake endpoint on a daemon thread; returns the server (call .shutdown())."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _fake_handler(reply, delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Message Batches helpers.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="recorded batches")
+    fake = sub.add_parser("fake-server", help="local stand-in for the batch endpoints")
+    fake.add_argument("--port", type=int, default=8765)
+    fake.add_argument("--reply", default="[]", help="text every request is answered with")
+    fake.add_argument("--delay", type=float, default=2.0, help="seconds before a batch reports ended")
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        rows = get_batch_log().report()
+        if not rows:
+            print("No batches recorded")
+        for batch_id, label, model, ids, created, collected in rows:
+            state = "collected" if collected else "open"
+            print(f"{batch_id:40} {label:24} {model:28} {len(json.loads(ids)):6,} "
+                  f"{datetime.fromtimestamp(created):%Y-%m-%d %H:%M}  {state}")
+        return
+
+    server = serve_fake(args.port, args.reply, args.delay)
+    print(f"Fake batch endpoint on http://127.0.0.1:{args.port} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
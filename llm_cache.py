@@ -0,0 +1,234 @@
+"""
+Content-hash memoization for the Claude extraction calls.
+
+awards/llm_extract.py, directories/_stockists.py, directories/_editorial_mining.py,
+directories/restaurants/_substack.py and best_wine_shops/extractor.py send an
+article (or page / snippet) to Claude and parse a JSON array out of the
+reply. Re-running `discover_awards.py --all` or a stockist sweep used to pay
+for every article again even when nothing on the page had changed. Now each
+caller asks this cache first:
+
+  - The key is sha256(model, sha256(system prompt), sha256(normalized user
+    text)). Normalizing (NFC, whitespace runs collapsed, blank lines dropped)
+    means re-fetched pages that differ only in layout whitespace still hit.
+  - The value is the parsed JSON array exactly as the model returned it,
+    before the caller's own field shaping, so shaping changes apply to
+    cached rows too. Only successful parses are stored; API errors and
+    unparseable replies are retried next run.
+  - Each entry keeps the tokens and estimated USD of the call that produced
+    it; hits add those to the run's "saved" totals and to the entry's
+    lifetime hit count.
+
+Entries don't expire (same input, same prompt, same model → same answer);
+editing a system prompt changes the key. LLM_CACHE=0 bypasses it and
+LLM_CACHE_REFRESH=1 re-asks the model but still writes back.
+
+    python llm_cache.py info
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import telemetry
+from config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_REFRESH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key            TEXT PRIMARY KEY,
+    model          TEXT NOT NULL,
+    system_sha     TEXT NOT NULL,
+    input_sha      TEXT NOT NULL,
+    rows           TEXT NOT NULL,
+    input_tokens   INTEGER NOT NULL DEFAULT 0,
+    output_tokens  INTEGER NOT NULL DEFAULT 0,
+    cost_usd       REAL NOT NULL DEFAULT 0,
+    hits           INTEGER NOT NULL DEFAULT 0,
+    created_at     REAL NOT NULL,
+    hit_at         REAL
+);
+"""
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """NFC, whitespace runs collapsed per line, blank lines dropped."""
+    text = unicodedata.normalize("NFC", text or "")
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(model: str, system: str, user: str) -> tuple[str, str, str]:
+    """(key, system_sha, input_sha)."""
+    system_sha = _sha(system or "")
+    input_sha = _sha(normalize_text(user))
+    return _sha(f"{model}\n{system_sha}\n{input_sha}"), system_sha, input_sha
+
+
+class LLMCacheStats:
+    """Per-process counters for the end-of-run summary line."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lookups = self.hits = 0
+        self.input_saved = self.output_saved = 0
+        self.cost_saved = 0.0
+
+    def hit(self, input_tokens: int, output_tokens: int, cost: float) -> None:
+        with self._lock:
+            self.lookups += 1
+            self.hits += 1
+            self.input_saved += input_tokens
+            self.output_saved += output_tokens
+            self.cost_saved += cost
+
+    def miss(self) -> None:
+        with self._lock:
+            self.lookups += 1
+
+    def summary(self) -> str:
+        rate = self.hits / self.lookups * 100 if self.lookups else 0.0
+        return (
+            f"llm cache: {self.lookups} extractions, {self.hits} cached ({rate:.0f}%), "
+            f"saved {self.input_saved:,} in / {self.output_saved:,} out tokens (~${self.cost_saved:.2f})"
+        )
+
+
+class LLMCache:
+    def __init__(self, path: str = LLM_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def lookup(self, model: str, system: str, user: str) -> tuple[list, int, int, float] | None:
+        """(rows, input_tokens, output_tokens, cost_usd) of the original call, or None."""
+        key, _, _ = cache_key(model, system, user)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rows, input_tokens, output_tokens, cost_usd FROM extractions WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE extractions SET hits = hits + 1, hit_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return json.loads(row[0]), row[1], row[2], row[3]
+
+    def contains(self, model: str, system: str, user: str) -> bool:
+        """Whether an entry exists, without counting it as a hit."""
+        key, _, _ = cache_key(model, system, user)
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM extractions WHERE key = ?", (key,)).fetchone() is not None
+
+    def store(self, model: str, system: str, user: str, rows: list, *,
+              input_tokens: int = 0, output_tokens: int = 0, cost: float = 0.0) -> None:
+        key, system_sha, input_sha = cache_key(model, system, user)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions"
+                " (key, model, system_sha, input_sha, rows, input_tokens, output_tokens, cost_usd, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, system_sha, input_sha, json.dumps(rows, ensure_ascii=False),
+                 input_tokens, output_tokens, cost, time.time()),
+            )
+            self._db.commit()
+
+    def report(self) -> list[tuple]:
+        """(model, entries, lifetime hits, input tokens saved, output tokens saved, USD saved) per model."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT model, COUNT(*), SUM(hits), SUM(hits * input_tokens), SUM(hits * output_tokens),"
+                " SUM(hits * cost_usd) FROM extractions GROUP BY model ORDER BY model"
+            ).fetchall()
+
+
+stats = LLMCacheStats()
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+_clients: dict[str, object] = {}
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Process-wide cache, or None when LLM_CACHE=0."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def get_anthropic_client(api_key: str):
+    """One Anthropic client (and connection pool) per key for the whole process."""
+    from anthropic import Anthropic
+
+    with _cache_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = Anthropic(api_key=api_key)
+        return client
+
+
+def lookup(model: str, system: str, user: str) -> list | None:
+    """Cached parsed rows for this exact request, or None (miss / disabled / refresh)."""
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+    hit = None if LLM_CACHE_REFRESH else cache.lookup(model, system, user)
+    if hit is None:
+        stats.miss()
+        return None
+    rows, input_tokens, output_tokens, cost = hit
+    stats.hit(input_tokens, output_tokens, cost)
+    telemetry.record("anthropic", status="cache", cached=True, error=False)
+    return rows
+
+
+def store(model: str, system: str, user: str, rows: list, usage=None, cost: float | None = None) -> None:
+    """Remember a successfully parsed reply; `usage` is the Messages API usage block.
+    `cost` overrides the list-price estimate (batch results are billed at half)."""
+    cache = get_llm_cache()
+    if cache is None:
+        return
+    input_tokens = sum(getattr(usage, f, 0) or 0 for f in
+                       ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"))
+    cache.store(model, system, user, rows,
+                input_tokens=input_tokens,
+                output_tokens=getattr(usage, "output_tokens", 0) or 0,
+                cost=telemetry.anthropic_cost(model, usage) if cost is None else cost)
+
+
+def print_llm_cache_summary() -> None:
+    """End-of-run hit rate / tokens saved; silent when nothing was extracted."""
+    if stats.lookups:
+        print(stats.summary())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect the LLM extraction cache.")
+    parser.add_argument("cmd", choices=["info"])
+    parser.parse_args()
+
+    rows = LLMCache().report()
+    if not rows:
+        print("LLM cache: empty")
+        return
+    print(f"{'model':32} {'entries':>8} {'hits':>8} {'in saved':>12} {'out saved':>10} {'USD saved':>10}")
+    for model, entries, hits, tin, tout, usd in rows:
+        print(f"{model:32} {entries:8,} {hits or 0:8,} {tin or 0:12,} {tout or 0:10,} {usd or 0:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
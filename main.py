@@ -5,23 +5,38 @@ Find, enrich, and score leads for Table22 subscription program outreach.
 Usage:
     python main.py              # Run full pipeline
     python main.py --discover   # Only run discovery phase
+    python main.py --discover --budget 2000   # Refresh the 2,000 most valuable stale cells
     python main.py --enrich     # Enrich from existing discovery CSV
-    python main.py --score      # Score from existing enriched CSV
+    python main.py --stream     # Enrich + score batches while discovery runs
+    python main.py --enrich store --resume    # Run only the steps not finished yet
+    python main.py --score      # Score from existing enriched CSV (or "store")
+    python main.py --export output/leads.csv  # Dump the lead store (.csv / .parquet)
 """
 import os
 import sys
+import queue
+import threading
 import argparse
 from datetime import datetime
 
 import pandas as pd
 
-from discover import discover_leads
+import enrich
+from config import STREAM_BATCH_SIZE, STREAM_QUEUE_BATCHES
+from discover import discover_leads, stream_leads
+from entity_resolution import dedupe as dedupe_entities
+from lead_io import LEAD_SCHEMA, read_table, with_suffix, write_table
+from lead_store import LeadStore, assign_lead_ids
+from pipeline_dag import Step, run_steps
 from enrich import (
     enrich_websites, enrich_instagram, enrich_facebook, enrich_press_and_awards,
     enrich_google_reviews, enrich_instagram_reels, enrich_instagram_posts,
     enrich_booking_availability,
 )
-from score import score_leads
+from score import assign_tiers, compute_lead_scores, score_leads
+import telemetry
+from apify_runs import print_apify_summary
+from serper import print_serper_summary, set_offline
 
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
@@ -31,58 +46,194 @@ def ensure_output_dir():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
-def run_discovery(types: list[str] | None = None, max_searches: int = 0, max_cities: int = 0) -> pd.DataFrame:
-    """Phase 1: Find leads."""
-    df = discover_leads(types=types, max_searches=max_searches, max_cities=max_cities)
+def run_discovery(
+    types: list[str] | None = None, max_searches: int = 0, max_cities: int = 0,
+    incremental: bool = False, budget: int = 0, adaptive: bool = False,
+) -> pd.DataFrame:
+    """Phase 1: Find leads.
+
+    With incremental / budget only stale cells are searched, so the result
+    is merged into the previous 1_discovered file rather than replacing it.
+    The returned frame is still just this run's leads.
+    """
+    incremental = incremental or budget > 0
+    stats: dict = {}
+    with telemetry.stage("discovery"):
+        df = discover_leads(
+            types=types, max_searches=max_searches, max_cities=max_cities,
+            incremental=incremental, budget=budget, adaptive=adaptive, stats=stats,
+        )
 
     if df.empty:
+        if incremental and stats.get("searches") == 0 and stats.get("fresh", 0) > 0:
+            print("\nAll cells fresh; nothing to discover. Existing discovery output left as is.")
+            return df
         print("\nNo leads found. Check API key and try again.")
         sys.exit(1)
 
     ensure_output_dir()
-    path = os.path.join(OUTPUT_DIR, "1_discovered.csv")
-    df.to_csv(path, index=False)
+    path = with_suffix(os.path.join(OUTPUT_DIR, "1_discovered.csv"))
+    out = df
+    if incremental and path.exists():
+        prior = read_table(path)
+        out = dedupe_entities(pd.concat([df, prior], ignore_index=True)).reset_index(drop=True)
+        print(f"\nMerged {len(df):,} leads from stale cells into {len(prior):,} prior leads "
+              f"({len(out):,} unique)")
+    write_table(out, path, LEAD_SCHEMA)
     print(f"\nSaved discovery results to {path}")
 
     return df
 
 
+# Listed in the old sequential order; `needs` lets pipeline_dag run the rest
+# in parallel (press + reviews + websites first, IG steps once usernames exist).
 ENRICHMENT_STEPS = [
-    ("websites",    enrich_websites,            "2_enriched_websites.csv"),
-    ("instagram",   enrich_instagram,           "2_enriched_instagram.csv"),
-    ("facebook",    enrich_facebook,            "2_enriched_social.csv"),
-    ("press",       enrich_press_and_awards,    "2_enriched_full.csv"),
-    ("reviews",     enrich_google_reviews,      "2_enriched_reviews.csv"),
-    ("reels",       enrich_instagram_reels,     "2_enriched_reels.csv"),
-    ("posts",       enrich_instagram_posts,     "2_enriched_posts.csv"),
-    ("availability", enrich_booking_availability, "2_enriched_availability.csv"),
+    Step("websites",     enrich_websites,             uses={"http": 300}),
+    Step("instagram",    enrich_instagram,            needs=("websites",), uses={"apify": 8}),
+    Step("facebook",     enrich_facebook,             needs=("websites", "instagram"), uses={"http": 30}),
+    Step("press",        enrich_press_and_awards,     uses={"serper": 40}),
+    Step("reviews",      enrich_google_reviews,       uses={"serper": 40}),
+    Step("reels",        enrich_instagram_reels,      needs=("instagram",), uses={"apify": 8}),
+    Step("posts",        enrich_instagram_posts,      needs=("instagram",), uses={"apify": 8}),
+    Step("availability", enrich_booking_availability, needs=("websites",), uses={"apify": 4, "http": 30}),
 ]
 
 
-def run_enrichment(df: pd.DataFrame, start_from: str | None = None) -> pd.DataFrame:
-    """Phase 2: Enrich with website + social data. Optionally skip to a step."""
+def load_leads(source: str) -> pd.DataFrame:
+    """Read leads from a CSV / Parquet path, or from the lead store ("store")."""
+    if source == "store":
+        with LeadStore() as store:
+            df = store.load()
+        if df.empty:
+            print("Lead store is empty. Run the pipeline or --enrich a CSV first.")
+            sys.exit(1)
+        return df
+    if source.endswith(".parquet"):
+        # Enrichment steps assign new values freely; don't hold them to categories.
+        df = read_table(source)
+        return df.astype({c: object for c in df.select_dtypes("category").columns})
+    return pd.read_csv(source)
+
+
+def run_enrichment(
+    df: pd.DataFrame, start_from: str | None = None, done: set[str] | None = None,
+    resume: bool = False,
+) -> pd.DataFrame:
+    """Phase 2: Enrich with website + social data.
+
+    Steps run concurrently as their dependencies allow (pipeline_dag.py).
+    `start_from` skips the steps listed before it; `done` skips the named
+    steps (--resume passes the ones the store has finished). Step journals
+    are only reused when `resume` is set; otherwise the steps that run start
+    from an empty journal and re-fetch every lead. After each step only the
+    cells it changed are upserted into the lead store (see lead_store.py);
+    use --export for a CSV / Parquet copy.
+    """
     ensure_output_dir()
-    step_names = [s[0] for s in ENRICHMENT_STEPS]
+    step_names = [s.name for s in ENRICHMENT_STEPS]
 
     if start_from:
         if start_from not in step_names:
             print(f"Unknown step '{start_from}'. Valid: {', '.join(step_names)}")
             sys.exit(1)
-        start_idx = step_names.index(start_from)
-    else:
-        start_idx = 0
-
-    for name, func, filename in ENRICHMENT_STEPS[start_idx:]:
-        df = func(df)
-        path = os.path.join(OUTPUT_DIR, filename)
-        tmp = path + ".tmp"
-        df.to_csv(tmp, index=False)
-        os.replace(tmp, path)
-        print(f"\nSaved {name} enrichment to {path}")
+        done = set(done or ()) | set(step_names[:step_names.index(start_from)])
+
+    if not resume:
+        enrich.reset_journals(n for n in step_names if n not in (done or ()))
+
+    df = assign_lead_ids(df)
+    with LeadStore() as store:
+        if not done:
+            store.reset_steps()
+        store.upsert_changes({}, df)  # seed new leads; existing rows only get changed cells
+
+        def save(step, before, result):
+            rows, cells = store.upsert_changes(before, result, step=step.name)
+            print(f"\nSaved {step.name} enrichment to lead store ({rows:,} rows, {cells:,} cells changed)")
+
+        df = run_steps(df, ENRICHMENT_STEPS, done=done, on_done=save)
+        print(store.summary())
 
     return df
 
 
+def run_streaming(
+    types: list[str] | None = None, max_searches: int = 0, max_cities: int = 0,
+    incremental: bool = False, budget: int = 0, adaptive: bool = False,
+) -> int:
+    """Discover and enrich at the same time, in micro-batches.
+
+    A producer thread pulls filtered, deduped places from
+    discover.stream_leads into a bounded queue of STREAM_BATCH_SIZE-lead
+    batches. This thread enriches and scores each batch through the step
+    graph and upserts it into the lead store. When the queue is full the
+    producer blocks, and stream_leads stops submitting searches, so memory
+    stays at a few batches however large the universe is. Returns the
+    number of leads stored; use --export for the full table.
+    """
+    ensure_output_dir()
+    batches: queue.Queue = queue.Queue(maxsize=STREAM_QUEUE_BATCHES)
+    stats: dict = {}
+    failure: list[BaseException] = []
+
+    def produce():
+        batch = []
+        try:
+            with telemetry.stage("discovery"):
+                for place in stream_leads(
+                    types=types, max_searches=max_searches, max_cities=max_cities,
+                    incremental=incremental, budget=budget, adaptive=adaptive, stats=stats,
+                ):
+                    batch.append(place)
+                    if len(batch) >= STREAM_BATCH_SIZE:
+                        batches.put(batch)
+                        batch = []
+            if batch:
+                batches.put(batch)
+        except BaseException as e:  # surfaced on the consumer side
+            failure.append(e)
+        finally:
+            batches.put(None)
+
+    print(f"\n{'='*60}")
+    print(f"STREAMING DISCOVERY -> ENRICHMENT (batches of {STREAM_BATCH_SIZE})")
+    print(f"{'='*60}")
+    enrich.SAVE_STEP_CSVS = False  # per-batch frames would overwrite the full-table CSVs
+    enrich.reset_journals(s.name for s in ENRICHMENT_STEPS)  # batches share this run's journals
+    producer = threading.Thread(target=produce, name="discover-stream", daemon=True)
+    producer.start()
+
+    total = 0
+    with LeadStore() as store:
+        while (batch := batches.get()) is not None:
+            df = assign_lead_ids(pd.DataFrame(batch))
+            store.upsert_changes({}, df)
+
+            def save(step, before, result):
+                store.upsert_changes(before, result)
+
+            df = run_steps(df, ENRICHMENT_STEPS, on_done=save)
+            df["lead_score"] = compute_lead_scores(df)
+            df["tier"] = assign_tiers(df, df["lead_score"].to_numpy())
+            store.upsert_changes({}, df[["lead_id", "lead_score", "tier"]])
+            total += len(df)
+            print(
+                f"\n[stream] stored batch of {len(df)} ({total:,} leads so far) | "
+                f"searches {stats.get('done', 0):,}/{stats.get('searches', 0):,}, "
+                f"raw {stats.get('raw', 0):,}, kept {stats.get('kept', 0):,}",
+                flush=True,
+            )
+        print(store.summary())
+
+    producer.join()
+    if failure:
+        raise failure[0]
+    dropped = stats.get("dropped", {})
+    if dropped:
+        print("  Dropped: " + ", ".join(f"{k} {v:,}" for k, v in sorted(dropped.items())))
+    return total
+
+
 def build_output_filename(df: pd.DataFrame, suffix: str, owner: str = "kavir") -> str:
     """Build filename: custom-serper-scoring_{owner}_{date}_{verticals}_{count}_{suffix}.csv"""
     date_str = datetime.now().strftime("%Y%m%d")
@@ -102,6 +253,10 @@ def run_scoring(df: pd.DataFrame) -> pd.DataFrame:
     path_full = os.path.join(OUTPUT_DIR, fname_all)
     df.to_csv(path_full, index=False)
     print(f"\nSaved all scored leads to {path_full}")
+    if "lead_id" in df.columns:
+        with LeadStore() as store:
+            rows, _ = store.upsert_changes({}, df[["lead_id", "lead_score", "tier"]])
+        print(f"Updated scores for {rows:,} leads in the lead store")
 
     # Top leads only (A + B tier)
     df_top = df[df["tier"].isin(["A - Hot Lead", "B - Warm Lead"])]
@@ -136,17 +291,7 @@ def merge_discovery(existing_path: str, new_df: pd.DataFrame) -> pd.DataFrame:
     print(f"\nMerging {len(new_df)} new leads with {len(existing)} existing leads...")
 
     combined = pd.concat([existing, new_df], ignore_index=True)
-
-    # Dedup by phone
-    combined["phone_clean"] = combined["phone"].astype(str).str.replace(r"[^\d]", "", regex=True)
-    df_deduped = combined.drop_duplicates(subset=["phone_clean"], keep="first")
-    mask_no_phone = df_deduped["phone_clean"] == ""
-    df_with_phone = df_deduped[~mask_no_phone]
-    df_no_phone = df_deduped[mask_no_phone].drop_duplicates(
-        subset=["name", "address"], keep="first"
-    )
-    merged = pd.concat([df_with_phone, df_no_phone], ignore_index=True)
-    merged = merged.drop(columns=["phone_clean"])
+    merged = dedupe_entities(combined).reset_index(drop=True)
 
     dupes_removed = len(combined) - len(merged)
     print(f"  Combined: {len(merged)} unique leads ({dupes_removed} duplicates removed)")
@@ -159,18 +304,39 @@ def merge_discovery(existing_path: str, new_df: pd.DataFrame) -> pd.DataFrame:
 
 
 def main():
+    telemetry.start_live()
+    try:
+        _main()
+    finally:
+        telemetry.stop_live()
+        print_serper_summary()
+        print_apify_summary()
+        telemetry.print_telemetry_report()
+
+
+def _main():
     parser = argparse.ArgumentParser(description="Lead Scorer")
     parser.add_argument("--discover", action="store_true", help="Only run discovery")
     parser.add_argument("--types", type=str, help="Comma-separated business types to discover (e.g. butcher,wine_store)")
     parser.add_argument("--max-searches", type=int, default=0, help="Max Serper API calls (0 = unlimited)")
     parser.add_argument("--max-cities", type=int, default=0, help="Limit to first N cities (0 = all)")
+    parser.add_argument("--incremental", action="store_true", help="Skip recently searched (query, city) cells; run the rest by past new-lead yield")
+    parser.add_argument("--budget", type=int, default=0, help="Search only the N most valuable stale cells (implies --incremental)")
+    parser.add_argument("--adaptive", action="store_true", help="Page/tile Serper Maps deeper only where results still bring new places")
+    parser.add_argument("--stream", action="store_true", help="Enrich leads in batches while discovery is still running (results go to the lead store)")
     parser.add_argument("--merge", type=str, help="Merge new discovery with existing CSV (path to existing)")
     parser.add_argument("--enrich", type=str, help="Enrich from existing CSV path")
     parser.add_argument("--enrich-remaining", type=str, help="Run only remaining enrichment phases (reels, posts, availability) + scoring")
     parser.add_argument("--enrich-from", type=str, help="Start enrichment from step (websites,instagram,facebook,press,reviews,reels,posts,availability)")
+    parser.add_argument("--resume", action="store_true", help="With --enrich store: skip the steps the store has already finished")
     parser.add_argument("--score", type=str, help="Score from existing CSV path")
+    parser.add_argument("--export", type=str, help="Write the lead store to a .csv or .parquet path and exit")
+    parser.add_argument("--offline", action="store_true", help="Serve Serper only from the response cache (no API calls)")
     args = parser.parse_args()
 
+    if args.offline:
+        set_offline()
+
     types_filter = [t.strip() for t in args.types.split(",")] if args.types else None
 
     print(f"\n{'#'*60}")
@@ -181,28 +347,56 @@ def main():
         print(f"  Types filter: {', '.join(types_filter)}")
     print(f"{'#'*60}")
 
+    if args.export:
+        with LeadStore() as store:
+            n = store.export(args.export)
+        print(f"\nExported {n:,} leads to {args.export}")
+        return
+
     if args.score:
         # Just score existing enriched data
-        df = pd.read_csv(args.score)
+        df = load_leads(args.score)
         run_scoring(df)
         return
 
     if args.enrich_remaining:
         # Run only the remaining enrichment phases (reels, posts, availability) + scoring
-        df = pd.read_csv(args.enrich_remaining)
+        df = load_leads(args.enrich_remaining)
         df = run_enrichment(df, start_from="reels")
         run_scoring(df)
         return
 
     if args.enrich:
         # Enrich existing discovery data
-        df = pd.read_csv(args.enrich)
-        df = run_enrichment(df, start_from=args.enrich_from)
+        df = load_leads(args.enrich)
+        done = None
+        if args.resume and not args.enrich_from:
+            with LeadStore() as store:
+                done = set(store.finished_steps())
+            remaining = [s.name for s in ENRICHMENT_STEPS if s.name not in done]
+            if not remaining:
+                print("\nAll enrichment steps already finished; scoring.")
+                run_scoring(df)
+                return
+            print(f"\nResuming enrichment: {', '.join(remaining)}")
+        df = run_enrichment(df, start_from=args.enrich_from, done=done, resume=done is not None)
         run_scoring(df)
         return
 
+    if args.stream:
+        n = run_streaming(
+            types=types_filter, max_searches=args.max_searches, max_cities=args.max_cities,
+            incremental=args.incremental, budget=args.budget, adaptive=args.adaptive,
+        )
+        print(f"\nStreamed {n:,} enriched + scored leads into the lead store. "
+              f"Export with: python main.py --export output/leads.csv")
+        return
+
     if args.discover:
-        df = run_discovery(types=types_filter, max_searches=args.max_searches, max_cities=args.max_cities)
+        df = run_discovery(
+            types=types_filter, max_searches=args.max_searches, max_cities=args.max_cities,
+            incremental=args.incremental, budget=args.budget, adaptive=args.adaptive,
+        )
         if args.merge and not df.empty:
             df = merge_discovery(args.merge, df)
             path = os.path.join(OUTPUT_DIR, "1_discovered_merged.csv")
@@ -211,7 +405,12 @@ def main():
         return
 
     # Full pipeline
-    df = run_discovery(types=types_filter, max_searches=args.max_searches, max_cities=args.max_cities)
+    df = run_discovery(
+        types=types_filter, max_searches=args.max_searches, max_cities=args.max_cities,
+        incremental=args.incremental, budget=args.budget, adaptive=args.adaptive,
+    )
+    if df.empty:  # incremental run with every cell fresh
+        return
     if args.merge and not df.empty:
         df = merge_discovery(args.merge, df)
     df = run_enrichment(df)
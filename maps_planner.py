@@ -0,0 +1,158 @@
+"""
+Adaptive paging and tiling for Serper Maps discovery.
+
+A plain (query, city) search returns one page of ~20 places. That undercounts
+dense metros and wastes calls in small towns, where every query returns the
+same dozen places. `AdaptiveMapsPlanner.search_cell` spends calls only where
+they still find places nobody has seen this run:
+
+  1. Fetch page 1 for the city.
+  2. While the last page was full and at most MAPS_OVERLAP_STOP of its cids
+     were already seen, fetch the next page (up to MAPS_MAX_PAGES).
+  3. If the last page was still productive, split the area around the
+     results' centre into a 2x2 grid of map viewports (`ll`, one zoom level
+     closer per split) and run steps 1-3 on each, up to MAPS_TILE_DEPTH.
+
+The seen-cid set is shared by every worker (and can be seeded from the
+discovery ledger), so overlap between queries in the same city counts as well.
+Per-city calls and new cids feed the cost-per-new-lead table printed at the
+end of the run.
+"""
+from __future__ import annotations
+
+import statistics
+import threading
+from typing import Callable, Iterable
+
+from config import (
+    MAPS_MAX_PAGES, MAPS_OVERLAP_STOP, MAPS_PAGE_SIZE, MAPS_TILE_DEPTH, MAPS_TILE_SPAN_DEG,
+    MAPS_TILE_ZOOM, SERPER_USD_PER_1K,
+)
+
+SearchFn = Callable[..., list[dict]]
+
+
+class AdaptiveMapsPlanner:
+    def __init__(
+        self,
+        search: SearchFn,
+        seen: Iterable[str] = (),
+        max_pages: int = MAPS_MAX_PAGES,
+        overlap_stop: float = MAPS_OVERLAP_STOP,
+        tile_depth: int = MAPS_TILE_DEPTH,
+    ):
+        self.search = search
+        self.max_pages = max_pages
+        self.overlap_stop = overlap_stop
+        self.tile_depth = tile_depth
+        self._seen = set(seen)
+        self._lock = threading.Lock()
+        self.city_stats: dict[str, dict[str, int]] = {}
+
+    # ─── Bookkeeping ──────────────────────────────────────────────────
+
+    def _claim(self, city: str, places: list[dict]) -> int:
+        """Mark the page's cids seen; return how many were new."""
+        new = 0
+        with self._lock:
+            for p in places:
+                cid = str(p.get("cid") or "")
+                if cid and cid not in self._seen:
+                    self._seen.add(cid)
+                    new += 1
+            stats = self.city_stats.setdefault(city, {"calls": 0, "results": 0, "new": 0})
+            stats["calls"] += 1
+            stats["results"] += len(places)
+            stats["new"] += new
+        return new
+
+    def _productive(self, places: list[dict], new: int) -> bool:
+        if len(places) < MAPS_PAGE_SIZE:  # short page: nothing deeper to find
+            return False
+        return 1 - new / len(places) <= self.overlap_stop
+
+    # ─── Search ───────────────────────────────────────────────────────
+
+    def _pages(self, query: str, city: str, ll: str | None, first: list[dict] | None = None) -> tuple[list[dict], bool]:
+        """Page through one area. Returns (places, still_productive_at_the_end)."""
+        results: list[dict] = []
+        for page in range(1, self.max_pages + 1):
+            if page == 1 and first is not None:
+                places = first
+            else:
+                try:
+                    places = self.search(query, city, raise_errors=True, page=page, ll=ll)
+                except Exception:
+                    if page == 1:
+                        raise
+                    return results, False  # keep what we have; deeper pages are optional
+            new = self._claim(city, places)
+            results.extend(places)
+            if not self._productive(places, new):
+                return results, False
+        return results, True
+
+    def _tiles(self, query: str, city: str, places: list[dict], depth: int) -> list[dict]:
+        coords = [
+            (p["latitude"], p["longitude"]) for p in places
+            if isinstance(p.get("latitude"), (int, float)) and isinstance(p.get("longitude"), (int, float))
+        ]
+        if not coords:
+            return []
+        lat = statistics.median(c[0] for c in coords)
+        lng = statistics.median(c[1] for c in coords)
+        return self._split(query, city, lat, lng, MAPS_TILE_SPAN_DEG, depth)
+
+    def _split(self, query: str, city: str, lat: float, lng: float, span: float, depth: int) -> list[dict]:
+        results: list[dict] = []
+        zoom = MAPS_TILE_ZOOM + depth - 1
+        for dlat in (-span / 4, span / 4):
+            for dlng in (-span / 4, span / 4):
+                tlat, tlng = lat + dlat, lng + dlng
+                try:
+                    places, productive = self._pages(query, city, f"@{tlat:.5f},{tlng:.5f},{zoom}z")
+                except Exception:
+                    continue
+                results.extend(places)
+                if productive and depth < self.tile_depth:
+                    results.extend(self._split(query, city, tlat, tlng, span / 2, depth + 1))
+        return results
+
+    def search_cell(self, query: str, city: str) -> list[dict]:
+        """All places for one (query, city), paging and tiling while it pays off.
+
+        Raises if the first page fails so callers can tell a failed cell from
+        an empty one.
+        """
+        first = self.search(query, city, raise_errors=True)
+        results, productive = self._pages(query, city, None, first=first)
+        if productive and self.tile_depth > 0:
+            results.extend(self._tiles(query, city, results, depth=1))
+        return results
+
+    # ─── Report ───────────────────────────────────────────────────────
+
+    def report(self, top: int = 25) -> str:
+        """Cost per new lead by city, most expensive first."""
+        rows = sorted(
+            self.city_stats.items(),
+            key=lambda kv: kv[1]["calls"] / max(kv[1]["new"], 1),
+            reverse=True,
+        )
+        calls = sum(s["calls"] for s in self.city_stats.values())
+        new = sum(s["new"] for s in self.city_stats.values())
+        usd = SERPER_USD_PER_1K / 1000
+        lines = [
+            f"Adaptive maps: {calls:,} calls, {new:,} new cids "
+            f"({calls / max(new, 1):.2f} calls / ${calls * usd / max(new, 1):.4f} per new lead)",
+            f"  {'city':<28}{'calls':>7}{'results':>9}{'new':>7}{'calls/new':>11}{'$/new':>9}",
+        ]
+        for city, s in rows[:top]:
+            per = s["calls"] / s["new"] if s["new"] else float("inf")
+            lines.append(
+                f"  {city[:27]:<28}{s['calls']:>7}{s['results']:>9}{s['new']:>7}"
+                f"{per:>11.2f}{per * usd:>9.4f}"
+            )
+        if len(rows) > top:
+            lines.append(f"  ... {len(rows) - top} more cities")
+        return "\n".join(lines)
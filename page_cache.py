@@ -0,0 +1,455 @@
+"""
+Disk-backed page cache shared by every website crawler in the repo.
+
+enrich.analyze_website, detect_clubs / detect_clubs_v2, the scripts/ crawlers
+and clean_directories.verify_website all fetch the same merchant homepages.
+Going through `cached_get` / `cached_head` / `async_cached_get` means a second pass
+over the same sites is served from disk:
+
+  - Keys are normalized URLs (scheme/host lowercased, default port, fragment
+    and utm_* params dropped).
+  - Bodies are zlib-compressed and content-addressed (sha256), so identical
+    parked/placeholder pages are stored once.
+  - Entries younger than PAGE_CACHE_TTL_DAYS are served without a request;
+    older ones are revalidated with If-None-Match / If-Modified-Since and a
+    304 refreshes the entry without re-downloading.
+  - Total body size is bounded by PAGE_CACHE_MAX_MB with least-recently-used
+    eviction.
+
+The index is SQLite (WAL), so concurrent threads and processes can share one
+cache directory. Set PAGE_CACHE=0 to bypass it entirely.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import telemetry
+from config import (
+    PAGE_CACHE_DIR, PAGE_CACHE_ENABLED, PAGE_CACHE_ERROR_TTL_DAYS,
+    PAGE_CACHE_MAX_MB, PAGE_CACHE_TTL_DAYS,
+)
+
+_DAY = 86_400
+_EVICT_EVERY = 500  # stores between LRU eviction sweeps
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key            TEXT PRIMARY KEY,
+    url            TEXT NOT NULL,
+    final_url      TEXT NOT NULL,
+    status         INTEGER NOT NULL,
+    content_type   TEXT NOT NULL DEFAULT '',
+    encoding       TEXT,
+    etag           TEXT NOT NULL DEFAULT '',
+    last_modified  TEXT NOT NULL DEFAULT '',
+    body_sha       TEXT,
+    body_size      INTEGER NOT NULL DEFAULT 0,
+    stored_size    INTEGER NOT NULL DEFAULT 0,
+    truncated      INTEGER NOT NULL DEFAULT 0,
+    fetched_at     REAL NOT NULL,
+    accessed_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages(accessed_at);
+CREATE INDEX IF NOT EXISTS pages_body ON pages(body_sha);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used as the cache key."""
+    url = (url or "").strip()
+    if not url.lower().startswith(("http://", "https://")):
+        url = "https://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    netloc = host if port is None or (scheme, port) in {("http", 80), ("https", 443)} else f"{host}:{port}"
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    ])
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+@dataclass
+class CachedPage:
+    url: str
+    final_url: str
+    status: int
+    content_type: str
+    encoding: str | None
+    body: bytes
+    etag: str = ""
+    last_modified: str = ""
+    truncated: bool = False
+    fetched_at: float = 0.0
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.encoding or "utf-8", errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def validators(self) -> dict[str, str]:
+        """Conditional-request headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    def __init__(
+        self,
+        root: str = PAGE_CACHE_DIR,
+        ttl_days: float = PAGE_CACHE_TTL_DAYS,
+        error_ttl_days: float = PAGE_CACHE_ERROR_TTL_DAYS,
+        max_mb: int = PAGE_CACHE_MAX_MB,
+    ):
+        self.root = root
+        self.ttl = ttl_days * _DAY
+        self.error_ttl = error_ttl_days * _DAY
+        self.max_bytes = max_mb * 1024 * 1024
+        self._blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._stores = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    # ─── Blobs ────────────────────────────────────────────────────────
+
+    def _blob_path(self, sha: str) -> str:
+        return os.path.join(self._blob_dir, sha[:2], sha[2:] + ".z")
+
+    def _write_blob(self, body: bytes) -> tuple[str, int]:
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(sha)
+        if os.path.exists(path):
+            return sha, os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(body, 6)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return sha, len(data)
+
+    def _read_blob(self, sha: str | None) -> bytes | None:
+        if not sha:
+            return b""
+        try:
+            with open(self._blob_path(sha), "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+    # ─── Index ────────────────────────────────────────────────────────
+
+    def lookup(self, url: str, max_body: int | None = None) -> tuple[CachedPage | None, bool]:
+        """Return (page, is_fresh). page is None on a miss.
+
+        A body stored truncated at a smaller cap than `max_body` (or with no
+        cap requested) does not satisfy the request and counts as a miss.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, final_url, status, content_type, encoding, etag, last_modified,"
+                " body_sha, body_size, truncated, fetched_at FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None, False
+        (orig_url, final_url, status, ctype, encoding, etag, last_modified,
+         body_sha, body_size, truncated, fetched_at) = row
+        if truncated and (max_body is None or max_body > body_size):
+            return None, False
+        body = self._read_blob(body_sha)
+        if body is None:
+            return None, False
+        if max_body is not None and len(body) > max_body:
+            body = body[:max_body]
+        page = CachedPage(
+            url=orig_url, final_url=final_url, status=status, content_type=ctype,
+            encoding=encoding, body=body, etag=etag, last_modified=last_modified,
+            truncated=bool(truncated), fetched_at=fetched_at, from_cache=True,
+        )
+        ttl = self.ttl if page.ok else self.error_ttl
+        fresh = time.time() - fetched_at < ttl
+        with self._lock:
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return page, fresh
+
+    def store(self, page: CachedPage) -> CachedPage:
+        sha, stored_size = self._write_blob(page.body) if page.body else (None, 0)
+        now = time.time()
+        page.fetched_at = now
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (key, url, final_url, status, content_type, encoding,"
+                " etag, last_modified, body_sha, body_size, stored_size, truncated, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(page.url), page.url, page.final_url, page.status, page.content_type,
+                 page.encoding, page.etag, page.last_modified, sha, len(page.body), stored_size,
+                 int(page.truncated), now, now),
+            )
+            self._db.commit()
+            self._stores += 1
+            sweep = self._stores % _EVICT_EVERY == 0
+        if sweep:
+            self.evict()
+        return page
+
+    def refresh(self, page: CachedPage) -> CachedPage:
+        """Mark a revalidated (304) entry as freshly fetched."""
+        now = time.time()
+        page.fetched_at = now
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, normalize_url(page.url)),
+            )
+            self._db.commit()
+        return page
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until bodies fit in max_bytes."""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            target = total - int(self.max_bytes * 0.9)  # evict to 90% so sweeps aren't constant
+            victims, freed = [], 0
+            for key, sha, size in self._db.execute(
+                "SELECT key, body_sha, stored_size FROM pages ORDER BY accessed_at"
+            ):
+                victims.append((key, sha))
+                freed += size
+                if freed >= target:
+                    break
+            self._db.executemany("DELETE FROM pages WHERE key = ?", [(k,) for k, _ in victims])
+            orphans = {
+                sha for _, sha in victims
+                if sha and self._db.execute(
+                    "SELECT 1 FROM pages WHERE body_sha = ? LIMIT 1", (sha,)
+                ).fetchone() is None
+            }
+            self._db.commit()
+        for sha in orphans:
+            try:
+                os.remove(self._blob_path(sha))
+            except OSError:
+                pass
+        return len(victims)
+
+    def summary(self) -> str:
+        total = self.hits + self.revalidated + self.misses
+        rate = (self.hits + self.revalidated) / total * 100 if total else 0.0
+        return (
+            f"page cache: {self.hits} hits, {self.revalidated} revalidated, "
+            f"{self.misses} fetched ({rate:.0f}% served from cache)"
+        )
+
+
+_cache: PageCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache | None:
+    """Process-wide cache, or None when PAGE_CACHE=0."""
+    global _cache
+    if not PAGE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache()
+        return _cache
+
+
+def print_cache_summary() -> None:
+    """End-of-run hit/miss line; silent when the cache was never used."""
+    if _cache is not None:
+        print(_cache.summary())
+
+
+def _header(headers, name: str) -> str:
+    return (headers.get(name) or "") if headers is not None else ""
+
+
+def _page_from_response(url: str, resp, body: bytes, truncated: bool) -> CachedPage:
+    return CachedPage(
+        url=url,
+        final_url=str(resp.url),
+        status=resp.status_code,
+        content_type=_header(resp.headers, "content-type"),
+        encoding=resp.encoding,
+        body=body,
+        etag=_header(resp.headers, "etag"),
+        last_modified=_header(resp.headers, "last-modified"),
+        truncated=truncated,
+    )
+
+
+def _finish(cache: PageCache | None, cached: CachedPage | None, page: CachedPage) -> CachedPage:
+    if cache is None:
+        return page
+    if page.status == 304 and cached is not None:
+        cache.revalidated += 1
+        return cache.refresh(cached)
+    cache.misses += 1
+    return cache.store(page)
+
+
+# ─── Sync (requests / curl_cffi) ─────────────────────────────────────
+
+def cached_get(
+    url: str,
+    *,
+    headers: dict | None = None,
+    timeout=10,
+    max_body: int | None = None,
+    get=None,
+    cache: PageCache | None = None,
+) -> CachedPage:
+    """GET through the page cache. Network errors propagate to the caller.
+
+    get: a `requests.get`-compatible callable (e.g. curl_cffi with
+    impersonate=...). Defaults to requests.get.
+    """
+    if get is None:
+        import requests
+        get = requests.get
+    cache = cache or get_page_cache()
+    cached = None
+    if cache is not None:
+        cached, fresh = cache.lookup(url, max_body)
+        if cached is not None and fresh:
+            cache.hits += 1
+            telemetry.record("http", status=cached.status, nbytes=len(cached.body), cached=True)
+            return cached
+
+    req_headers = dict(headers or {})
+    if cached is not None:
+        req_headers.update(cached.validators())
+    with telemetry.timed("http") as call:
+        if max_body is None:
+            resp = get(url, headers=req_headers, timeout=timeout, allow_redirects=True)
+            page = _page_from_response(url, resp, resp.content, truncated=False)
+        else:
+            resp = get(url, headers=req_headers, timeout=timeout, allow_redirects=True, stream=True)
+            chunks, total, truncated = [], 0, False
+            try:
+                for chunk in resp.iter_content(chunk_size=65536):
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if total >= max_body:
+                        truncated = True
+                        break
+            finally:
+                resp.close()
+            page = _page_from_response(url, resp, b"".join(chunks)[:max_body], truncated)
+        call.update(status=page.status, nbytes=len(page.body))
+    return _finish(cache, cached, page)
+
+
+def cached_head(
+    url: str,
+    *,
+    headers: dict | None = None,
+    timeout=10,
+    cache: PageCache | None = None,
+) -> CachedPage:
+    """HEAD through the page cache, for reachability checks.
+
+    Any fresh entry for the URL answers it. HEAD results are stored as
+    zero-byte truncated bodies, so they never satisfy a later GET.
+    """
+    import requests
+
+    cache = cache or get_page_cache()
+    if cache is not None:
+        cached, fresh = cache.lookup(url, max_body=0)
+        if cached is not None and fresh:
+            cache.hits += 1
+            telemetry.record("http", status=cached.status, nbytes=len(cached.body), cached=True)
+            return cached
+    with telemetry.timed("http") as call:
+        resp = requests.head(url, headers=headers or {}, timeout=timeout, allow_redirects=True)
+        page = _page_from_response(url, resp, b"", truncated=True)
+        call["status"] = page.status
+    if cache is None:
+        return page
+    cache.misses += 1
+    return cache.store(page)
+
+
+# ─── Async (httpx) ───────────────────────────────────────────────────
+
+async def async_cached_get(
+    client,
+    url: str,
+    *,
+    headers: dict | None = None,
+    timeout=None,
+    max_body: int | None = None,
+    cache: PageCache | None = None,
+) -> CachedPage:
+    """httpx.AsyncClient GET through the page cache (redirects followed).
+
+    Network errors propagate as the usual httpx exceptions.
+    """
+    cache = cache or get_page_cache()
+    cached = None
+    if cache is not None:
+        cached, fresh = cache.lookup(url, max_body)
+        if cached is not None and fresh:
+            cache.hits += 1
+            telemetry.record("http", status=cached.status, nbytes=len(cached.body), cached=True)
+            return cached
+
+    req_headers = dict(headers or {})
+    if cached is not None:
+        req_headers.update(cached.validators())
+    kwargs = {"headers": req_headers, "follow_redirects": True}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    with telemetry.timed("http") as call:
+        if max_body is None:
+            resp = await client.get(url, **kwargs)
+            page = _page_from_response(url, resp, resp.content, truncated=False)
+        else:
+            async with client.stream("GET", url, **kwargs) as resp:
+                chunks, total, truncated = [], 0, False
+                async for chunk in resp.aiter_bytes(chunk_size=65536):
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if total >= max_body:
+                        truncated = True
+                        break
+                page = _page_from_response(url, resp, b"".join(chunks)[:max_body], truncated)
+        call.update(status=page.status, nbytes=len(page.body))
+    return _finish(cache, cached, page)
@@ -0,0 +1,122 @@
+"""
+Dependency-aware scheduler for the enrichment steps.
+
+main.run_enrichment used to run every step strictly one after another, but
+most of them only need discovery columns: press/awards needs name + city,
+reviews needs cid, the website crawl needs website. Only the Instagram
+steps wait on websites (instagram_url), reels/posts wait on the profile
+scrape (ig_username), and so on. `run_steps` starts every step whose
+`needs` are finished, as long as the resources it `uses` fit the budget:
+
+  - Each step runs on its own copy of the leads, so steps never mutate the
+    same DataFrame concurrently. When one finishes, only the columns it
+    changed are merged back and `on_done(step, before, result)` is called
+    from the scheduling thread (main.py upserts those cells into the store
+    there, so SQLite is only touched from one thread).
+  - Budgets (PIPELINE_BUDGETS) cap concurrent Serper threads, Apify actor
+    runs and HTTP sockets. A step whose own cost exceeds a budget still
+    runs, just alone on that resource. The Serper request *rate* is
+    enforced separately by serper.py's shared limiter.
+  - PIPELINE_MAX_PARALLEL=1 gives the old sequential order.
+  - Each step runs inside `telemetry.stage(step.name)`, so external-call
+    latency and cost are reported per step.
+"""
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+import pandas as pd
+
+import telemetry
+from config import PIPELINE_BUDGETS, PIPELINE_MAX_PARALLEL
+from lead_store import snapshot
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    func: Callable[[pd.DataFrame], pd.DataFrame]
+    needs: tuple[str, ...] = ()
+    uses: dict[str, int] = field(default_factory=dict)  # resource -> concurrent units
+
+
+def validate(steps: list[Step]) -> None:
+    """Every dependency exists and appears earlier in the list (so no cycles)."""
+    seen = set()
+    for step in steps:
+        missing = [n for n in step.needs if n not in seen]
+        if missing:
+            raise ValueError(f"step '{step.name}' needs {missing}, which must be listed before it")
+        seen.add(step.name)
+
+
+def _changed_columns(before: dict, after: dict) -> list[str]:
+    return [
+        col for col, h in after.items()
+        if col not in before or len(before[col]) != len(h) or (before[col] != h).any()
+    ]
+
+
+def _run_step(step: Step, df: pd.DataFrame) -> pd.DataFrame:
+    with telemetry.stage(step.name):
+        return step.func(df)
+
+
+def run_steps(
+    df: pd.DataFrame,
+    steps: list[Step],
+    done: set[str] | None = None,
+    on_done: Callable[[Step, dict, pd.DataFrame], None] | None = None,
+    budgets: dict[str, int] | None = None,
+    max_parallel: int = PIPELINE_MAX_PARALLEL,
+) -> pd.DataFrame:
+    """Run `steps` (minus those in `done`) as their dependencies allow."""
+    validate(steps)
+    budgets = PIPELINE_BUDGETS if budgets is None else budgets
+    finished = set(done or ())
+    waiting = [s for s in steps if s.name not in finished]
+    in_use = {r: 0 for r in budgets}
+    running = {}
+
+    def fits(step: Step) -> bool:
+        for res, cost in step.uses.items():
+            cap = budgets.get(res)
+            if cap is not None and in_use.get(res, 0) and in_use[res] + cost > cap:
+                return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        while waiting or running:
+            for step in list(waiting):
+                if len(running) >= max(1, max_parallel):
+                    break
+                if all(n in finished for n in step.needs) and fits(step):
+                    waiting.remove(step)
+                    for res, cost in step.uses.items():
+                        in_use[res] = in_use.get(res, 0) + cost
+                    work = df.copy()
+                    before = snapshot(work)
+                    running[pool.submit(_run_step, step, work)] = (step, before)
+                    print(f"\n[pipeline] started {step.name}"
+                          + (f" (alongside {', '.join(s.name for s, _ in running.values() if s is not step)})"
+                             if len(running) > 1 else ""), flush=True)
+            if not running:
+                stuck = ", ".join(s.name for s in waiting)
+                raise RuntimeError(f"pipeline stalled; unmet dependencies for: {stuck}")
+
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in completed:
+                step, before = running.pop(fut)
+                for res, cost in step.uses.items():
+                    in_use[res] -= cost
+                result = fut.result()  # a failing step stops the run; finished steps are kept
+                after = snapshot(result)
+                for col in _changed_columns(before, after):
+                    df[col] = result[col].values
+                finished.add(step.name)
+                if on_done:
+                    on_done(step, before, result)
+
+    return df
@@ -0,0 +1,221 @@
+"""
+Readable-text extraction and token-budget chunking for the Claude callers.
+
+awards/llm_extract.py, directories/_stockists.py, the Substack helper and
+best_wine_shops/fetch.py each had their own `_readable_text`: parse the whole
+page with BeautifulSoup's pure-Python html.parser, strip a few tags, join
+every text node with "\\n" and cut the result at 60-80k chars. Long "best of"
+lists lost their tail, and parsing was most of the CPU of a sweep. Now:
+
+  - `readable_text(html)` parses with selectolax's lexbor backend (C), drops
+    scripts/styles/forms and page chrome (nav, header, footer, aside, and
+    elements whose class/id says cookie banner, share bar, newsletter
+    signup, related posts or comments), then picks the article container.
+    The first of article / main / [role=main] / common CMS body classes
+    that holds at least 30% of the page's text wins; otherwise it uses the
+    whole body.
+  - Text is rendered block-aware. Inline runs stay on one line, headings
+    become "#"-prefixed lines, list items "- " lines, and table rows
+    "cell | cell" lines, so a retailer table reads as one row per line.
+  - `chunk_text(text)` splits at headings into chunks of about
+    READABLE_CHUNK_TOKENS (~4 chars a token). A section that is too long
+    is split at paragraphs, then lines. At most READABLE_MAX_CHUNKS chunks
+    are kept, and the tail beyond that is reported and dropped.
+  - `map_chunks(text, extract)` runs `extract` over the chunks on a small
+    thread pool and concatenates the rows in order. `key` drops the
+    duplicates a venue named in two sections would produce.
+
+Each chunk is its own LLM cache entry, so a page that grew at the end only
+re-pays for the last chunk.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Hashable
+
+from selectolax.lexbor import LexborHTMLParser
+
+import telemetry
+from config import READABLE_CHUNK_TOKENS, READABLE_CHUNK_WORKERS, READABLE_MAX_CHUNKS
+
+CHARS_PER_TOKEN = 4
+
+_DROP_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "form", "button", "select")
+_CHROME_TAGS = ("nav", "header", "footer", "aside")
+_CHROME_SELECTORS = ", ".join(
+    f'[{attr}*="{word}"]'
+    for attr in ("class", "id")
+    for word in ("cookie", "consent", "share", "social", "newsletter", "subscribe", "related", "comment", "popup", "modal")
+)
+_CONTAINERS = ("article", "main", '[role="main"]', ".entry-content", ".post-content",
+               ".article-body", ".available-content", ".body.markup")
+
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_BLOCKS = {
+    "p", "div", "section", "article", "main", "ul", "ol", "dl", "dt", "dd", "table", "thead",
+    "tbody", "tfoot", "blockquote", "pre", "figure", "figcaption", "address", "details", "summary", "hr",
+}
+_WS = re.compile(r"\s+")
+_EMPTY_MARK = re.compile(r"[#\-]*")  # heading / bullet prefix with no text after it
+
+
+def _render(node, out: list[str]) -> None:
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            out.append(_WS.sub(" ", child.text(deep=False) or ""))
+        elif tag in _HEADINGS:
+            out.append("\n\n" + "#" * _HEADINGS[tag] + " ")
+            _render(child, out)
+            out.append("\n\n")
+        elif tag == "li":
+            out.append("\n- ")
+            _render(child, out)
+        elif tag in ("td", "th"):
+            _render(child, out)
+            out.append(" | ")
+        elif tag == "tr":
+            out.append("\n")
+            _render(child, out)
+        elif tag == "br":
+            out.append("\n")
+        elif tag in _BLOCKS:
+            out.append("\n")
+            _render(child, out)
+            out.append("\n")
+        elif tag[:1].isalpha():  # inline element (comments are "_comment")
+            _render(child, out)
+
+
+def _tidy(raw: str) -> str:
+    lines: list[str] = []
+    for line in raw.split("\n"):
+        line = line.strip().rstrip("|").strip()
+        if _EMPTY_MARK.fullmatch(line):
+            line = ""
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def node_text(node) -> str:
+    """Block-aware text of one selectolax node."""
+    out: list[str] = []
+    try:
+        _render(node, out)
+    except RecursionError:  # pathological nesting; plain text is good enough
+        return _tidy(node.text(separator="\n"))
+    return _tidy("".join(out))
+
+
+def readable_text(html: str, *, strip_chrome: bool = True) -> str:
+    """Main-content text of a page ("" for empty input).
+
+    strip_chrome=False keeps nav/header/footer/aside and the class-based
+    boilerplate, for pages where the payload lives there (footer store lists).
+    """
+    if not html:
+        return ""
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(_DROP_TAGS))
+    body = tree.body or tree.root
+    if body is None:
+        return ""
+    if strip_chrome:
+        tree.strip_tags(list(_CHROME_TAGS))
+        # A class match on a page-wide wrapper ("share-layout") must not take
+        # the article with it, so only small blocks go.
+        small = 0.2 * len(body.text())
+        for node in tree.css(_CHROME_SELECTORS):
+            if node.tag not in ("html", "body") and len(node.text()) < small:
+                node.decompose()
+    full = node_text(body)
+    for sel in _CONTAINERS:
+        node = tree.css_first(sel)
+        if node is None:
+            continue
+        text = node_text(node)
+        if len(text) >= 0.3 * len(full):
+            return text
+    return full
+
+
+def _split(text: str, limit: int, seps: tuple[str, ...]) -> list[str]:
+    """Pieces of at most `limit` chars, cut at the coarsest separator that works."""
+    if len(text) <= limit:
+        return [text]
+    if not seps:
+        return [text[i : i + limit] for i in range(0, len(text), limit)]
+    sep, rest = seps[0], seps[1:]
+    pieces: list[str] = []
+    cur = ""
+    for part in text.split(sep):
+        if len(part) > limit:
+            if cur:
+                pieces.append(cur)
+                cur = ""
+            pieces.extend(_split(part, limit, rest))
+        elif cur and len(cur) + len(sep) + len(part) > limit:
+            pieces.append(cur)
+            cur = part
+        else:
+            cur = f"{cur}{sep}{part}" if cur else part
+    if cur:
+        pieces.append(cur)
+    return pieces
+
+
+def chunk_text(text: str, *, max_tokens: int = READABLE_CHUNK_TOKENS,
+               max_chunks: int = READABLE_MAX_CHUNKS) -> list[str]:
+    """Split at headings into chunks of about `max_tokens`; [] for empty text."""
+    text = text.strip()
+    if not text:
+        return []
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return [text]
+    chunks: list[str] = []
+    cur = ""
+    for section in re.split(r"\n(?=#{1,6} )", text):
+        for piece in _split(section, limit, ("\n\n", "\n")):
+            if cur and len(cur) + 1 + len(piece) > limit:
+                chunks.append(cur)
+                cur = piece
+            else:
+                cur = f"{cur}\n{piece}" if cur else piece
+    if cur:
+        chunks.append(cur)
+    if len(chunks) > max_chunks:
+        dropped = sum(len(c) for c in chunks[max_chunks:])
+        print(f"  [readable] {len(chunks)} chunks; dropping the last {len(chunks) - max_chunks} "
+              f"({dropped:,} chars)", flush=True)
+        chunks = chunks[:max_chunks]
+    return chunks
+
+
+def map_chunks(
+    text: str,
+    extract: Callable[[str], list],
+    *,
+    key: Callable[[dict], Hashable] | None = None,
+    max_tokens: int = READABLE_CHUNK_TOKENS,
+    workers: int = READABLE_CHUNK_WORKERS,
+) -> list:
+    """extract() over each chunk of `text` (in parallel), rows concatenated in order."""
+    chunks = chunk_text(text, max_tokens=max_tokens)
+    if len(chunks) <= 1:
+        results = [extract(c) for c in chunks]
+    else:
+        with telemetry.ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+            results = list(pool.map(extract, chunks))
+    rows: list = []
+    seen: set = set()
+    for part in results:
+        for row in part:
+            if key is not None:
+                k = key(row)
+                if k in seen:
+                    continue
+                seen.add(k)
+            rows.append(row)
+    return rows
@@ -4,6 +4,11 @@ Phase 3: Score and rank leads using SHAP-aligned weights
 import numpy as np
 import pandas as pd
 from config import SCORING_WEIGHTS
+from score_registry import (
+    ENRICHMENT_ONLY_SIGNALS as _ENRICHMENT_ONLY_SIGNALS,
+    LEAD_MODEL,
+    RESERVATION_TYPES,
+)
 
 
 def score_reservation_difficulty_composite(row: pd.Series) -> float:
@@ -185,12 +190,6 @@ _SCORE_DISPATCH = {
 }
 
 
-RESERVATION_TYPES = {"restaurant", "wine_bar"}
-
-# Signals that require IG/Apify enrichment — exclude weight when data is missing
-_ENRICHMENT_ONLY_SIGNALS = {"avg_video_views", "avg_likes", "follower_count"}
-
-
 def compute_lead_score(row: pd.Series) -> float:
     """Compute total lead score for a single row.
 
@@ -233,39 +232,69 @@ def compute_lead_score(row: pd.Series) -> float:
     return round(score, 1)
 
 
+def get_tier(row: pd.Series) -> str:
+    """Tier for a single scored row (row-wise reference for assign_tiers)."""
+    s = row["lead_score"]
+    biz = str(row.get("business_type", "")).strip()
+    if biz in RESERVATION_TYPES:
+        # Restaurants / wine bars (full enrichment)
+        if s >= 55:
+            return "A - Hot Lead"
+        elif s >= 35:
+            return "B - Warm Lead"
+        elif s >= 20:
+            return "C - Worth a Look"
+        return "D - Low Priority"
+    else:
+        # Niche (partial enrichment — no IG/Apify data)
+        if s >= 45:
+            return "A - Hot Lead"
+        elif s >= 25:
+            return "B - Warm Lead"
+        elif s >= 15:
+            return "C - Worth a Look"
+        return "D - Low Priority"
+
+
+# ---------------------------------------------------------------------------
+# Columnar scoring — the same ladders as the scalar functions above, declared
+# as the "lead" model in score_registry and compiled to NumPy kernels.
+# compute_lead_score and get_tier stay as the row-wise reference (see
+# verify_score_parity and tests/test_score.py).
+# ---------------------------------------------------------------------------
+
+def compute_lead_scores(df: pd.DataFrame) -> np.ndarray:
+    """Columnar equivalent of `df.apply(compute_lead_score, axis=1)`."""
+    return LEAD_MODEL.score(df)
+
+
+def assign_tiers(df: pd.DataFrame, scores: np.ndarray) -> np.ndarray:
+    """Tier label per row from per-type cutoff arrays."""
+    return LEAD_MODEL.tier(df, scores)
+
+
+def verify_score_parity(df: pd.DataFrame, tolerance: float = 0.0) -> pd.DataFrame:
+    """Compare the columnar path against row-wise compute_lead_score.
+
+    Returns the rows whose scores differ by more than `tolerance`.
+    """
+    row_wise = df.apply(compute_lead_score, axis=1).to_numpy(dtype=float)
+    columnar = compute_lead_scores(df)
+    diff = np.abs(row_wise - columnar)
+    mismatched = df.loc[diff > tolerance + 1e-9].copy()
+    mismatched["lead_score_row_wise"] = row_wise[diff > tolerance + 1e-9]
+    mismatched["lead_score_columnar"] = columnar[diff > tolerance + 1e-9]
+    return mismatched
+
+
 def score_leads(df: pd.DataFrame) -> pd.DataFrame:
     """Score all leads and sort by score descending."""
     print(f"\n{'='*60}")
     print(f"PHASE 3: SCORING LEADS")
     print(f"{'='*60}")
 
-    df["lead_score"] = df.apply(compute_lead_score, axis=1)
-
-    # Tier thresholds — niche types have fewer enrichment signals available,
-    # so use lower thresholds to keep the pyramid shape (A < B).
-    def get_tier(row):
-        s = row["lead_score"]
-        biz = str(row.get("business_type", "")).strip()
-        if biz in RESERVATION_TYPES:
-            # Restaurants / wine bars (full enrichment)
-            if s >= 55:
-                return "A - Hot Lead"
-            elif s >= 35:
-                return "B - Warm Lead"
-            elif s >= 20:
-                return "C - Worth a Look"
-            return "D - Low Priority"
-        else:
-            # Niche (partial enrichment — no IG/Apify data)
-            if s >= 45:
-                return "A - Hot Lead"
-            elif s >= 25:
-                return "B - Warm Lead"
-            elif s >= 15:
-                return "C - Worth a Look"
-            return "D - Low Priority"
-
-    df["tier"] = df.apply(get_tier, axis=1)
+    df["lead_score"] = compute_lead_scores(df)
+    df["tier"] = assign_tiers(df, df["lead_score"].to_numpy())
 
     df = df.sort_values("lead_score", ascending=False).reset_index(drop=True)
 
@@ -285,3 +314,23 @@ def score_leads(df: pd.DataFrame) -> pd.DataFrame:
     print(df[available_cols].head(20).to_string())
 
     return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score an enriched lead CSV")
+    parser.add_argument("csv", help="Enriched CSV to score")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="Compare columnar scores against row-wise compute_lead_score")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    if args.check_parity:
+        bad = verify_score_parity(df)
+        print(f"{len(df) - len(bad)}/{len(df)} rows match row-wise scoring")
+        if not bad.empty:
+            print(bad[["name", "business_type", "lead_score_row_wise", "lead_score_columnar"]].head(20).to_string())
+            raise SystemExit(1)
+    else:
+        score_leads(df)
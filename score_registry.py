@@ -0,0 +1,501 @@
+"""
+Declarative score models shared by score.py and the scripts/ rankers.
+
+A ScoreModel is a base score plus an ordered list of terms (ladders, capped
+log/linear terms, flags, lookups, keyword hits) and optional tier cutoffs per
+business_type. Models compile once into NumPy kernels that score a whole
+DataFrame per call, so re-ranking a 50K-row vertical list is one batched pass
+instead of a row-wise `df.apply`.
+
+    from score_registry import Flag, Log, ScoreModel, register
+
+    MODEL = register(ScoreModel("my_vertical", base=10.0, terms=[
+        Log("review_count", scale=3.0, upper=18.0),
+        Flag("has_email_signup", 5.0),
+    ]))
+    df["my_score"] = MODEL.score(df)
+
+Terms are summed in declaration order so scores match the per-row functions
+they replace. Derived columns (`derive=`) are vectorized pandas expressions
+computed once per call for signals that need more than one raw column.
+"""
+from __future__ import annotations
+
+import math
+import operator
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from config import SCORING_WEIGHTS
+
+
+TIER_LABELS = ("A - Hot Lead", "B - Warm Lead", "C - Worth a Look", "D - Low Priority")
+
+TRUE_STRINGS = {"true", "1", "yes", "y"}
+BLANK_STRINGS = {"", "nan", "none", "null"}
+
+_OPS = {
+    ">=": operator.ge, ">": operator.gt, "==": operator.eq,
+    "<=": operator.le, "<": operator.lt, "!=": operator.ne,
+}
+
+
+# ---------------------------------------------------------------------------
+# Column access
+# ---------------------------------------------------------------------------
+
+def round_half(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """np.round that agrees with Python's round() on near-half values.
+
+    np.round scales by 10**ndigits before rounding, so a value like 24.05
+    (stored just above the half) can round down where round() rounds up.
+    Only those near-tie elements are re-rounded with round().
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(float(v), ndigits) for v in values[near_half]]
+    return rounded
+
+
+def numeric_column(df: pd.DataFrame, col: str, default: float = 0.0) -> np.ndarray:
+    """Column as float64 with missing/unparseable values set to `default`."""
+    if col not in df.columns:
+        return np.full(len(df), default, dtype=float)
+    return pd.to_numeric(df[col], errors="coerce").fillna(default).to_numpy(dtype=float)
+
+
+def text_column(df: pd.DataFrame, *cols: str, normalize: bool = False) -> pd.Series:
+    """Space-joined `str(value)` of `cols`; missing columns contribute "".
+
+    normalize=True lowercases and collapses non-alphanumerics to single
+    spaces, like the `norm()` helpers in scripts/.
+    """
+    parts = [
+        df[c].astype(str) if c in df.columns else pd.Series("", index=df.index)
+        for c in cols
+    ]
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + " " + part
+    if normalize:
+        text = text.str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    return text
+
+
+class _Frame:
+    """DataFrame view that resolves derived columns and caches conversions."""
+
+    def __init__(self, df: pd.DataFrame, derive: dict[str, Callable[[pd.DataFrame], object]]):
+        self.df = df
+        self._derive = derive
+        self._raw: dict[str, pd.Series | None] = {}
+        self._numeric: dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def raw(self, col: str) -> pd.Series | None:
+        if col not in self._raw:
+            if col in self._derive:
+                value = self._derive[col](self.df)
+                self._raw[col] = pd.Series(np.asarray(value), index=self.df.index)
+            elif col in self.df.columns:
+                self._raw[col] = self.df[col]
+            else:
+                self._raw[col] = None
+        return self._raw[col]
+
+    def numeric(self, col: str) -> np.ndarray:
+        if col not in self._numeric:
+            s = self.raw(col)
+            if s is None:
+                self._numeric[col] = np.zeros(len(self), dtype=float)
+            else:
+                self._numeric[col] = pd.to_numeric(s, errors="coerce").fillna(0.0).to_numpy(dtype=float)
+        return self._numeric[col]
+
+    def text(self, col: str) -> pd.Series:
+        s = self.raw(col)
+        if s is None:
+            return pd.Series("", index=self.df.index)
+        return s.astype(str)
+
+    def mask(self, col: str) -> np.ndarray:
+        s = self.raw(col)
+        if s is None:
+            return np.zeros(len(self), dtype=bool)
+        return s.astype(bool).to_numpy()
+
+
+# ---------------------------------------------------------------------------
+# Terms
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _Term:
+    col: str
+    weight: float = field(default=1.0, kw_only=True)
+    # Boolean (raw or derived) column; the term contributes 0 where it is False
+    where: str | None = field(default=None, kw_only=True)
+
+    def compile(self) -> Callable[[_Frame], np.ndarray]:
+        kernel = self._kernel()
+        weight, where = self.weight, self.where
+
+        def run(frame: _Frame) -> np.ndarray:
+            out = kernel(frame) * weight
+            if where is not None:
+                out = np.where(frame.mask(where), out, 0.0)
+            return out
+
+        return run
+
+    def _kernel(self) -> Callable[[_Frame], np.ndarray]:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class Ladder(_Term):
+    """Stepwise `if x >= b[-1]: v[-1] elif ... else v[0]` score.
+
+    values[i] applies when breakpoints[i-1] <= x < breakpoints[i], so
+    len(values) == len(breakpoints) + 1. Use GT_ZERO for a strict `x > 0` step.
+    zero_is_missing=True scores exactly-zero values as 0 (no data, no penalty).
+    """
+    breakpoints: tuple[float, ...] = ()
+    values: tuple[float, ...] = ()
+    zero_is_missing: bool = False
+
+    def _kernel(self):
+        if len(self.values) != len(self.breakpoints) + 1:
+            raise ValueError(f"Ladder on {self.col!r} needs one more value than breakpoints")
+        bps = np.asarray(self.breakpoints, dtype=float)
+        vals = np.asarray(self.values, dtype=float)
+        col, zero_is_missing = self.col, self.zero_is_missing
+
+        def kernel(frame):
+            x = frame.numeric(col)
+            out = vals[np.searchsorted(bps, x, side="right")]
+            return np.where(x == 0, 0.0, out) if zero_is_missing else out
+
+        return kernel
+
+
+@dataclass(frozen=True)
+class Cases(_Term):
+    """First matching `(op, threshold, value)` wins, else `default` (np.select)."""
+    cases: tuple[tuple[str, float, float], ...] = ()
+    default: float = 0.0
+
+    def _kernel(self):
+        ops = [(_OPS[op], threshold) for op, threshold, _ in self.cases]
+        choices = [value for _, _, value in self.cases]
+        col, default = self.col, self.default
+        return lambda frame: np.select(
+            [op(frame.numeric(col), threshold) for op, threshold in ops], choices, default,
+        ).astype(float)
+
+
+@dataclass(frozen=True)
+class Log(_Term):
+    """`min(upper, log(x + 1) * scale)` for x > 0, else 0."""
+    scale: float = 1.0
+    upper: float | None = None
+    base: float = math.e
+
+    def _kernel(self):
+        col, scale, upper, base = self.col, self.scale, self.upper, self.base
+        if base == math.e:
+            log = np.log1p
+        elif base == 10:
+            log = lambda x: np.log10(x + 1.0)
+        else:
+            log = lambda x: np.log(x + 1.0) / math.log(base)
+
+        def kernel(frame):
+            x = frame.numeric(col)
+            out = np.where(x > 0, log(np.maximum(x, 0.0)) * scale, 0.0)
+            return out if upper is None else np.minimum(out, upper)
+
+        return kernel
+
+
+@dataclass(frozen=True)
+class Linear(_Term):
+    """`clip((x - offset) * scale, lower, upper)`."""
+    scale: float = 1.0
+    offset: float = 0.0
+    lower: float | None = None
+    upper: float | None = None
+
+    def _kernel(self):
+        col, scale, offset, lower, upper = self.col, self.scale, self.offset, self.lower, self.upper
+
+        def kernel(frame):
+            x = frame.numeric(col)
+            out = (x - offset) * scale if offset else x * scale
+            if lower is not None:
+                out = np.maximum(out, lower)
+            if upper is not None:
+                out = np.minimum(out, upper)
+            return out
+
+        return kernel
+
+
+@dataclass(frozen=True)
+class Flag(_Term):
+    """`points` when the column passes `test`, else 0.
+
+    test: "truthy" — string in TRUE_STRINGS (CSV-safe booleans)
+          "present" — non-blank string (not "", nan, none, null)
+          "bool"    — Python truthiness of the raw cell
+    """
+    points: float = 1.0
+    test: str = "truthy"
+
+    def _kernel(self):
+        col, points, test = self.col, self.points, self.test
+        if test not in {"truthy", "present", "bool"}:
+            raise ValueError(f"Unknown Flag test {test!r}")
+
+        def kernel(frame):
+            if test == "bool":
+                hit = frame.mask(col)
+            else:
+                s = frame.text(col).str.strip().str.lower()
+                hit = (s.isin(TRUE_STRINGS) if test == "truthy" else ~s.isin(BLANK_STRINGS)).to_numpy()
+            return np.where(hit, points, 0.0)
+
+        return kernel
+
+
+@dataclass(frozen=True)
+class Lookup(_Term):
+    """Points by exact string value; unmatched values score `default`.
+
+    blank, when set, is the score for empty cells (instead of `default`).
+    """
+    mapping: dict[str, float] = field(default_factory=dict)
+    default: float = 0.0
+    blank: float | None = None
+
+    def _kernel(self):
+        col, mapping, default, blank = self.col, dict(self.mapping), self.default, self.blank
+
+        def kernel(frame):
+            s = frame.text(col)
+            out = s.map(mapping).fillna(default).to_numpy(dtype=float)
+            if blank is not None:
+                out = np.where(s.eq("").to_numpy(), blank, out)
+            return out
+
+        return kernel
+
+
+@dataclass(frozen=True)
+class Keywords(_Term):
+    """`points` per keyword found as a substring of a text column, capped at `upper`."""
+    keywords: tuple[str, ...] = ()
+    points: float = 1.0
+    upper: float | None = None
+
+    def _kernel(self):
+        col, keywords, points, upper = self.col, tuple(self.keywords), self.points, self.upper
+
+        def kernel(frame):
+            text = frame.text(col)
+            hits = np.zeros(len(frame), dtype=float)
+            for kw in keywords:
+                hits += text.str.contains(kw, regex=False).to_numpy()
+            out = hits * points
+            return out if upper is None else np.minimum(out, upper)
+
+        return kernel
+
+
+@dataclass(frozen=True)
+class Pattern(_Term):
+    """`points` when a compiled regex matches the text column."""
+    pattern: re.Pattern | str = ""
+    points: float = 1.0
+
+    def _kernel(self):
+        col, points = self.col, self.points
+        regex = self.pattern if isinstance(self.pattern, re.Pattern) else re.compile(self.pattern)
+        return lambda frame: np.where(frame.text(col).str.contains(regex).to_numpy(), points, 0.0)
+
+
+GT_ZERO = np.nextafter(0.0, 1.0)  # "x > 0" as an inclusive Ladder breakpoint
+
+
+# ---------------------------------------------------------------------------
+# Models
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Tiers:
+    """Tier cutoffs (descending, one fewer than labels), optionally per type."""
+    cutoffs: tuple[float, ...]
+    by_type: dict[str, tuple[float, ...]] = field(default_factory=dict)
+    type_col: str = "business_type"
+    labels: tuple[str, ...] = TIER_LABELS
+
+
+@dataclass(frozen=True)
+class ScoreModel:
+    name: str
+    terms: list[_Term]
+    base: float = 0.0
+    ndigits: int = 2
+    tiers: Tiers | None = None
+    derive: dict[str, Callable[[pd.DataFrame], object]] = field(default_factory=dict)
+
+
+class CompiledModel:
+    """A ScoreModel with every term compiled to a NumPy kernel."""
+
+    def __init__(self, model: ScoreModel):
+        self.model = model
+        self._kernels = [term.compile() for term in model.terms]
+        tiers = model.tiers
+        if tiers is not None:
+            if len(tiers.labels) != len(tiers.cutoffs) + 1:
+                raise ValueError(f"{model.name}: tiers need one more label than cutoffs")
+            self._tier_labels = np.asarray(tiers.labels, dtype=object)
+            self._tier_default = np.asarray(tiers.cutoffs, dtype=float)
+            self._tier_by_type = {k: np.asarray(v, dtype=float) for k, v in tiers.by_type.items()}
+
+    @property
+    def name(self) -> str:
+        return self.model.name
+
+    def score(self, df: pd.DataFrame) -> np.ndarray:
+        """Score every row of `df` in one pass."""
+        frame = _Frame(df, self.model.derive)
+        total = np.full(len(df), self.model.base, dtype=float)
+        for kernel in self._kernels:
+            total = total + kernel(frame)
+        return round_half(total, self.model.ndigits)
+
+    def tier(self, df: pd.DataFrame, scores: np.ndarray) -> np.ndarray:
+        """Tier label per row using the model's (per-type) cutoffs."""
+        tiers = self.model.tiers
+        if tiers is None:
+            raise ValueError(f"Score model {self.name!r} has no tiers")
+        cutoffs = np.tile(self._tier_default, (len(df), 1))
+        if self._tier_by_type and tiers.type_col in df.columns:
+            types = df[tiers.type_col].astype(str).str.strip()
+            for biz, type_cutoffs in self._tier_by_type.items():
+                cutoffs[types.eq(biz).to_numpy()] = type_cutoffs
+        # Number of cutoffs the score falls below: 0 -> first label, and so on
+        tier_idx = (np.asarray(scores, dtype=float)[:, None] < cutoffs).sum(axis=1)
+        return self._tier_labels[tier_idx]
+
+
+_REGISTRY: dict[str, CompiledModel] = {}
+
+
+def register(model: ScoreModel) -> CompiledModel:
+    """Compile `model` and make it available via get_model(model.name)."""
+    compiled = CompiledModel(model)
+    _REGISTRY[model.name] = compiled
+    return compiled
+
+
+def get_model(name: str) -> CompiledModel:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Unknown score model {name!r}. Registered: {', '.join(sorted(_REGISTRY))}") from None
+
+
+def registered_models() -> list[str]:
+    return sorted(_REGISTRY)
+
+
+# ---------------------------------------------------------------------------
+# Generic lead score (score.py) — SHAP-aligned weights from config
+# ---------------------------------------------------------------------------
+
+RESERVATION_TYPES = {"restaurant", "wine_bar"}
+
+# Signals that require IG/Apify enrichment — exclude weight when data is missing
+ENRICHMENT_ONLY_SIGNALS = {"avg_video_views", "avg_likes", "follower_count"}
+
+
+def reservation_difficulty_composite(df: pd.DataFrame) -> np.ndarray:
+    """Columnar score.score_reservation_difficulty_composite."""
+    platform = numeric_column(df, "reservation_difficulty").astype(int)
+    platform_score = np.select(
+        [platform == 3, platform == 2, platform == 1], [1.0, 0.7, 0.4], 0.0,
+    )
+    review_sentiment = numeric_column(df, "review_difficulty_sentiment")
+    availability = numeric_column(df, "booking_availability_score", default=1.0)
+    return round_half(
+        0.40 * platform_score + 0.35 * review_sentiment + 0.25 * (1.0 - availability), 3,
+    )
+
+
+def _is_reservation_type(df: pd.DataFrame) -> np.ndarray:
+    return text_column(df, "business_type").str.strip().isin(RESERVATION_TYPES).to_numpy()
+
+
+def _lead_ladder(weight_key: str, col: str, breakpoints, values) -> Ladder:
+    return Ladder(
+        col, breakpoints=tuple(breakpoints), values=tuple(values),
+        weight=SCORING_WEIGHTS[weight_key],
+        zero_is_missing=weight_key in ENRICHMENT_ONLY_SIGNALS,
+    )
+
+
+LEAD_MODEL = register(ScoreModel(
+    "lead",
+    ndigits=1,
+    derive={
+        "_reservation_composite": reservation_difficulty_composite,
+        "_reservation_type": _is_reservation_type,
+    },
+    terms=[
+        # Composite reservation difficulty — only for restaurants/wine bars, skip if no data
+        Linear("_reservation_composite", scale=SCORING_WEIGHTS["reservation_difficulty"],
+               lower=0.0, where="_reservation_type"),
+        _lead_ladder("avg_video_views", "avg_video_views",
+                     [GT_ZERO, 1_000, 5_000, 10_000, 20_000, 50_000, 100_000],
+                     [0.0, 0.1, 0.2, 0.4, 0.6, 0.8, 0.9, 1.0]),
+        _lead_ladder("follower_count", "follower_count",
+                     [500, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000],
+                     [0.0, 0.1, 0.3, 0.5, 0.7, 0.8, 0.9, 1.0]),
+        _lead_ladder("review_count", "review_count",
+                     [50, 100, 200, 500, 1000, 2000, 5000],
+                     [0.0, 0.1, 0.2, 0.4, 0.6, 0.8, 0.9, 1.0]),
+        _lead_ladder("press_mentions", "press_mentions",
+                     [1, 3, 5, 7, 10], [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]),
+        Cases("awards_count", cases=((">=", 3, 1.0), ("==", 2, 0.8), ("==", 1, 0.5)),
+              weight=SCORING_WEIGHTS["awards_count"]),
+        # Rating of exactly 0 means "no rating", not a bad one
+        Ladder("rating", breakpoints=(3.5, 4.0, 4.3, 4.5, 4.7),
+               values=(0.1, 0.3, 0.5, 0.7, 0.9, 1.0),
+               zero_is_missing=True, weight=SCORING_WEIGHTS["google_rating"]),
+        _lead_ladder("avg_likes", "avg_likes",
+                     [GT_ZERO, 200, 500, 1_000, 2_000, 5_000],
+                     [0.0, 0.1, 0.2, 0.4, 0.6, 0.8, 1.0]),
+        Cases("price_tier", cases=(("==", 4, 1.0), ("==", 3, 0.7), ("==", 2, 0.4), ("==", 1, 0.2)),
+              weight=SCORING_WEIGHTS["price_tier"]),
+        Flag("has_email_signup", SCORING_WEIGHTS["has_email_signup"], test="bool"),
+        Flag("has_ecommerce", SCORING_WEIGHTS["has_ecommerce"], test="bool"),
+    ],
+    # Tier thresholds — niche types have fewer enrichment signals available,
+    # so use lower thresholds to keep the pyramid shape (A < B).
+    tiers=Tiers(
+        cutoffs=(45, 25, 15),  # niche (partial enrichment — no IG/Apify data)
+        by_type={t: (55, 35, 20) for t in RESERVATION_TYPES},  # full enrichment
+    ),
+))
@@ -1,5 +1,6 @@
 """Smart dedupe pass:
-- Group by (normalized business_name, normalized city).
+- Group rows for the same business (entity_resolution on business_name + city;
+  rows with different ig_handles are never grouped fuzzily).
 - If group has rows with AND without ig_handle, drop handle-less rows (subsumed).
 - If multiple rows with DIFFERENT handles → keep all (different businesses).
 - If multiple handle-less → keep highest confidence, then most signal columns filled.
@@ -7,20 +8,17 @@
 """
 import argparse
 import csv
-import re
-import unicodedata
+import os
+import sys
 from collections import defaultdict
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd  # noqa: E402
 
-CONF_RANK = {"high": 3, "med": 2, "low": 1, "": 0, None: 0}
+from entity_resolution import normalize_name, fold, resolve  # noqa: E402
 
 
-def norm(s: str) -> str:
-    if not s:
-        return ""
-    s = unicodedata.normalize("NFKD", str(s)).encode("ascii", "ignore").decode()
-    s = re.sub(r"[^\w\s]", " ", s.lower())
-    return re.sub(r"\s+", " ", s).strip()
+CONF_RANK = {"high": 3, "med": 2, "low": 1, "": 0, None: 0}
 
 
 def signal_score(row: dict) -> int:
@@ -53,10 +51,12 @@ def main():
 
     print(f"  Input: {len(rows)} rows", flush=True)
 
-    # Group by (norm_name, norm_city)
+    # Group by resolved business
+    clusters = resolve(
+        pd.DataFrame(rows, columns=cols), name="business_name", cid=None, distinct=("ig_handle",),
+    )
     groups = defaultdict(list)
-    for r in rows:
-        key = (norm(r.get("business_name", "")), norm(r.get("city", "")))
+    for r, key in zip(rows, clusters):
         groups[key].append(r)
 
     kept = []
@@ -105,7 +105,7 @@ def main():
         print(f"  Handle uniqueness OK ({len(set(handles))} unique handles)", flush=True)
 
     # Sanity: no (name, city) dups remaining
-    pairs = [(norm(r.get("business_name", "")), norm(r.get("city", ""))) for r in kept]
+    pairs = [(normalize_name(r.get("business_name") or ""), fold(r.get("city") or "")) for r in kept]
     from collections import Counter
     pair_counts = Counter(pairs)
     pair_dups = {k: v for k, v in pair_counts.items() if v > 1}
@@ -3,6 +3,7 @@ import argparse
 import base64
 import json
 import os
+import sys
 import time
 from pathlib import Path
 
@@ -10,6 +11,10 @@ import requests
 from anthropic import Anthropic, APIConnectionError, APIStatusError
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import llm_batch  # noqa: E402
+import telemetry  # noqa: E402
+
 load_dotenv()
 
 OUT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -28,6 +33,7 @@ Rules:
 - If slide is a cover / intro / outro / brand title with no specific business, set is_intro_or_cover=true and items=[].
 - Skip the @beli_eats brand itself.
 - Output JSON only."""
+_SYSTEM_BLOCKS = [{"type": "text", "text": OCR_SYSTEM, "cache_control": {"type": "ephemeral"}}]
 
 
 def download_image(url: str, dest: Path) -> bool:
@@ -43,32 +49,16 @@ def download_image(url: str, dest: Path) -> bool:
         return False
 
 
-def ocr_image(image_path: Path) -> dict:
+def _slide_content(image_path: Path) -> list[dict]:
     img_b64 = base64.standard_b64encode(image_path.read_bytes()).decode()
-    last_err = None
-    for attempt in range(4):
-        try:
-            resp = client.messages.create(
-                model=MODEL,
-                max_tokens=2048,
-                system=[{"type": "text", "text": OCR_SYSTEM, "cache_control": {"type": "ephemeral"}}],
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "image", "source": {"type": "base64", "media_type": "image/jpeg", "data": img_b64}},
-                        {"type": "text", "text": "Extract businesses from this slide."},
-                    ],
-                }],
-            )
-            break
-        except (APIConnectionError, APIStatusError) as e:
-            last_err = e
-            wait = 2 ** attempt
-            print(f"    [retry {attempt+1}/4 in {wait}s] {type(e).__name__}", flush=True)
-            time.sleep(wait)
-    else:
-        raise last_err
-    raw = resp.content[0].text.strip()
+    return [
+        {"type": "image", "source": {"type": "base64", "media_type": "image/jpeg", "data": img_b64}},
+        {"type": "text", "text": "Extract businesses from this slide."},
+    ]
+
+
+def _parse_reply(raw: str) -> dict:
+    raw = raw.strip()
     if raw.startswith("```"):
         raw = raw.split("```")[1]
         if raw.startswith("json"):
@@ -81,11 +71,47 @@ def ocr_image(image_path: Path) -> dict:
         return {"is_intro_or_cover": False, "items": []}
 
 
+def ocr_image(image_path: Path) -> dict:
+    content = _slide_content(image_path)
+    last_err = None
+    with telemetry.timed("anthropic") as call:
+        for attempt in range(4):
+            try:
+                resp = client.messages.create(
+                    model=MODEL,
+                    max_tokens=2048,
+                    system=_SYSTEM_BLOCKS,
+                    messages=[{"role": "user", "content": content}],
+                )
+                break
+            except (APIConnectionError, APIStatusError) as e:
+                last_err = e
+                call["retries"] = attempt + 1
+                wait = 2 ** attempt
+                print(f"    [retry {attempt+1}/4 in {wait}s] {type(e).__name__}", flush=True)
+                time.sleep(wait)
+        else:
+            raise last_err
+        call["cost"] = telemetry.anthropic_cost(MODEL, resp.usage)
+    return _parse_reply(resp.content[0].text)
+
+
+def ocr_batch(slides: dict[str, Path]) -> dict[str, dict]:
+    """{slide id: OCR result} for every slide, via one Message Batch."""
+    replies = llm_batch.run_batch(
+        MODEL, _SYSTEM_BLOCKS, {sid: _slide_content(path) for sid, path in slides.items()},
+        max_tokens=2048, parse=_parse_reply, label="beli-ocr",
+    )
+    return {sid: r or {"is_intro_or_cover": False, "items": []} for sid, r in replies.items()}
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--raw", required=True, help="raw_posts JSON")
     ap.add_argument("--captions", required=True, help="candidates_captions JSON (used to skip non-US posts)")
     ap.add_argument("--out", default=None)
+    ap.add_argument("--batch", action="store_true",
+                    help="OCR every slide in one Message Batch (half price, waits for the batch)")
     args = ap.parse_args()
 
     out_path = args.out or args.raw.replace("raw_posts", "candidates_ocr").replace(".json", ".json")
@@ -94,6 +120,7 @@ def main():
     cap_results = {r["shortCode"]: r for r in json.load(open(args.captions))}
 
     all_results = []
+    pending: dict[str, tuple[Path, dict]] = {}  # --batch: slide id -> (image, its result dict)
     for i, p in enumerate(posts):
         sc = p["shortCode"]
         post_url = p.get("url") or f"https://www.instagram.com/p/{sc}/"
@@ -123,6 +150,11 @@ def main():
             dest = post_dir / f"slide_{j:02d}.jpg"
             if not download_image(url, dest):
                 continue
+            if args.batch:
+                # Filled in after the batch comes back.
+                slide_results.append({"slide_index": j, "image_url": url})
+                pending[f"{sc}_{j:02d}"] = (dest, slide_results[-1])
+                continue
             try:
                 r = ocr_image(dest)
             except Exception as e:
@@ -140,12 +172,19 @@ def main():
             "slides": slide_results,
         })
 
+    if pending:
+        print(f"  Batch OCR of {len(pending)} slides", flush=True)
+        results = ocr_batch({sid: dest for sid, (dest, _) in pending.items()})
+        for sid, (_, slide) in pending.items():
+            slide.update(results[sid])
+
     with open(out_path, "w") as f:
         json.dump(all_results, f, indent=2, ensure_ascii=False)
     print(f"  Saved -> {out_path}", flush=True)
 
     total_items = sum(len(s.get("items") or []) for r in all_results for s in r.get("slides", []))
     print(f"  Total OCR items: {total_items}", flush=True)
+    telemetry.print_telemetry_report()
 
 
 if __name__ == "__main__":
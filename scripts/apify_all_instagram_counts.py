@@ -11,20 +11,19 @@ import json
 import re
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import pandas as pd
-from apify_client import ApifyClient
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+import ig_profiles
+from apify_runs import print_apify_summary
 from config import APIFY_API_TOKEN
 
 RUN_DIR = ROOT / "output" / "fresh_bakery_leads_20260525"
-ACTOR_ID = "apify/instagram-profile-scraper"
 USERNAME_RE = re.compile(r"instagram\.com/([A-Za-z0-9_.]+)")
 SKIP_USERNAMES = {"p", "reel", "reels", "stories", "explore", "accounts", "share"}
 
@@ -62,28 +61,46 @@ def load_existing(path: Path) -> pd.DataFrame:
     return pd.DataFrame()
 
 
-def scrape_batch(usernames: list[str], batch_label: str) -> pd.DataFrame:
-    client = ApifyClient(APIFY_API_TOKEN)
-    print(f"  Apify batch {batch_label}: {len(usernames)} usernames", flush=True)
-    run = client.actor(ACTOR_ID).call(run_input={"usernames": usernames})
-    items = client.dataset(run["defaultDatasetId"]).list_items().items
+def profile_rows(found: dict[str, dict]) -> pd.DataFrame:
     rows: list[dict] = []
-    for item in items:
-        username = str(item.get("username") or "").lower()
+    for username, v in found.items():
+        if v.get("ig_followers") is None:  # profile not found
+            continue
         rows.append(
             {
                 "ig_username": username,
-                "ig_followers_apify_all": item.get("followersCount", 0) or 0,
-                "ig_posts_apify_all": item.get("postsCount", 0) or 0,
-                "ig_full_name_apify_all": item.get("fullName") or item.get("full_name") or "",
-                "ig_is_private_apify_all": item.get("private") if "private" in item else item.get("isPrivate"),
-                "ig_is_verified_apify_all": item.get("verified") if "verified" in item else item.get("isVerified"),
-                "ig_apify_all_url": item.get("url") or f"https://www.instagram.com/{username}/",
+                "ig_followers_apify_all": v["ig_followers"] or 0,
+                "ig_posts_apify_all": v.get("ig_posts") or 0,
+                "ig_full_name_apify_all": v.get("ig_full_name") or "",
+                "ig_is_private_apify_all": v.get("ig_is_private"),
+                "ig_is_verified_apify_all": v.get("ig_is_verified"),
+                "ig_apify_all_url": f"https://www.instagram.com/{username}/",
             }
         )
     return pd.DataFrame(rows)
 
 
+def scrape_all(usernames: list[str], output_path: Path, batch_size: int) -> None:
+    """Fetch through ig_profiles (store first, then Apify), checkpointing each batch."""
+    completed = 0
+
+    def on_batch(found: dict[str, dict]) -> None:
+        nonlocal completed
+        recovered = append_recovered(output_path, profile_rows(found))
+        completed += len(found)
+        nonzero = pd.to_numeric(recovered.get("ig_followers_apify_all", 0), errors="coerce").fillna(0).gt(0).sum() if not recovered.empty else 0
+        print(
+            f"  Completed {completed:,}/{len(usernames):,} usernames | "
+            f"checkpoint rows {len(recovered):,} | nonzero {nonzero:,}",
+            flush=True,
+        )
+
+    ig_profiles.fetch(
+        "profile", usernames, ig_profiles.COUNT_FIELDS, on_batch=on_batch, batch_size=batch_size,
+    )
+    print_apify_summary()
+
+
 def append_recovered(output_path: Path, new_rows: pd.DataFrame) -> pd.DataFrame:
     existing = load_existing(output_path)
     combined = pd.concat([existing, new_rows], ignore_index=True)
@@ -151,7 +168,6 @@ def main() -> None:
     parser.add_argument("--input", type=Path, default=RUN_DIR / "fresh_bakery_clay_input_top_5000.csv")
     parser.add_argument("--output", type=Path, default=RUN_DIR / "fresh_bakery_apify_all_ig_counts_recovered.csv")
     parser.add_argument("--batch-size", type=int, default=75)
-    parser.add_argument("--workers", type=int, default=2)
     parser.add_argument("--limit", type=int, default=0)
     args = parser.parse_args()
 
@@ -170,27 +186,9 @@ def main() -> None:
     print(f"Already recovered/checkpointed: {len(done):,}")
     print(f"Pending: {len(pending):,}")
 
-    batches = [pending[i : i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
     started = time.monotonic()
-    recovered = existing
-
-    if batches:
-        with ThreadPoolExecutor(max_workers=args.workers) as pool:
-            futures = {
-                pool.submit(scrape_batch, batch, f"{idx + 1}/{len(batches)}"): idx
-                for idx, batch in enumerate(batches)
-            }
-            completed = 0
-            for future in as_completed(futures):
-                rows = future.result()
-                recovered = append_recovered(args.output, rows)
-                completed += 1
-                nonzero = pd.to_numeric(recovered.get("ig_followers_apify_all", 0), errors="coerce").fillna(0).gt(0).sum() if not recovered.empty else 0
-                print(
-                    f"  Completed {completed}/{len(batches)} batches | "
-                    f"checkpoint rows {len(recovered):,} | nonzero {nonzero:,}",
-                    flush=True,
-                )
+    if pending:
+        scrape_all(pending, args.output, args.batch_size)
 
     recovered = load_existing(args.output)
     merge_targets = [
@@ -11,20 +11,19 @@ import json
 import re
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import pandas as pd
-from apify_client import ApifyClient
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+import ig_profiles
+from apify_runs import print_apify_summary
 from config import APIFY_API_TOKEN
 
 RUN_DIR = ROOT / "output" / "fresh_bakery_leads_20260525"
-ACTOR_ID = "apify/instagram-profile-scraper"
 USERNAME_RE = re.compile(r"instagram\.com/([A-Za-z0-9_.]+)")
 SKIP_USERNAMES = {"p", "reel", "reels", "stories", "explore", "accounts", "share"}
 
@@ -44,23 +43,20 @@ def extract_username(value: str) -> str:
     return "" if username in SKIP_USERNAMES else username
 
 
-def scrape_batch(usernames: list[str], batch_label: str) -> list[dict]:
-    client = ApifyClient(APIFY_API_TOKEN)
-    print(f"  Apify batch {batch_label}: {len(usernames)} usernames", flush=True)
-    run = client.actor(ACTOR_ID).call(run_input={"usernames": usernames})
-    items = client.dataset(run["defaultDatasetId"]).list_items().items
+def profile_rows(found: dict[str, dict]) -> list[dict]:
     rows: list[dict] = []
-    for item in items:
-        username = str(item.get("username") or "").lower()
+    for username, v in found.items():
+        if v.get("ig_followers") is None:  # profile not found
+            continue
         rows.append(
             {
                 "ig_username": username,
-                "ig_followers_apify": item.get("followersCount", 0) or 0,
-                "ig_posts_apify": item.get("postsCount", 0) or 0,
-                "ig_full_name_apify": item.get("fullName") or item.get("full_name") or "",
-                "ig_is_private_apify": item.get("private") if "private" in item else item.get("isPrivate"),
-                "ig_is_verified_apify": item.get("verified") if "verified" in item else item.get("isVerified"),
-                "ig_apify_url": item.get("url") or f"https://www.instagram.com/{username}/",
+                "ig_followers_apify": v["ig_followers"] or 0,
+                "ig_posts_apify": v.get("ig_posts") or 0,
+                "ig_full_name_apify": v.get("ig_full_name") or "",
+                "ig_is_private_apify": v.get("ig_is_private"),
+                "ig_is_verified_apify": v.get("ig_is_verified"),
+                "ig_apify_url": f"https://www.instagram.com/{username}/",
             }
         )
     return rows
@@ -73,7 +69,6 @@ def main() -> None:
     parser.add_argument("--all-ranked", type=Path, default=RUN_DIR / "fresh_bakery_final_all_ranked.csv")
     parser.add_argument("--output-prefix", type=str, default="fresh_bakery")
     parser.add_argument("--batch-size", type=int, default=30)
-    parser.add_argument("--workers", type=int, default=3)
     args = parser.parse_args()
 
     if not APIFY_API_TOKEN:
@@ -91,23 +86,18 @@ def main() -> None:
     if not usernames:
         raise SystemExit("No valid usernames to scrape")
 
-    batches = [usernames[i : i + args.batch_size] for i in range(0, len(usernames), args.batch_size)]
     all_rows: list[dict] = []
     started = time.monotonic()
-    with ThreadPoolExecutor(max_workers=args.workers) as pool:
-        futures = {
-            pool.submit(scrape_batch, batch, f"{idx + 1}/{len(batches)}"): idx
-            for idx, batch in enumerate(batches)
-        }
-        completed = 0
-        for future in as_completed(futures):
-            batch_rows = future.result()
-            all_rows.extend(batch_rows)
-            completed += 1
-            print(
-                f"  Completed {completed}/{len(batches)} batches | recovered rows {len(all_rows):,}",
-                flush=True,
-            )
+    completed = 0
+
+    def on_batch(found: dict[str, dict]) -> None:
+        nonlocal completed
+        all_rows.extend(profile_rows(found))
+        completed += len(found)
+        print(f"  Completed {completed:,}/{len(usernames):,} usernames | recovered rows {len(all_rows):,}", flush=True)
+
+    ig_profiles.fetch("profile", usernames, ig_profiles.COUNT_FIELDS, on_batch=on_batch, batch_size=args.batch_size)
+    print_apify_summary()
 
     recovered = pd.DataFrame(all_rows)
     recovered_path = RUN_DIR / f"{args.output_prefix}_apify_ig_counts_recovered.csv"
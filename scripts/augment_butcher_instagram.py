@@ -15,22 +15,21 @@ import json
 import re
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
-from apify_client import ApifyClient
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+import ig_profiles
+from apify_runs import print_apify_summary
 from config import APIFY_API_TOKEN
 
 
 RUN_DIR = ROOT / "output" / "fresh_butcher_leads_20260531"
-ACTOR_ID = "apify/instagram-profile-scraper"
 USERNAME_RE = re.compile(r"instagram\.com/([A-Za-z0-9_.]+)")
 SKIP_USERNAMES = {"p", "reel", "reels", "stories", "explore", "accounts", "share"}
 
@@ -76,26 +75,21 @@ def load_usernames(df: pd.DataFrame) -> list[str]:
     return sorted(set(usernames))
 
 
-def scrape_batch(usernames: list[str], batch_label: str) -> pd.DataFrame:
-    client = ApifyClient(APIFY_API_TOKEN)
-    print(f"  Apify IG batch {batch_label}: {len(usernames)} usernames", flush=True)
-    run = client.actor(ACTOR_ID).call(run_input={"usernames": usernames})
-    items = client.dataset(run["defaultDatasetId"]).list_items().items
+def profile_rows(found: dict[str, dict]) -> pd.DataFrame:
     rows: list[dict] = []
-    for item in items:
-        username = str(item.get("username") or "").lower()
-        if not username:
+    for username, v in found.items():
+        if v.get("ig_followers") is None:  # profile not found
             continue
         rows.append(
             {
                 "ig_username": username,
-                "ig_followers": item.get("followersCount", 0) or 0,
-                "ig_posts": item.get("postsCount", 0) or 0,
-                "ig_full_name": item.get("fullName") or item.get("full_name") or "",
-                "ig_is_private": item.get("private") if "private" in item else item.get("isPrivate"),
-                "ig_is_verified": item.get("verified") if "verified" in item else item.get("isVerified"),
+                "ig_followers": v["ig_followers"] or 0,
+                "ig_posts": v.get("ig_posts") or 0,
+                "ig_full_name": v.get("ig_full_name") or "",
+                "ig_is_private": v.get("ig_is_private"),
+                "ig_is_verified": v.get("ig_is_verified"),
                 "ig_count_source": "apify/instagram-profile-scraper",
-                "ig_profile_url": item.get("url") or f"https://www.instagram.com/{username}/",
+                "ig_profile_url": f"https://www.instagram.com/{username}/",
             }
         )
     return pd.DataFrame(rows)
@@ -115,7 +109,6 @@ def recover_instagram_counts(
     usernames: list[str],
     counts_path: Path,
     batch_size: int,
-    workers: int,
     limit: int,
     skip_fetch: bool,
 ) -> pd.DataFrame:
@@ -135,25 +128,24 @@ def recover_instagram_counts(
     if skip_fetch:
         return existing
 
-    batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
-    recovered = existing
-    if batches:
-        with ThreadPoolExecutor(max_workers=workers) as pool:
-            futures = {
-                pool.submit(scrape_batch, batch, f"{idx + 1}/{len(batches)}"): idx
-                for idx, batch in enumerate(batches)
-            }
-            completed = 0
-            for future in as_completed(futures):
-                rows = future.result()
-                recovered = append_checkpoint(counts_path, rows)
-                completed += 1
-                nonzero = numeric(recovered.get("ig_followers", pd.Series(dtype=int))).gt(0).sum() if not recovered.empty else 0
-                print(
-                    f"  Completed {completed}/{len(batches)} batches | "
-                    f"checkpoint rows {len(recovered):,} | nonzero {nonzero:,}",
-                    flush=True,
-                )
+    completed = 0
+
+    def on_batch(found: dict[str, dict]) -> None:
+        nonlocal completed
+        recovered = append_checkpoint(counts_path, profile_rows(found))
+        completed += len(found)
+        nonzero = numeric(recovered.get("ig_followers", pd.Series(dtype=int))).gt(0).sum() if not recovered.empty else 0
+        print(
+            f"  Completed {completed:,}/{len(pending):,} usernames | "
+            f"checkpoint rows {len(recovered):,} | nonzero {nonzero:,}",
+            flush=True,
+        )
+
+    if pending:
+        ig_profiles.fetch(
+            "profile", pending, ig_profiles.COUNT_FIELDS, on_batch=on_batch, batch_size=batch_size,
+        )
+        print_apify_summary()
     return load_existing(counts_path)
 
 
@@ -228,7 +220,6 @@ def main() -> None:
     parser.add_argument("--output", type=Path, default=RUN_DIR / "fresh_butcher_social_augmented_20260601.csv")
     parser.add_argument("--custom-output", type=Path, default=ROOT / "output" / "custom-serper-scoring_kavir_20260601_butcher_5000_top.csv")
     parser.add_argument("--batch-size", type=int, default=75)
-    parser.add_argument("--workers", type=int, default=2)
     parser.add_argument("--limit", type=int, default=0)
     parser.add_argument("--skip-fetch", action="store_true")
     args = parser.parse_args()
@@ -236,7 +227,7 @@ def main() -> None:
     started = time.monotonic()
     df = pd.read_csv(args.input, low_memory=False)
     usernames = load_usernames(df)
-    recovered = recover_instagram_counts(usernames, args.counts_output, args.batch_size, args.workers, args.limit, args.skip_fetch)
+    recovered = recover_instagram_counts(usernames, args.counts_output, args.batch_size, args.limit, args.skip_fetch)
     df, merged = merge_counts(df, recovered)
 
     fb = numeric(df["fb_likes"]) if "fb_likes" in df.columns else pd.Series(0, index=df.index, dtype=int)
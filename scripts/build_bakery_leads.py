@@ -26,6 +26,7 @@ if str(ROOT) not in sys.path:
 from config import CHAIN_KEYWORDS
 from enrich import enrich_instagram
 import enrich as enrich_module
+from lead_io import numeric, truthy
 from score import score_leads
 
 
@@ -38,18 +39,10 @@ DEFAULT_SOURCE = Path(
 DEFAULT_RUN_DIR = Path("output/bakery_leads_20260525")
 
 
-def truthy(series: pd.Series) -> pd.Series:
-    return series.fillna(False).astype(str).str.lower().isin({"true", "1", "yes", "y"})
-
-
 def present(series: pd.Series) -> pd.Series:
     return series.fillna("").astype(str).str.strip().ne("")
 
 
-def numeric(series: pd.Series) -> pd.Series:
-    return pd.to_numeric(series, errors="coerce").fillna(0)
-
-
 def normalize_bool_columns(df: pd.DataFrame) -> pd.DataFrame:
     for col in ["has_email_signup", "has_ecommerce", "has_online_ordering"]:
         if col in df.columns:
@@ -12,9 +12,9 @@ Wave 2 = the 8 net-new curation channels added 2026-05-25:
   Channel 07 Cookbook authors     -> output/directories/cookbook_authors_<stamp>.csv
   Channel 08 Distributor customers-> output/directories/distributor_*_<stamp>.csv
 
-Unifies into output/wave2_master_<stamp>.csv with `channel` column and dedupe
-by (name lower, city lower, state lower). One row per dedup-key with all
-contributing sources comma-joined.
+Unifies into output/wave2_master_<stamp>.csv with `channel` column, deduped with
+entity_resolution (name within city/state, tolerant of spelling variants). One
+row per venue with all contributing sources comma-joined.
 
 Usage:
     python scripts/build_wave2_master.py
@@ -24,14 +24,20 @@ from __future__ import annotations
 
 import argparse
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 OUT = ROOT / "output"
 
+from entity_resolution import resolve as resolve_entities  # noqa: E402
+from lead_io import AWARD_SCHEMA, read_table, with_suffix, write_table  # noqa: E402
+
 
 # (channel_id, channel_name, glob_pattern_under_output)
 SOURCES = [
@@ -54,7 +60,8 @@ def _norm(s: str) -> str:
 
 
 def _latest_for_pattern(pattern: str, stamp: str | None) -> list[Path]:
-    files = sorted(OUT.glob(pattern))
+    # Patterns are written for .csv; Parquet outputs (OUTPUT_FORMAT=parquet) match too.
+    files = sorted([*OUT.glob(pattern), *OUT.glob(pattern[: -len(".csv")] + ".parquet")])
     if not files:
         return []
     if stamp:
@@ -63,7 +70,7 @@ def _latest_for_pattern(pattern: str, stamp: str | None) -> list[Path]:
 
 
 def _load_source(p: Path, channel_id: str, channel_name: str) -> pd.DataFrame:
-    df = pd.read_csv(p, dtype=str).fillna("")
+    df = read_table(p, schema=AWARD_SCHEMA)
     if df.empty:
         return df
     df["channel"] = channel_name
@@ -92,16 +99,13 @@ def build(stamp: str | None = None) -> Path:
         return Path()
 
     big = pd.concat(rows, ignore_index=True)
-    big["name_key"] = big["name"].apply(_norm)
-    big["city_key"] = big["city"].apply(_norm)
-    big["state_key"] = big["state"].apply(_norm)
-
-    big = big[big["name_key"] != ""].copy()
+    big = big[big["name"].apply(_norm) != ""].copy()
     print(f"  [wave2] union raw: {len(big)} rows")
 
-    # Group by (name, city, state) — stack all sources per venue
+    # Resolve venues across sources (entity_resolution) — stack all sources per venue
+    big["cluster_id"] = resolve_entities(big)
     agg = (
-        big.groupby(["name_key", "city_key", "state_key"], dropna=False)
+        big.groupby("cluster_id", sort=False)
         .agg(
             name=("name", "first"),
             city=("city", "first"),
@@ -121,8 +125,8 @@ def build(stamp: str | None = None) -> Path:
     )
 
     stamp = stamp or datetime.now().strftime("%Y%m%d")
-    out_path = OUT / f"wave2_master_{stamp}.csv"
-    agg.to_csv(out_path, index=False)
+    out_path = with_suffix(OUT / f"wave2_master_{stamp}.csv")
+    write_table(agg, out_path, AWARD_SCHEMA)
 
     print(f"  [wave2] unique venues: {len(agg)}")
     print(f"  [wave2] venues w/ 2+ sources: {(agg['n_sources'] >= 2).sum()}")
@@ -9,13 +9,13 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
 import re
 import sys
 from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
 
+import numpy as np
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -23,6 +23,9 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from config import CHAIN_KEYWORDS  # noqa: E402
+from score_registry import (  # noqa: E402
+    Flag, Linear, Log, Lookup, Pattern, ScoreModel, Tiers, numeric_column, register, text_column,
+)
 
 
 DEFAULT_SOURCES = [
@@ -230,12 +233,14 @@ def load_candidates(sources: list[Path]) -> pd.DataFrame:
     return candidates
 
 
+ROW_TEXT_FIELDS = [
+    "name", "business_type", "google_type", "google_types", "search_query",
+    "page_title", "source_tags", "distinctions", "blurb", "tier_reason",
+]
+
+
 def row_text(row: pd.Series) -> str:
-    fields = [
-        "name", "business_type", "google_type", "google_types", "search_query",
-        "page_title", "source_tags", "distinctions", "blurb", "tier_reason",
-    ]
-    return " ".join(str(row.get(field, "")) for field in fields)
+    return " ".join(str(row.get(field, "")) for field in ROW_TEXT_FIELDS)
 
 
 def is_prestige_row(row: pd.Series) -> bool:
@@ -372,58 +377,51 @@ def dedupe_key(row: pd.Series) -> str:
     return f"name:{name_city}"
 
 
-def score_row(row: pd.Series) -> float:
-    rating = number(row.get("rating"))
-    reviews = number(row.get("review_count"))
-    lead_score = number(row.get("lead_score"))
-    fresh_score = number(row.get("fresh_icp_score"))
-    followers = max(number(row.get("follower_count")), number(row.get("ig_followers")) + number(row.get("fb_likes")))
-    press = number(row.get("press_mentions"))
-    awards = number(row.get("awards_count"))
-    source_count = number(row.get("source_count"))
-    text = row_text(row)
-
-    score = 40.0
-    score += min(24.0, math.log1p(reviews) * 4.0)
-    score += max(0.0, (rating - 4.0) * 12.0)
-    score += min(18.0, math.log1p(followers) * 2.0)
-    score += min(14.0, lead_score * 0.14)
-    score += min(10.0, fresh_score * 0.12)
-    score += min(8.0, press * 1.5)
-    score += min(8.0, awards * 2.0)
-    score += min(7.0, source_count * 2.5)
-    score += 10.0 if is_prestige_row(row) else 0.0
-    score += 7.0 if truthy(row.get("has_club_final")) else 0.0
-    score += 5.0 if truthy(row.get("has_email_signup")) else 0.0
-    score += 4.0 if truthy(row.get("has_ecommerce")) else 0.0
-    score += 4.0 if present(row.get("instagram_url")) else 0.0
-    score += 4.0 if POSITIVE_WINE_RE.search(text) else 0.0
-
-    if LIQUOR_HEAVY_RE.search(text):
-        score -= 8.0
-    recovery_reason = str(row.get("expanded_recovery_reason", ""))
-    if recovery_reason:
-        score -= {
-            "expanded_low_review_count": 16.0,
-            "expanded_missing_website": 18.0,
-            "expanded_missing_location": 20.0,
-            "expanded_rating_exception": 20.0,
-            "expanded_hybrid_wine_retail": 12.0,
-            "expanded_liquor_beer_hybrid": 22.0,
-            "expanded_event_or_programming_flag": 18.0,
-            "prospecting_tail_wine_query": 34.0,
-        }.get(recovery_reason, 18.0)
-    return round(score, 2)
-
-
-def assign_band(score: float) -> str:
-    if score >= 90:
-        return "A - Hot Lead"
-    if score >= 72:
-        return "B - Warm Lead"
-    if score >= 55:
-        return "C - Worth a Look"
-    return "D - Low Priority"
+WINE_PRIORITY_MODEL = register(ScoreModel(
+    "wine_priority",
+    base=40.0,
+    derive={
+        "_followers": lambda df: np.maximum(
+            numeric_column(df, "follower_count"),
+            numeric_column(df, "ig_followers") + numeric_column(df, "fb_likes"),
+        ),
+        "_row_text": lambda df: text_column(df, *ROW_TEXT_FIELDS),
+        "_prestige_text": lambda df: text_column(df, "_source_file", "source_tags", "distinctions"),
+    },
+    terms=[
+        Log("review_count", scale=4.0, upper=24.0),
+        Linear("rating", offset=4.0, scale=12.0, lower=0.0),
+        Log("_followers", scale=2.0, upper=18.0),
+        Linear("lead_score", scale=0.14, upper=14.0),
+        Linear("fresh_icp_score", scale=0.12, upper=10.0),
+        Linear("press_mentions", scale=1.5, upper=8.0),
+        Linear("awards_count", scale=2.0, upper=8.0),
+        Linear("source_count", scale=2.5, upper=7.0),
+        Pattern("_prestige_text", PRESTIGE_SOURCE_RE, points=10.0),
+        Flag("has_club_final", 7.0),
+        Flag("has_email_signup", 5.0),
+        Flag("has_ecommerce", 4.0),
+        Flag("instagram_url", 4.0, test="present"),
+        Pattern("_row_text", POSITIVE_WINE_RE, points=4.0),
+        Pattern("_row_text", LIQUOR_HEAVY_RE, points=-8.0),
+        Lookup(
+            "expanded_recovery_reason",
+            {
+                "expanded_low_review_count": -16.0,
+                "expanded_missing_website": -18.0,
+                "expanded_missing_location": -20.0,
+                "expanded_rating_exception": -20.0,
+                "expanded_hybrid_wine_retail": -12.0,
+                "expanded_liquor_beer_hybrid": -22.0,
+                "expanded_event_or_programming_flag": -18.0,
+                "prospecting_tail_wine_query": -34.0,
+            },
+            default=-18.0,
+            blank=0.0,
+        ),
+    ],
+    tiers=Tiers(cutoffs=(90, 72, 55)),
+))
 
 
 def build_leads(candidates: pd.DataFrame, limit: int, expanded: bool = False) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
@@ -451,8 +449,8 @@ def build_leads(candidates: pd.DataFrame, limit: int, expanded: bool = False) ->
         accepted = pd.concat([accepted, recovered], ignore_index=True, sort=False)
 
     accepted["_dedupe_key"] = accepted.apply(dedupe_key, axis=1)
-    accepted["wine_priority_score"] = accepted.apply(score_row, axis=1)
-    accepted["wine_icp_band"] = accepted["wine_priority_score"].apply(assign_band)
+    accepted["wine_priority_score"] = WINE_PRIORITY_MODEL.score(accepted)
+    accepted["wine_icp_band"] = WINE_PRIORITY_MODEL.tier(accepted, accepted["wine_priority_score"])
     accepted["_prestige_rank"] = accepted.apply(is_prestige_row, axis=1).astype(int)
     accepted["_club_rank"] = accepted["has_club_final"].apply(truthy).astype(int)
     accepted["_reviews_rank"] = accepted["review_count"].apply(number)
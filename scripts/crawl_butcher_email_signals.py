@@ -13,8 +13,8 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
 import re
+import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -32,6 +32,14 @@ except ImportError:  # pragma: no cover
 
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from lead_io import numeric  # noqa: E402
+from page_cache import cached_get  # noqa: E402
+from score_registry import Flag, Linear, Log, Lookup, ScoreModel, register  # noqa: E402
+from site_signals import Detector  # noqa: E402
+
 RUN_DIR = ROOT / "output" / "fresh_butcher_leads_20260531"
 
 EMAIL_TERMS = [
@@ -252,6 +260,57 @@ def detect_butcher_commerce(html: str) -> dict:
     }
 
 
+COMMERCE_KEYS = [
+    "has_ecommerce_signal",
+    "ecommerce_platform",
+    "ecommerce_signal_terms",
+    "has_subscription_signal",
+    "subscription_signals",
+    "premium_signals",
+    "premium_signal_count",
+]
+
+
+class ButcherCommerceDetector(Detector):
+    """detect_butcher_commerce for the single-fetch pass in site_signals.py.
+
+    ecommerce_platform is written as butcher_ecommerce_providers so it can sit
+    next to enrich's ecommerce_platform column.
+    """
+    name = "butcher"
+    columns = {
+        "has_ecommerce_signal": False,
+        "butcher_ecommerce_providers": "",
+        "ecommerce_signal_terms": "",
+        "has_subscription_signal": False,
+        "subscription_signals": "",
+        "premium_signals": "",
+        "premium_signal_count": 0,
+    }
+    subpage_hints = FOLLOW_LINK_TERMS
+    max_subpages = 5
+
+    def start(self):
+        return {key: "" for key in COMMERCE_KEYS}
+
+    def analyze(self, page, acc):
+        commerce = detect_butcher_commerce(page.html)
+        for key in COMMERCE_KEYS:
+            if commerce.get(key) and not acc.get(key):
+                acc[key] = commerce[key]
+
+    def satisfied(self, acc):
+        return bool(acc["has_ecommerce_signal"] and acc["has_subscription_signal"])
+
+    def finalize(self, acc):
+        out = {key: acc[key] or self.columns.get(key, "") for key in COMMERCE_KEYS if key != "ecommerce_platform"}
+        out["butcher_ecommerce_providers"] = acc["ecommerce_platform"]
+        return out
+
+
+BUTCHER_COMMERCE_DETECTOR = ButcherCommerceDetector()
+
+
 def candidate_follow_links(soup: BeautifulSoup, base_url: str) -> list[str]:
     links: list[str] = []
     for tag in soup.find_all("a", href=True):
@@ -269,17 +328,21 @@ def candidate_follow_links(soup: BeautifulSoup, base_url: str) -> list[str]:
     return links[:5]
 
 
-def fetch(url: str) -> tuple[int, str, str]:
-    kwargs = {
-        "timeout": 14,
-        "allow_redirects": True,
-        "headers": {"Accept-Language": "en-US,en;q=0.9"},
-    }
+def _impersonated_get(url: str, **kwargs):
     try:
-        resp = requests.get(url, impersonate="chrome120", **kwargs)
+        return requests.get(url, impersonate="chrome120", **kwargs)
     except TypeError:
-        resp = requests.get(url, **kwargs)
-    return resp.status_code, resp.url, resp.text
+        return requests.get(url, **kwargs)
+
+
+def fetch(url: str) -> tuple[int, str, str]:
+    page = cached_get(
+        url,
+        headers={"Accept-Language": "en-US,en;q=0.9"},
+        timeout=14,
+        get=_impersonated_get,
+    )
+    return page.status, page.final_url, page.text
 
 
 def crawl_one(row: dict) -> dict:
@@ -346,15 +409,7 @@ def crawl_one(row: dict) -> dict:
                 if email2["email_signup_confidence"] > result["email_signup_confidence"]:
                     result.update(email2)
                     result["newsletter_url"] = final2 if email2["has_email_signup"] else result["newsletter_url"]
-                for key in [
-                    "has_ecommerce_signal",
-                    "ecommerce_platform",
-                    "ecommerce_signal_terms",
-                    "has_subscription_signal",
-                    "subscription_signals",
-                    "premium_signals",
-                    "premium_signal_count",
-                ]:
+                for key in COMMERCE_KEYS:
                     if commerce2.get(key) and not result.get(key):
                         result[key] = commerce2[key]
                 if result["has_email_signup"] and result["has_subscription_signal"] and result["has_ecommerce_signal"]:
@@ -382,38 +437,35 @@ def present_series(df: pd.DataFrame, col: str) -> pd.Series:
 def numeric_series(df: pd.DataFrame, col: str) -> pd.Series:
     if col not in df:
         return pd.Series(0, index=df.index, dtype=float)
-    return pd.to_numeric(df[col], errors="coerce").fillna(0)
+    return numeric(df[col])
+
+
+BUTCHER_SEED_MODEL = register(ScoreModel(
+    "butcher_seed",
+    terms=[
+        Lookup(
+            "verification_reason",
+            {
+                "keep_strong_google_type": 28,
+                "keep_adjacent_type_plus_name": 22,
+                "keep_strong_name_signal": 18,
+                "keep_butcher_text_signal": 14,
+            },
+        ),
+        Flag("has_email_signup", 10.0),
+        Flag("instagram_url", 8.0, test="present"),
+        Flag("has_ecommerce_signal", 8.0),
+        Flag("has_subscription_signal", 14.0),
+        Linear("premium_signal_count", scale=3.0, lower=0.0, upper=12.0),
+        Flag("website_reachable", 5.0),
+        Linear("rating", scale=6.0, lower=0.0, upper=30.0),
+        Log("review_count", scale=6.0, upper=24.0, base=10),
+    ],
+))
 
 
 def butcher_seed_score(df: pd.DataFrame) -> pd.Series:
-    rating = numeric_series(df, "rating")
-    reviews = numeric_series(df, "review_count")
-    type_bonus = df.get("verification_reason", "").map(
-        {
-            "keep_strong_google_type": 28,
-            "keep_adjacent_type_plus_name": 22,
-            "keep_strong_name_signal": 18,
-            "keep_butcher_text_signal": 14,
-        }
-    ).fillna(0)
-    email_bonus = bool_series(df, "has_email_signup").astype(int) * 10
-    ig_bonus = present_series(df, "instagram_url").astype(int) * 8
-    ecommerce_bonus = bool_series(df, "has_ecommerce_signal").astype(int) * 8
-    subscription_bonus = bool_series(df, "has_subscription_signal").astype(int) * 14
-    premium_bonus = numeric_series(df, "premium_signal_count").clip(0, 4) * 3
-    reachable_bonus = bool_series(df, "website_reachable").astype(int) * 5
-    review_score = reviews.apply(lambda x: min(24, math.log10(x + 1) * 6 if x > 0 else 0))
-    return (
-        type_bonus
-        + email_bonus
-        + ig_bonus
-        + ecommerce_bonus
-        + subscription_bonus
-        + premium_bonus
-        + reachable_bonus
-        + rating.clip(0, 5) * 6
-        + review_score
-    ).round(2)
+    return pd.Series(BUTCHER_SEED_MODEL.score(df), index=df.index)
 
 
 def likely_butcher_mask(df: pd.DataFrame) -> pd.Series:
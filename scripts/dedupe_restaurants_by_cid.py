@@ -12,14 +12,19 @@ Never overwrites the input.
 from __future__ import annotations
 
 import argparse
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 OUTPUT_DIR = ROOT / "output"
 
+from entity_resolution import normalize_cid  # noqa: E402
+
 
 def collect_existing_cids(exclude: Path) -> tuple[set[str], int]:
     """Union of all non-empty `cid` values across output/**.csv, EXCLUDING every
@@ -71,9 +76,10 @@ def main() -> None:
 
     # Collapse intra-file duplicate CIDs (same Google place that survived the
     # discovery dedupe under different phone/name keys). Input is score-sorted, so
-    # keep the first (highest-ranked) occurrence. Blank CIDs are never collapsed.
-    has_cid = df["cid"].ne("")
-    dup_mask = has_cid & df["cid"].duplicated(keep="first")
+    # keep the first (highest-ranked) occurrence. Blank CIDs are never collapsed:
+    # this is a by-cid dedupe, and fuzzy name matching would drop real locations.
+    cid_key = df["cid"].map(normalize_cid)
+    dup_mask = cid_key.ne("") & cid_key.duplicated(keep="first")
     if dup_mask.any():
         print(f"Collapsed {int(dup_mask.sum()):,} intra-file duplicate-CID rows")
         df = df[~dup_mask].reset_index(drop=True)
@@ -18,6 +18,11 @@ from bs4 import BeautifulSoup
 from curl_cffi import requests
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ig_profiles import get_ig_profile_store
+
 RUN_DIR = ROOT / "output" / "fresh_bakery_leads_20260525"
 
 USERNAME_RE = re.compile(r"instagram\.com/([A-Za-z0-9_.]+)")
@@ -149,6 +154,20 @@ def main() -> None:
         df[col] = df[col].astype(object)
 
     todo = df.index[df["ig_username"].fillna("").astype(str).str.strip().ne("")].tolist()
+
+    # Handles with fresh counts in the shared profile store are not re-fetched
+    store = get_ig_profile_store()
+    if store is not None:
+        fresh = store.fresh(df.loc[todo, "ig_username"], ("ig_followers", "ig_posts"))
+        fresh = {u: v for u, v in fresh.items() if v["ig_followers"] is not None}
+        for i in todo:
+            v = fresh.get(df.at[i, "ig_username"])
+            if v:
+                df.at[i, "ig_followers"] = v["ig_followers"]
+                df.at[i, "ig_posts"] = v["ig_posts"]
+                df.at[i, "ig_count_source"] = "ig_profile_store"
+        todo = [i for i in todo if df.at[i, "ig_username"] not in fresh]
+        print(f"Profile store: {len(fresh):,} handles with fresh counts")
     print(f"Fetching Instagram counts for {len(todo):,}/{len(df):,} rows with usernames")
 
     started = time.monotonic()
@@ -160,6 +179,11 @@ def main() -> None:
             result = future.result()
             for col, value in result.items():
                 df.at[i, col] = value
+            if store is not None and result["ig_followers"] is not None:
+                fields = ["ig_followers", "ig_posts"]
+                if result["ig_count_source"] == "web_profile_info":
+                    fields += ["ig_full_name", "ig_is_private"]
+                store.put({result["ig_username"]: {f: result[f] for f in fields}}, result["ig_count_source"])
             completed += 1
             if completed % 25 == 0 or completed == len(todo):
                 elapsed = max(time.monotonic() - started, 1)
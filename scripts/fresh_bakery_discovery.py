@@ -11,7 +11,6 @@ import argparse
 import os
 import re
 import sys
-import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
@@ -24,6 +23,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from config import CITIES, CHAIN_KEYWORDS, SERPER_API_KEY
+from serper import serper_post
 
 
 RUN_DIR = ROOT / "output" / "fresh_bakery_leads_20260525"
@@ -67,21 +67,6 @@ RESTAURANT_ONLY_RE = re.compile(
     re.I,
 )
 
-_rate_lock = threading.Lock()
-_last_times: list[float] = []
-
-
-def rate_limit(rps: int) -> None:
-    with _rate_lock:
-        now = time.monotonic()
-        while _last_times and _last_times[0] < now - 1:
-            _last_times.pop(0)
-        if len(_last_times) >= rps:
-            wait = _last_times[0] + 1 - now
-            if wait > 0:
-                time.sleep(wait)
-        _last_times.append(time.monotonic())
-
 
 def parse_city_state(address: str) -> tuple[str, str]:
     address = re.sub(r",?\s*United States\s*$", "", str(address or ""), flags=re.I)
@@ -99,7 +84,6 @@ def is_chain(name: str) -> bool:
 
 
 def call_serper_maps(query: str, city: str, rps: int) -> list[dict]:
-    rate_limit(rps)
     headers = {"X-API-KEY": SERPER_API_KEY or "", "Content-Type": "application/json"}
     payload = {
         "q": query,
@@ -110,7 +94,7 @@ def call_serper_maps(query: str, city: str, rps: int) -> list[dict]:
     }
     for attempt in range(3):
         try:
-            resp = requests.post("https://google.serper.dev/maps", headers=headers, json=payload, timeout=20)
+            resp = serper_post("https://google.serper.dev/maps", headers=headers, json=payload, timeout=20, max_rps=rps)
             resp.raise_for_status()
             places = resp.json().get("places", [])
             rows = []
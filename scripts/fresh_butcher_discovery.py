@@ -15,7 +15,6 @@ import math
 import os
 import re
 import sys
-import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
@@ -31,6 +30,7 @@ if str(ROOT) not in sys.path:
 
 from butcher import BANNED_STATES, load_eligible_butcher_cities
 from config import CHAIN_KEYWORDS, SERPER_API_KEY
+from serper import serper_post
 
 
 RUN_DIR = ROOT / "output" / "fresh_butcher_leads_20260531"
@@ -87,21 +87,6 @@ RESTAURANT_ONLY_RE = re.compile(
     re.I,
 )
 
-_rate_lock = threading.Lock()
-_last_times: list[float] = []
-
-
-def rate_limit(rps: int) -> None:
-    with _rate_lock:
-        now = time.monotonic()
-        while _last_times and _last_times[0] < now - 1:
-            _last_times.pop(0)
-        if len(_last_times) >= rps:
-            wait = _last_times[0] + 1 - now
-            if wait > 0:
-                time.sleep(wait)
-        _last_times.append(time.monotonic())
-
 
 def clean_phone(value: object) -> str:
     return re.sub(r"[^\d]", "", str(value or ""))
@@ -310,12 +295,11 @@ def load_locations(args: argparse.Namespace, prior: pd.DataFrame) -> list[str]:
 
 
 def call_serper_maps(query: str, location: str, rps: int) -> list[dict]:
-    rate_limit(rps)
     headers = {"X-API-KEY": SERPER_API_KEY or "", "Content-Type": "application/json"}
     payload = {"q": query, "location": f"{location}, United States", "gl": "us", "hl": "en", "num": 20}
     for attempt in range(3):
         try:
-            resp = requests.post("https://google.serper.dev/maps", headers=headers, json=payload, timeout=20)
+            resp = serper_post("https://google.serper.dev/maps", headers=headers, json=payload, timeout=20, max_rps=rps)
             resp.raise_for_status()
             rows = []
             for p in resp.json().get("places", []):
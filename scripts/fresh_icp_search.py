@@ -9,7 +9,6 @@ from __future__ import annotations
 
 import argparse
 import csv
-import math
 import os
 import re
 import sys
@@ -28,6 +27,10 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 from config import CITIES, CHAIN_KEYWORDS, SERPER_API_KEY  # noqa: E402
+from serper import serper_post  # noqa: E402
+from score_registry import (  # noqa: E402
+    Cases, Flag, Keywords, Linear, Log, Lookup, ScoreModel, register, text_column,
+)
 
 
 OUTPUT_DIR = ROOT / "output"
@@ -293,7 +296,7 @@ def search_serper(task: SearchTask, api_key: str) -> list[dict]:
     }
     for attempt in range(3):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=20)
+            resp = serper_post(url, headers=headers, json=payload, timeout=20)
             if resp.status_code in (429, 500, 502, 503, 504):
                 time.sleep(2 ** attempt)
                 continue
@@ -394,29 +397,30 @@ def rejection_reason(row: pd.Series) -> str:
     return ""
 
 
-def score_row(row: pd.Series) -> float:
-    vertical = row["business_type"]
-    rating = pd.to_numeric(row.get("rating"), errors="coerce")
-    reviews = pd.to_numeric(row.get("review_count"), errors="coerce")
-    query_weight = pd.to_numeric(row.get("query_weight"), errors="coerce")
-    rating = 0 if pd.isna(rating) else float(rating)
-    reviews = 0 if pd.isna(reviews) else float(reviews)
-    query_weight = 0 if pd.isna(query_weight) else float(query_weight)
-
-    text = norm(f"{row.get('name')} {row.get('search_query')} {row.get('google_type')} {row.get('google_types')}")
-    score = TARGET_VERTICALS.get(vertical, 0)
-    score += query_weight
-    score += min(18, math.log1p(reviews) * 3.0)
-    score += max(0, (rating - 4.0) * 14)
-    score += 5 if row.get("website") else 0
-    score += 4 if str(row.get("price_level", "")).count("$") >= 2 else 0
-    score += 4 if row.get("search_city") in PREMIUM_CITIES else 0
-    score += sum(2.0 for term in POSITIVE_TERMS if term in text)
-    if vertical == "wine_store" and "wine bar" in text:
-        score -= 18
-    if vertical == "specialty_grocer" and "grocery store" in text:
-        score -= 8
-    return round(score, 2)
+FRESH_ICP_MODEL = register(ScoreModel(
+    "fresh_icp",
+    derive={
+        "_signal_text": lambda df: text_column(
+            df, "name", "search_query", "google_type", "google_types", normalize=True,
+        ),
+        "_price_dollars": lambda df: text_column(df, "price_level").str.count(r"\$"),
+        "_premium_city": lambda df: df["search_city"].isin(PREMIUM_CITIES),
+        "_is_wine_store": lambda df: df["business_type"].eq("wine_store"),
+        "_is_specialty_grocer": lambda df: df["business_type"].eq("specialty_grocer"),
+    },
+    terms=[
+        Lookup("business_type", TARGET_VERTICALS),
+        Linear("query_weight"),
+        Log("review_count", scale=3.0, upper=18.0),
+        Linear("rating", offset=4.0, scale=14.0, lower=0.0),
+        Flag("website", 5.0, test="bool"),
+        Cases("_price_dollars", cases=((">=", 2, 4.0),)),
+        Flag("_premium_city", 4.0, test="bool"),
+        Keywords("_signal_text", POSITIVE_TERMS, points=2.0),
+        Keywords("_signal_text", ("wine bar",), points=-18.0, where="_is_wine_store"),
+        Keywords("_signal_text", ("grocery store",), points=-8.0, where="_is_specialty_grocer"),
+    ],
+))
 
 
 def build_tasks(max_cities: int, max_queries_per_vertical: int) -> list[SearchTask]:
@@ -469,7 +473,7 @@ def discover(args: argparse.Namespace) -> pd.DataFrame:
     raw["reject_reason"] = raw.apply(rejection_reason, axis=1)
 
     accepted = raw[raw["reject_reason"].eq("")].copy()
-    accepted["fresh_icp_score"] = accepted.apply(score_row, axis=1)
+    accepted["fresh_icp_score"] = FRESH_ICP_MODEL.score(accepted)
     accepted["_domain"] = accepted["website"].apply(domain)
     accepted["_phone"] = accepted["phone"].astype(str).str.replace(r"\D+", "", regex=True)
     accepted["_name_city"] = accepted.apply(
@@ -499,7 +503,7 @@ def filter_and_rank_raw(raw: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     raw["reject_reason"] = raw.apply(rejection_reason, axis=1)
 
     accepted = raw[raw["reject_reason"].eq("")].copy()
-    accepted["fresh_icp_score"] = accepted.apply(score_row, axis=1)
+    accepted["fresh_icp_score"] = FRESH_ICP_MODEL.score(accepted)
     accepted["_domain"] = accepted["website"].apply(domain)
     accepted["_phone"] = accepted["phone"].astype(str).str.replace(r"\D+", "", regex=True)
     accepted["_name_city"] = accepted.apply(
@@ -18,11 +18,9 @@ from __future__ import annotations
 import argparse
 import csv
 import json
-import math
 import os
 import re
 import sys
-import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
@@ -39,6 +37,10 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from config import CHAIN_KEYWORDS, SERPER_API_KEY, TYPE_TO_PARTNER_TYPE  # noqa: E402
+from serper import serper_post  # noqa: E402
+from score_registry import (  # noqa: E402
+    Cases, Flag, Keywords, Linear, Log, Lookup, ScoreModel, register, text_column,
+)
 
 OUTPUT_DIR = ROOT / "output"
 ICP_PATH = ROOT / "docs" / "ICP.md"
@@ -177,9 +179,6 @@ PREMIUM_CITIES = {
     "Nashville", "Miami", "Charleston", "New Orleans", "Philadelphia", "Minneapolis",
 }
 
-_rate_lock = threading.Lock()
-_last_times: list[float] = []
-
 # Lower-fit cuisines (pizza-first, breakfast/brunch, burgers, most Latin American /
 # African — docs/ICP.md Appendix B "lower fit / experimental"; pizza-first is a
 # near-DQ). Rejected by default; pass --keep-lower-fit to score-demote instead.
@@ -227,18 +226,6 @@ def parse_town_state(address: object) -> tuple[str, str]:
     return ("", "")
 
 
-def rate_limit(rps: int) -> None:
-    with _rate_lock:
-        now = time.monotonic()
-        while _last_times and _last_times[0] < now - 1:
-            _last_times.pop(0)
-        if len(_last_times) >= rps:
-            wait = _last_times[0] + 1 - now
-            if wait > 0:
-                time.sleep(wait)
-        _last_times.append(time.monotonic())
-
-
 def load_locations(path: Path, max_neighborhoods: int) -> list[tuple[str, str, str]]:
     df = pd.read_csv(path)
     required = {"city", "state", "neighborhood"}
@@ -261,7 +248,6 @@ def load_locations(path: Path, max_neighborhoods: int) -> list[tuple[str, str, s
 
 
 def search_serper(task: SearchTask, api_key: str, rps: int) -> list[dict]:
-    rate_limit(rps)
     url = "https://google.serper.dev/maps"
     headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
     payload = {
@@ -273,7 +259,7 @@ def search_serper(task: SearchTask, api_key: str, rps: int) -> list[dict]:
     }
     for attempt in range(3):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=20)
+            resp = serper_post(url, headers=headers, json=payload, timeout=20, max_rps=rps)
             if resp.status_code in (429, 500, 502, 503, 504):
                 time.sleep(2 ** attempt)
                 continue
@@ -401,49 +387,46 @@ def rejection_reason(row: pd.Series) -> str:
     return ""
 
 
-def score_row(row: pd.Series) -> float:
-    """SHAP-aligned ICP score. Partner type dominates (it's SHAP #1), then
-    demand/quality proxies available from Serper, then cuisine fit (#10)."""
-    partner = row["partner_type"]
-    gtype = clean_text(row.get("google_type"))
-    rating = pd.to_numeric(row.get("rating"), errors="coerce")
-    reviews = pd.to_numeric(row.get("review_count"), errors="coerce")
-    weight = pd.to_numeric(row.get("query_weight"), errors="coerce")
-    rating = 0.0 if pd.isna(rating) else float(rating)
-    reviews = 0.0 if pd.isna(reviews) else float(reviews)
-    weight = 0.0 if pd.isna(weight) else float(weight)
-
-    text = norm(f"{row.get('name')} {row.get('search_query')}")
-
-    # Partner type (SHAP #1): destination ~2x neighborhood AGMV.
-    score = 30.0 if partner == "destination_restaurant" else 16.0
-
-    # Destination promotion from name/query acclaim signals.
-    dest_hits = sum(1 for s in DESTINATION_SIGNALS if s in text)
-    score += min(10.0, dest_hits * 4.0)
-    if partner == "neighbourhood_restaurant" and dest_hits >= 1:
-        score += 4.0  # acclaimed neighborhood spot leans destination
-
-    # Demand / quality proxies.
-    score += min(18.0, math.log1p(reviews) * 3.0)
-    score += max(0.0, (rating - 4.0) * 14.0)
-    score += weight
-
-    # Cuisine fit (Appendix B).
-    fit = cuisine_fit(gtype)
-    score += {"core": 8.0, "emerging": 4.0, "neutral": 0.0, "lower": -6.0}[fit]
-
-    # Premium positioning + market.
-    score += 4.0 if str(row.get("price_level", "")).count("$") >= 3 else (
-        2.0 if str(row.get("price_level", "")).count("$") == 2 else 0.0
-    )
-    if clean_text(row.get("city")) in PREMIUM_CITIES or clean_text(row.get("search_city")) in PREMIUM_CITIES:
-        score += 4.0
-
-    # Artisanal / brand-narrative signals (ICP dimension 3).
-    score += min(6.0, sum(1.5 for s in ARTISANAL_SIGNALS if s in norm(row.get("name"))))
-
-    return round(score, 2)
+def clean_text_series(df: pd.DataFrame, col: str) -> pd.Series:
+    """Vectorized clean_text over one column."""
+    return text_column(df, col).str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+# SHAP-aligned ICP score. Partner type dominates (it's SHAP #1), then
+# demand/quality proxies available from Serper, then cuisine fit (#10).
+# Expects `partner_type` and `cuisine_fit` (see filter_and_rank).
+ICP_SCORE_MODEL = register(ScoreModel(
+    "fresh_restaurant_icp",
+    derive={
+        "_signal_text": lambda df: text_column(df, "name", "search_query", normalize=True),
+        "_name_norm": lambda df: text_column(df, "name", normalize=True),
+        "_neighbourhood": lambda df: df["partner_type"].eq("neighbourhood_restaurant"),
+        "_price_dollars": lambda df: text_column(df, "price_level").str.count(r"\$"),
+        "_premium_city": lambda df: (
+            clean_text_series(df, "city").isin(PREMIUM_CITIES)
+            | clean_text_series(df, "search_city").isin(PREMIUM_CITIES)
+        ),
+    },
+    terms=[
+        # Partner type (SHAP #1): destination ~2x neighborhood AGMV.
+        Lookup("partner_type", {"destination_restaurant": 30.0}, default=16.0),
+        # Destination promotion from name/query acclaim signals.
+        Keywords("_signal_text", DESTINATION_SIGNALS, points=4.0, upper=10.0),
+        # Acclaimed neighborhood spot leans destination.
+        Keywords("_signal_text", DESTINATION_SIGNALS, points=4.0, upper=4.0, where="_neighbourhood"),
+        # Demand / quality proxies.
+        Log("review_count", scale=3.0, upper=18.0),
+        Linear("rating", offset=4.0, scale=14.0, lower=0.0),
+        Linear("query_weight"),
+        # Cuisine fit (Appendix B).
+        Lookup("cuisine_fit", {"core": 8.0, "emerging": 4.0, "neutral": 0.0, "lower": -6.0}),
+        # Premium positioning + market.
+        Cases("_price_dollars", cases=((">=", 3, 4.0), ("==", 2, 2.0))),
+        Flag("_premium_city", 4.0, test="bool"),
+        # Artisanal / brand-narrative signals (ICP dimension 3).
+        Keywords("_name_norm", ARTISANAL_SIGNALS, points=1.5, upper=6.0),
+    ],
+))
 
 
 def build_tasks(locations: list[tuple[str, str, str]], max_queries: int) -> list[SearchTask]:
@@ -467,7 +450,7 @@ def filter_and_rank(raw: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     if accepted.empty:
         return raw, accepted
     accepted["cuisine_fit"] = accepted["google_type"].apply(lambda g: cuisine_fit(clean_text(g)))
-    accepted["icp_score"] = accepted.apply(score_row, axis=1)
+    accepted["icp_score"] = ICP_SCORE_MODEL.score(accepted)
 
     accepted["_domain"] = accepted["website"].apply(domain)
     accepted["_phone"] = accepted["phone"].astype(str).str.replace(r"\D+", "", regex=True)
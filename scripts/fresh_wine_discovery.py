@@ -12,7 +12,6 @@ import json
 import os
 import re
 import sys
-import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
@@ -29,6 +28,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from config import CITIES, SERPER_API_KEY  # noqa: E402
+from serper import serper_post  # noqa: E402
 
 
 RUN_DIR = ROOT / "output" / "fresh_wine_leads_20260602"
@@ -64,9 +64,6 @@ REJECT_RE = re.compile(
     re.I,
 )
 
-_rate_lock = threading.Lock()
-_last_times: list[float] = []
-
 
 @dataclass(frozen=True)
 class SearchTask:
@@ -101,18 +98,6 @@ def load_locations(locations_file: Path | None, max_cities: int) -> list[str]:
     return locations[:max_cities] if max_cities else locations
 
 
-def rate_limit(rps: int) -> None:
-    with _rate_lock:
-        now = time.monotonic()
-        while _last_times and _last_times[0] < now - 1:
-            _last_times.pop(0)
-        if len(_last_times) >= rps:
-            wait = _last_times[0] + 1 - now
-            if wait > 0:
-                time.sleep(wait)
-        _last_times.append(time.monotonic())
-
-
 def clean_text(value: object) -> str:
     return re.sub(r"\s+", " ", str(value or "")).strip()
 
@@ -157,7 +142,6 @@ def likely_wine_store(row: dict) -> bool:
 
 
 def search(task: SearchTask, api_key: str, rps: int) -> list[dict]:
-    rate_limit(rps)
     url = "https://google.serper.dev/maps"
     headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
     payload = {
@@ -169,7 +153,7 @@ def search(task: SearchTask, api_key: str, rps: int) -> list[dict]:
     }
     for attempt in range(3):
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=20)
+            resp = serper_post(url, headers=headers, json=payload, timeout=20, max_rps=rps)
             if resp.status_code in {429, 500, 502, 503, 504}:
                 time.sleep(2 ** attempt)
                 continue
@@ -7,36 +7,36 @@ ESP signals (Mailchimp, Klaviyo, Substack, Beehiiv, ConvertKit, MailerLite,
 Constant Contact, Brevo, HubSpot, ActiveCampaign, Flodesk, Drip, Omnisend,
 Squarespace-native, Shopify-native, generic forms) to a resumable progress CSV.
 
+The crawl itself (resume, per-host politeness, fetch tiers, streaming CSV) is
+crawl_engine.py; this module is the signal lists and NewsletterDetector.
+
 Usage:
     python scripts/scrape_newsletter.py                 # full run
     python scripts/scrape_newsletter.py --limit 200     # smoke test
     python scripts/scrape_newsletter.py --concurrency 75
+    python scripts/scrape_newsletter.py --tiers httpx,curl_cffi   # retry blocked sites over curl_cffi
 """
 from __future__ import annotations
 
-import argparse
-import asyncio
-import csv
 import os
 import re
-import time
-from datetime import datetime, timezone
+import sys
 from urllib.parse import urljoin, urlparse
 
-import httpx
-import pandas as pd
 from selectolax.parser import HTMLParser
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import crawl_engine  # noqa: E402
+from crawl_engine import CrawlSpec  # noqa: E402
+from keyword_match import KeywordMatcher  # noqa: E402
+from site_signals import Detector  # noqa: E402
+
 SEED_PATH = os.path.join(ROOT, "output/newsletter_merchants/inputs/seed_100k.csv")
 PROGRESS_PATH = os.path.join(ROOT, "output/newsletter_merchants/raw/scrape_progress.csv")
 
-UA = (
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0 Safari/537.36"
-)
-HEADERS = {"User-Agent": UA, "Accept-Language": "en-US,en;q=0.9"}
-
 # Subpages worth probing if the homepage shows no signal.
 SUBPAGE_HINTS = (
     "newsletter", "subscribe", "sign-up", "signup", "sign up",
@@ -148,6 +148,10 @@ POPUP_TOKENS = (
     "modal-newsletter", "newsletter-modal", "subscribe-modal",
 )
 
+ESP_TOKENS = [tk for tokens in ESP_SIGNALS.values() for tk in tokens]
+ESP_MATCHER = KeywordMatcher(ESP_TOKENS)
+POPUP_MATCHER = KeywordMatcher(POPUP_TOKENS)
+
 PUBLIC_NEWSLETTER_HOSTS = (
     "substack.com", "beehiiv.com", "ghost.io", "buttondown.email",
     "buttondown.com", "revue.co",
@@ -258,10 +262,10 @@ def detect_esp(html_lower: str, link_blob_lower: str) -> tuple[list[str], list[s
     """Return (esp_canonical_names, raw_hit_tokens)."""
     hits: list[str] = []
     raw: list[str] = []
-    combined = html_lower + " " + link_blob_lower
+    found = set(ESP_MATCHER.matches(html_lower + " " + link_blob_lower))
     for name, tokens in ESP_SIGNALS.items():
         for tk in tokens:
-            if tk in combined:
+            if tk in found:
                 hits.append(name)
                 raw.append(tk)
                 break
@@ -269,8 +273,7 @@ def detect_esp(html_lower: str, link_blob_lower: str) -> tuple[list[str], list[s
 
 
 def detect_popup(html_lower: str, link_blob_lower: str) -> bool:
-    blob = html_lower + " " + link_blob_lower
-    return any(tk in blob for tk in POPUP_TOKENS)
+    return POPUP_MATCHER.search(html_lower + " " + link_blob_lower)
 
 
 def detect_newsletter_url(tree: HTMLParser, base_url: str) -> str:
@@ -307,9 +310,8 @@ def detect_embed_iframe_host(tree: HTMLParser, base_url: str) -> str:
     return ""
 
 
-def analyze_page(html: str, base_url: str) -> dict:
-    """Extract all signals from one HTML page."""
-    out = {
+def empty_page_result() -> dict:
+    return {
         "esp_platforms": [],
         "raw_signals": [],
         "form_present": False,
@@ -318,16 +320,24 @@ def analyze_page(html: str, base_url: str) -> dict:
         "newsletter_url": "",
         "embed_iframe_host": "",
     }
+
+
+def analyze_page(html: str, base_url: str) -> dict:
+    """Extract all signals from one HTML page."""
     if not html:
-        return out
+        return empty_page_result()
 
     try:
         tree = HTMLParser(html)
     except Exception:
-        return out
+        return empty_page_result()
+    return analyze_tree(tree, html.lower(), base_url)
 
+
+def analyze_tree(tree: HTMLParser, html_lower: str, base_url: str) -> dict:
+    """analyze_page over an already-parsed tree (read-only)."""
+    out = empty_page_result()
     try:
-        html_lower = html.lower()
         link_blob = " ".join(collect_link_attrs(tree)).lower()
 
         esps, raw = detect_esp(html_lower, link_blob)
@@ -361,6 +371,10 @@ def merge_page_results(dst: dict, src: dict) -> None:
             dst[k] = src[k]
 
 
+def has_signal(hits: dict) -> bool:
+    return bool(hits["esp_platforms"] or hits["form_present"] or hits["newsletter_url"])
+
+
 def pick_fallback_paths(html: str, base_url: str) -> list[str]:
     """Up to 2 same-domain subpages whose href/text hints at newsletter signup."""
     if not html:
@@ -401,212 +415,86 @@ def pick_fallback_paths(html: str, base_url: str) -> list[str]:
     return picks
 
 
-# ─── Async fetch ─────────────────────────────────────────────────────
-
+def summarize(aggregated: dict) -> dict:
+    """Flatten merged page results into the OUT_COLS string encoding."""
+    return {
+        "any_signal": "1" if has_signal(aggregated) else "",
+        "esp_platforms": ";".join(aggregated["esp_platforms"]),
+        "esp_count": str(len(aggregated["esp_platforms"])),
+        "form_present": "1" if aggregated["form_present"] else "",
+        "popup_signal": "1" if aggregated["popup_signal"] else "",
+        "newsletter_url": aggregated["newsletter_url"],
+        "embed_iframe_host": aggregated["embed_iframe_host"],
+        "form_action_host": aggregated["form_action_host"],
+        "raw_signals": ";".join(aggregated["raw_signals"]),
+    }
 
-FETCH_TIMEOUT = 12.0
 
+class NewsletterDetector(Detector):
+    """ESP/form detection over one crawled site (this script and site_signals.py).
 
-async def fetch(client: httpx.AsyncClient, url: str) -> tuple[str, str, str]:
-    """Return (html, final_url, status_str)."""
-    try:
-        r = await client.get(url, headers=HEADERS, timeout=FETCH_TIMEOUT, follow_redirects=True)
-        ct = r.headers.get("content-type", "")
-        if "text/html" not in ct and "application/xhtml" not in ct:
-            return "", str(r.url), f"non_html_{r.status_code}"
-        return r.text, str(r.url), str(r.status_code)
-    except httpx.TimeoutException:
-        return "", url, "timeout"
-    except httpx.TooManyRedirects:
-        return "", url, "too_many_redirects"
-    except httpx.HTTPError as e:
-        return "", url, f"http_err:{type(e).__name__}"
-    except Exception as e:
-        return "", url, f"err:{type(e).__name__}"
-
-
-async def scrape_one(client: httpx.AsyncClient, sem: asyncio.Semaphore, row: dict) -> dict:
-    out = {c: "" for c in OUT_COLS}
-    for k in ("cid", "name", "website", "business_type", "city", "state"):
-        out[k] = row.get(k, "")
-    out["scraped_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-    raw_url = normalize_url(str(row.get("website") or ""))
-    if not raw_url:
-        out["website_status"] = "no_url"
-        return out
-
-    aggregated = {
-        "esp_platforms": [],
-        "raw_signals": [],
-        "form_present": False,
-        "form_action_host": "",
-        "popup_signal": False,
-        "newsletter_url": "",
-        "embed_iframe_host": "",
+    Subpages are probed only if home has no signal; probing stops once an ESP shows up.
+    """
+    name = "newsletter"
+    columns = {
+        "newsletter_signal": "", "esp_platforms": "", "esp_count": "0",
+        "form_present": "", "popup_signal": "", "newsletter_url": "",
+        "embed_iframe_host": "", "form_action_host": "",
+        "newsletter_source_path": "", "esp_raw_signals": "",
     }
-    source_path = "home"
-
-    async with sem:
-        html, final_url, status = await fetch(client, raw_url)
-        out["website_status"] = status
-        out["final_url"] = final_url
-
-        if html:
-            home_hits = analyze_page(html, final_url)
-            merge_page_results(aggregated, home_hits)
-
-            # Probe subpages if home produced no signal
-            home_signal = (
-                bool(home_hits["esp_platforms"])
-                or home_hits["form_present"]
-                or home_hits["newsletter_url"]
-            )
-            if not home_signal:
-                for sp in pick_fallback_paths(html, final_url):
-                    sub_html, sub_final, sub_status = await fetch(client, sp)
-                    if not sub_html:
-                        continue
-                    sub_hits = analyze_page(sub_html, sub_final)
-                    if (
-                        sub_hits["esp_platforms"]
-                        or sub_hits["form_present"]
-                        or sub_hits["newsletter_url"]
-                    ):
-                        merge_page_results(aggregated, sub_hits)
-                        source_path = sub_final
-                        # Keep probing the second subpage only if still no ESP match
-                        if aggregated["esp_platforms"]:
-                            break
-
-    out["esp_platforms"] = ";".join(aggregated["esp_platforms"])
-    out["esp_count"] = str(len(aggregated["esp_platforms"]))
-    out["form_present"] = "1" if aggregated["form_present"] else ""
-    out["popup_signal"] = "1" if aggregated["popup_signal"] else ""
-    out["newsletter_url"] = aggregated["newsletter_url"]
-    out["embed_iframe_host"] = aggregated["embed_iframe_host"]
-    out["form_action_host"] = aggregated["form_action_host"]
-    out["source_path"] = source_path
-    out["raw_signals"] = ";".join(aggregated["raw_signals"])
-    out["any_signal"] = "1" if (
-        aggregated["esp_platforms"]
-        or aggregated["form_present"]
-        or aggregated["newsletter_url"]
-    ) else ""
-    return out
+    subpage_hints = SUBPAGE_HINTS
+    fallback_paths = FALLBACK_PATHS
+
+    def start(self):
+        return {**empty_page_result(), "source_path": "home"}
+
+    def analyze(self, page, acc):
+        hits = analyze_tree(page.tree, page.html_lower, page.final_url)
+        if page.is_home:
+            merge_page_results(acc, hits)
+        elif has_signal(hits):
+            merge_page_results(acc, hits)
+            acc["source_path"] = page.final_url
+
+    def satisfied(self, acc):
+        return bool(acc["esp_platforms"]) or (acc["source_path"] == "home" and has_signal(acc))
+
+    def finalize(self, acc):
+        flat = summarize(acc)
+        flat["newsletter_signal"] = flat.pop("any_signal")
+        flat["esp_raw_signals"] = flat.pop("raw_signals")
+        flat["newsletter_source_path"] = acc["source_path"]
+        return flat
+
+
+NEWSLETTER_DETECTOR = NewsletterDetector()
 
 
 # ─── Driver ──────────────────────────────────────────────────────────
 
 
-def load_done_cids(progress_path: str) -> set[str]:
-    if not os.path.exists(progress_path):
-        return set()
-    try:
-        df = pd.read_csv(progress_path, usecols=["cid"], dtype=str)
-        return set(df["cid"].dropna().astype(str).tolist())
-    except Exception:
-        return set()
-
-
-async def main(limit: int | None, concurrency: int, timeout: float):
-    global FETCH_TIMEOUT
-    FETCH_TIMEOUT = timeout
-
-    seed = pd.read_csv(SEED_PATH, dtype=str).fillna("")
-    print(f"Loaded seed: {len(seed):,} rows")
-
-    done = load_done_cids(PROGRESS_PATH)
-    if done:
-        print(f"Resuming — {len(done):,} cids already scraped, skipping.")
-        seed = seed[~seed["cid"].astype(str).isin(done)]
-
-    if limit:
-        seed = seed.head(limit)
-    print(f"To scrape this run: {len(seed):,}")
-
-    if seed.empty:
-        print("Nothing to do.")
-        return
-
-    write_header = (
-        not os.path.exists(PROGRESS_PATH)
-        or os.path.getsize(PROGRESS_PATH) == 0
-    )
-    f = open(PROGRESS_PATH, "a", newline="", encoding="utf-8")
-    writer = csv.DictWriter(f, fieldnames=OUT_COLS, extrasaction="ignore")
-    if write_header:
-        writer.writeheader()
-        f.flush()
-
-    limits = httpx.Limits(
-        max_connections=concurrency * 2,
-        max_keepalive_connections=concurrency,
-    )
-    client_timeout = httpx.Timeout(timeout, connect=min(timeout, 6.0))
-
-    sem = asyncio.Semaphore(concurrency)
-    t0 = time.time()
-    completed = 0
-    sig_hits = 0
-    esp_hits = 0
-    form_hits = 0
-    err_hits = 0
-    flush_every = 500
-
-    rows = seed.to_dict("records")
-    total = len(rows)
-    # Chunk to keep memory bounded — pre-allocating 60K+ tasks at once OOMs.
-    chunk_size = max(concurrency * 20, 1000)
-
-    async with httpx.AsyncClient(
-        http2=True, limits=limits, timeout=client_timeout, verify=False
-    ) as client:
-        for chunk_start in range(0, total, chunk_size):
-            chunk = rows[chunk_start:chunk_start + chunk_size]
-            tasks = [asyncio.create_task(scrape_one(client, sem, r)) for r in chunk]
-            for fut in asyncio.as_completed(tasks):
-                res = await fut
-                writer.writerow(res)
-                completed += 1
-                if res["any_signal"]:
-                    sig_hits += 1
-                if res["esp_platforms"]:
-                    esp_hits += 1
-                if res["form_present"]:
-                    form_hits += 1
-                if res["website_status"] and not res["website_status"].startswith(
-                    ("200", "non_html")
-                ):
-                    err_hits += 1
-
-                if completed % flush_every == 0:
-                    f.flush()
-                    elapsed = time.time() - t0
-                    rate = completed / elapsed if elapsed > 0 else 0
-                    eta = (total - completed) / rate if rate > 0 else 0
-                    print(
-                        f"  [{completed:,}/{total:,}] "
-                        f"any={sig_hits} esp={esp_hits} form={form_hits} err={err_hits} "
-                        f"| {rate:.1f}/s | ETA {eta/60:.1f}min",
-                        flush=True,
-                    )
-            # Release task list memory between chunks
-            tasks.clear()
-            f.flush()
-
-    f.flush()
-    f.close()
-    print(
-        f"\nDone in {(time.time()-t0)/60:.1f}min. "
-        f"any={sig_hits} esp={esp_hits} form={form_hits} errors={err_hits}"
-    )
+def progress_row(seed_row: dict, out: dict) -> dict:
+    """Detector columns -> the historical scrape_progress.csv names."""
+    return {
+        **out,
+        "website_status": out.get("site_status", ""),
+        "final_url": out.get("site_final_url", ""),
+        "any_signal": out.get("newsletter_signal", ""),
+        "source_path": out.get("newsletter_source_path", ""),
+        "raw_signals": out.get("esp_raw_signals", ""),
+        "scraped_at": out.get("site_analyzed_at", ""),
+    }
+
+
+SPEC = CrawlSpec(
+    seed_path=SEED_PATH,
+    progress_path=PROGRESS_PATH,
+    detectors=[NEWSLETTER_DETECTOR],
+    columns=OUT_COLS,
+    finish=progress_row,
+    counters={"any": "any_signal", "esp": "esp_platforms", "form": "form_present"},
+)
 
 
 if __name__ == "__main__":
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--limit", type=int, default=None)
-    ap.add_argument("--concurrency", type=int, default=50)
-    ap.add_argument("--timeout", type=float, default=12.0)
-    args = ap.parse_args()
-    asyncio.run(main(args.limit, args.concurrency, args.timeout))
+    crawl_engine.main(SPEC)
@@ -4,6 +4,8 @@ Async Tock/Resy/OpenTable link scraper for the April 2026 lead universe.
 Reads output/resy_tock_merchants/inputs/seed_52k.csv, fetches each merchant
 website (and up to 2 reservation-pathed subpages), and writes any detected
 exploretock.com / resy.com / opentable.com links to a resumable progress CSV.
+The crawl itself (resume, per-host politeness, fetch tiers, streaming CSV) is
+crawl_engine.py.
 
 Usage:
     python scripts/scrape_resy_tock.py                 # full run
@@ -12,30 +14,24 @@ Usage:
 """
 from __future__ import annotations
 
-import argparse
-import asyncio
-import csv
 import os
 import re
 import sys
-import time
-from datetime import datetime, timezone
 from urllib.parse import urljoin, urlparse
 
-import httpx
-import pandas as pd
 from selectolax.parser import HTMLParser
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import crawl_engine  # noqa: E402
+from crawl_engine import CrawlSpec  # noqa: E402
+from site_signals import Detector  # noqa: E402
+
 SEED_PATH = os.path.join(ROOT, "output/resy_tock_merchants/inputs/seed_52k.csv")
 PROGRESS_PATH = os.path.join(ROOT, "output/resy_tock_merchants/raw/scrape_progress.csv")
 
-UA = (
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0 Safari/537.36"
-)
-HEADERS = {"User-Agent": UA, "Accept-Language": "en-US,en;q=0.9"}
-
 SUBPAGE_HINTS = ("reservation", "reserve", "book", "booking")
 FALLBACK_PATHS = ("/reservations", "/reserve", "/book", "/booking", "/menu")
 
@@ -104,14 +100,19 @@ def normalize_url(url: str) -> str:
 
 def extract_platform_links(html: str, base_url: str) -> dict:
     """Scan parsed HTML for tock/resy/opentable links in <a> and <iframe>."""
-    out = {"tock_url": "", "resy_url": "", "opentable_url": ""}
     if not html:
-        return out
+        return {"tock_url": "", "resy_url": "", "opentable_url": ""}
 
     try:
         tree = HTMLParser(html)
     except Exception:
-        return out
+        return {"tock_url": "", "resy_url": "", "opentable_url": ""}
+    return platform_links_from_tree(tree, html, base_url)
+
+
+def platform_links_from_tree(tree: HTMLParser, html: str, base_url: str) -> dict:
+    """extract_platform_links over an already-parsed tree (read-only)."""
+    out = {"tock_url": "", "resy_url": "", "opentable_url": ""}
 
     # Walk a + iframe + link tags
     candidates = []
@@ -180,173 +181,89 @@ def pick_fallback_paths(html: str, base_url: str) -> list[str]:
     return picks
 
 
-# ── Async fetch ──────────────────────────────────────────────────────
-
-
-FETCH_TIMEOUT = 12.0
-
-async def fetch(client: httpx.AsyncClient, url: str) -> tuple[str, str, str]:
-    """Return (html, final_url, status_str)."""
-    try:
-        r = await client.get(url, headers=HEADERS, timeout=FETCH_TIMEOUT, follow_redirects=True)
-        ct = r.headers.get("content-type", "")
-        if "text/html" not in ct and "application/xhtml" not in ct:
-            return "", str(r.url), f"non_html_{r.status_code}"
-        return r.text, str(r.url), str(r.status_code)
-    except httpx.TimeoutException:
-        return "", url, "timeout"
-    except httpx.TooManyRedirects:
-        return "", url, "too_many_redirects"
-    except httpx.HTTPError as e:
-        return "", url, f"http_err:{type(e).__name__}"
-    except Exception as e:
-        return "", url, f"err:{type(e).__name__}"
-
-
-async def scrape_one(client: httpx.AsyncClient, sem: asyncio.Semaphore, row: dict) -> dict:
-    out = {c: "" for c in OUT_COLS}
-    for k in ("cid", "name", "website", "business_type", "city", "state"):
-        out[k] = row.get(k, "")
-    out["scraped_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-    raw_url = normalize_url(str(row.get("website") or ""))
-    if not raw_url:
-        out["website_status"] = "no_url"
-        return out
-
-    async with sem:
-        html, final_url, status = await fetch(client, raw_url)
-        out["website_status"] = status
-        out["final_url"] = final_url
-        out["source_path"] = "home"
-
-        if html:
-            hits = extract_platform_links(html, final_url)
-            out["tock_url"] = hits["tock_url"]
-            out["resy_url"] = hits["resy_url"]
-            out["opentable_url"] = hits["opentable_url"]
-
-            # Fallback subpages if no tock/resy found — skip for wine_store (low yield)
-            biz_type = (row.get("business_type") or "").lower()
-            if not out["tock_url"] and not out["resy_url"] and biz_type != "wine_store":
-                subpages = pick_fallback_paths(html, final_url)
-                for sp in subpages:
-                    sub_html, sub_final, sub_status = await fetch(client, sp)
-                    if not sub_html:
-                        continue
-                    hits2 = extract_platform_links(sub_html, sub_final)
-                    if hits2["tock_url"] or hits2["resy_url"] or hits2["opentable_url"]:
-                        if not out["tock_url"]:
-                            out["tock_url"] = hits2["tock_url"]
-                        if not out["resy_url"]:
-                            out["resy_url"] = hits2["resy_url"]
-                        if not out["opentable_url"]:
-                            out["opentable_url"] = hits2["opentable_url"]
-                        out["source_path"] = sub_final
-                        if out["tock_url"] and out["resy_url"]:
-                            break
-
-    out["tock_slug"] = parse_tock_slug(out["tock_url"])
-    out["resy_slug"] = parse_resy_slug(out["resy_url"])
-    out["tock_embed_only"] = "1" if out["tock_url"] and not out["tock_slug"] else ""
-    out["resy_embed_only"] = "1" if out["resy_url"] and not out["resy_slug"] else ""
-    return out
+def slug_columns(tock_url: str, resy_url: str) -> dict:
+    tock_slug = parse_tock_slug(tock_url)
+    resy_slug = parse_resy_slug(resy_url)
+    return {
+        "tock_slug": tock_slug,
+        "resy_slug": resy_slug,
+        "tock_embed_only": "1" if tock_url and not tock_slug else "",
+        "resy_embed_only": "1" if resy_url and not resy_slug else "",
+    }
+
+
+class ReservationDetector(Detector):
+    """Platform-link detection over one crawled site (this script and site_signals.py).
+
+    Subpages are probed only if home has no Tock/Resy link (never for
+    wine_store rows); probing stops once both are found.
+    """
+    name = "reservations"
+    columns = {
+        "tock_url": "", "tock_slug": "", "tock_embed_only": "",
+        "resy_url": "", "resy_slug": "", "resy_embed_only": "",
+        "opentable_url": "", "reservation_source_path": "",
+    }
+    subpage_hints = SUBPAGE_HINTS
+    fallback_paths = FALLBACK_PATHS
+
+    def start(self):
+        return {"tock_url": "", "resy_url": "", "opentable_url": "", "source_path": "home"}
+
+    def analyze(self, page, acc):
+        hits = platform_links_from_tree(page.tree, page.html, page.final_url)
+        if not page.is_home and not any(hits.values()):
+            return
+        for key, val in hits.items():
+            if not acc[key]:
+                acc[key] = val
+        if not page.is_home:
+            acc["source_path"] = page.final_url
+
+    def satisfied(self, acc):
+        if acc["source_path"] == "home":
+            return bool(acc["tock_url"] or acc["resy_url"])
+        return bool(acc["tock_url"] and acc["resy_url"])
+
+    def wants_subpages(self, row):
+        return (row.get("business_type") or "").lower() != "wine_store"
+
+    def finalize(self, acc):
+        return {
+            "tock_url": acc["tock_url"],
+            "resy_url": acc["resy_url"],
+            "opentable_url": acc["opentable_url"],
+            "reservation_source_path": acc["source_path"],
+            **slug_columns(acc["tock_url"], acc["resy_url"]),
+        }
+
+
+RESERVATION_DETECTOR = ReservationDetector()
 
 
 # ── Driver ───────────────────────────────────────────────────────────
 
 
-def load_done_cids(progress_path: str) -> set[str]:
-    if not os.path.exists(progress_path):
-        return set()
-    try:
-        df = pd.read_csv(progress_path, usecols=["cid"], dtype=str)
-        return set(df["cid"].dropna().astype(str).tolist())
-    except Exception:
-        return set()
-
-
-async def main(limit: int | None, concurrency: int, timeout: float):
-    global FETCH_TIMEOUT
-    FETCH_TIMEOUT = timeout
-    seed = pd.read_csv(SEED_PATH, dtype=str).fillna("")
-    print(f"Loaded seed: {len(seed):,} rows")
-
-    done = load_done_cids(PROGRESS_PATH)
-    if done:
-        print(f"Resuming — {len(done):,} cids already scraped, skipping.")
-        seed = seed[~seed["cid"].astype(str).isin(done)]
-
-    if limit:
-        seed = seed.head(limit)
-    print(f"To scrape this run: {len(seed):,}")
-
-    if seed.empty:
-        print("Nothing to do.")
-        return
-
-    write_header = not os.path.exists(PROGRESS_PATH) or os.path.getsize(PROGRESS_PATH) == 0
-    f = open(PROGRESS_PATH, "a", newline="", encoding="utf-8")
-    writer = csv.DictWriter(f, fieldnames=OUT_COLS, extrasaction="ignore")
-    if write_header:
-        writer.writeheader()
-        f.flush()
-
-    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
-    client_timeout = httpx.Timeout(timeout, connect=min(timeout, 6.0))
-
-    sem = asyncio.Semaphore(concurrency)
-    t0 = time.time()
-    completed = 0
-    tock_hits = 0
-    resy_hits = 0
-    ot_hits = 0
-    err_hits = 0
-    flush_every = 500
-
-    async with httpx.AsyncClient(
-        http2=True, limits=limits, timeout=client_timeout, verify=False
-    ) as client:
-        rows = seed.to_dict("records")
-        tasks = [asyncio.create_task(scrape_one(client, sem, r)) for r in rows]
-
-        for fut in asyncio.as_completed(tasks):
-            res = await fut
-            writer.writerow(res)
-            completed += 1
-            if res["tock_url"]:
-                tock_hits += 1
-            if res["resy_url"]:
-                resy_hits += 1
-            if res["opentable_url"]:
-                ot_hits += 1
-            if res["website_status"] and not res["website_status"].startswith(("200", "non_html")):
-                err_hits += 1
-
-            if completed % flush_every == 0:
-                f.flush()
-                elapsed = time.time() - t0
-                rate = completed / elapsed if elapsed > 0 else 0
-                eta = (len(rows) - completed) / rate if rate > 0 else 0
-                print(
-                    f"  [{completed:,}/{len(rows):,}] "
-                    f"tock={tock_hits} resy={resy_hits} ot={ot_hits} err={err_hits} "
-                    f"| {rate:.1f}/s | ETA {eta/60:.1f}min",
-                    flush=True,
-                )
-
-    f.flush()
-    f.close()
-    print(
-        f"\nDone in {(time.time()-t0)/60:.1f}min. "
-        f"tock={tock_hits} resy={resy_hits} opentable={ot_hits} errors={err_hits}"
-    )
+def progress_row(seed_row: dict, out: dict) -> dict:
+    """Detector columns -> the historical scrape_progress.csv names."""
+    return {
+        **out,
+        "website_status": out.get("site_status", ""),
+        "final_url": out.get("site_final_url", ""),
+        "source_path": out.get("reservation_source_path", ""),
+        "scraped_at": out.get("site_analyzed_at", ""),
+    }
+
+
+SPEC = CrawlSpec(
+    seed_path=SEED_PATH,
+    progress_path=PROGRESS_PATH,
+    detectors=[RESERVATION_DETECTOR],
+    columns=OUT_COLS,
+    finish=progress_row,
+    counters={"tock": "tock_url", "resy": "resy_url", "ot": "opentable_url"},
+)
 
 
 if __name__ == "__main__":
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--limit", type=int, default=None)
-    ap.add_argument("--concurrency", type=int, default=50)
-    ap.add_argument("--timeout", type=float, default=12.0)
-    args = ap.parse_args()
-    asyncio.run(main(args.limit, args.concurrency, args.timeout))
+    crawl_engine.main(SPEC)
@@ -0,0 +1,441 @@
+"""
+Serper API access shared by every caller in the repo.
+
+All Serper traffic (discover, enrich, backfill_type*, jobs/, awards/,
+directories/, best_wine_shops/ and the scripts/ discovery runs) goes through
+`serper_post` / `async_serper_post`, which take a token from one
+machine-wide bucket before each request:
+
+  - True token bucket: O(1) per call, refilled at the current rate, at most
+    SERPER_BURST tokens banked. A caller that finds the bucket empty
+    reserves a future token and sleeps outside every lock.
+  - Cross-process: the bucket state lives in a 32-byte file guarded by
+    flock, so two pipelines running side by side share SERPER_RPS instead of
+    each taking it.
+  - Adaptive (AIMD): a 429 halves the shared rate (floor SERPER_MIN_RPS) and
+    drains the bucket; every success adds SERPER_RPS / 400 back, so full speed
+    returns after a few hundred clean calls.
+
+Callers keep their own retry loops; the limiter only paces and learns.
+
+Successful responses are cached in SQLite (SERPER_CACHE_PATH), keyed by
+endpoint + request payload (query and location case/whitespace-folded), with
+a per-endpoint TTL (SERPER_CACHE_TTL_DAYS). A cache hit costs neither a token
+nor a credit. In offline mode (`set_offline(True)`, SERPER_OFFLINE=1 or the
+entry points' --offline) misses are answered with a 504 instead of a request,
+so a filter tweak can be replayed against last run's responses for free.
+`print_serper_summary()` prints the hit/miss/cost line at the end of a run.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json as jsonlib
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+import requests
+
+import telemetry
+from config import (
+    SERPER_API_KEY, SERPER_BURST, SERPER_CACHE_DEFAULT_TTL_DAYS, SERPER_CACHE_ENABLED,
+    SERPER_CACHE_PATH, SERPER_CACHE_TTL_DAYS, SERPER_LIMITER_PATH, SERPER_MIN_RPS,
+    SERPER_OFFLINE, SERPER_RPS, SERPER_USD_PER_1K,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover — Windows: limiter is per-process only
+    fcntl = None
+
+_STATE = struct.Struct("<dddd")  # tokens, updated_at, rate, last_cut (epoch seconds)
+_DECREASE = 0.5
+_CUT_INTERVAL = 1.0    # 429s within this window of the last cut count as one
+_INCREASE_STEPS = 400  # successes to climb from 0 back to max_rate
+
+
+class TokenBucket:
+    """In-process token bucket (O(1), thread-safe).
+
+    Used for per-run caps below the shared rate (the scripts' --rps flags).
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - 1.0
+            self._updated = now
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class SharedTokenBucket:
+    """Token bucket whose state is shared through a flock-guarded file."""
+
+    def __init__(self, path: str, max_rate: float, min_rate: float, burst: float):
+        self.path = path
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = max(1.0, burst)
+        self._lock = threading.Lock()  # flock is per open file, not per thread
+        self._fd: int | None = None
+
+    # ── state file ──
+    def _open(self) -> int:
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _update(self, fn):
+        """Run fn(tokens, rate, last_cut, now) -> (tokens, rate, last_cut, result) atomically."""
+        with self._lock:
+            fd = self._open()
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                now = time.time()
+                raw = os.pread(fd, _STATE.size, 0)
+                if len(raw) == _STATE.size:
+                    tokens, updated, rate, last_cut = _STATE.unpack(raw)
+                    rate = min(max(rate, self.min_rate), self.max_rate)
+                    tokens = min(self.burst, tokens + max(0.0, now - updated) * rate)
+                else:
+                    tokens, rate, last_cut = self.burst, self.max_rate, 0.0
+                tokens, rate, last_cut, result = fn(tokens, rate, last_cut, now)
+                os.pwrite(fd, _STATE.pack(tokens, now, rate, last_cut), 0)
+                return result
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    # ── pacing ──
+    def reserve(self) -> float:
+        """Take one token now; return how long the caller must wait before using it."""
+        def take(tokens, rate, last_cut, now):
+            tokens -= 1.0
+            return tokens, rate, last_cut, (-tokens / rate if tokens < 0 else 0.0)
+        return self._update(take)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    # ── feedback ──
+    def record(self, status_code: int) -> None:
+        """AIMD: multiplicative decrease on 429, additive increase on success."""
+        if status_code == 429:
+            def backoff(tokens, rate, last_cut, now):
+                if now - last_cut < _CUT_INTERVAL:  # in-flight requests from before the cut
+                    return tokens, rate, last_cut, None
+                return min(tokens, 0.0), max(self.min_rate, rate * _DECREASE), now, None
+            self._update(backoff)
+        elif status_code < 400:
+            step = self.max_rate / _INCREASE_STEPS
+
+            def recover(tokens, rate, last_cut, now):
+                return tokens, min(self.max_rate, rate + step), last_cut, None
+            self._update(recover)
+
+    def current_rate(self) -> float:
+        return self._update(lambda tokens, rate, last_cut, now: (tokens, rate, last_cut, rate))
+
+
+# ─── Response cache ──────────────────────────────────────────────────
+
+_DAY = 86_400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    endpoint    TEXT NOT NULL,
+    query       TEXT NOT NULL DEFAULT '',
+    location    TEXT NOT NULL DEFAULT '',
+    payload     TEXT NOT NULL,
+    body        BLOB NOT NULL,
+    fetched_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_endpoint ON responses(endpoint, fetched_at);
+"""
+
+
+def _fold(value) -> str:
+    return " ".join(str(value).split()).lower()
+
+
+def cache_key(url: str, payload: dict) -> tuple[str, str]:
+    """(endpoint, key) for a request. The API key header is never part of it."""
+    endpoint = urlsplit(url).path.strip("/") or url
+    canonical = {k: (_fold(v) if k in ("q", "location") else v) for k, v in payload.items()}
+    raw = endpoint + "\n" + jsonlib.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return endpoint, hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CachedResponse:
+    """Enough of a requests/httpx response for the Serper callers."""
+
+    def __init__(self, status_code: int, content: bytes, url: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+        self.headers: dict = {}
+        self.from_cache = status_code == 200
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    is_success = ok
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return jsonlib.loads(self.content or b"{}")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} (serper offline cache miss)", response=self)
+
+
+class SerperCache:
+    def __init__(self, path: str = SERPER_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @staticmethod
+    def ttl(endpoint: str) -> float:
+        return SERPER_CACHE_TTL_DAYS.get(endpoint, SERPER_CACHE_DEFAULT_TTL_DAYS) * _DAY
+
+    def lookup(self, url: str, payload: dict, *, any_age: bool = False) -> bytes | None:
+        """Cached body if present and within the endpoint's TTL (any age when replaying)."""
+        endpoint, key = cache_key(url, payload)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, fetched_at FROM responses WHERE key = ?", (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        body, fetched_at = row
+        if not any_age and time.time() - fetched_at >= self.ttl(endpoint):
+            return None
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return None
+
+    def store(self, url: str, payload: dict, content: bytes) -> None:
+        endpoint, key = cache_key(url, payload)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, query, location, payload, body, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, str(payload.get("q", "")), str(payload.get("location", "")),
+                 jsonlib.dumps(payload, sort_keys=True), zlib.compress(content), time.time()),
+            )
+            self._db.commit()
+
+
+class SerperStats:
+    """Per-process counters for the end-of-run summary line."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.billed = 0
+        self.offline_misses = 0
+
+    def add(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    @property
+    def cost(self) -> float:
+        return self.billed * SERPER_USD_PER_1K / 1000
+
+    def summary(self) -> str:
+        total = self.hits + self.billed + self.offline_misses
+        rate = self.hits / total * 100 if total else 0.0
+        line = (
+            f"serper: {total} queries, {self.hits} cached ({rate:.0f}%), "
+            f"{self.billed} billed (~${self.cost:.3f})"
+        )
+        if self.offline_misses:
+            line += f", {self.offline_misses} offline misses"
+        return line
+
+
+stats = SerperStats()
+_offline = SERPER_OFFLINE
+_cache: SerperCache | None = None
+_cache_lock = threading.Lock()
+
+
+def set_offline(offline: bool = True) -> None:
+    """Replay mode: serve only from cache (any age); misses return a 504."""
+    global _offline
+    _offline = offline
+
+
+def is_offline() -> bool:
+    return _offline
+
+
+def get_serper_cache() -> SerperCache | None:
+    """Process-wide cache, or None when SERPER_CACHE=0."""
+    global _cache
+    if not SERPER_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SerperCache()
+        return _cache
+
+
+def print_serper_summary() -> None:
+    """End-of-run hit/miss/cost line; silent when Serper was never called."""
+    if stats.hits or stats.billed or stats.offline_misses:
+        print(stats.summary())
+
+
+def _from_cache(url: str, payload: dict) -> CachedResponse | None:
+    cache = get_serper_cache()
+    body = cache.lookup(url, payload, any_age=_offline) if cache is not None else None
+    if body is not None:
+        stats.add("hits")
+        telemetry.record("serper", status=200, nbytes=len(body), cached=True)
+        return CachedResponse(200, body, url)
+    if _offline:
+        stats.add("offline_misses")
+        return CachedResponse(504, b"{}", url)
+    return None
+
+
+def _to_cache(url: str, payload: dict, resp, latency: float) -> None:
+    telemetry.record(
+        "serper", latency=latency, status=resp.status_code, nbytes=len(resp.content),
+        cost=SERPER_USD_PER_1K / 1000 if resp.status_code == 200 else 0.0,
+    )
+    if resp.status_code != 200:  # errors and 429s aren't billed or cached
+        return
+    stats.add("billed")
+    cache = get_serper_cache()
+    if cache is not None:
+        cache.store(url, payload, resp.content)
+
+
+# ─── Rate-limited, cached POST ───────────────────────────────────────
+
+_limiter: SharedTokenBucket | None = None
+_caps: dict[float, TokenBucket] = {}
+_limiter_lock = threading.Lock()
+
+
+def get_serper_limiter() -> SharedTokenBucket:
+    """Process-wide handle on the machine-wide Serper bucket."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = SharedTokenBucket(SERPER_LIMITER_PATH, SERPER_RPS, SERPER_MIN_RPS, SERPER_BURST)
+        return _limiter
+
+
+def _cap(max_rps: float | None) -> TokenBucket | None:
+    if not max_rps or max_rps >= SERPER_RPS:
+        return None
+    with _limiter_lock:
+        if max_rps not in _caps:
+            _caps[max_rps] = TokenBucket(max_rps)
+        return _caps[max_rps]
+
+
+def _headers(headers: dict | None) -> dict:
+    return headers if headers is not None else {
+        "X-API-KEY": SERPER_API_KEY or "",
+        "Content-Type": "application/json",
+    }
+
+
+def serper_post(url: str, *, json: dict, headers: dict | None = None, timeout=20, post=None,
+                max_rps: float | None = None):
+    """Rate-limited POST to a google.serper.dev endpoint.
+
+    `post` defaults to requests.post; pass e.g. an httpx.Client's .post to
+    reuse a session. `max_rps` additionally caps this process below the
+    shared rate. Returns the response unchanged (no raise_for_status), or a
+    CachedResponse when served from the response cache.
+    """
+    cached = _from_cache(url, json)
+    if cached is not None:
+        return cached
+    cap = _cap(max_rps)
+    if cap is not None:
+        cap.acquire()
+    limiter = get_serper_limiter()
+    limiter.acquire()
+    t0 = time.perf_counter()
+    try:
+        resp = (post or requests.post)(url, json=json, headers=_headers(headers), timeout=timeout)
+    except Exception as e:
+        telemetry.record("serper", latency=time.perf_counter() - t0, status=type(e).__name__)
+        raise
+    limiter.record(resp.status_code)
+    _to_cache(url, json, resp, time.perf_counter() - t0)
+    return resp
+
+
+async def async_serper_post(client, url: str, *, json: dict, headers: dict | None = None, timeout=None,
+                            max_rps: float | None = None):
+    """serper_post for an httpx.AsyncClient."""
+    cached = _from_cache(url, json)
+    if cached is not None:
+        return cached
+    cap = _cap(max_rps)
+    if cap is not None:
+        await cap.acquire_async()
+    limiter = get_serper_limiter()
+    await limiter.acquire_async()
+    kwargs = {"json": json, "headers": _headers(headers)}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    t0 = time.perf_counter()
+    try:
+        resp = await client.post(url, **kwargs)
+    except Exception as e:
+        telemetry.record("serper", latency=time.perf_counter() - t0, status=type(e).__name__)
+        raise
+    limiter.record(resp.status_code)
+    _to_cache(url, json, resp, time.perf_counter() - t0)
+    return resp
@@ -0,0 +1,484 @@
+"""
+Single-fetch website analysis: one crawl of a merchant site feeds every detector.
+
+The same homepage used to be fetched and parsed separately by
+enrich.analyze_website (ecommerce/email/socials/reservation difficulty),
+detect_clubs (club programs), scripts/scrape_newsletter.py (ESP signals),
+scripts/scrape_resy_tock.py (Tock/Resy/OpenTable links) and
+scripts/crawl_butcher_email_signals.py (butcher commerce). Here each of those is a
+`Detector` that runs over one shared `SitePage`:
+
+  1. The homepage is fetched once (async httpx, through page_cache) and parsed
+     once; raw HTML, visible text, the selectolax tree, a lazily-built
+     BeautifulSoup and the link list are shared by every detector.
+  2. Detectors that are not yet satisfied nominate subpages (their own
+     href/anchor hints). Nominations are pooled, ranked by how many detectors
+     want each URL and fetched once each, up to `max_subpages`.
+  3. Each detector finalizes its own columns; all of them land in one row.
+
+Adding a detector: subclass `Detector` in the module that owns the signal
+lists, then list it in DETECTOR_SOURCES (or call `register_detector`).
+
+Usage:
+    python site_signals.py input.csv                           # all detectors
+    python site_signals.py input.csv --detectors website,clubs
+    python site_signals.py input.csv -o output/signals.csv --concurrency 75
+    python site_signals.py input.csv --resume --limit 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import cached_property
+from typing import Awaitable, Callable
+from urllib.parse import urljoin, urlparse
+
+import httpx
+import pandas as pd
+from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+from page_cache import async_cached_get, print_cache_summary
+
+
+# ─── Shared page ─────────────────────────────────────────────────────
+
+_INVISIBLE_TAGS = {"script", "style", "noscript"}
+
+
+@dataclass
+class SitePage:
+    """One fetched page; every parsed view is built at most once."""
+    url: str
+    final_url: str
+    status: str
+    html: str
+    is_home: bool = True
+
+    @cached_property
+    def html_lower(self) -> str:
+        return self.html.lower()
+
+    @cached_property
+    def tree(self) -> LexborHTMLParser:
+        """selectolax (lexbor) tree — detectors must treat it as read-only."""
+        return LexborHTMLParser(self.html)
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        """BeautifulSoup view for detectors written against bs4."""
+        return BeautifulSoup(self.html, "html.parser")
+
+    @cached_property
+    def text(self) -> str:
+        """Lowercased visible text (script/style/noscript excluded) of <body>."""
+        root = self.tree.body or self.tree.root
+        if root is None:
+            return self.html_lower
+        parts = []
+        for node in root.traverse(include_text=True):
+            if node.tag != "-text" or (node.parent is not None and node.parent.tag in _INVISIBLE_TAGS):
+                continue
+            chunk = (node.text_content or "").strip()
+            if chunk:
+                parts.append(chunk)
+        return " ".join(parts).lower()
+
+    @cached_property
+    def links(self) -> list[tuple[str, str]]:
+        """(href, lowercased anchor text) for every <a href>."""
+        out = []
+        for tag in self.tree.css("a[href]"):
+            href = (tag.attributes.get("href") or "").strip()
+            if href:
+                out.append((href, (tag.text() or "").strip().lower()))
+        return out
+
+
+# ─── Detector contract ───────────────────────────────────────────────
+
+class Detector:
+    """Base class for one family of website signals.
+
+    Subclasses set `name`, `columns` (output column -> default) and optionally
+    the subpage hints, then implement `analyze`. State for one site lives in a
+    plain dict created by `start()` and mutated by `analyze()`.
+    """
+    name: str = ""
+    columns: dict = {}
+    subpage_hints: tuple[str, ...] = ()  # substrings of href (and anchor text)
+    match_anchor_text: bool = True       # False → hints are matched on href only
+    fallback_paths: tuple[str, ...] = () # probed when no link matches a hint
+    max_subpages: int = 2
+
+    def start(self) -> dict:
+        return dict(self.columns)
+
+    def analyze(self, page: SitePage, acc: dict) -> None:
+        raise NotImplementedError
+
+    def satisfied(self, acc: dict) -> bool:
+        """True once subpages cannot add anything worth a fetch."""
+        return False
+
+    def wants_subpages(self, row: dict) -> bool:
+        return bool(self.subpage_hints or self.fallback_paths)
+
+    def wants_link(self, href_lower: str, anchor_text: str) -> bool:
+        if any(hint in href_lower for hint in self.subpage_hints):
+            return True
+        return self.match_anchor_text and any(hint in anchor_text for hint in self.subpage_hints)
+
+    def finalize(self, acc: dict) -> dict:
+        return {col: acc.get(col, default) for col, default in self.columns.items()}
+
+
+# name -> "module:ATTRIBUTE"; imported lazily so a run only loads what it uses.
+DETECTOR_SOURCES: dict[str, str] = {
+    "website": "enrich:WEBSITE_DETECTOR",
+    "clubs": "detect_clubs:CLUB_DETECTOR",
+    "newsletter": "scripts.scrape_newsletter:NEWSLETTER_DETECTOR",
+    "reservations": "scripts.scrape_resy_tock:RESERVATION_DETECTOR",
+    "butcher": "scripts.crawl_butcher_email_signals:BUTCHER_COMMERCE_DETECTOR",
+}
+
+_DETECTORS: dict[str, Detector] = {}
+
+
+def register_detector(detector: Detector) -> Detector:
+    """Make a detector available by name (overrides DETECTOR_SOURCES)."""
+    if not detector.name:
+        raise ValueError(f"{type(detector).__name__} has no name")
+    _DETECTORS[detector.name] = detector
+    return detector
+
+
+def get_detector(name: str) -> Detector:
+    if name not in _DETECTORS:
+        if name not in DETECTOR_SOURCES:
+            raise KeyError(f"unknown detector {name!r} (known: {', '.join(registered_detectors())})")
+        module_path, attr = DETECTOR_SOURCES[name].split(":")
+        register_detector(getattr(importlib.import_module(module_path), attr))
+    return _DETECTORS[name]
+
+
+def registered_detectors() -> list[str]:
+    return list(dict.fromkeys([*DETECTOR_SOURCES, *_DETECTORS]))
+
+
+def resolve_detectors(names: list[str] | None = None) -> list[Detector]:
+    """Load detectors by name and check their output columns don't collide."""
+    detectors = [get_detector(n) for n in (names or registered_detectors())]
+    owner: dict[str, str] = {}
+    for det in detectors:
+        for col in det.columns:
+            if col in owner or col in BASE_COLS:
+                raise ValueError(f"column {col!r} produced by both {owner.get(col, 'site_signals')} and {det.name}")
+            owner[col] = det.name
+    return detectors
+
+
+def output_columns(detectors: list[Detector]) -> list[str]:
+    return BASE_COLS + [col for det in detectors for col in det.columns]
+
+
+# ─── Crawl ───────────────────────────────────────────────────────────
+
+BASE_COLS = ["site_status", "site_final_url", "site_pages_fetched", "site_analyzed_at"]
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+FETCH_TIMEOUT = 12.0
+MAX_BODY = 1_000_000
+MAX_SUBPAGES = 4
+
+_SKIP_HREF_PREFIXES = ("mailto:", "tel:", "#", "javascript:")
+_ASSET_EXTS = (
+    ".js", ".css", ".png", ".jpg", ".jpeg", ".svg", ".ico", ".webp",
+    ".gif", ".woff", ".woff2", ".mp4", ".pdf", ".json",
+)
+
+
+def normalize_url(url) -> str:
+    url = str(url or "").strip()
+    if not url or url.lower() == "nan":
+        return ""
+    if not url.lower().startswith(("http://", "https://")):
+        url = "https://" + url
+    return url
+
+
+def _host(url: str) -> str:
+    try:
+        return urlparse(url).netloc.lower().removeprefix("www.")
+    except ValueError:
+        return ""
+
+
+class HostLimiter:
+    """Caps in-flight requests per host: `async with limiter(url): ...`."""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._sems: dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = _host(url)
+        sem = self._sems.get(host)
+        if sem is None:
+            sem = self._sems[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+
+async def fetch_page(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    is_home: bool = True,
+    limiter: HostLimiter | None = None,
+    max_body: int = MAX_BODY,
+    headers: dict | None = None,
+    timeout: float = FETCH_TIMEOUT,
+) -> SitePage:
+    """GET through the page cache. Non-HTML or failed fetches come back with html=""."""
+    headers = headers or HEADERS
+    try:
+        if limiter is None:
+            page = await async_cached_get(client, url, headers=headers, timeout=timeout, max_body=max_body)
+        else:
+            async with limiter(url):
+                page = await async_cached_get(client, url, headers=headers, timeout=timeout,
+                                              max_body=max_body)
+    except httpx.TimeoutException:
+        return SitePage(url, url, "timeout", "", is_home)
+    except httpx.TooManyRedirects:
+        return SitePage(url, url, "too_many_redirects", "", is_home)
+    except httpx.HTTPError as e:
+        return SitePage(url, url, f"http_err:{type(e).__name__}", "", is_home)
+    except Exception as e:
+        return SitePage(url, url, f"err:{type(e).__name__}", "", is_home)
+    ctype = page.content_type.lower()
+    if "text/html" not in ctype and "application/xhtml" not in ctype:
+        return SitePage(url, page.final_url, f"non_html_{page.status}", "", is_home)
+    html = page.text if page.status < 400 else ""
+    return SitePage(url, page.final_url, str(page.status), html, is_home)
+
+
+def discover_subpages(home: SitePage, detectors: list[Detector], limit: int = MAX_SUBPAGES) -> list[tuple[str, list[Detector]]]:
+    """Pool every pending detector's subpage picks into one ranked fetch list.
+
+    URLs wanted by more detectors come first; ties keep homepage link order.
+    """
+    base = home.final_url
+    base_host = _host(base)
+    wanted: dict[str, list[Detector]] = {}
+    for det in detectors:
+        picks: list[str] = []
+        for href, anchor in home.links:
+            href_l = href.lower()
+            if href_l.startswith(_SKIP_HREF_PREFIXES) or href_l.endswith(_ASSET_EXTS):
+                continue
+            if not det.wants_link(href_l, anchor):
+                continue
+            try:
+                full = urljoin(base, href).split("#")[0]
+            except ValueError:
+                continue
+            if _host(full) != base_host or full.rstrip("/") == base.rstrip("/") or full in picks:
+                continue
+            picks.append(full)
+            if len(picks) >= det.max_subpages:
+                break
+        if not picks:
+            picks = [urljoin(base, p) for p in det.fallback_paths[:det.max_subpages]]
+        for url in picks:
+            wanted.setdefault(url, []).append(det)
+    order = {url: i for i, url in enumerate(wanted)}
+    ranked = sorted(wanted, key=lambda u: (-len(wanted[u]), order[u]))
+    return [(url, wanted[url]) for url in ranked[:limit]]
+
+
+async def analyze_site(
+    client: httpx.AsyncClient,
+    url,
+    detectors: list[Detector],
+    *,
+    row: dict | None = None,
+    max_subpages: int = MAX_SUBPAGES,
+    limiter: HostLimiter | None = None,
+    max_body: int = MAX_BODY,
+    fetch: Callable[[str, bool], Awaitable[SitePage]] | None = None,
+) -> dict:
+    """Fetch a site once (+ shared subpages) and return every detector's columns.
+
+    `fetch(url, is_home)` replaces the page-cache GET (crawl_engine passes its
+    curl_cffi / Playwright tiers here); `client` is unused when it is given.
+    """
+    row = row or {}
+    if fetch is None:
+        async def fetch(page_url: str, is_home: bool) -> SitePage:
+            return await fetch_page(client, page_url, is_home=is_home, limiter=limiter, max_body=max_body)
+    states = {det.name: det.start() for det in detectors}
+    out = {
+        "site_status": "",
+        "site_final_url": "",
+        "site_pages_fetched": 0,
+        "site_analyzed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+    url = normalize_url(url)
+    if not url:
+        out["site_status"] = "no_url"
+    else:
+        home = await fetch(url, True)
+        out["site_status"] = home.status
+        out["site_final_url"] = home.final_url
+        out["site_pages_fetched"] = 1
+        if home.html:
+            for det in detectors:
+                det.analyze(home, states[det.name])
+
+            pending = [
+                det for det in detectors
+                if det.wants_subpages(row) and not det.satisfied(states[det.name])
+            ]
+            for sub_url, wanting in discover_subpages(home, pending, max_subpages):
+                active = [det for det in wanting if not det.satisfied(states[det.name])]
+                if not active:
+                    continue
+                sub = await fetch(sub_url, False)
+                out["site_pages_fetched"] += 1
+                if not sub.html:
+                    continue
+                for det in active:
+                    det.analyze(sub, states[det.name])
+
+    for det in detectors:
+        out.update(det.finalize(states[det.name]))
+    return out
+
+
+# ─── Batch runner ────────────────────────────────────────────────────
+
+def _atomic_csv_write(df: pd.DataFrame, path: str):
+    """Write CSV atomically via temp file."""
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+async def _run_async(input_path: str, output_path: str, detector_names: list[str] | None,
+                     concurrency: int, resume: bool, limit: int | None, max_subpages: int):
+    detectors = resolve_detectors(detector_names)
+    cols = output_columns(detectors)
+    print(f"Loading {input_path}...")
+    df = pd.read_csv(input_path, dtype=str, low_memory=False).fillna("")
+    if "website" not in df.columns:
+        print("ERROR: CSV must have a 'website' column.")
+        sys.exit(1)
+
+    for col in cols:
+        if col not in df.columns:
+            df[col] = ""
+        df[col] = df[col].astype("object")
+
+    if resume and os.path.exists(output_path):
+        existing = pd.read_csv(output_path, dtype=str, low_memory=False).fillna("")
+        if len(existing) == len(df) and "site_status" in existing.columns:
+            for col in cols:
+                if col in existing.columns:
+                    df[col] = existing[col].values
+            print(f"  Resuming — {int((df['site_status'] != '').sum())}/{len(df)} rows already analyzed")
+
+    todo = df.index[df["site_status"] == ""]
+    if limit is not None:
+        todo = todo[:limit]
+    if len(todo) == 0:
+        print("All rows already processed.")
+        return
+
+    print(f"  Analyzing {len(todo)} websites — detectors={','.join(d.name for d in detectors)} "
+          f"concurrency={concurrency}")
+    print()
+
+    sem = asyncio.Semaphore(concurrency)
+    timeout = httpx.Timeout(FETCH_TIMEOUT, connect=min(FETCH_TIMEOUT, 6.0))
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+
+    async def one(idx, row):
+        async with sem:
+            try:
+                return idx, await analyze_site(client, row.get("website", ""), detectors,
+                                               row=row, max_subpages=max_subpages)
+            except Exception as e:
+                return idx, {"site_status": f"err:{type(e).__name__}"}
+
+    t0 = time.time()
+    done = 0
+    pages = 0
+    chunk_size = 500
+    for start in range(0, len(todo), chunk_size):
+        chunk = todo[start:start + chunk_size]
+        # Fresh client per chunk — httpx pools degrade across ~10K distinct hosts.
+        async with httpx.AsyncClient(timeout=timeout, limits=limits, follow_redirects=True,
+                                     verify=False) as client:
+            results = await asyncio.gather(*(one(idx, df.loc[idx].to_dict()) for idx in chunk))
+        for idx, data in results:
+            for col, val in data.items():
+                df.at[idx, col] = str(val)
+            pages += int(data.get("site_pages_fetched") or 0)
+        done += len(chunk)
+        _atomic_csv_write(df, output_path)
+        elapsed = time.time() - t0
+        rate = done / elapsed if elapsed > 0 else 0
+        print(f"  [{done}/{len(todo)}] saved — {pages / done:.2f} pages/site — {rate:.1f} sites/s")
+
+    print()
+    print("=" * 60)
+    print(f"DONE: {done} sites, {pages} page fetches ({pages / done:.2f} per site)")
+    print(f"Output: {output_path}")
+    print_cache_summary()
+    print("=" * 60)
+
+
+def main():
+    import functools
+    global print
+    print = functools.partial(print, flush=True)
+
+    parser = argparse.ArgumentParser(description="Run every website detector over one fetch per site")
+    parser.add_argument("input_csv", help="Path to CSV with a 'website' column")
+    parser.add_argument("-o", "--output", help="Output CSV path (default: <input>_signals.csv)")
+    parser.add_argument("--detectors", help=f"Comma-separated subset (default: all of {','.join(DETECTOR_SOURCES)})")
+    parser.add_argument("--concurrency", type=int, default=50, help="Max concurrent sites (default: 50)")
+    parser.add_argument("--max-subpages", type=int, default=MAX_SUBPAGES,
+                        help=f"Shared subpage budget per site (default: {MAX_SUBPAGES})")
+    parser.add_argument("--resume", action="store_true", help="Resume from partial output")
+    parser.add_argument("--limit", type=int, default=None, help="Cap rows processed this run")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_csv):
+        print(f"ERROR: File not found: {args.input_csv}")
+        sys.exit(1)
+
+    names = [n.strip() for n in args.detectors.split(",") if n.strip()] if args.detectors else None
+    output_path = args.output or f"{os.path.splitext(args.input_csv)[0]}_signals.csv"
+    asyncio.run(_run_async(args.input_csv, output_path, names, args.concurrency,
+                           args.resume, args.limit, args.max_subpages))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,6 @@ import argparse
 import csv
 import json
 import os
-import time
 from datetime import datetime
 from pathlib import Path
 
@@ -60,24 +59,34 @@ def _load_seeds() -> list[dict]:
     return out
 
 
-def _fetch_seed(handle: str, *, posts_per_seed: int = POSTS_PER_SEED) -> dict:
+def _fetch_seeds(seeds: list[dict], stamp: str, *, posts_per_seed: int = POSTS_PER_SEED) -> None:
+    """Scrape posts for `seeds` through apify_runs (one run per handle, runs in
+    parallel, cached per handle) and write each raw file as its run finishes."""
     if not APIFY_API_TOKEN:
-        return {"error": "APIFY_API_TOKEN missing"}
-    try:
-        from apify_client import ApifyClient
-    except ImportError:
-        return {"error": "apify-client not installed"}
-    client = ApifyClient(APIFY_API_TOKEN)
-    try:
-        run = client.actor(APIFY_ACTOR_IG_POST).call(run_input={
-            "username": [handle],
-            "resultsLimit": posts_per_seed,
-            "skipPinnedPosts": False,
-        })
-        items = list(client.dataset(run["defaultDatasetId"]).iterate_items())
-        return {"handle": handle, "posts": items}
-    except Exception as e:
-        return {"handle": handle, "error": str(e)}
+        print("  [seed_posts] APIFY_API_TOKEN missing", flush=True)
+        return
+    from apify_runs import print_apify_summary, scrape_usernames
+
+    by_handle = {s["handle"].lower(): s for s in seeds}
+
+    def on_batch(found: dict[str, list]) -> None:
+        for handle, items in found.items():
+            s = by_handle[handle]
+            out_path = RAW_DIR / f"{s['handle']}_{stamp}.json"
+            result = {"handle": s["handle"], "posts": items, "seed_meta": s}
+            out_path.write_text(json.dumps(result, indent=2))
+            print(f"  [seed_posts] @{s['handle']} -> {len(items)} posts -> {out_path.relative_to(ROOT)}", flush=True)
+
+    found = scrape_usernames(
+        APIFY_ACTOR_IG_POST, list(by_handle),
+        lambda batch: {"username": batch, "resultsLimit": posts_per_seed, "skipPinnedPosts": False},
+        lambda item: item.get("ownerUsername") or "",
+        options={"resultsLimit": posts_per_seed, "skipPinnedPosts": False},
+        batch_size=1, on_batch=on_batch, label="seed_posts",
+    )
+    for handle in sorted(set(by_handle) - set(found)):
+        print(f"  [seed_posts] @{by_handle[handle]['handle']} failed; will retry next run", flush=True)
+    print_apify_summary()
 
 
 def fetch_all(*, handle: str | None = None, limit: int | None = None) -> None:
@@ -91,18 +100,14 @@ def fetch_all(*, handle: str | None = None, limit: int | None = None) -> None:
         seeds = seeds[:limit]
     stamp = datetime.now().strftime("%Y%m%d")
     print(f"  [seed_posts] fetching {len(seeds)} seeds", flush=True)
+    todo = []
     for s in seeds:
-        out_path = RAW_DIR / f"{s['handle']}_{stamp}.json"
-        if out_path.exists():
+        if (RAW_DIR / f"{s['handle']}_{stamp}.json").exists():
             print(f"  [seed_posts] cached: {s['handle']}", flush=True)
             continue
-        print(f"  [seed_posts] fetching @{s['handle']} ({s['name']})", flush=True)
-        result = _fetch_seed(s["handle"])
-        result["seed_meta"] = s
-        out_path.write_text(json.dumps(result, indent=2))
-        post_count = len(result.get("posts") or [])
-        print(f"  [seed_posts] @{s['handle']} -> {post_count} posts -> {out_path.relative_to(ROOT)}", flush=True)
-        time.sleep(1.0)
+        todo.append(s)
+    if todo:
+        _fetch_seeds(todo, stamp)
 
 
 def main():
@@ -0,0 +1,194 @@
+"""
+Concurrent runner for the award and directory sources.
+
+discover_awards.py and discover_directories.py used to call `_run_one` for
+each source strictly one after another, so an `--all` sweep took the sum of
+~40 sources that spend nearly all of their time waiting on HTTP, Serper or
+Claude. `run_sources` runs them side by side instead:
+
+  - A pool of SOURCE_WORKERS threads for ordinary sources, and a separate,
+    smaller pool of SOURCE_BROWSER_WORKERS for the sources that drive
+    Playwright first (each holds a ~300MB Chromium for most of its run).
+    Sources that only fall back to Playwright stay in the ordinary pool.
+  - `browser_slot()` caps open Chromiums process-wide at SOURCE_MAX_BROWSERS,
+    whichever source opened them; awards._lib.playwright_session takes one.
+    Render-only fallbacks share browser_pool's warm browsers instead.
+  - `host_slot(url)` caps concurrent requests to one site at SOURCE_PER_HOST,
+    so eater / eater_bakery / eater_cheese (or the twelve substacks) running
+    together don't hammer the same origin. The shared fetch helpers take one
+    around each request, not around their retry back-off sleeps.
+  - Each source gets SOURCE_TIMEOUT seconds. Threads can't be killed, so a
+    source that overruns is reported as timed out and the sweep moves on
+    without its rows. The straggler keeps its worker slot (and so its
+    Chromium's place in the browser lane) until its thread finishes, or
+    for one more timeout at most, so stragglers can't pile up past the pool
+    sizes. Whatever it wrote stays on disk; the daemon thread is dropped
+    when the process exits.
+  - Each source runs inside `telemetry.stage(slug)`, as before, and an
+    exception is reported without stopping the sweep.
+
+workers=1 keeps the old serial loop (no timeout, no extra threads). Output
+lines from concurrent sources interleave; each finish is reported as
+`[done k/N] slug rows (secs)`.
+"""
+from __future__ import annotations
+
+import contextvars
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlparse
+
+import telemetry
+from config import (
+    SOURCE_BROWSER_WORKERS,
+    SOURCE_MAX_BROWSERS,
+    SOURCE_PER_HOST,
+    SOURCE_TIMEOUT,
+    SOURCE_WORKERS,
+)
+
+
+@dataclass(frozen=True)
+class SourceJob:
+    slug: str
+    func: Callable[[], int]      # runs the source, returns rows written
+    browser: bool = False        # Playwright-first: runs in the browser pool
+    timeout: float = SOURCE_TIMEOUT
+
+
+# -- Shared caps ---------------------------------------------------------------
+
+_lock = threading.Lock()
+_host_sems: dict[str, threading.BoundedSemaphore] = {}
+_browser_sem = threading.BoundedSemaphore(max(1, SOURCE_MAX_BROWSERS))
+_held = threading.local()
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+@contextmanager
+def host_slot(url: str):
+    """Hold one of SOURCE_PER_HOST request slots for `url`'s site."""
+    host = _host(url)
+    with _lock:
+        sem = _host_sems.get(host)
+        if sem is None:
+            sem = _host_sems[host] = threading.BoundedSemaphore(max(1, SOURCE_PER_HOST))
+    with sem:
+        yield
+
+
+@contextmanager
+def browser_slot():
+    """Hold one of SOURCE_MAX_BROWSERS browser slots. Re-entrant per thread,
+    so a helper that opens a session inside another one can't deadlock."""
+    depth = getattr(_held, "browsers", 0)
+    if depth:
+        _held.browsers = depth + 1
+        try:
+            yield
+        finally:
+            _held.browsers = depth
+        return
+    with _browser_sem:
+        _held.browsers = 1
+        try:
+            yield
+        finally:
+            _held.browsers = 0
+
+
+# -- Runner --------------------------------------------------------------------
+
+def _run(job: SourceJob) -> int:
+    """Run one source in its telemetry stage; errors are reported, not raised."""
+    try:
+        with telemetry.stage(job.slug):
+            return job.func() or 0
+    except Exception as e:
+        print(f"  ERROR [{job.slug}] — {e}", flush=True)
+        traceback.print_exc(limit=3)
+        return 0
+
+
+def _call(job: SourceJob, results: queue.Queue) -> None:
+    started = time.monotonic()
+    rows = _run(job)
+    results.put((job.slug, rows, time.monotonic() - started))
+
+
+def run_sources(
+    jobs: list[SourceJob],
+    *,
+    workers: int = SOURCE_WORKERS,
+    browser_workers: int = SOURCE_BROWSER_WORKERS,
+) -> int:
+    """Run every job; returns total rows written by the ones that finished in time."""
+    if workers <= 1:
+        return sum(_run(job) for job in jobs)
+
+    pending = {False: deque(j for j in jobs if not j.browser), True: deque(j for j in jobs if j.browser)}
+    free = {False: workers, True: max(1, browser_workers)}
+    running: dict[str, tuple[SourceJob, float]] = {}     # slug -> (job, deadline)
+    stragglers: dict[str, tuple[SourceJob, float]] = {}  # timed out, still holding a slot until
+    results: queue.Queue = queue.Queue()
+    total = finished = 0
+    timed_out: list[str] = []
+
+    while pending[False] or pending[True] or running:
+        for lane in (True, False):
+            while pending[lane] and free[lane]:
+                job = pending[lane].popleft()
+                free[lane] -= 1
+                deadline = time.monotonic() + job.timeout if job.timeout > 0 else float("inf")
+                running[job.slug] = (job, deadline)
+                ctx = contextvars.copy_context()
+                threading.Thread(target=ctx.run, args=(_call, job, results),
+                                 name=f"source-{job.slug}", daemon=True).start()
+
+        wait = min((d for _, d in (*running.values(), *stragglers.values())), default=float("inf"))
+        wait -= time.monotonic()
+        try:
+            slug, rows, secs = results.get(timeout=None if wait == float("inf") else max(0.0, wait))
+        except queue.Empty:
+            now = time.monotonic()
+            for slug, (job, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[slug]
+                    stragglers[slug] = (job, now + job.timeout)
+                    finished += 1
+                    timed_out.append(slug)
+                    print(f"  [timeout {finished}/{len(jobs)}] {slug} after {job.timeout:.0f}s — moving on", flush=True)
+            for slug, (job, release) in list(stragglers.items()):
+                if release <= now:
+                    del stragglers[slug]
+                    free[job.browser] += 1
+                    print(f"  [abandoned] {slug} still running after {2 * job.timeout:.0f}s; "
+                          f"freeing its slot", flush=True)
+            continue
+        if slug in stragglers:
+            job, _ = stragglers.pop(slug)
+            free[job.browser] += 1
+            print(f"  [late] {slug} finished after its timeout ({rows} rows, {secs:.0f}s)", flush=True)
+            continue
+        if slug not in running:
+            print(f"  [late] {slug} finished after its timeout ({rows} rows, {secs:.0f}s)", flush=True)
+            continue
+        job, _ = running.pop(slug)
+        free[job.browser] += 1
+        finished += 1
+        total += rows
+        print(f"  [done {finished}/{len(jobs)}] {slug} {rows} rows ({secs:.0f}s)", flush=True)
+
+    if timed_out:
+        print(f"\n  Timed out: {', '.join(timed_out)}")
+    return total
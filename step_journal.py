@@ -0,0 +1,164 @@
+"""
+Per-(key, step) completion journal for the enrichment steps.
+
+Each step used to guess what was already done from its last partial CSV:
+websites by prefix length, press/reviews/reels/posts by "value > 0" (so a
+business with genuinely zero press was re-queried on every resume), and
+availability by "any non-default value" (all or nothing). A StepJournal
+instead records every finished unit of work together with its result:
+
+    journal = StepJournal("press", os.path.join(OUTPUT_DIR, "journal"))
+    keys = lead_keys(df)
+    journal.apply(df, keys, ["press_mentions", "press_sources"])   # restore
+    todo = journal.pending(keys)                                   # only these
+    ...
+    journal.record(key, {"press_mentions": 0, "press_sources": ""})
+
+  - One append-only JSON-lines file per step (<dir>/<step>.jsonl). Records
+    are buffered and written + fsync'd every `flush_every` records, so a
+    crash loses at most one batch; a torn last line is ignored on load.
+  - Empty results are recorded like any other, so they are never re-fetched.
+    Failures (API errors) are simply not recorded and stay pending.
+  - Keys are lead ids (`lead_keys`), or whatever unit the step fetches
+    (the Instagram steps journal by username).
+  - `record` is thread-safe, and every flush is a single O_APPEND write, so
+    several processes can work the same step on disjoint keys
+    (`pending(keys, shard=(i, n))`) and share one journal.
+  - Journals only carry one run over an interruption. main.run_enrichment
+    resets the journals of the steps it runs unless it is resuming, so a
+    normal run re-fetches everything. `reset()` (or ENRICH_JOURNAL=0) does
+    the same for one step.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from config import JOURNAL_ENABLED, JOURNAL_FLUSH_EVERY
+
+
+def _json_default(v):
+    if isinstance(v, np.generic):
+        return v.item()
+    return str(v)
+
+
+def lead_keys(df: pd.DataFrame) -> pd.Series:
+    """Journal key per row: lead_id when present, else one derived the same way."""
+    from lead_store import ID_COL, assign_lead_ids
+
+    if ID_COL in df.columns and df[ID_COL].fillna("").astype(str).str.strip().ne("").all():
+        return df[ID_COL].astype(str)
+    return assign_lead_ids(df)[ID_COL]
+
+
+class StepJournal:
+    def __init__(self, step: str, directory: str, flush_every: int = JOURNAL_FLUSH_EVERY):
+        os.makedirs(directory, exist_ok=True)
+        self.step = step
+        self.path = os.path.join(directory, f"{step}.jsonl")
+        self.flush_every = max(1, flush_every)
+        self.done: dict[str, dict] = {}
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        if JOURNAL_ENABLED:
+            self._load()
+        else:
+            self.reset()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:  # torn write from a crash
+                    continue
+                self.done[entry["k"]] = entry.get("v") or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __contains__(self, key) -> bool:
+        return str(key) in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def pending(self, keys, shard: tuple[int, int] | None = None) -> list:
+        """Keys not yet journaled, optionally only shard i of n (stable by key)."""
+        out = []
+        for key in dict.fromkeys(keys):
+            if str(key) in self.done:
+                continue
+            if shard and zlib.crc32(str(key).encode()) % shard[1] != shard[0]:
+                continue
+            out.append(key)
+        return out
+
+    def record(self, key, values: dict | None = None) -> None:
+        """Mark `key` finished with its result columns (may be empty)."""
+        key = str(key)
+        values = values or {}
+        line = json.dumps({"k": key, "v": values}, default=_json_default, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.done[key] = values
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.done.clear()
+            self._buffer = []
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def values(self, keys: pd.Series, col: str, default=None) -> pd.Series:
+        """Journaled value of `col` for each key (default where missing)."""
+        return keys.map(lambda k: self.done.get(str(k), {}).get(col, default))
+
+    def apply(self, df: pd.DataFrame, keys: pd.Series, cols: list[str]) -> int:
+        """Copy journaled results into df for finished keys; returns rows restored."""
+        hit = keys.map(lambda k: str(k) in self.done).to_numpy(dtype=bool)
+        if not hit.any():
+            return 0
+        rows = df.index[hit]
+        for col in cols:
+            vals = self.values(keys[hit], col)
+            has = vals.notna().to_numpy()
+            if not has.any():
+                continue
+            if col not in df.columns:
+                df[col] = pd.array([None] * len(df), dtype="object")
+            elif pd.api.types.is_numeric_dtype(df[col]) and not all(
+                isinstance(v, (int, float)) for v in vals[has]
+            ):
+                df[col] = df[col].astype("object")
+            df.loc[rows[has], col] = vals[has].to_numpy()
+        return int(hit.sum())
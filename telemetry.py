@@ -0,0 +1,270 @@
+"""
+Cost and latency telemetry for every external call.
+
+Serper, Apify, Anthropic, Resy and raw website HTTP all record into one
+process-wide registry, aggregated by (provider, stage):
+
+  - calls, errors, cache hits, retries, bytes received, estimated USD
+  - a latency histogram (LATENCY_BUCKETS, seconds) with p50 / p95 / max
+  - status-code counts (HTTP status, Apify run status, or exception name)
+
+The stage is whatever `with telemetry.stage("press"):` is active in the
+calling context; pipeline_dag wraps every enrichment step in one. Worker
+threads only see it when they are started from a context-propagating pool,
+so modules that fan out use `telemetry.ThreadPoolExecutor` instead of the
+concurrent.futures one (asyncio tasks inherit it on their own).
+
+Recording a call:
+
+    with telemetry.timed("anthropic") as call:
+        msg = client.messages.create(...)
+        call["cost"] = telemetry.anthropic_cost(model, msg.usage)
+
+`timed` records the latency when the block exits; exceptions are counted
+as errors under their class name and re-raised. `start_live()` prints
+`summary_line()` every TELEMETRY_LIVE_SECONDS. `write_report()` writes
+output/telemetry/run_<stamp>.json (with histograms) and .csv (one row per
+provider/stage, sorted by total time).
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import csv
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent import futures
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import ANTHROPIC_USD_PER_MTOK, TELEMETRY_DIR, TELEMETRY_LIVE_SECONDS
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_stage: contextvars.ContextVar[str] = contextvars.ContextVar("telemetry_stage", default="")
+
+
+@contextmanager
+def stage(name: str):
+    """Attribute external calls made in this context to pipeline stage `name`."""
+    token = _stage.set(name)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def current_stage() -> str:
+    return _stage.get() or "-"
+
+
+class ThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in the submitter's context (stage)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        ctx = contextvars.copy_context()
+        return super().submit(ctx.run, fn, *args, **kwargs)
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "cached", "retries", "bytes", "cost", "total_s", "max_s", "buckets", "statuses")
+
+    def __init__(self):
+        self.calls = self.errors = self.cached = self.retries = self.bytes = 0
+        self.cost = self.total_s = self.max_s = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses: Counter = Counter()
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th timed (non-cached) call."""
+        timed = self.calls - self.cached
+        if timed <= 0:
+            return 0.0
+        target, seen = q * timed, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(LATENCY_BUCKETS[i], self.max_s) if i < len(LATENCY_BUCKETS) else self.max_s
+        return self.max_s
+
+    def row(self) -> dict:
+        timed = self.calls - self.cached
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cached": self.cached,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "cost_usd": round(self.cost, 4),
+            "total_s": round(self.total_s, 2),
+            "mean_s": round(self.total_s / timed, 3) if timed else 0.0,
+            "p50_s": round(self.quantile(0.5), 3),
+            "p95_s": round(self.quantile(0.95), 3),
+            "max_s": round(self.max_s, 2),
+            "statuses": dict(self.statuses),
+        }
+
+
+_series: dict[tuple[str, str], _Series] = {}
+_lock = threading.Lock()
+_started = time.time()
+
+
+def record(
+    provider: str,
+    *,
+    latency: float = 0.0,
+    status=None,
+    nbytes: int = 0,
+    retries: int = 0,
+    cost: float = 0.0,
+    cached: bool = False,
+    error: bool | None = None,
+) -> None:
+    """Record one external call (or cache hit) against the current stage."""
+    if error is None:
+        error = isinstance(status, str) or (isinstance(status, int) and status >= 400)
+    key = (provider, current_stage())
+    with _lock:
+        s = _series.get(key)
+        if s is None:
+            s = _series[key] = _Series()
+        s.calls += 1
+        s.retries += retries
+        s.bytes += nbytes or 0
+        s.cost += cost or 0.0
+        if status is not None:
+            s.statuses[str(status)] += 1
+        if error:
+            s.errors += 1
+        if cached:
+            s.cached += 1
+            return
+        s.total_s += latency
+        s.max_s = max(s.max_s, latency)
+        s.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+
+@contextmanager
+def timed(provider: str, **fields):
+    """Time the block as one `provider` call; set status/nbytes/cost/retries on the yielded dict."""
+    call = dict(fields)
+    t0 = time.perf_counter()
+    try:
+        yield call
+    except BaseException as e:
+        call.setdefault("status", type(e).__name__)
+        call["error"] = True
+        raise
+    finally:
+        record(provider, latency=time.perf_counter() - t0, **call)
+
+
+def anthropic_cost(model: str, usage) -> float:
+    """List-price USD for one Messages API response's `usage`."""
+    if usage is None:
+        return 0.0
+    family = next((f for f in ANTHROPIC_USD_PER_MTOK if f in (model or "")), "sonnet")
+    usd_in, usd_out = ANTHROPIC_USD_PER_MTOK[family]
+    tokens_in = getattr(usage, "input_tokens", 0) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    tokens_out = getattr(usage, "output_tokens", 0) or 0
+    return (tokens_in * usd_in + cache_write * usd_in * 1.25 + cache_read * usd_in * 0.1
+            + tokens_out * usd_out) / 1_000_000
+
+
+# ─── Reporting ───────────────────────────────────────────────────────
+
+def snapshot() -> list[dict]:
+    """One row per (provider, stage), slowest total first."""
+    with _lock:
+        rows = [{"provider": p, "stage": st, **s.row(), "histogram": list(s.buckets)}
+                for (p, st), s in _series.items()]
+    return sorted(rows, key=lambda r: -r["total_s"])
+
+
+def summary_line() -> str:
+    """`[telemetry] 12m03s | serper 4,210 (38% cached) p95 0.8s $4.21 | ... | $5.10`"""
+    by_provider: dict[str, _Series] = {}
+    with _lock:
+        for (p, _st), s in _series.items():
+            agg = by_provider.setdefault(p, _Series())
+            agg.calls += s.calls
+            agg.cached += s.cached
+            agg.errors += s.errors
+            agg.cost += s.cost
+            agg.max_s = max(agg.max_s, s.max_s)
+            agg.buckets = [a + b for a, b in zip(agg.buckets, s.buckets)]
+    elapsed = int(time.time() - _started)
+    parts = [f"[telemetry] {elapsed // 60}m{elapsed % 60:02d}s"]
+    for p, s in sorted(by_provider.items(), key=lambda kv: -kv[1].calls):
+        part = f"{p} {s.calls:,}"
+        if s.cached:
+            part += f" ({s.cached / s.calls:.0%} cached)"
+        if s.errors:
+            part += f" {s.errors:,} err"
+        part += f" p95 {s.quantile(0.95):.2g}s"
+        if s.cost:
+            part += f" ${s.cost:.2f}"
+        parts.append(part)
+    parts.append(f"${sum(s.cost for s in by_provider.values()):.2f}")
+    return " | ".join(parts)
+
+
+def write_report(directory: str = TELEMETRY_DIR, name: str | None = None) -> tuple[str, str] | None:
+    """Write run_<stamp>.json and .csv; returns their paths (None if nothing was recorded)."""
+    rows = snapshot()
+    if not rows:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    name = name or f"run_{datetime.fromtimestamp(_started).strftime('%Y%m%d_%H%M%S')}"
+    json_path = os.path.join(directory, f"{name}.json")
+    csv_path = os.path.join(directory, f"{name}.csv")
+    with open(json_path, "w") as f:
+        json.dump({
+            "started": datetime.fromtimestamp(_started).isoformat(timespec="seconds"),
+            "elapsed_s": round(time.time() - _started, 1),
+            "latency_buckets_s": list(LATENCY_BUCKETS),
+            "total_cost_usd": round(sum(r["cost_usd"] for r in rows), 4),
+            "series": rows,
+        }, f, indent=2)
+    cols = [c for c in rows[0] if c != "histogram"]
+    with open(csv_path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=cols, extrasaction="ignore")
+        w.writeheader()
+        for r in rows:
+            w.writerow({**r, "statuses": ";".join(f"{k}={v}" for k, v in r["statuses"].items())})
+    return json_path, csv_path
+
+
+def print_telemetry_report() -> None:
+    """End-of-run summary line + report files; silent when nothing was called."""
+    paths = write_report()
+    if paths:
+        print(summary_line())
+        print(f"Telemetry report: {paths[0]} / {os.path.basename(paths[1])}")
+
+
+_live_stop = threading.Event()
+
+
+def start_live(interval: float = TELEMETRY_LIVE_SECONDS) -> None:
+    """Print `summary_line()` every `interval` seconds from a daemon thread."""
+    if interval <= 0:
+        return
+    _live_stop.clear()
+
+    def loop():
+        while not _live_stop.wait(interval):
+            if _series:
+                print(summary_line(), flush=True)
+
+    threading.Thread(target=loop, name="telemetry-live", daemon=True).start()
+
+
+def stop_live() -> None:
+    _live_stop.set()
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from entity_resolution import dedupe, resolve
+
+COLUMNS = dict(name="name", city="city", state="state", cid="cid")
+
+
+def test_resolve_distinct_cids_with_blocked_candidates():
+    # Both names share a blocking key, but their cids differ, so every
+    # candidate pair is guarded out before scoring.
+    df = pd.DataFrame({
+        "name": ["Joe's Pizza", "Joe's Deli"],
+        "city": ["Austin", "Austin"],
+        "state": ["TX", "TX"],
+        "cid": ["111", "222"],
+    })
+    clusters = resolve(df, **COLUMNS)
+    assert clusters.nunique() == 2
+
+
+def test_resolve_same_name_distinct_cids_stay_apart():
+    df = pd.DataFrame({
+        "name": ["Golden Oak Butcher"] * 3,
+        "city": ["Austin"] * 3,
+        "state": ["TX"] * 3,
+        "cid": ["1", "2", "3"],
+    })
+    assert resolve(df, **COLUMNS).nunique() == 3
+
+
+def test_resolve_never_chains_across_cids():
+    # The cid-less middle row matches both neighbours, but cid 1 and cid 2
+    # must still end up in different clusters.
+    df = pd.DataFrame({
+        "name": ["Golden Oak Butcher"] * 3,
+        "city": ["Austin"] * 3,
+        "state": ["TX"] * 3,
+        "cid": ["1", "", "2"],
+    })
+    clusters = resolve(df, **COLUMNS)
+    assert clusters.iloc[0] != clusters.iloc[2]
+    assert clusters.nunique() == 2
+
+
+def test_second_location_keeps_its_own_cluster():
+    df = pd.DataFrame({
+        "name": ["Golden Oak Butcher"] * 2,
+        "city": ["Austin"] * 2,
+        "state": ["TX"] * 2,
+        "address": ["100 Main St, Austin, TX 78701", "900 Lamar Blvd, Austin, TX 78703"],
+    })
+    assert resolve(df).nunique() == 2
+    assert len(dedupe(df)) == 2
+
+
+def test_distinct_column_values_keep_their_own_cluster():
+    df = pd.DataFrame({
+        "name": ["Golden Oak Butcher"] * 3,
+        "city": ["Austin"] * 3,
+        "state": ["TX"] * 3,
+        "ig": ["a", "b", "a"],
+    })
+    clusters = resolve(df, distinct=("ig",))
+    assert clusters.iloc[0] == clusters.iloc[2]
+    assert clusters.iloc[0] != clusters.iloc[1]
+    assert len(dedupe(df, distinct=("ig",))) == 2
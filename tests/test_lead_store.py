@@ -0,0 +1,31 @@
+import pandas as pd
+
+from lead_store import ID_COL, assign_lead_ids
+
+
+def test_lead_id_ignores_the_rest_of_the_frame():
+    row = {"name": "Golden Oak Butcher", "city": "Austin", "state": "TX", "cid": "2"}
+    alone = assign_lead_ids(pd.DataFrame([row]))
+    crowded = assign_lead_ids(pd.DataFrame([
+        {"name": "Golden Oak Butcher", "city": "Austin", "state": "TX", "cid": ""},
+        {"name": "Golden Oak Butcher", "city": "Austin", "state": "TX", "cid": "1"},
+        row,
+    ]))
+    assert crowded[ID_COL].iloc[2] == alone[ID_COL].iloc[0]
+    assert crowded[ID_COL].is_unique
+
+
+def test_shared_identity_ids_ignore_row_order_and_duplicates():
+    rows = [
+        {"name": "Golden Oak Butcher", "city": "Austin", "state": "TX", "address": "100 Main St, Austin, TX"},
+        {"name": "Golden Oak Butcher", "city": "Austin", "state": "TX", "address": "900 Lamar Blvd, Austin, TX"},
+    ]
+    forward = assign_lead_ids(pd.DataFrame(rows))[ID_COL].tolist()
+    backward = assign_lead_ids(pd.DataFrame(rows[::-1]))[ID_COL].tolist()
+    assert forward == backward[::-1]
+    assert len(set(forward)) == 2
+
+    # An exact duplicate joining the frame shifts no one's id.
+    with_dup = assign_lead_ids(pd.DataFrame([rows[1], *rows]))[ID_COL].tolist()
+    assert with_dup[1:] == forward
+    assert with_dup[0] == forward[1]
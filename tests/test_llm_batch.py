@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+import llm_batch
+import llm_cache
+
+MODEL = "claude-fake"
+SYSTEM = "Extract venues as a JSON array."
+REPLY = '[{"name": "Golden Oak Butcher"}]'
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    """Fake batch endpoint on an ephemeral port, with the LLM cache and batch
+    log in tmp_path and a short poll interval."""
+    server = llm_batch.serve_fake(port=0, reply=REPLY, delay=0.2)
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "fake")
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_REFRESH", False)
+    path = str(tmp_path / "llm_cache.sqlite")
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path))
+    monkeypatch.setattr(llm_cache, "_clients", {})
+    log = llm_batch.BatchLog(path)
+    monkeypatch.setattr(llm_batch, "_log", log)
+    yield log
+    server.shutdown()
+
+
+def test_run_batch_dedupes_maps_and_caches(fake):
+    items = {"a": "doc one", "b": "doc two", "c": "doc one"}
+    out = llm_batch.run_batch(MODEL, SYSTEM, items, label="test")
+
+    assert out == {k: json.loads(REPLY) for k in items}
+    batches = fake.report()
+    assert len(batches) == 1
+    assert len(json.loads(batches[0][3])) == 2  # "doc one" sent once
+    assert batches[0][5] is not None  # collected
+
+    # Second call is answered from the cache without a new batch.
+    again = llm_batch.run_batch(MODEL, SYSTEM, items, label="test")
+    assert again == out
+    assert len(fake.report()) == 1
+
+
+def test_prefill_stores_replies_in_llm_cache(fake):
+    llm_batch.prefill(MODEL, SYSTEM, ["doc one", "doc two", "doc one"], label="test")
+    assert llm_cache.lookup(MODEL, SYSTEM, "doc one") == json.loads(REPLY)
+    assert llm_cache.lookup(MODEL, SYSTEM, "doc two") == json.loads(REPLY)
+    llm_batch.prefill(MODEL, SYSTEM, ["doc one", "doc two"], label="test")
+    assert len(fake.report()) == 1
+
+
+def test_rerun_reattaches_to_open_batch(fake):
+    # A previous run submitted the request and was interrupted before collecting.
+    params = {"model": MODEL, "max_tokens": 4096, "system": SYSTEM,
+              "messages": [{"role": "user", "content": "doc one"}]}
+    cid = llm_batch._custom_id(params)
+    client = llm_cache.get_anthropic_client("fake")
+    batch = client.messages.batches.create(requests=[{"custom_id": cid, "params": params}])
+    fake.add(batch.id, "test", MODEL, [cid])
+
+    out = llm_batch.run_batch(MODEL, SYSTEM, {"a": "doc one"}, label="test")
+
+    assert out == {"a": json.loads(REPLY)}
+    batches = fake.report()
+    assert [b[0] for b in batches] == [batch.id]  # nothing new submitted
+    assert fake.open_for([cid]) == {}
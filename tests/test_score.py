@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from score import (
+    _ENRICHMENT_ONLY_SIGNALS,
+    _SCORE_DISPATCH,
+    assign_tiers,
+    compute_lead_score,
+    compute_lead_scores,
+    get_tier,
+)
+from score_registry import RESERVATION_TYPES
+
+# Every rung of every ladder in score.py, plus the values either side of it.
+BOUNDARIES = {
+    "avg_video_views": (0, 1, 1_000, 5_000, 10_000, 20_000, 50_000, 100_000),
+    "follower_count": (0, 500, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000),
+    "review_count": (0, 50, 100, 200, 500, 1000, 2000, 5000),
+    "press_mentions": (0, 1, 3, 5, 7, 10),
+    "awards_count": (0, 1, 2, 3),
+    "rating": (0.0, 3.5, 4.0, 4.3, 4.5, 4.7),
+    "avg_likes": (0, 1, 200, 500, 1_000, 2_000, 5_000),
+    "price_tier": (0, 1, 2, 3, 4),
+}
+TYPES = sorted(RESERVATION_TYPES) + ["wine_store", "butcher", ""]
+TIER_CUTOFFS = (15, 20, 25, 35, 45, 55)
+
+
+def _around(col, value):
+    step = 0.01 if col == "rating" else 1
+    return [v for v in (value - step, value, value + step) if v >= 0]
+
+
+def _boundary_frame() -> pd.DataFrame:
+    rows = []
+    for _, col in _SCORE_DISPATCH.values():
+        for edge in BOUNDARIES[col]:
+            for value in _around(col, edge):
+                for biz in TYPES:
+                    rows.append({"business_type": biz, col: value})
+    # Enrichment-only signals with no data (0 and NaN) are skipped, not scored.
+    for key in _ENRICHMENT_ONLY_SIGNALS:
+        col = _SCORE_DISPATCH[key][1]
+        rows += [{"business_type": "restaurant", col: 0}, {"business_type": "restaurant", col: np.nan}]
+    # Reservation composite and flags, on reservation and niche types.
+    for biz in TYPES:
+        for platform in (0, 1, 2, 3):
+            rows.append({
+                "business_type": biz, "reservation_difficulty": platform,
+                "review_difficulty_sentiment": 0.5, "booking_availability_score": 0.2,
+                "has_email_signup": True, "has_ecommerce": platform % 2 == 0,
+                "review_count": 600, "rating": 4.6, "follower_count": 25_000,
+                "press_mentions": 4, "awards_count": 2, "price_tier": 3,
+            })
+    df = pd.DataFrame(rows)
+    # Enrichment defaults for the reservation inputs; signal columns keep NaN.
+    df = df.fillna({"reservation_difficulty": 0, "review_difficulty_sentiment": 0.0,
+                    "booking_availability_score": 1.0})
+    for col in ("has_email_signup", "has_ecommerce"):
+        df[col] = df[col].astype(object).where(df[col].notna(), False)
+    return df
+
+
+def test_columnar_scores_match_row_wise():
+    df = _boundary_frame()
+    expected = df.apply(compute_lead_score, axis=1).to_numpy(dtype=float)
+    np.testing.assert_array_equal(compute_lead_scores(df), expected)
+
+
+def test_tiers_match_row_wise_at_every_cutoff():
+    scores = sorted({round(c + d, 1) for c in TIER_CUTOFFS for d in (-0.1, 0.0, 0.1)} | {0.0, 100.0})
+    df = pd.DataFrame([{"business_type": biz, "lead_score": s} for biz in TYPES for s in scores])
+    expected = df.apply(get_tier, axis=1).to_numpy()
+    assert list(assign_tiers(df, df["lead_score"].to_numpy())) == list(expected)
+
+
+def test_tiers_match_row_wise_on_scored_frame():
+    df = _boundary_frame()
+    df["lead_score"] = compute_lead_scores(df)
+    expected = df.apply(get_tier, axis=1).to_numpy()
+    assert list(assign_tiers(df, df["lead_score"].to_numpy())) == list(expected)